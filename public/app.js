@@ -109,6 +109,10 @@ class VoiceInterviewerApp {
         this.anketaPollingInterval = null;
         this.anketaSaveTimeout = null;
         this._pollAbortController = null; // R4-07: AbortController for pending fetch
+        this._eventSource = null; // Push-канал анкеты (SSE); polling остаётся fallback
+        this._anketaState = null; // Последнее полное состояние анкеты (база для SSE дельт)
+        this._anketaEtag = null; // ETag последнего ответа GET /anketa (If-None-Match → 304)
+        this._anketaEtagSession = null;
         this.focusedField = null;
         this.localEdits = {};
         this.consultationType = 'consultation'; // 'consultation' or 'interview'
@@ -2432,7 +2436,10 @@ class VoiceInterviewerApp {
             if (!el.value) el.classList.add('field-loading');
         });
         this._scheduleNextPoll();
-        this.pollAnketa();
+        // SSE snapshot заменяет первый poll; без EventSource — обычный polling
+        if (!this._openAnketaStream()) {
+            this.pollAnketa();
+        }
     }
 
     stopAnketaPolling() {
@@ -2449,9 +2456,88 @@ class VoiceInterviewerApp {
             this._pollAbortController.abort();
             this._pollAbortController = null;
         }
+        this._closeAnketaStream();
+    }
+
+    // ===== Anketa Push (SSE) =====
+
+    _openAnketaStream() {
+        if (!window.EventSource || !this.sessionId) return false;
+        this._closeAnketaStream();
+
+        const source = new EventSource(`/api/session/${this.sessionId}/events`);
+        this._eventSource = source;
+
+        const handle = (type) => (event) => {
+            if (this._eventSource !== source) return;
+            let payload;
+            try {
+                payload = JSON.parse(event.data);
+            } catch (e) {
+                LOG.warn('[SSE] Bad event payload', type);
+                return;
+            }
+            this._pollingFailureCount = 0;
+            this._handleAnketaEvent(type, payload);
+        };
+        ['snapshot', 'anketa', 'status', 'runtime', 'metadata', 'resync'].forEach(type => {
+            source.addEventListener(type, handle(type));
+        });
+
+        source.onopen = () => {
+            // Пока поток жив, polling работает только как редкая страховка
+            this._scheduleNextPoll();
+        };
+        source.onerror = () => {
+            if (this._eventSource !== source) return;
+            if (source.readyState === EventSource.CLOSED) {
+                // Сервер закрыл поток (терминальный статус) или SSE недоступен — назад к polling
+                LOG.warn('[SSE] Stream closed, falling back to polling');
+                this._eventSource = null;
+            }
+            // CONNECTING: браузер переподключится сам, а polling пока возвращается к обычному интервалу
+            if (this.sessionId) this._scheduleNextPoll();
+        };
+        return true;
+    }
+
+    _closeAnketaStream() {
+        if (this._eventSource) {
+            this._eventSource.close();
+            this._eventSource = null;
+        }
+    }
+
+    _handleAnketaEvent(type, payload) {
+        if (type === 'snapshot') {
+            this._applyAnketaPayload(payload);
+            return;
+        }
+        if (type === 'resync' || !this._anketaState) {
+            this.pollAnketa();
+            return;
+        }
+
+        const state = { ...this._anketaState };
+        if (type === 'anketa') {
+            const anketaData = { ...(state.anketa_data || {}), ...(payload.changed || {}) };
+            (payload.removed || []).forEach(key => delete anketaData[key]);
+            state.anketa_data = anketaData;
+            if (payload.completion_rate !== undefined) state.completion_rate = payload.completion_rate;
+            if (payload.updated_at) state.updated_at = payload.updated_at;
+        } else if (type === 'status') {
+            state.status = payload.status;
+        } else if (type === 'runtime') {
+            state.runtime_status = payload.runtime_status;
+        } else if (type === 'metadata') {
+            if (payload.company_name !== undefined) state.company_name = payload.company_name;
+        }
+        this._applyAnketaPayload(state);
     }
 
     _getPollingInterval() {
+        // SSE поток открыт — изменения приходят push'ем, polling только страхует
+        if (this._eventSource && this._eventSource.readyState === EventSource.OPEN) return 30000;
         // Adaptive: 2s active, 5s idle (>30s no message), 10s tab hidden
         // R5-16: Exponential backoff on repeated failures
         if (document.hidden) return 10000;
@@ -2481,9 +2567,20 @@ class VoiceInterviewerApp {
                 this._pollAbortController.abort();
             }
             this._pollAbortController = new AbortController();
+            // Conditional GET: 304, если анкета не менялась с прошлого ответа
+            const headers = {};
+            if (this._anketaEtag && this._anketaEtagSession === this.sessionId) {
+                headers['If-None-Match'] = this._anketaEtag;
+            }
             const response = await fetch(`/api/session/${this.sessionId}/anketa`, {
                 signal: this._pollAbortController.signal,
+                headers,
+                cache: 'no-store',
             });
+            if (response.status === 304) {
+                this._pollingFailureCount = 0;
+                return;
+            }
             if (!response.ok) {
                 if (response.status === 404) {
                     LOG.warn(`[POLLING] Session ${this.sessionId} not found, stopping polling`);
@@ -2494,152 +2591,161 @@ class VoiceInterviewerApp {
             }
 
             const data = await response.json();
+            this._anketaEtag = response.headers.get('ETag');
+            this._anketaEtagSession = this.sessionId;
 
             // SUCCESS: Reset failure count
             this._pollingFailureCount = 0;
 
-            // SPRINT 5: Debug logging
-            const completion = data.completion_rate || 0;
-            const messageCount = this.messageHistory?.length || 0;
-            const filledFields = data.anketa_data ? Object.keys(data.anketa_data).filter(
-                k => data.anketa_data[k] && data.anketa_data[k] !== '' &&
-                !(Array.isArray(data.anketa_data[k]) && data.anketa_data[k].length === 0)
-            ).length : 0;
-
-            // Debug logging (console only, no visual noise)
-            if (window.location.search.includes('debug=true')) {
-                console.log('[POLLING] Anketa update', {
-                    session_id: this.sessionId,
-                    completion_rate: completion,
-                    message_count: messageCount,
-                    fields_filled: filledFields,
-                    total_fields: this.anketaFields.length,
-                    status: data.status
-                });
+            this._applyAnketaPayload(data);
+        } catch (error) {
+            // R4-07: Ignore aborted requests (expected on navigation/cleanup)
+            if (error.name === 'AbortError') return;
+
+            // SPRINT 5: Not silent anymore - log errors with failure count
+            LOG.error('[POLLING] Anketa fetch failed:', error);
+
+            // Show toast only after multiple consecutive failures
+            this._pollingFailureCount = (this._pollingFailureCount || 0) + 1;
+            if (this._pollingFailureCount >= 3) {
+                showToast('Проблема с обновлением анкеты. Попробуйте обновить страницу.', 'warning', 5000);
             }
+        }
+    }
 
-            // SPRINT 5: Update debug panel
-            this._updateDebugPanel(completion, filledFields, this.anketaFields.length, messageCount, true);
+    _applyAnketaPayload(data) {
+        // Общая обработка состояния анкеты: ответ polling и SSE (snapshot + дельты)
+        this._anketaState = data;
 
-            if (data.status) {
-                this.updateAnketaStatus(data.status);
+        // SPRINT 5: Debug logging
+        const completion = data.completion_rate || 0;
+        const messageCount = this.messageHistory?.length || 0;
+        const filledFields = data.anketa_data ? Object.keys(data.anketa_data).filter(
+            k => data.anketa_data[k] && data.anketa_data[k] !== '' &&
+            !(Array.isArray(data.anketa_data[k]) && data.anketa_data[k].length === 0)
+        ).length : 0;
 
-                // Check runtime_status first (agent-internal ephemeral state)
-                if (data.runtime_status === 'processing') {
-                    this.updateStatusTicker('🤖 AI извлекает данные из разговора...', true);
-                } else if (data.status === 'reviewing') {
-                    this.updateStatusTicker('✨ AI анализирует ответы...', true);
-                } else if (data.status === 'confirmed') {
-                    this.updateStatusTicker('✅ Консультация завершена');
-                } else if (data.status === 'declined') {
-                    this.updateStatusTicker('❌ Сессия отклонена');
-                }
+        // Debug logging (console only, no visual noise)
+        if (window.location.search.includes('debug=true')) {
+            console.log('[ANKETA] Update', {
+                session_id: this.sessionId,
+                completion_rate: completion,
+                message_count: messageCount,
+                fields_filled: filledFields,
+                total_fields: this.anketaFields.length,
+                status: data.status
+            });
+        }
 
-                // F7.5: Stop polling after terminal state — no more changes expected
-                if (data.status === 'confirmed' || data.status === 'declined') {
-                    this.stopAnketaPolling();
-                    return;
-                }
-            }
+        // SPRINT 5: Update debug panel
+        this._updateDebugPanel(completion, filledFields, this.anketaFields.length, messageCount, true);
+
+        if (data.status) {
+            this.updateAnketaStatus(data.status);
 
-            // Update company name in header
-            if (data.company_name) {
-                this.elements.sessionCompany.textContent = data.company_name;
-                this._updateHeaderSessionContext(data.company_name, data.status);
+            // Check runtime_status first (agent-internal ephemeral state)
+            if (data.runtime_status === 'processing') {
+                this.updateStatusTicker('🤖 AI извлекает данные из разговора...', true);
+            } else if (data.status === 'reviewing') {
+                this.updateStatusTicker('✨ AI анализирует ответы...', true);
+            } else if (data.status === 'confirmed') {
+                this.updateStatusTicker('✅ Консультация завершена');
+            } else if (data.status === 'declined') {
+                this.updateStatusTicker('❌ Сессия отклонена');
             }
 
-            // Remove skeleton on first successful poll
-            if (!this._anketaFirstPollDone) {
-                this._anketaFirstPollDone = true;
-                this.elements.anketaForm?.querySelectorAll('.field-loading').forEach(el => {
-                    el.classList.remove('field-loading');
-                });
+            // F7.5: Stop polling after terminal state — no more changes expected
+            if (data.status === 'confirmed' || data.status === 'declined') {
+                this.stopAnketaPolling();
+                return;
             }
+        }
 
-            if (data.anketa_data) {
-                // v5.0: Detect anketa type for rendering
-                if (data.anketa_data.anketa_type === 'interview') {
-                    this.consultationType = 'interview';
-                }
+        // Update company name in header
+        if (data.company_name) {
+            this.elements.sessionCompany.textContent = data.company_name;
+            this._updateHeaderSessionContext(data.company_name, data.status);
+        }
 
-                // Normalize field names (business_description→company_description, etc.)
-                // BEFORE counting, so mapped fields are included in progress
-                const normalized = this._normalizeAnketaData(data.anketa_data);
-                const anketaFieldSet = new Set(this.anketaFields);
-                const keys = Object.keys(normalized).filter(
-                    k => anketaFieldSet.has(k) &&
-                    normalized[k] && normalized[k] !== '' &&
-                    !(Array.isArray(normalized[k]) && normalized[k].length === 0)
-                );
-                if (this.consultationType === 'interview') {
-                    this.updateAnketaFromServerInterview(data.anketa_data);
-                } else {
-                    this.updateAnketaFromServer(data.anketa_data);
-                    this.updateAIBlocksSummary(data.anketa_data);
-                }
-                this.lastServerAnketa = { ...data.anketa_data };
+        // Remove skeleton on first successful poll
+        if (!this._anketaFirstPollDone) {
+            this._anketaFirstPollDone = true;
+            this.elements.anketaForm?.querySelectorAll('.field-loading').forEach(el => {
+                el.classList.remove('field-loading');
+            });
+        }
 
-                let pct;
-                if (this.consultationType === 'interview') {
-                    const qaPairs = data.anketa_data.qa_pairs || [];
-                    const answered = qaPairs.filter(qa => qa.answer && qa.answer.trim()).length;
-                    pct = qaPairs.length > 0 ? Math.min(100, Math.round(answered / qaPairs.length * 100)) : 0;
-                } else {
-                    pct = this.anketaFields.length > 0
-                        ? Math.min(100, Math.round(keys.length / this.anketaFields.length * 100))
-                        : 0;
-                }
-                this.updateProgress(pct);
-                this._updateStepperProgress(normalized);
+        if (data.anketa_data) {
+            // v5.0: Detect anketa type for rendering
+            if (data.anketa_data.anketa_type === 'interview') {
+                this.consultationType = 'interview';
+            }
 
-                // SPRINT 3: Update header anketa status
-                const headerStatus = document.getElementById('header-anketa-status');
-                const headerProgress = document.getElementById('header-anketa-progress');
+            // Normalize field names (business_description→company_description, etc.)
+            // BEFORE counting, so mapped fields are included in progress
+            const normalized = this._normalizeAnketaData(data.anketa_data);
+            const anketaFieldSet = new Set(this.anketaFields);
+            const keys = Object.keys(normalized).filter(
+                k => anketaFieldSet.has(k) &&
+                normalized[k] && normalized[k] !== '' &&
+                !(Array.isArray(normalized[k]) && normalized[k].length === 0)
+            );
+            if (this.consultationType === 'interview') {
+                this.updateAnketaFromServerInterview(data.anketa_data);
+            } else {
+                this.updateAnketaFromServer(data.anketa_data);
+                this.updateAIBlocksSummary(data.anketa_data);
+            }
+            this.lastServerAnketa = { ...data.anketa_data };
 
-                if (this.consultationType === 'consultation' && !this.isPaused && this.isConnected) {
-                    if (pct > 0 && pct < 100 && headerStatus) {
-                        headerStatus.style.display = 'flex';
-                        if (headerProgress) {
-                            headerProgress.textContent = `${Math.round(pct)}%`;
-                        }
-                    }
+            let pct;
+            if (this.consultationType === 'interview') {
+                const qaPairs = data.anketa_data.qa_pairs || [];
+                const answered = qaPairs.filter(qa => qa.answer && qa.answer.trim()).length;
+                pct = qaPairs.length > 0 ? Math.min(100, Math.round(answered / qaPairs.length * 100)) : 0;
+            } else {
+                pct = this.anketaFields.length > 0
+                    ? Math.min(100, Math.round(keys.length / this.anketaFields.length * 100))
+                    : 0;
+            }
+            this.updateProgress(pct);
+            this._updateStepperProgress(normalized);
 
-                    // Hide when complete
-                    if (pct >= 100 && headerStatus) {
-                        setTimeout(() => {
-                            headerStatus.style.display = 'none';
-                        }, 5000);
+            // SPRINT 3: Update header anketa status
+            const headerStatus = document.getElementById('header-anketa-status');
+            const headerProgress = document.getElementById('header-anketa-progress');
+
+            if (this.consultationType === 'consultation' && !this.isPaused && this.isConnected) {
+                if (pct > 0 && pct < 100 && headerStatus) {
+                    headerStatus.style.display = 'flex';
+                    if (headerProgress) {
+                        headerProgress.textContent = `${Math.round(pct)}%`;
                     }
                 }
 
-                // Status ticker + toast notifications
-                const prevCount = this._lastFieldCount || 0;
-                if (prevCount === 0 && keys.length > 0) {
-                    showToast('Анкета заполняется автоматически по ходу беседы', 'info', 4000);
-                    this.updateStatusTicker('Анкета заполняется автоматически');
-                } else if (keys.length > prevCount && prevCount > 0) {
-                    const diff = keys.length - prevCount;
-                    showToast(`Анкета обновлена — +${diff} ${diff === 1 ? 'поле' : 'полей'}`, 'success', 4000);  // SPRINT 4: было 'info', 2500ms
-                    this.updateStatusTicker(`Заполнено ${keys.length} из ${this.anketaFields.length} полей`, true);  // pulse = true
-                }
-                if (pct >= 50 && (this._lastPct || 0) < 50) {
-                    this.updateStatusTicker('Собрано больше половины данных');
+                // Hide when complete
+                if (pct >= 100 && headerStatus) {
+                    setTimeout(() => {
+                        headerStatus.style.display = 'none';
+                    }, 5000);
                 }
-                this._lastFieldCount = keys.length;
-                this._lastPct = pct;
             }
-        } catch (error) {
-            // R4-07: Ignore aborted requests (expected on navigation/cleanup)
-            if (error.name === 'AbortError') return;
-
-            // SPRINT 5: Not silent anymore - log errors with failure count
-            LOG.error('[POLLING] Anketa fetch failed:', error);
 
-            // Show toast only after multiple consecutive failures
-            this._pollingFailureCount = (this._pollingFailureCount || 0) + 1;
-            if (this._pollingFailureCount >= 3) {
-                showToast('Проблема с обновлением анкеты. Попробуйте обновить страницу.', 'warning', 5000);
+            // Status ticker + toast notifications
+            const prevCount = this._lastFieldCount || 0;
+            if (prevCount === 0 && keys.length > 0) {
+                showToast('Анкета заполняется автоматически по ходу беседы', 'info', 4000);
+                this.updateStatusTicker('Анкета заполняется автоматически');
+            } else if (keys.length > prevCount && prevCount > 0) {
+                const diff = keys.length - prevCount;
+                showToast(`Анкета обновлена — +${diff} ${diff === 1 ? 'поле' : 'полей'}`, 'success', 4000);  // SPRINT 4: было 'info', 2500ms
+                this.updateStatusTicker(`Заполнено ${keys.length} из ${this.anketaFields.length} полей`, true);  // pulse = true
+            }
+            if (pct >= 50 && (this._lastPct || 0) < 50) {
+                this.updateStatusTicker('Собрано больше половины данных');
             }
+            this._lastFieldCount = keys.length;
+            this._lastPct = pct;
         }
     }
 
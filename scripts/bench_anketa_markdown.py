@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Микро-бенчмарк markdown анкеты: полный рендер (_render_markdown) против
+AnketaMarkdownRenderer, который перерисовывает только изменённые секции.
+
+Анкета — заполненная v2.0 (как в bench_anketa_models.py). Сценарии повторяют
+вызовы render_markdown: цикл экстракции голосового агента (merge_json с
+изменением одного-двух полей), повторный экспорт без изменений, экспорт
+после полной валидации из БД (равные, но новые объекты).
+
+Использование:
+    python scripts/bench_anketa_markdown.py
+    python scripts/bench_anketa_markdown.py --iterations 2000
+"""
+
+import io
+import os
+import statistics
+import sys
+import time
+
+# Добавляем корень проекта в path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from bench_anketa_models import build_anketa
+from src.anketa.generator import AnketaGenerator, AnketaMarkdownRenderer
+from src.anketa.schema import FinalAnketa
+
+console = Console()
+
+
+def median_us(func, iterations: int) -> float:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return statistics.median(timings)
+
+
+@click.command()
+@click.option('--iterations', '-n', default=1000, show_default=True, help='Повторов на операцию')
+def main(iterations):
+    """Сравнить полный рендер markdown анкеты с посекционным кэшем."""
+    anketa = build_anketa()
+    data = anketa.to_json_dict()
+    generator = AnketaGenerator.__new__(AnketaGenerator)
+
+    # Цикл экстракции: каждая итерация — новая копия с одним изменённым полем
+    counter = iter(range(10 ** 9))
+
+    def next_cycle(field, make_value):
+        return lambda: anketa.merge_json({field: make_value(next(counter))})
+
+    cases = [
+        ("без изменений (та же анкета)", lambda: anketa),
+        ("экспорт: полная валидация из БД", lambda: FinalAnketa(**data)),
+        ("цикл: изменилось agent_name", next_cycle("agent_name", lambda i: f"Алина {i}")),
+        ("цикл: изменился FAQ", next_cycle(
+            "faq_items", lambda i: data["faq_items"][:-1] + [{"question": f"Вопрос {i}?", "answer": "Ответ"}])),
+    ]
+
+    table = Table(title=f"render_markdown: полный против посекционного ({iterations} итераций)")
+    table.add_column("Сценарий")
+    table.add_column("полный, мкс", justify="right")
+    table.add_column("секции, мкс", justify="right")
+    table.add_column("Ускорение", justify="right")
+    table.add_column("Перерисовано секций", justify="right")
+
+    for name, make_anketa in cases:
+        # Копии готовятся заранее: меряем только рендер
+        anketas = [make_anketa() for _ in range(iterations)]
+        renderer = AnketaMarkdownRenderer()
+        renderer.render(anketa)  # прогрев: секции исходной анкеты в кэше
+        renderer.rendered = renderer.reused = 0
+
+        full_iter = iter(anketas)
+        cached_iter = iter(anketas)
+        full_us = median_us(lambda: generator._render_markdown(next(full_iter)), iterations)
+        cached_us = median_us(lambda: renderer.render(next(cached_iter)), iterations)
+        per_call = renderer.rendered / iterations
+        table.add_row(name, f"{full_us:.1f}", f"{cached_us:.1f}", f"×{full_us / cached_us:.1f}", f"{per_call:.1f}")
+
+    console.print(table)
+
+    renderer = AnketaMarkdownRenderer()
+    renderer.render(anketa)
+    buffer_us = median_us(lambda: io.StringIO().write(renderer.render(anketa)), iterations)
+    stream_us = median_us(lambda: renderer.write(anketa, io.StringIO()), iterations)
+    console.print(f"Запись в файл: строкой целиком {buffer_us:.1f} мкс, по секциям {stream_us:.1f} мкс "
+                  f"({len(renderer.render(anketa))} символов)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Микро-бенчмарк валидации и дампа анкеты: полная валидация FinalAnketa(**data)
+и model_dump(mode="json") против merge_json() и закэшированного to_json_dict().
+
+Анкета — заполненная v2.0 (клиентские поля + экспертный контент), как после
+финализации. Цикл экстракции голосового агента: dump → merge → модель для
+markdown; сервер: dump после экстракции с документами.
+
+Использование:
+    python scripts/bench_anketa_models.py
+    python scripts/bench_anketa_models.py --iterations 2000
+"""
+
+import os
+import statistics
+import sys
+import time
+
+# Добавляем корень проекта в path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from src.anketa.schema import FinalAnketa
+
+console = Console()
+
+
+def build_anketa() -> FinalAnketa:
+    """Fully populated v2.0 anketa."""
+    return FinalAnketa(
+        company_name="Клиника Здоровье",
+        industry="Медицина",
+        specialization="Многопрофильная клиника",
+        business_description="Сеть из трёх клиник: терапия, стоматология, диагностика.",
+        services=["терапия", "стоматология", "анализы", "УЗИ", "МРТ", "вакцинация"],
+        client_types=["взрослые", "дети", "корпоративные клиенты"],
+        current_problems=[f"проблема {i}: администраторы не успевают отвечать" for i in range(5)],
+        business_goals=[f"цель {i}: сократить пропущенные звонки" for i in range(5)],
+        agent_name="Алина",
+        agent_purpose="Запись пациентов и ответы на вопросы 24/7",
+        agent_functions=[
+            {"name": f"функция {i}", "description": "приём звонков и запись на приём", "priority": "high"}
+            for i in range(8)
+        ],
+        integrations=[{"name": name, "purpose": "учёт пациентов"} for name in ("1С", "amoCRM", "Telegram")],
+        contact_name="Анна Петрова",
+        contact_phone="+79991234567",
+        contact_email="anna@clinic.ru",
+        faq_items=[
+            {"question": f"Вопрос {i}?", "answer": "Подробный ответ для пациента с ценами и графиком."}
+            for i in range(30)
+        ],
+        objection_handlers=[
+            {"objection": f"Возражение {i}", "response": "Ответ на возражение", "follow_up": "Предложить запись"}
+            for i in range(10)
+        ],
+        sample_dialogue=[
+            {"role": "bot" if i % 2 == 0 else "client", "message": f"Реплика {i}", "intent": "booking"}
+            for i in range(12)
+        ],
+        financial_metrics=[{"name": f"метрика {i}", "value": "120 000 ₽"} for i in range(6)],
+        competitors=[
+            {"name": f"Конкурент {i}", "strengths": ["цена", "локация"], "weaknesses": ["сервис"]}
+            for i in range(4)
+        ],
+        market_insights=[{"insight": f"Инсайт {i}"} for i in range(5)],
+        escalation_rules=[{"trigger": f"Триггер {i}", "action": "Перевод на администратора"} for i in range(5)],
+        success_kpis=[{"name": f"KPI {i}", "target": "90%"} for i in range(6)],
+        launch_checklist=[{"item": f"Пункт {i}"} for i in range(8)],
+        ai_recommendations=[{"recommendation": f"Рекомендация {i}", "impact": "высокий"} for i in range(5)],
+    )
+
+
+def median_us(func, iterations: int) -> float:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return statistics.median(timings)
+
+
+@click.command()
+@click.option('--iterations', '-n', default=1000, show_default=True, help='Повторов на операцию')
+def main(iterations):
+    """Сравнить полную валидацию/дамп анкеты с trusted-путями."""
+    anketa = build_anketa()
+    data = anketa.model_dump(mode="json")
+    anketa.to_json_dict()  # прогрев кэша дампа
+    # После merge с БД: пара полей пришла из правок клиента
+    merged = {**data, "company_name": "Клиника «Здоровье»", "agent_functions": data["agent_functions"][:-1]}
+
+    cases = [
+        ("dump(mode=json)", lambda: anketa.model_dump(mode="json"), anketa.to_json_dict),
+        ("модель после merge (2 поля из БД)", lambda: FinalAnketa(**merged), lambda: anketa.merge_json(merged)),
+        ("модель после merge (без изменений)", lambda: FinalAnketa(**data), lambda: anketa.merge_json(data)),
+        ("цикл экстракции: dump + merge", lambda: FinalAnketa(**anketa.model_dump(mode="json")),
+         lambda: anketa.merge_json(anketa.to_json_dict())),
+    ]
+
+    table = Table(title=f"FinalAnketa: validate/dump vs trusted ({len(data)} полей, {iterations} итераций)")
+    table.add_column("Операция")
+    table.add_column("pydantic, мкс", justify="right")
+    table.add_column("trusted, мкс", justify="right")
+    table.add_column("Ускорение", justify="right")
+
+    for name, before, after in cases:
+        before_us = median_us(before, iterations)
+        after_us = median_us(after, iterations)
+        table.add_row(name, f"{before_us:.1f}", f"{after_us:.1f}", f"×{before_us / after_us:.1f}")
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк парсинга документов: пиковый RSS и время на больших синтетических файлах.
+
+- XLSX: прайс-лист на десятки тысяч строк — полная загрузка книги (как до
+  streaming-режима) против read-only итератора с чанками по строкам
+- PDF: многостраничный прайс — последовательное извлечение против диапазонов
+  страниц в процессах (DOCUMENT_PARSE_WORKERS)
+- full_text/word_count: повторные обращения без кэша и с кэшем
+
+Каждый замер XLSX/PDF идёт в отдельном процессе: ru_maxrss — пик за всё
+время жизни процесса, иначе замеры влияли бы друг на друга.
+
+Использование:
+    python scripts/bench_document_parsing.py
+    python scripts/bench_document_parsing.py --rows 80000 --pages 600
+"""
+
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Добавляем корень проекта в path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+SERVICES = ["Консультация терапевта", "УЗИ брюшной полости", "МРТ коленного сустава", "Анализ крови общий"]
+
+
+def make_xlsx(path: Path, rows: int) -> None:
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Прайс")
+    ws.append(["Артикул", "Услуга", "Отделение", "Цена, руб", "Длительность", "Врач", "Примечание", "Код"])
+    for i in range(rows):
+        ws.append([
+            f"A-{i:06d}", SERVICES[i % len(SERVICES)], f"Отделение {i % 12}", 500 + i % 9000,
+            f"{15 + i % 60} мин", f"Врач {i % 150}", "по записи" if i % 3 else "", i,
+        ])
+    wb.save(path)
+
+
+def make_pdf(path: Path, pages: int) -> None:
+    import fitz
+
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        for line in range(60):
+            page.insert_text(
+                (20, 12 + line * 13),
+                f"Позиция {page_num}-{line} | {SERVICES[line % len(SERVICES)]} | {1000 + line} руб",
+                fontsize=8,
+            )
+    doc.save(path)
+    doc.close()
+
+
+def parse_xlsx_full(path: Path) -> int:
+    """Parsing as before streaming mode: the whole workbook in memory, one chunk per sheet."""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, data_only=True)
+    rows = []
+    for ws in wb.worksheets:
+        for row in ws.iter_rows(values_only=True):
+            if any(cell is not None for cell in row):
+                rows.append(" | ".join(str(cell) if cell is not None else "" for cell in row))
+    return len("\n".join(rows))
+
+
+def parse_with_parser(path: Path, **kwargs) -> int:
+    from src.documents.parser import DocumentParser, _reset_pdf_pool
+
+    doc = DocumentParser(**kwargs).parse(path)
+    # Пул процессов PDF гасим явно: иначе дочерний процесс замера зависнет на выходе
+    _reset_pdf_pool(wait=True)
+    return len(doc.full_text)
+
+
+def _measure(queue, func, args, kwargs) -> None:
+    import logging
+
+    import structlog
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.ERROR))
+    start = time.perf_counter()
+    size = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    # Для параллельного PDF учитываем и процессы пула
+    peak_kb = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    queue.put((elapsed, peak_kb / 1024, size))
+
+
+def measure(func, *args, **kwargs):
+    """Wall time, peak RSS (MB) and output size of func in a fresh process."""
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_measure, args=(queue, func, args, kwargs))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def bench_full_text(chunks: int, accesses: int):
+    from src.documents.models import DocumentChunk, ParsedDocument
+
+    doc = ParsedDocument(
+        filename="price.pdf", doc_type="pdf", file_path="price.pdf",
+        chunks=[DocumentChunk(content=f"Позиция {i} " * 200, doc_type="pdf", page=i) for i in range(chunks)],
+    )
+
+    start = time.perf_counter()
+    for _ in range(accesses):
+        text = "\n\n".join(chunk.content for chunk in doc.chunks if chunk.content)
+        len(text.split())
+    uncached = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(accesses):
+        doc.full_text
+        doc.word_count
+    cached = time.perf_counter() - start
+    return uncached, cached
+
+
+@click.command()
+@click.option('--rows', default=60000, show_default=True, help='Строк в синтетическом XLSX')
+@click.option('--pages', default=400, show_default=True, help='Страниц в синтетическом PDF')
+@click.option('--workers', default=4, show_default=True, help='DOCUMENT_PARSE_WORKERS для параллельного PDF')
+def main(rows, pages, workers):
+    """Сравнить пиковый RSS и время парсинга больших XLSX/PDF."""
+    os.environ["DOCUMENT_PARSE_WORKERS"] = str(workers)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        xlsx_path = Path(tmp) / "price.xlsx"
+        pdf_path = Path(tmp) / "price.pdf"
+        make_xlsx(xlsx_path, rows)
+        make_pdf(pdf_path, pages)
+
+        table = Table(title=f"Парсинг: XLSX {rows} строк ({xlsx_path.stat().st_size // 1024} КБ), "
+                            f"PDF {pages} стр. ({pdf_path.stat().st_size // 1024} КБ), CPU: {os.cpu_count()}")
+        table.add_column("Случай")
+        table.add_column("Время, с", justify="right")
+        table.add_column("Пик RSS, МБ", justify="right")
+        table.add_column("Текст, симв.", justify="right")
+
+        cases = [
+            ("XLSX: полная загрузка книги", parse_xlsx_full, (xlsx_path,), {}),
+            ("XLSX: read-only, чанки по строкам", parse_with_parser, (xlsx_path,), {}),
+            ("PDF: последовательно", parse_with_parser, (pdf_path,), {"pdf_parallel_min_pages": 10 ** 9}),
+            (f"PDF: диапазоны страниц, {workers} процесса", parse_with_parser, (pdf_path,), {"pdf_parallel_min_pages": 1}),
+        ]
+        for name, func, args, kwargs in cases:
+            elapsed, peak_mb, size = measure(func, *args, **kwargs)
+            table.add_row(name, f"{elapsed:.2f}", f"{peak_mb:.0f}", f"{size:,}")
+
+    console.print(table)
+    if (os.cpu_count() or 1) < 2:
+        console.print("[yellow]Один CPU: параллельное извлечение PDF не даст выигрыша "
+                      "(в сервисе оно включается только при DOCUMENT_PARSE_WORKERS > 1)[/yellow]")
+
+    uncached, cached = bench_full_text(chunks=pages, accesses=50)
+    console.print(f"full_text + word_count × 50: без кэша {uncached * 1000:.1f} мс, с кэшем {cached * 1000:.2f} мс")
+
+
+if __name__ == "__main__":
+    main()
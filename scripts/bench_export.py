@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк экспорта анкет: рендер на каждый запрос против кэша артефактов,
+и пакетная выгрузка PDF — в event loop против пула процессов (EXPORT_WORKERS).
+
+Для пакета меряется и задержка event loop: пока анкеты рендерятся прямо в
+корутине, сервер не отвечает на другие запросы (polling, SSE, загрузки).
+
+Использование:
+    python scripts/bench_export.py
+    python scripts/bench_export.py --sessions 50 --workers 2
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+# Добавляем корень проекта в path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from bench_anketa_models import build_anketa
+from src.anketa.export_service import ExportService, build_export
+
+console = Console()
+
+
+async def _max_loop_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Largest delay of a periodic timer while the batch runs (ms)."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst * 1000
+
+
+async def run_batch(service: ExportService, sources, inline: bool) -> tuple:
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(_max_loop_lag(stop))
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    if inline:
+        for source in sources:
+            build_export(*source, "pdf")
+            await asyncio.sleep(0)
+    else:
+        semaphore = asyncio.Semaphore(4)
+
+        async def render(source):
+            async with semaphore:
+                return await service.render(*source, "pdf")
+
+        await asyncio.gather(*(render(source) for source in sources))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return elapsed, await lag_task
+
+
+async def run_cached(service: ExportService, source, requests: int) -> float:
+    async def load():
+        return source
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await service.export("bench", "1:now", load, "pdf")
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.option('--sessions', '-s', default=30, show_default=True, help='Анкет в пакете')
+@click.option('--workers', '-w', default=2, show_default=True, help='Процессов рендера (EXPORT_WORKERS)')
+def main(sessions, workers):
+    """Сравнить экспорт без кэша, с кэшем и пакетную выгрузку PDF."""
+    import logging
+
+    import structlog
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.ERROR))
+
+    data = build_anketa().to_json_dict()
+    sources = [(dict(data, company_name=f"Компания {i}"), None, f"Компания {i}", "consultation") for i in range(sessions)]
+
+    async def scenario():
+        service = ExportService(workers=workers)
+        try:
+            await service.render(*sources[0], "pdf")  # прогрев пула
+            inline = await run_batch(service, sources, inline=True)
+            pooled = await run_batch(service, sources, inline=False)
+        finally:
+            service.shutdown(wait=True)
+        cached_service = ExportService(workers=0)
+        uncached = time.perf_counter()
+        for _ in range(20):
+            build_export(*sources[0], "pdf")
+        uncached = time.perf_counter() - uncached
+        cached = await run_cached(cached_service, sources[0], 20)
+        return inline, pooled, uncached, cached
+
+    inline, pooled, uncached, cached = asyncio.run(scenario())
+
+    table = Table(title=f"Пакетный экспорт PDF: {sessions} анкет, CPU: {os.cpu_count()}")
+    table.add_column("Режим")
+    table.add_column("Время, с", justify="right")
+    table.add_column("Макс. задержка event loop, мс", justify="right")
+    table.add_row("рендер в event loop", f"{inline[0]:.2f}", f"{inline[1]:.0f}")
+    table.add_row(f"пул процессов ({workers})", f"{pooled[0]:.2f}", f"{pooled[1]:.0f}")
+    console.print(table)
+    console.print(f"20 повторных экспортов PDF одной версии: без кэша {uncached * 1000:.0f} мс, "
+                  f"с кэшем {cached * 1000:.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
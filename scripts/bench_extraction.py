@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк извлечения анкеты: латентность по этапам + качество полей.
+
+Источники диалогов:
+  - tests/fixtures/bench/*.json (по умолчанию)
+  - data/sessions.db (--sessions-db)
+  - JSON отчёты симулятора TestResult (--results)
+
+LLM: заглушка с записанным ответом (по умолчанию) или кассета (--cassette, replay).
+
+Использование:
+    python scripts/bench_extraction.py
+    python scripts/bench_extraction.py --iterations 20
+    python scripts/bench_extraction.py --sessions-db data/sessions.db --limit 50
+    python scripts/bench_extraction.py --results output/tests/*.json
+    python scripts/bench_extraction.py --cassette tests/cassettes/realtime.json
+    python scripts/bench_extraction.py --compare output/bench/extraction_abc1234.json
+"""
+
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+# Добавляем корень проекта в path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from src.agent_client_simulator.extraction_bench import (
+    compare_reports,
+    load_fixture_cases,
+    load_result_cases,
+    load_session_cases,
+    run_benchmark,
+)
+
+console = Console()
+
+ROOT = Path(__file__).parent.parent
+FIXTURES_DIR = ROOT / "tests" / "fixtures" / "bench"
+SCENARIOS_DIR = ROOT / "tests" / "scenarios"
+
+
+def print_report(report: dict, comparison: dict = None):
+    """Вывести таблицы этапов и качества."""
+    deltas = (comparison or {}).get("stages", {})
+
+    table = Table(title=f"Этапы extraction (commit {report['commit']}, LLM: {report['llm_mode']})")
+    table.add_column("Этап")
+    table.add_column("n", justify="right")
+    table.add_column("p50, мс", justify="right")
+    table.add_column("p95, мс", justify="right")
+    if comparison:
+        table.add_column("Δp50", justify="right")
+        table.add_column("Δp95", justify="right")
+    for stage, stats in report["stages"].items():
+        row = [stage, str(stats["n"]), f"{stats['p50_ms']:.2f}", f"{stats['p95_ms']:.2f}"]
+        if comparison:
+            delta = deltas.get(stage, {})
+            row += [f"{delta.get('p50_ms', 0):+.2f}", f"{delta.get('p95_ms', 0):+.2f}"]
+        table.add_row(*row)
+    console.print(table)
+
+    table = Table(title="Качество")
+    table.add_column("Диалог")
+    table.add_column("Заполнено", justify="right")
+    table.add_column("Score", justify="right")
+    table.add_column("Валидация")
+    for case in report["cases"]:
+        table.add_row(
+            case["name"],
+            f"{case['fields']['filled_ratio']:.0%}",
+            f"{case['validation_score']:.0f}",
+            "[green]OK[/green]" if case["validation_passed"] else "[red]FAIL[/red]",
+        )
+    console.print(table)
+
+    quality = report["quality"]
+    console.print(
+        f"Средний score: [bold]{quality['average_score']}[/bold], "
+        f"прошли валидацию: {quality['passed']}/{report['cases_total']}, "
+        f"LLM: {report['llm']['calls']} вызовов, ~{report['llm']['approx_tokens']} токенов"
+    )
+    if comparison and comparison.get("average_score") is not None:
+        console.print(
+            f"Δ score относительно {comparison['baseline_commit']}: {comparison['average_score']:+.1f}"
+        )
+
+
+@click.command()
+@click.option('--fixtures', type=click.Path(exists=True, file_okay=False), help='Папка фикстур (*.json)')
+@click.option('--sessions-db', type=click.Path(exists=True, dir_okay=False), help='Диалоги из data/sessions.db')
+@click.option('--limit', type=int, help='Максимум сессий из БД')
+@click.option('--results', multiple=True, type=click.Path(exists=True, dir_okay=False),
+              help='JSON отчёты TestResult симулятора')
+@click.option('--cassette', type=click.Path(exists=True, dir_okay=False),
+              help='Воспроизводить LLM из кассеты вместо заглушки')
+@click.option('--provider', help='LLM провайдер для кассеты (по умолчанию LLM_PROVIDER)')
+@click.option('--iterations', '-n', default=5, show_default=True, help='Прогонов на диалог')
+@click.option('--output-dir', default='output/bench', show_default=True, help='Куда сохранить отчёт')
+@click.option('--compare', 'compare_path', type=click.Path(exists=True, dir_okay=False),
+              help='Сравнить с предыдущим отчётом')
+def main(fixtures, sessions_db, limit, results, cassette, provider, iterations, output_dir, compare_path):
+    """Бенчмарк AnketaExtractor по записанным диалогам."""
+    cases = []
+    if sessions_db:
+        cases += load_session_cases(sessions_db, limit=limit)
+    if results:
+        cases += load_result_cases([Path(p) for p in results], scenarios_dir=SCENARIOS_DIR)
+    if fixtures or not cases:
+        cases += load_fixture_cases(Path(fixtures) if fixtures else FIXTURES_DIR)
+
+    if not cases:
+        console.print("[yellow]Нет диалогов для бенчмарка[/yellow]")
+        sys.exit(1)
+
+    llm_for_case = None
+    llm_mode = "stub"
+    if cassette:
+        from src.llm.factory import create_llm_client
+        llm = create_llm_client(provider, cassette=cassette, cassette_mode="replay")
+        llm_for_case = lambda case: llm  # noqa: E731
+        llm_mode = "replay"
+
+    console.print(f"Диалогов: [cyan]{len(cases)}[/cyan], прогонов на диалог: [cyan]{iterations}[/cyan]")
+    report = asyncio.run(run_benchmark(
+        cases, llm_for_case=llm_for_case, iterations=iterations, llm_mode=llm_mode,
+    ))
+
+    comparison = None
+    if compare_path:
+        baseline = json.loads(Path(compare_path).read_text(encoding="utf-8"))
+        comparison = compare_reports(baseline, report)
+        report["comparison"] = comparison
+
+    print_report(report, comparison)
+
+    out_dir = Path(output_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    report_path = out_dir / f"extraction_{report['commit']}.json"
+    report_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    console.print(f"\n[green]Отчёт:[/green] {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Микро-бенчмарк починки JSON: однопроходный JSONRepair.parse против прежнего
+regex-конвейера (extract → json.loads → FIXES × max_retries → balanced → minimal).
+
+Корпус: tests/fixtures/json_repair/corpus.json — реальные битые ответы LLM
+(ожидаемый результат в поле expected).
+
+Использование:
+    python scripts/bench_json_repair.py
+    python scripts/bench_json_repair.py --iterations 500
+    python scripts/bench_json_repair.py --corpus my_corpus.json
+"""
+
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Добавляем корень проекта в path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import click
+import structlog
+from rich.console import Console
+from rich.table import Table
+
+from src.anketa.data_cleaner import JSONRepair
+
+console = Console()
+
+ROOT = Path(__file__).parent.parent
+CORPUS_PATH = ROOT / "tests" / "fixtures" / "json_repair" / "corpus.json"
+
+
+def parse_legacy(text: str, max_retries: int = 3):
+    """Прежний JSONRepair.parse: stdlib json и только regex-конвейер."""
+    json_text = JSONRepair._extract_json(text)
+    try:
+        return json.loads(json_text)
+    except json.JSONDecodeError:
+        return JSONRepair._parse_legacy(json_text, max_retries)
+
+
+def parse_current(text: str):
+    return JSONRepair.parse(text)[0]
+
+
+def measure(func, text: str, expected, iterations: int) -> dict:
+    """Медиана времени вызова (мкс) и корректность результата."""
+    try:
+        ok = func(text) == expected
+    except json.JSONDecodeError:
+        ok = False
+
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        try:
+            func(text)
+        except json.JSONDecodeError:
+            pass
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return {"ok": ok, "median_us": statistics.median(timings)}
+
+
+@click.command()
+@click.option('--corpus', 'corpus_path', default=str(CORPUS_PATH), show_default=True, help='JSON корпус ответов')
+@click.option('--iterations', '-n', default=200, show_default=True, help='Повторов на случай')
+def main(corpus_path, iterations):
+    """Сравнить однопроходную починку JSON с прежней реализацией."""
+    # Логи о починке на каждой итерации не нужны
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(50))
+
+    corpus = json.loads(Path(corpus_path).read_text(encoding="utf-8"))
+
+    table = Table(title=f"JSON repair ({len(corpus)} случаев, {iterations} итераций)")
+    table.add_column("Случай")
+    table.add_column("Размер", justify="right")
+    table.add_column("legacy, мкс", justify="right")
+    table.add_column("single-pass, мкс", justify="right")
+    table.add_column("Ускорение", justify="right")
+    table.add_column("legacy")
+    table.add_column("single-pass")
+
+    totals = {"legacy": 0.0, "current": 0.0, "legacy_ok": 0, "current_ok": 0}
+    for case in corpus:
+        text, expected = case["response"], case["expected"]
+        legacy = measure(parse_legacy, text, expected, iterations)
+        current = measure(parse_current, text, expected, iterations)
+
+        totals["legacy"] += legacy["median_us"]
+        totals["current"] += current["median_us"]
+        totals["legacy_ok"] += legacy["ok"]
+        totals["current_ok"] += current["ok"]
+
+        table.add_row(
+            case["name"],
+            str(len(text)),
+            f"{legacy['median_us']:.1f}",
+            f"{current['median_us']:.1f}",
+            f"×{legacy['median_us'] / current['median_us']:.1f}",
+            "[green]OK[/green]" if legacy["ok"] else "[red]FAIL[/red]",
+            "[green]OK[/green]" if current["ok"] else "[red]FAIL[/red]",
+        )
+
+    console.print(table)
+    console.print(
+        f"Итого: legacy {totals['legacy']:.0f} мкс ({totals['legacy_ok']}/{len(corpus)} верно), "
+        f"single-pass {totals['current']:.0f} мкс ({totals['current_ok']}/{len(corpus)} верно)"
+    )
+
+
+if __name__ == "__main__":
+    main()
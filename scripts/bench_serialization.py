@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк JSON-сериализации: stdlib json против src.serialization (orjson).
+
+Полезная нагрузка — синтетическая 40-минутная голосовая консультация
+(реплика каждые ~5 с, как в dialogue_history) и заполненная анкета:
+то, что SessionManager пишет в SQLite и голосовой агент шлёт на веб-сервер.
+
+Использование:
+    python scripts/bench_serialization.py
+    python scripts/bench_serialization.py --minutes 60 --iterations 500
+"""
+
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+# Добавляем корень проекта в path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import click
+from rich.console import Console
+from rich.table import Table
+
+from src import serialization
+
+console = Console()
+
+PHASES = ["discovery", "analysis", "proposal", "refinement"]
+AGENT_LINE = (
+    "Понял вас. Уточните, пожалуйста, сколько звонков в день принимает ваша клиника "
+    "и какие вопросы пациенты задают чаще всего — про цены, запись или график врачей?"
+)
+CLIENT_LINE = (
+    "У нас около двухсот звонков в день, в основном запись к терапевту и стоматологу, "
+    "ещё спрашивают про анализы и стоимость приёма. Администраторы не успевают."
+)
+
+
+def build_dialogue(minutes: int) -> list:
+    """Dialogue history of a consultation lasting `minutes` (a turn every ~5 s)."""
+    start = datetime(2026, 1, 1, 10, 0, tzinfo=timezone.utc)
+    turns = minutes * 12
+    return [
+        {
+            "role": "assistant" if i % 2 == 0 else "user",
+            "content": AGENT_LINE if i % 2 == 0 else CLIENT_LINE,
+            "timestamp": (start + timedelta(seconds=5 * i)).isoformat(),
+            "phase": PHASES[min(i * len(PHASES) // turns, len(PHASES) - 1)],
+        }
+        for i in range(turns)
+    ]
+
+
+def build_anketa() -> dict:
+    return {
+        "company_name": "Клиника Здоровье",
+        "industry": "Медицина",
+        "services": ["терапия", "стоматология", "анализы", "УЗИ"],
+        "agent_functions": [
+            {"name": f"функция {i}", "description": "приём звонков и запись на приём 24/7", "priority": "high"}
+            for i in range(8)
+        ],
+        "faq_items": [
+            {"question": f"Вопрос {i}?", "answer": "Подробный ответ для пациента с ценами и графиком."}
+            for i in range(30)
+        ],
+        "integrations": [{"name": "1С", "purpose": "учёт пациентов", "required": True}],
+    }
+
+
+def median_us(func, iterations: int) -> float:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return statistics.median(timings)
+
+
+@click.command()
+@click.option('--minutes', default=40, show_default=True, help='Длительность консультации')
+@click.option('--iterations', '-n', default=200, show_default=True, help='Повторов на операцию')
+def main(minutes, iterations):
+    """Сравнить stdlib json и src.serialization на диалоге и анкете."""
+    payloads = {
+        f"dialogue_history ({minutes} мин)": build_dialogue(minutes),
+        "anketa_data": build_anketa(),
+    }
+
+    table = Table(title=f"JSON: stdlib vs src.serialization (orjson: {'да' if serialization.orjson else 'нет'})")
+    table.add_column("Данные")
+    table.add_column("Операция")
+    table.add_column("Размер, КБ", justify="right")
+    table.add_column("stdlib, мкс", justify="right")
+    table.add_column("serialization, мкс", justify="right")
+    table.add_column("Ускорение", justify="right")
+
+    for name, obj in payloads.items():
+        text = json.dumps(obj, ensure_ascii=False)
+        size_kb = f"{len(text.encode('utf-8')) / 1024:.1f}"
+        cases = [
+            ("dumps → str", lambda: json.dumps(obj, ensure_ascii=False), lambda: serialization.dumps(obj)),
+            ("dumps → bytes", lambda: json.dumps(obj, ensure_ascii=False).encode("utf-8"),
+             lambda: serialization.dumps_bytes(obj)),
+            ("loads", lambda: json.loads(text), lambda: serialization.loads(text)),
+        ]
+        for operation, before, after in cases:
+            before_us = median_us(before, iterations)
+            after_us = median_us(after, iterations)
+            table.add_row(name, operation, size_kb, f"{before_us:.0f}", f"{after_us:.0f}",
+                          f"×{before_us / after_us:.1f}")
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
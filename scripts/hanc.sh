@@ -4,7 +4,7 @@
 # ============================================================
 #
 # Использование:
-#   ./scripts/hanc.sh start            — запустить server + agent
+#   ./scripts/hanc.sh start            — запустить server + agent + jobs
 #   ./scripts/hanc.sh stop             — остановить всё
 #   ./scripts/hanc.sh restart          — перезапустить всё
 #   ./scripts/hanc.sh status           — статус процессов
@@ -12,12 +12,15 @@
 #
 #   ./scripts/hanc.sh start server     — только сервер
 #   ./scripts/hanc.sh start agent      — только агент
+#   ./scripts/hanc.sh start jobs       — только воркер очереди (финализация сессий)
 #   ./scripts/hanc.sh stop server      — остановить сервер
 #   ./scripts/hanc.sh stop agent       — остановить агент
 #   ./scripts/hanc.sh restart server   — перезапустить сервер
 #   ./scripts/hanc.sh restart agent    — перезапустить агент
+#   ./scripts/hanc.sh restart jobs     — перезапустить воркер очереди
 #   ./scripts/hanc.sh logs server      — логи сервера
 #   ./scripts/hanc.sh logs agent       — логи агента
+#   ./scripts/hanc.sh logs jobs        — логи воркера очереди
 #
 #   ./scripts/hanc.sh kill-all         — аварийно убить всё (SIGKILL)
 #
@@ -32,12 +35,15 @@ PROJECT_DIR="$(dirname "$SCRIPT_DIR")"
 PYTHON="$PROJECT_DIR/venv/bin/python"
 AGENT_SCRIPT="$PROJECT_DIR/scripts/run_voice_agent.py"
 SERVER_SCRIPT="$PROJECT_DIR/scripts/run_server.py"
+JOBS_SCRIPT="$PROJECT_DIR/scripts/run_jobs.py"
 
 AGENT_PIDFILE="$PROJECT_DIR/.agent.pid"
 SERVER_PIDFILE="$PROJECT_DIR/.server.pid"
+JOBS_PIDFILE="$PROJECT_DIR/.jobs.pid"
 
 AGENT_LOGFILE="$PROJECT_DIR/logs/agent.log"
 SERVER_LOGFILE="$PROJECT_DIR/logs/server.log"
+JOBS_LOGFILE="$PROJECT_DIR/logs/jobs.log"
 
 # -- Цвета --
 RED='\033[0;31m'
@@ -67,6 +73,10 @@ get_server_pids() {
     pgrep -f "run_server.py\|uvicorn.*src.web.server" 2>/dev/null || true
 }
 
+get_jobs_pids() {
+    pgrep -f "run_jobs.py" 2>/dev/null || true
+}
+
 # Универсальная остановка процесса по PID-файлу + pgrep
 # $1 = имя ("server" / "agent")
 # $2 = pidfile
@@ -213,6 +223,43 @@ stop_agent() {
     stop_service "Agent" "$AGENT_PIDFILE" get_agent_pids
 }
 
+# ============================================================
+# Jobs (финализация сессий: агент только ставит задачу в очередь)
+# ============================================================
+
+start_jobs() {
+    # Автоматическая остановка, если уже запущен
+    local existing
+    existing=$(get_jobs_pids)
+    if [ -n "$existing" ]; then
+        echo -e "${YELLOW}Jobs worker уже запущен (PID $(echo $existing | head -1)) — перезапускаю...${NC}"
+        stop_jobs
+        sleep 1
+    fi
+
+    ensure_log_dir
+
+    echo "Starting jobs worker..."
+    cd "$PROJECT_DIR"
+    nohup "$PYTHON" "$JOBS_SCRIPT" > "$JOBS_LOGFILE" 2>&1 &
+    local pid=$!
+    echo "$pid" > "$JOBS_PIDFILE"
+
+    sleep 2
+    if is_pid_alive "$pid"; then
+        echo -e "  ${GREEN}Jobs worker started (PID $pid)${NC}"
+    else
+        echo -e "  ${RED}Jobs worker failed to start! Logs:${NC}"
+        tail -20 "$JOBS_LOGFILE"
+        rm -f "$JOBS_PIDFILE"
+        return 1
+    fi
+}
+
+stop_jobs() {
+    stop_service "Jobs worker" "$JOBS_PIDFILE" get_jobs_pids
+}
+
 # ============================================================
 # Status
 # ============================================================
@@ -254,6 +301,19 @@ show_status() {
         echo -e "  Voice Agent:  ${RED}stopped${NC}"
     fi
 
+    # Jobs worker
+    local jobs_pids
+    jobs_pids=$(get_jobs_pids)
+    if [ -n "$jobs_pids" ]; then
+        local jobs_pid
+        jobs_pid=$(echo "$jobs_pids" | head -1)
+        local jobs_uptime
+        jobs_uptime=$(ps -o etime= -p "$jobs_pid" 2>/dev/null | tr -d ' ')
+        echo -e "  Jobs Worker:  ${GREEN}running${NC}  PID $jobs_pid  uptime $jobs_uptime"
+    else
+        echo -e "  Jobs Worker:  ${RED}stopped${NC}  (сессии не финализируются!)"
+    fi
+
     # Port 8000
     local port_pid
     port_pid=$(lsof -ti:8000 2>/dev/null | head -1)
@@ -290,11 +350,20 @@ show_logs() {
                 echo "No agent log: $AGENT_LOGFILE"
             fi
             ;;
+        jobs)
+            if [ -f "$JOBS_LOGFILE" ]; then
+                echo -e "${BOLD}=== Jobs Logs (Ctrl+C to exit) ===${NC}"
+                tail -f "$JOBS_LOGFILE"
+            else
+                echo "No jobs log: $JOBS_LOGFILE"
+            fi
+            ;;
         all|*)
             echo -e "${BOLD}=== All Logs (Ctrl+C to exit) ===${NC}"
             local files=""
             [ -f "$SERVER_LOGFILE" ] && files="$SERVER_LOGFILE"
             [ -f "$AGENT_LOGFILE" ] && files="$files $AGENT_LOGFILE"
+            [ -f "$JOBS_LOGFILE" ] && files="$files $JOBS_LOGFILE"
             if [ -n "$files" ]; then
                 tail -f $files
             else
@@ -311,9 +380,10 @@ show_logs() {
 kill_all() {
     echo -e "${RED}=== Emergency Kill ===${NC}"
 
-    local agent_pids server_pids
+    local agent_pids server_pids jobs_pids
     agent_pids=$(get_agent_pids)
     server_pids=$(get_server_pids)
+    jobs_pids=$(get_jobs_pids)
 
     if [ -n "$agent_pids" ]; then
         echo "  Killing agent: $(echo $agent_pids | tr '\n' ' ')"
@@ -325,6 +395,11 @@ kill_all() {
         echo "$server_pids" | xargs kill -9 2>/dev/null || true
     fi
 
+    if [ -n "$jobs_pids" ]; then
+        echo "  Killing jobs worker: $(echo $jobs_pids | tr '\n' ' ')"
+        echo "$jobs_pids" | xargs kill -9 2>/dev/null || true
+    fi
+
     # На всякий случай порт 8000
     local port_pids
     port_pids=$(lsof -ti:8000 2>/dev/null)
@@ -333,9 +408,9 @@ kill_all() {
         echo "$port_pids" | xargs kill -9 2>/dev/null || true
     fi
 
-    rm -f "$AGENT_PIDFILE" "$SERVER_PIDFILE"
+    rm -f "$AGENT_PIDFILE" "$SERVER_PIDFILE" "$JOBS_PIDFILE"
 
-    if [ -z "$agent_pids" ] && [ -z "$server_pids" ] && [ -z "$port_pids" ]; then
+    if [ -z "$agent_pids" ] && [ -z "$server_pids" ] && [ -z "$jobs_pids" ] && [ -z "$port_pids" ]; then
         echo "  Nothing running"
     else
         echo -e "  ${GREEN}Done${NC}"
@@ -353,15 +428,15 @@ show_help() {
     echo "  Usage: $0 <command> [service]"
     echo ""
     echo "  Commands:"
-    echo "    start   [server|agent]   Start services (default: both)"
-    echo "    stop    [server|agent]   Stop services (default: both)"
-    echo "    restart [server|agent]   Restart services (default: both)"
-    echo "    status                   Show process status"
-    echo "    logs    [server|agent]   Tail log files (default: all)"
-    echo "    kill-all                 Emergency SIGKILL everything"
+    echo "    start   [server|agent|jobs]   Start services (default: all)"
+    echo "    stop    [server|agent|jobs]   Stop services (default: all)"
+    echo "    restart [server|agent|jobs]   Restart services (default: all)"
+    echo "    status                        Show process status"
+    echo "    logs    [server|agent|jobs]   Tail log files (default: all)"
+    echo "    kill-all                      Emergency SIGKILL everything"
     echo ""
     echo "  Examples:"
-    echo "    $0 start                 # Start server + agent"
+    echo "    $0 start                 # Start server + agent + jobs worker"
     echo "    $0 restart agent         # Restart only voice agent"
     echo "    $0 logs server           # Tail server logs"
     echo "    $0 status                # Show all process status"
@@ -380,7 +455,8 @@ case "$CMD" in
         case "$TARGET" in
             server)  start_server ;;
             agent)   start_agent ;;
-            all|*)   start_server || true; echo ""; start_agent || true ;;
+            jobs)    start_jobs ;;
+            all|*)   start_server || true; echo ""; start_jobs || true; echo ""; start_agent || true ;;
         esac
         echo ""
         show_status
@@ -389,14 +465,16 @@ case "$CMD" in
         case "$TARGET" in
             server)  stop_server ;;
             agent)   stop_agent ;;
-            all|*)   stop_agent; stop_server ;;
+            jobs)    stop_jobs ;;
+            all|*)   stop_agent; stop_jobs; stop_server ;;
         esac
         ;;
     restart)
         case "$TARGET" in
             server)  stop_server; sleep 1; start_server ;;
             agent)   stop_agent; sleep 1; start_agent ;;
-            all|*)   stop_agent; stop_server; sleep 1; start_server || true; echo ""; start_agent || true ;;
+            jobs)    stop_jobs; sleep 1; start_jobs ;;
+            all|*)   stop_agent; stop_jobs; stop_server; sleep 1; start_server || true; echo ""; start_jobs || true; echo ""; start_agent || true ;;
         esac
         echo ""
         show_status
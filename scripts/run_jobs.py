@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Воркер durable очереди фоновых задач (data/jobs.db).
+
+Выполняет пост-сессионную финализацию, которую голосовой агент ставит в
+очередь при отключении клиента: извлечение анкеты, сохранение файлов,
+уведомления, record_learning, запись в PostgreSQL. Задачи переживают
+перезапуск агента и воркера, ошибки повторяются с backoff.
+
+Использование:
+    python scripts/run_jobs.py                    # 2 параллельные задачи
+    python scripts/run_jobs.py --concurrency 4
+    python scripts/run_jobs.py --once             # выполнить готовые задачи и выйти
+    python scripts/run_jobs.py --replay-dead-letters   # повторить недоставленные уведомления
+
+Статус очереди: GET /api/jobs, GET /api/jobs/{job_id}, GET /api/session/{id}/jobs
+"""
+
+import asyncio
+import os
+import signal
+import sys
+
+# Добавляем корень проекта в path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import click
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+async def _run(concurrency: int, once: bool, poll_interval: float):
+    from src.jobs import JobWorker
+    from src.voice.consultant import FINALIZE_JOB, _get_job_queue, run_finalize_job
+
+    worker = JobWorker(
+        _get_job_queue(),
+        {FINALIZE_JOB: run_finalize_job},
+        concurrency=concurrency,
+        poll_interval=poll_interval,
+    )
+
+    from src.notifications import get_dispatcher
+
+    try:
+        if once:
+            processed = 0
+            while await worker.run_once():
+                processed += 1
+            print(f"Выполнено задач: {processed}")
+            return
+
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                # Текущие задачи доработают; прерванные по kill заберёт следующий воркер по аренде
+                loop.add_signal_handler(sig, worker.stop)
+            except NotImplementedError:
+                pass
+        await worker.run()
+    finally:
+        # Недоставленные уведомления (ожидающие повтора) — в dead-letter
+        await get_dispatcher().close()
+
+
+async def _replay_dead_letters(timeout: float) -> int:
+    """Повторно доставить уведомления из dead-letter; возвращает число недоставленных."""
+    from src.notifications import get_dispatcher
+
+    dispatcher = get_dispatcher()
+    try:
+        queued, delivered = await dispatcher.redeliver_dead_letters(timeout=timeout)
+    finally:
+        # Не доставленные за timeout снова уходят в dead-letter
+        await dispatcher.close(timeout=0)
+    print(f"Уведомлений из dead-letter: {queued}, доставлено: {delivered}")
+    return queued - delivered
+
+
+@click.command()
+@click.option('--concurrency', '-c', default=lambda: int(os.getenv("JOB_WORKERS", "2")),
+              show_default="JOB_WORKERS или 2", help='Сколько задач выполнять одновременно')
+@click.option('--once', is_flag=True, help='Выполнить готовые задачи и выйти')
+@click.option('--poll-interval', default=1.0, show_default=True, help='Пауза опроса пустой очереди, сек')
+@click.option('--replay-dead-letters', is_flag=True,
+              help='Повторить недоставленные уведомления (dead-letter) и выйти')
+@click.option('--replay-timeout', default=300.0, show_default=True,
+              help='Сколько ждать доставки при --replay-dead-letters, сек')
+def main(concurrency, once, poll_interval, replay_dead_letters, replay_timeout):
+    """Запуск воркера очереди фоновых задач."""
+    if replay_dead_letters:
+        undelivered = asyncio.run(_replay_dead_letters(replay_timeout))
+        sys.exit(1 if undelivered else 0)
+    asyncio.run(_run(concurrency, once, poll_interval))
+
+
+if __name__ == "__main__":
+    main()
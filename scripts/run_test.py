@@ -8,6 +8,10 @@
     python scripts/run_test.py --list                # Список сценариев
     python scripts/run_test.py vitalbox --quiet      # Без подробного вывода
     python scripts/run_test.py vitalbox --input-dir input/test_docs  # С документами
+    python scripts/run_test.py --all --workers 6     # Все сценарии параллельно
+    python scripts/run_test.py vitalbox medical_center -w 2  # Несколько сценариев
+    python scripts/run_test.py --all --cassettes tests/cassettes --cassette-mode record
+    python scripts/run_test.py --all --cassettes tests/cassettes --cassette-mode replay
 """
 
 import asyncio
@@ -23,8 +27,8 @@ from dotenv import load_dotenv
 from rich.console import Console
 from rich.panel import Panel
 
-from src.agent_client_simulator.client import SimulatedClient
-from src.agent_client_simulator.runner import ConsultationTester, run_test_scenario
+from src.agent_client_simulator.batch import discover_scenarios, run_batch
+from src.agent_client_simulator.runner import run_test_scenario
 from src.agent_client_simulator.reporter import TestReporter
 
 load_dotenv()
@@ -67,34 +71,95 @@ def find_scenario(name: str) -> Path:
     raise FileNotFoundError(f"Сценарий не найден: {name}")
 
 
+def _cassette_for(scenario_path: Path, cassettes: str):
+    """Путь к кассете LLM для сценария (<cassettes>/<имя сценария>.json)."""
+    return str(Path(cassettes) / f"{scenario_path.stem}.json") if cassettes else None
+
+
+def run_many(scenario_paths, workers: int, quiet: bool, no_save: bool, input_dir: str,
+             cassettes: str = None, cassette_mode: str = None):
+    """Run several scenarios concurrently and print an aggregated report."""
+    console.print(Panel(
+        f"[bold cyan]ПАРАЛЛЕЛЬНЫЙ ПРОГОН СЦЕНАРИЕВ[/bold cyan]\n\n"
+        f"Сценариев: [green]{len(scenario_paths)}[/green]\n"
+        f"Воркеров: [green]{workers}[/green]",
+        border_style="cyan"
+    ))
+
+    def _on_result(result):
+        status_color = "green" if result.status == "completed" else "red"
+        console.print(
+            f"  [{status_color}]●[/{status_color}] {result.scenario_name}: "
+            f"{result.status} ({result.duration_seconds:.0f} сек)"
+        )
+
+    batch = asyncio.run(run_batch(
+        scenario_paths,
+        workers=workers,
+        verbose=False,
+        input_dir=input_dir,
+        on_result=None if quiet else _on_result,
+        cassette_dir=Path(cassettes) if cassettes else None,
+        cassette_mode=cassette_mode,
+    ))
+
+    TestReporter().batch_report(batch, save_files=not no_save)
+
+    failed = [r for r in batch.results if r.status != "completed"]
+    if failed:
+        console.print(f"\n[bold red]✗ Не завершены: {', '.join(r.scenario_name for r in failed)}[/bold red]")
+        sys.exit(1)
+    console.print("\n[bold green]✓ Все сценарии завершены успешно[/bold green]")
+    sys.exit(0)
+
+
 @click.command()
-@click.argument('scenario', required=False)
+@click.argument('scenarios', nargs=-1)
 @click.option('--list', '-l', 'list_all', is_flag=True, help='Показать список сценариев')
+@click.option('--all', '-a', 'run_all', is_flag=True, help='Запустить все сценарии параллельно')
+@click.option('--workers', '-w', default=4, show_default=True, help='Параллельных прогонов для нескольких сценариев')
 @click.option('--quiet', '-q', is_flag=True, help='Минимальный вывод')
 @click.option('--no-save', is_flag=True, help='Не сохранять отчёты в файлы')
 @click.option('--input-dir', '-i', help='Путь к папке с документами клиента')
-def main(scenario: str, list_all: bool, quiet: bool, no_save: bool, input_dir: str):
+@click.option('--cassettes', help='Папка кассет LLM (запись/воспроизведение ответов)')
+@click.option('--cassette-mode', type=click.Choice(['record', 'replay', 'auto']), default='auto',
+              show_default=True, help='Режим кассет LLM')
+def main(scenarios, list_all: bool, run_all: bool, workers: int, quiet: bool, no_save: bool, input_dir: str,
+         cassettes: str, cassette_mode: str):
     """
     Запуск тестовой симуляции консультации.
 
-    SCENARIO: имя сценария или путь к YAML файлу
+    SCENARIOS: имена сценариев или пути к YAML файлам
     """
     if list_all:
         list_scenarios()
         return
 
-    if not scenario:
+    if not scenarios and not run_all:
         console.print("[yellow]Укажите сценарий для запуска[/yellow]")
         console.print("Используйте --list для просмотра доступных сценариев")
         return
 
     try:
-        scenario_path = find_scenario(scenario)
+        if run_all:
+            scenario_paths = discover_scenarios(SCENARIOS_DIR)
+        else:
+            scenario_paths = [find_scenario(name) for name in scenarios]
     except FileNotFoundError as e:
         console.print(f"[red]{e}[/red]")
         console.print("Используйте --list для просмотра доступных сценариев")
         return
 
+    if len(scenario_paths) > 1:
+        try:
+            run_many(scenario_paths, workers, quiet, no_save, input_dir, cassettes, cassette_mode)
+        except KeyboardInterrupt:
+            console.print("\n[yellow]Прервано пользователем[/yellow]")
+            sys.exit(130)
+        return
+
+    scenario_path = scenario_paths[0]
+
     docs_info = ""
     if input_dir:
         docs_info = f"\nДокументы: [cyan]{input_dir}[/cyan]"
@@ -111,7 +176,9 @@ def main(scenario: str, list_all: bool, quiet: bool, no_save: bool, input_dir: s
         result = asyncio.run(run_test_scenario(
             str(scenario_path),
             verbose=not quiet,
-            input_dir=input_dir
+            input_dir=input_dir,
+            cassette=_cassette_for(scenario_path, cassettes),
+            cassette_mode=cassette_mode,
         ))
 
         # Generate report
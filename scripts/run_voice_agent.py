@@ -4,6 +4,7 @@
 
 Использование:
     python scripts/run_voice_agent.py
+    python scripts/run_voice_agent.py --workers 3     # 3 воркера под супервизором
 
 Агент подключится к LiveKit Cloud и будет ждать клиентов.
 Клиенты могут подключиться через:
@@ -14,6 +15,12 @@
 Требования:
 - .env файл с настройками LiveKit и Azure OpenAI
 - Установленные зависимости: pip install -r requirements.txt
+
+Несколько воркеров (--workers N или AGENT_WORKERS): супервизор запускает N
+процессов `run_voice_agent.py start` с портами AGENT_HTTP_PORT_BASE + i
+(по умолчанию 8081...) и перезапускает упавшие. Ёмкость воркера —
+AGENT_MAX_ROOMS комнат (под супервизором по умолчанию 4; одиночный воркер
+без AGENT_MAX_ROOMS не ограничен); нагрузка всех воркеров — GET /api/agent/health.
 """
 
 import sys
@@ -32,6 +39,9 @@ load_dotenv()
 # === PID-file: защита от запуска нескольких копий ===
 PIDFILE = os.path.join(PROJECT_ROOT, ".agent.pid")
 
+# Воркер, запущенный супервизором: PID-файлом владеет супервизор
+SUPERVISED = os.getenv("AGENT_SUPERVISED") == "1"
+
 
 def _is_process_alive(pid: int) -> bool:
     """Проверяет, жив ли процесс с данным PID."""
@@ -78,10 +88,25 @@ def _cleanup_pid(*args):
         pass
 
 
+def _pop_workers_arg() -> int:
+    """--workers N из argv (или AGENT_WORKERS); остальные аргументы уходят в LiveKit CLI."""
+    workers = os.getenv("AGENT_WORKERS", "1")
+    if "--workers" in sys.argv:
+        i = sys.argv.index("--workers")
+        workers = sys.argv[i + 1] if i + 1 < len(sys.argv) else workers
+        del sys.argv[i:i + 2]
+    try:
+        return max(1, int(workers))
+    except ValueError:
+        print(f"❌ Некорректное число воркеров: {workers}")
+        sys.exit(1)
+
+
 # Регистрируем cleanup на завершение
-signal.signal(signal.SIGTERM, lambda sig, frame: (_cleanup_pid(), sys.exit(0)))
-import atexit
-atexit.register(_cleanup_pid)
+if not SUPERVISED:
+    signal.signal(signal.SIGTERM, lambda sig, frame: (_cleanup_pid(), sys.exit(0)))
+    import atexit
+    atexit.register(_cleanup_pid)
 
 # Проверяем необходимые переменные
 required_vars = [
@@ -113,9 +138,25 @@ print("Нажмите Ctrl+C для остановки.")
 print("=" * 60)
 
 if __name__ == "__main__":
+    workers = 1 if SUPERVISED else _pop_workers_arg()
+
     # Защита от дублей: проверяем PID-файл
-    _check_duplicate()
-    _write_pid()
+    if not SUPERVISED:
+        _check_duplicate()
+        _write_pid()
+
+    if workers > 1:
+        from src.voice.supervisor import AgentSupervisor
+
+        # Воркеры — prod-режим LiveKit: dev-перезагрузка по файлам в каждом из N не нужна
+        command = [sys.executable, os.path.abspath(__file__)] + (sys.argv[1:] or ["start"])
+        print(f"Супервизор: {workers} воркеров")
+        AgentSupervisor(
+            workers=workers,
+            command=command,
+            base_port=int(os.getenv("AGENT_HTTP_PORT_BASE", "8081")),
+        ).run()
+        sys.exit(0)
 
     # Python 3.14: asyncio.get_event_loop() raises RuntimeError when no loop exists.
     # LiveKit Agents SDK (cli.py) calls get_event_loop() in dev mode — create one first.
@@ -5,10 +5,12 @@ Reusable components:
 - SimulatedClient: AI-powered client simulator
 - ConsultationTester: Test runner
 - TestReporter: Report generator
+- run_batch: Concurrent runner for many scenarios
 """
 
 from .client import SimulatedClient
 from .runner import ConsultationTester
 from .reporter import TestReporter
+from .batch import BatchResult, run_batch
 
-__all__ = ["SimulatedClient", "ConsultationTester", "TestReporter"]
+__all__ = ["SimulatedClient", "ConsultationTester", "TestReporter", "BatchResult", "run_batch"]
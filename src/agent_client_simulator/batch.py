@@ -0,0 +1,128 @@
+"""
+Batch Runner - runs many simulated consultations concurrently.
+
+Each scenario gets its own SimulatedClient, ConsultationTester and
+ConsultantInterviewer (with its own input provider), so runs share
+nothing but the event loop. Concurrency is bounded by a worker count.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .runner import TestResult, run_test_scenario
+
+
+@dataclass
+class BatchResult:
+    """Aggregated result of a batch run."""
+    results: List[TestResult] = field(default_factory=list)
+    workers: int = 1
+    wall_time_seconds: float = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate statistics over all scenario results."""
+        total = len(self.results)
+        completed = [r for r in self.results if r.status == "completed"]
+        scores = [
+            r.validation["score"] for r in self.results
+            if r.validation and r.validation.get("score") is not None
+        ]
+        passed = [r for r in self.results if r.validation and r.validation.get("passed")]
+        durations = [r.duration_seconds for r in self.results]
+
+        return {
+            "total": total,
+            "completed": len(completed),
+            "failed": total - len(completed),
+            "validation_passed": len(passed),
+            "average_score": round(sum(scores) / len(scores), 1) if scores else None,
+            "total_turns": sum(r.turn_count for r in self.results),
+            "sum_duration_seconds": round(sum(durations), 1),
+            "max_duration_seconds": round(max(durations), 1) if durations else 0.0,
+            "wall_time_seconds": round(self.wall_time_seconds, 1),
+            "workers": self.workers,
+            "scenarios": [
+                {
+                    "scenario_name": r.scenario_name,
+                    "status": r.status,
+                    "duration_seconds": round(r.duration_seconds, 1),
+                    "turn_count": r.turn_count,
+                    "score": (r.validation or {}).get("score"),
+                    "passed": (r.validation or {}).get("passed"),
+                    "errors": r.errors,
+                }
+                for r in self.results
+            ],
+        }
+
+
+def discover_scenarios(scenarios_dir: Path) -> List[Path]:
+    """List scenario YAML files, skipping templates (names starting with '_')."""
+    return sorted(
+        path for path in Path(scenarios_dir).glob("*.yaml")
+        if not path.name.startswith("_")
+    )
+
+
+async def run_batch(
+    scenario_paths: Iterable[Path],
+    workers: int = 4,
+    verbose: bool = False,
+    input_dir: Optional[str] = None,
+    on_result: Optional[Callable[[TestResult], None]] = None,
+    cassette_dir: Optional[Path] = None,
+    cassette_mode: Optional[str] = None,
+) -> BatchResult:
+    """
+    Run scenarios concurrently with at most `workers` in flight.
+
+    Args:
+        scenario_paths: Scenario YAML files
+        workers: Maximum concurrent consultations
+        verbose: Per-run console output (interleaves when workers > 1)
+        input_dir: Documents folder applied to every scenario
+        on_result: Callback invoked as each scenario finishes
+        cassette_dir: Directory of per-scenario LLM cassettes (<stem>.json)
+        cassette_mode: record / replay / auto for those cassettes
+
+    Returns:
+        BatchResult with results in the input order
+    """
+    paths = [Path(p) for p in scenario_paths]
+    workers = max(1, workers)
+    semaphore = asyncio.Semaphore(workers)
+
+    async def _run_one(path: Path) -> TestResult:
+        async with semaphore:
+            kwargs = {}
+            if cassette_dir is not None:
+                kwargs = {
+                    "cassette": str(Path(cassette_dir) / f"{path.stem}.json"),
+                    "cassette_mode": cassette_mode,
+                }
+            try:
+                result = await run_test_scenario(
+                    str(path), verbose=verbose, input_dir=input_dir, **kwargs
+                )
+            except Exception as e:
+                # One broken scenario must not abort the batch
+                result = TestResult(
+                    scenario_name=path.stem,
+                    status="failed",
+                    duration_seconds=0.0,
+                    errors=[f"{type(e).__name__}: {e}"],
+                )
+        if on_result is not None:
+            on_result(result)
+        return result
+
+    start = time.monotonic()
+    results = await asyncio.gather(*(_run_one(path) for path in paths))
+    return BatchResult(
+        results=list(results),
+        workers=workers,
+        wall_time_seconds=time.monotonic() - start,
+    )
@@ -0,0 +1,438 @@
+"""
+Extraction Benchmark - repeatable latency/quality measurement of AnketaExtractor.
+
+Runs AnketaExtractor.extract over recorded dialogues (fixtures, data/sessions.db,
+simulator TestResult JSON) against a stub or replayed LLM and reports:
+- p50/p95 per stage: prompt build, LLM, JSON repair, AnketaPostProcessor.process,
+  _build_anketa, render_markdown
+- LLM usage (calls, prompt/response chars, approximate tokens)
+- field-level accuracy and TestValidator score per dialogue
+
+The report is plain JSON keyed by git commit, so runs on different commits
+can be diffed with compare_reports().
+"""
+
+import copy
+import json
+import math
+import sqlite3
+import subprocess
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import yaml
+
+from src.anketa.extractor import AnketaExtractor
+from src.anketa.generator import AnketaGenerator
+from src.anketa.schema import FinalAnketa
+
+from .runner import TestResult
+from .validator import SynonymMatcher, TestValidator
+
+REPORT_VERSION = 1
+
+STAGES = (
+    "prompt_build",
+    "llm",
+    "json_repair",
+    "post_process",
+    "build_anketa",
+    "render_markdown",
+    "extract_total",
+)
+
+# Кириллица в среднем ~3 символа на токен у BPE-токенизаторов
+CHARS_PER_TOKEN = 3
+
+# Поля, заполненность которых учитывается в field-level отчёте
+TRACKED_FIELDS = (
+    "company_name", "industry", "specialization", "contact_name", "contact_role",
+    "contact_phone", "contact_email", "business_description", "agent_name",
+    "agent_purpose", "services", "client_types", "current_problems",
+    "business_goals", "agent_functions", "integrations",
+)
+
+
+@dataclass
+class BenchCase:
+    """One recorded dialogue to benchmark."""
+    name: str
+    dialogue_history: List[Dict[str, str]]
+    scenario: Dict[str, Any] = field(default_factory=dict)
+    llm_response: Optional[str] = None
+    duration_seconds: float = 0.0
+    source: str = "fixture"
+
+
+class StubLLM:
+    """LLM stub returning a fixed response (the recorded extraction JSON)."""
+
+    def __init__(self, response: Optional[str] = None):
+        self.response = response if response is not None else "{}"
+
+    async def chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        return self.response
+
+
+class MeteredLLM:
+    """Wraps any LLM client, counting calls and request/response size."""
+
+    def __init__(self, inner, timer: "StageTimer"):
+        self.inner = inner
+        self.timer = timer
+        self.calls = 0
+        self.prompt_chars = 0
+        self.response_chars = 0
+
+    async def chat(self, messages: List[Dict[str, str]], **kwargs) -> str:
+        self.calls += 1
+        self.prompt_chars += sum(len(m.get("content") or "") for m in messages)
+        started = time.perf_counter()
+        response = await self.inner.chat(messages, **kwargs)
+        self.timer.add("llm", time.perf_counter() - started)
+        self.response_chars += len(response or "")
+        return response
+
+
+class StageTimer:
+    """Collects per-stage wall times (seconds)."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.samples.setdefault(stage, []).append(seconds)
+
+    def wrap(self, obj: Any, attr: str, stage: str) -> None:
+        """Replace obj.attr (sync callable) with a timed wrapper on the instance."""
+        original = getattr(obj, attr)
+
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - started)
+
+        setattr(obj, attr, timed)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {
+            stage: {
+                "n": len(values),
+                "p50_ms": round(percentile(values, 50) * 1000, 3),
+                "p95_ms": round(percentile(values, 95) * 1000, 3),
+                "mean_ms": round(sum(values) / len(values) * 1000, 3),
+            }
+            for stage, values in self.samples.items()
+            if values
+        }
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentile with linear interpolation (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return ordered[low]
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+# ---------------------------------------------------------------------------
+# Case loaders
+# ---------------------------------------------------------------------------
+
+def _load_scenario(scenarios_dir: Optional[Path], name: str) -> Dict[str, Any]:
+    if scenarios_dir is None:
+        return {}
+    path = Path(scenarios_dir) / f"{name}.yaml"
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def load_fixture_cases(fixtures_dir: Path) -> List[BenchCase]:
+    """Load benchmark fixtures (*.json with name, dialogue_history, scenario, llm_response)."""
+    cases = []
+    for path in sorted(Path(fixtures_dir).glob("*.json")):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        response = data.get("llm_response")
+        cases.append(BenchCase(
+            name=data.get("name", path.stem),
+            dialogue_history=data.get("dialogue_history", []),
+            scenario=data.get("scenario", {}),
+            llm_response=response if isinstance(response, str) or response is None
+            else json.dumps(response, ensure_ascii=False),
+            duration_seconds=data.get("duration_seconds", 0.0),
+            source=str(path),
+        ))
+    return cases
+
+
+def load_session_cases(db_path: str, limit: Optional[int] = None) -> List[BenchCase]:
+    """
+    Load dialogues from the sessions SQLite database (read-only).
+
+    The stored anketa_data serves as the stub LLM response, so the benchmark
+    replays what production extraction returned for that dialogue.
+    """
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        query = (
+            "SELECT session_id, dialogue_history, anketa_data, company_name, duration_seconds "
+            "FROM sessions WHERE dialogue_history != '[]' ORDER BY updated_at DESC"
+        )
+        params: tuple = ()
+        if limit:
+            query += " LIMIT ?"
+            params = (limit,)
+        rows = conn.execute(query, params).fetchall()
+    finally:
+        conn.close()
+
+    cases = []
+    for session_id, dialogue_json, anketa_json, company_name, duration in rows:
+        try:
+            dialogue = json.loads(dialogue_json or "[]")
+        except ValueError:
+            continue
+        if not dialogue:
+            continue
+        cases.append(BenchCase(
+            name=f"session_{session_id}",
+            dialogue_history=dialogue,
+            scenario={"persona": {"company": company_name}} if company_name else {},
+            llm_response=anketa_json,
+            duration_seconds=duration or 0.0,
+            source=db_path,
+        ))
+    return cases
+
+
+def load_result_cases(
+    result_paths: Iterable[Path],
+    scenarios_dir: Optional[Path] = None,
+) -> List[BenchCase]:
+    """Load dialogues from simulator TestResult JSON reports."""
+    cases = []
+    for path in result_paths:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        if not data.get("dialogue_history"):
+            continue
+        name = data.get("scenario_name", Path(path).stem)
+        final_anketa = data.get("final_anketa")
+        cases.append(BenchCase(
+            name=name,
+            dialogue_history=data["dialogue_history"],
+            scenario=_load_scenario(scenarios_dir, name),
+            llm_response=json.dumps(final_anketa, ensure_ascii=False) if final_anketa else None,
+            duration_seconds=data.get("duration_seconds", 0.0),
+            source=str(path),
+        ))
+    return cases
+
+
+# ---------------------------------------------------------------------------
+# Accuracy
+# ---------------------------------------------------------------------------
+
+def field_accuracy(anketa: FinalAnketa, scenario: Dict[str, Any]) -> Dict[str, Any]:
+    """Field-level comparison against the scenario's persona/expected results."""
+    validator = TestValidator()
+    persona = scenario.get("persona", {})
+    expected_results = scenario.get("expected_results", {})
+
+    filled = {name: bool(getattr(anketa, name, None)) for name in TRACKED_FIELDS}
+    fields: Dict[str, Any] = {
+        "filled": filled,
+        "filled_ratio": round(sum(filled.values()) / len(filled), 3),
+    }
+
+    expected_company = persona.get("company")
+    if expected_company:
+        fields["company_name"] = bool(anketa.company_name) and validator._fuzzy_company_match(
+            anketa.company_name, expected_company
+        )
+
+    expected_industry = persona.get("industry")
+    if expected_industry:
+        fields["industry"] = bool(anketa.industry) and SynonymMatcher.match_industry(
+            anketa.industry, expected_industry
+        )
+
+    functions = list(persona.get("target_functions", [])) + list(
+        expected_results.get("expected_functions", [])
+    )
+    if functions:
+        matched = validator._count_function_matches(anketa, functions)
+        fields["functions"] = {"matched": matched, "total": len(functions)}
+
+    integrations = list(persona.get("integrations", [])) + list(
+        expected_results.get("expected_integrations", [])
+    )
+    if integrations:
+        matched = validator._count_integration_matches(anketa, integrations)
+        fields["integrations"] = {"matched": matched, "total": len(integrations)}
+
+    return fields
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+async def run_case(
+    case: BenchCase,
+    llm,
+    timer: StageTimer,
+    iterations: int = 1,
+) -> Dict[str, Any]:
+    """Run extraction for one case `iterations` times; validate the last anketa."""
+    metered = MeteredLLM(llm, timer)
+    extractor = AnketaExtractor(metered)
+    timer.wrap(extractor, "_build_extraction_prompt", "prompt_build")
+    timer.wrap(extractor, "_parse_json_with_repair", "json_repair")
+    timer.wrap(extractor.post_processor, "process", "post_process")
+    timer.wrap(extractor, "_build_anketa", "build_anketa")
+
+    anketa = None
+    for _ in range(max(1, iterations)):
+        started = time.perf_counter()
+        anketa = await extractor.extract(
+            dialogue_history=case.dialogue_history,
+            duration_seconds=case.duration_seconds,
+            skip_expert_content=True,
+        )
+        timer.add("extract_total", time.perf_counter() - started)
+
+        started = time.perf_counter()
+        AnketaGenerator.render_markdown(anketa)
+        timer.add("render_markdown", time.perf_counter() - started)
+
+    result = TestResult(
+        scenario_name=case.name,
+        status="completed",
+        duration_seconds=case.duration_seconds,
+        phases_completed=["discovery", "analysis", "proposal", "refinement"],
+        dialogue_history=case.dialogue_history,
+        turn_count=sum(1 for m in case.dialogue_history if m.get("role") == "user"),
+    )
+    # TestValidator дополняет списки из persona на месте — даём ему копию
+    validation = TestValidator().validate(result, copy.deepcopy(case.scenario), anketa)
+
+    return {
+        "name": case.name,
+        "source": case.source,
+        "dialogue_turns": len(case.dialogue_history),
+        "completion_rate": round(anketa.completion_rate(), 3),
+        "validation_score": round(validation.score, 1),
+        "validation_passed": validation.passed,
+        "checks": {c.name: c.status for c in validation.checks},
+        "fields": field_accuracy(anketa, case.scenario),
+        "llm": {
+            "calls": metered.calls,
+            "prompt_chars": metered.prompt_chars,
+            "response_chars": metered.response_chars,
+            "approx_tokens": math.ceil(
+                (metered.prompt_chars + metered.response_chars) / CHARS_PER_TOKEN
+            ),
+        },
+    }
+
+
+async def run_benchmark(
+    cases: List[BenchCase],
+    llm_for_case: Optional[Callable[[BenchCase], Any]] = None,
+    iterations: int = 1,
+    llm_mode: str = "stub",
+) -> Dict[str, Any]:
+    """
+    Benchmark extraction over all cases.
+
+    Args:
+        cases: Recorded dialogues
+        llm_for_case: Returns the LLM client for a case (default: StubLLM with
+                      the case's recorded response)
+        iterations: Extractions per case (more → stabler percentiles)
+        llm_mode: Label stored in the report ("stub" / "replay")
+
+    Returns:
+        JSON-serializable report
+    """
+    llm_for_case = llm_for_case or (lambda case: StubLLM(case.llm_response))
+    timer = StageTimer()
+    case_reports = []
+    for case in cases:
+        case_reports.append(await run_case(case, llm_for_case(case), timer, iterations))
+
+    scores = [c["validation_score"] for c in case_reports]
+    return {
+        "version": REPORT_VERSION,
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "llm_mode": llm_mode,
+        "iterations": iterations,
+        "cases_total": len(case_reports),
+        "stages": timer.summary(),
+        "quality": {
+            "average_score": round(sum(scores) / len(scores), 1) if scores else None,
+            "passed": sum(1 for c in case_reports if c["validation_passed"]),
+            "average_completion": round(
+                sum(c["completion_rate"] for c in case_reports) / len(case_reports), 3
+            ) if case_reports else None,
+        },
+        "llm": {
+            key: sum(c["llm"][key] for c in case_reports)
+            for key in ("calls", "prompt_chars", "response_chars", "approx_tokens")
+        },
+        "cases": case_reports,
+    }
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Stage latency and quality deltas between two reports (current - baseline)."""
+    stages = {}
+    for stage, stats in current.get("stages", {}).items():
+        base = baseline.get("stages", {}).get(stage)
+        if not base:
+            continue
+        stages[stage] = {
+            "p50_ms": round(stats["p50_ms"] - base["p50_ms"], 3),
+            "p95_ms": round(stats["p95_ms"] - base["p95_ms"], 3),
+        }
+
+    base_score = baseline.get("quality", {}).get("average_score")
+    score = current.get("quality", {}).get("average_score")
+    base_cases = {c["name"]: c for c in baseline.get("cases", [])}
+    return {
+        "baseline_commit": baseline.get("commit"),
+        "commit": current.get("commit"),
+        "stages": stages,
+        "average_score": round(score - base_score, 1)
+        if score is not None and base_score is not None else None,
+        "cases": {
+            c["name"]: round(c["validation_score"] - base_cases[c["name"]]["validation_score"], 1)
+            for c in current.get("cases", [])
+            if c["name"] in base_cases
+        },
+    }
+
+
+def git_commit() -> str:
+    """Short hash of the repository commit ("unknown" outside a git checkout)."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parents[2],
+            capture_output=True, text=True, timeout=5, check=True,
+        ).stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
@@ -10,7 +10,7 @@ Outputs:
 import json
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 from rich.console import Console
 from rich.panel import Panel
@@ -19,6 +19,9 @@ from rich.markdown import Markdown
 
 from .runner import TestResult
 
+if TYPE_CHECKING:
+    from .batch import BatchResult
+
 
 console = Console()
 
@@ -396,3 +399,62 @@ class TestReporter:
             files['markdown'] = self.save_markdown(result)
 
         return files
+
+    def batch_report(self, batch: "BatchResult", save_files: bool = True) -> Dict[str, Path]:
+        """
+        Aggregated report for a batch run: summary table + per-scenario files.
+
+        Args:
+            batch: Result of run_batch()
+            save_files: Save summary JSON and per-scenario JSON/Markdown
+
+        Returns:
+            Dict with paths to saved files ('summary' + scenario names)
+        """
+        summary = batch.summary()
+
+        table = Table(title="Сводка прогона сценариев", show_header=True)
+        table.add_column("Сценарий", style="cyan")
+        table.add_column("Статус")
+        table.add_column("Оценка", justify="right")
+        table.add_column("Ходов", justify="right")
+        table.add_column("Время, сек", justify="right")
+
+        for row in summary["scenarios"]:
+            status_color = "green" if row["status"] == "completed" else "red"
+            score = f"{row['score']:.0f}%" if row["score"] is not None else "—"
+            table.add_row(
+                row["scenario_name"],
+                f"[{status_color}]{row['status']}[/{status_color}]",
+                score,
+                str(row["turn_count"]),
+                f"{row['duration_seconds']:.1f}",
+            )
+
+        console.print("\n")
+        console.print(table)
+        avg = f"{summary['average_score']:.1f}%" if summary["average_score"] is not None else "—"
+        console.print(
+            f"\nЗавершено: [green]{summary['completed']}[/green] из {summary['total']}, "
+            f"валидация пройдена: {summary['validation_passed']}, средняя оценка: {avg}"
+        )
+        console.print(
+            f"Время: {summary['wall_time_seconds']:.1f} сек "
+            f"(сумма по сценариям {summary['sum_duration_seconds']:.1f} сек, "
+            f"воркеров: {summary['workers']})"
+        )
+
+        files: Dict[str, Path] = {}
+        if save_files:
+            for result in batch.results:
+                files[result.scenario_name] = self.save_json(result)
+                self.save_markdown(result)
+
+            timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+            summary_path = self.output_dir / f"batch_summary_{timestamp}.json"
+            with open(summary_path, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, ensure_ascii=False, indent=2)
+            console.print(f"\n[green]Сводка сохранена:[/green] {summary_path}")
+            files['summary'] = summary_path
+
+        return files
@@ -4,13 +4,12 @@ Consultation Tester - runs simulated consultations.
 Orchestrates the interaction between ConsultantInterviewer and SimulatedClient.
 """
 
-import asyncio
 import json
+import re
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 from dataclasses import dataclass, field
-from unittest.mock import patch, MagicMock
 
 from rich.console import Console
 from rich.panel import Panel
@@ -87,7 +86,9 @@ class ConsultationTester:
     Runs simulated consultations for testing.
 
     Uses SimulatedClient to play the role of client.
-    Patches Rich Prompt.ask to inject simulated responses.
+    Simulated answers are injected into the interviewer via its
+    input_provider (no global Prompt.ask patching), so several testers
+    can run concurrently in one event loop.
     """
 
     def __init__(
@@ -97,6 +98,7 @@ class ConsultationTester:
         max_turns_per_phase: int = 20,
         verbose: bool = True,
         input_dir: Optional[Path] = None,
+        llm_client=None,
     ):
         """
         Initialize tester.
@@ -107,8 +109,11 @@ class ConsultationTester:
             max_turns_per_phase: Safety limit for turns per phase
             verbose: Show detailed output
             input_dir: Path to documents folder (for document analysis)
+            llm_client: LLM client for the consultant (e.g. cassette-backed);
+                        defaults to create_llm_client()
         """
         self.client = client
+        self.llm_client = llm_client
         self.pattern = pattern
         self.max_turns_per_phase = max_turns_per_phase
         self.verbose = verbose
@@ -156,16 +161,21 @@ class ConsultationTester:
             ))
 
         try:
-            # Create interviewer
+            from src.anketa.review_service import AnketaReviewService
+
+            # Create interviewer with per-run input provider
+            output_console = console if self.verbose else Console(quiet=True)
             self.interviewer = ConsultantInterviewer(
+                deepseek_client=self.llm_client,
                 pattern=self.pattern,
                 locale="ru",
-                document_context=self.document_context
+                document_context=self.document_context,
+                input_provider=self.ask,
+                review_service=AnketaReviewService(prompt_fn=self._review_prompt, output_console=output_console),
+                output_console=output_console,
             )
 
-            # Run with mocked input
-            with patch('rich.prompt.Prompt.ask', side_effect=self._mock_prompt_ask):
-                result = await self.interviewer.run()
+            result = await self.interviewer.run()
 
             status = result.get('status', 'completed')
             phases_completed = ["discovery", "analysis", "proposal", "refinement"]
@@ -313,11 +323,12 @@ class ConsultationTester:
             for warn in validation.warnings:
                 console.print(f"  - {warn}")
 
-    def _mock_prompt_ask(self, prompt_text: str, **kwargs) -> str:
+    async def ask(self, prompt_text: str, **kwargs) -> str:
         """
-        Mock for Rich Prompt.ask.
+        Input provider for ConsultantInterviewer (Prompt.ask signature).
 
-        Generates responses using SimulatedClient based on the prompt.
+        Scripted answers for choices/confirmations, SimulatedClient
+        responses for dialogue prompts.
         """
         self.turn_count += 1
 
@@ -331,8 +342,27 @@ class ConsultationTester:
                 console.print("[yellow]Превышен лимит ходов, завершаю...[/yellow]")
             return "done"
 
+        answer = self._scripted_answer(prompt_text, **kwargs)
+        if answer is not None:
+            return answer
+
+        return await self._generate_client_response(prompt_text)
+
+    def _review_prompt(self, prompt_text: str, **kwargs) -> str:
+        """Synchronous prompt_fn for AnketaReviewService."""
+        answer = self._scripted_answer(prompt_text, **kwargs)
+        if answer is None:
+            return kwargs.get("default", "")
+        return answer
+
+    def _scripted_answer(self, prompt_text: str, **kwargs) -> Optional[str]:
+        """
+        Answer non-dialogue prompts without the LLM.
+
+        Returns:
+            Answer string, or None if the prompt needs a client response
+        """
         # Clean prompt text (remove Rich markup)
-        import re
         clean_prompt = re.sub(r'\[.*?\]', '', prompt_text).strip().lower()
 
         # Debug: show what prompt we're receiving
@@ -380,7 +410,7 @@ class ConsultationTester:
         if clean_prompt in dialogue_labels:
             if self.verbose:
                 console.print("[dim]→ Dialogue prompt, generating client response[/dim]")
-            return self._generate_client_response(prompt_text)
+            return None
 
         # Confirmation prompts - contains question words
         confirmation_keywords = [
@@ -396,14 +426,14 @@ class ConsultationTester:
         # Default: treat as dialogue
         if self.verbose:
             console.print("[dim]→ Default: generating client response[/dim]")
-        return self._generate_client_response(prompt_text)
+        return None
 
     def _handle_confirmation(self, prompt_text: str) -> str:
         """Handle confirmation prompts."""
         # Usually confirm positively to proceed with the test
         return "да"
 
-    def _generate_client_response(self, consultant_prompt: str) -> str:
+    async def _generate_client_response(self, consultant_prompt: str) -> str:
         """Generate client response using SimulatedClient."""
         # Get the last AI message from interviewer's dialogue history
         if self.interviewer and self.interviewer.dialogue_history:
@@ -417,22 +447,8 @@ class ConsultationTester:
         else:
             consultant_message = consultant_prompt
 
-        # Generate response synchronously (for mock compatibility)
         try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # Create a new task in the existing loop
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(
-                        asyncio.run,
-                        self.client.respond(consultant_message, self.current_phase.value)
-                    )
-                    response = future.result(timeout=30)
-            else:
-                response = loop.run_until_complete(
-                    self.client.respond(consultant_message, self.current_phase.value)
-                )
+            response = await self.client.respond(consultant_message, self.current_phase.value)
         except Exception as e:
             if self.verbose:
                 console.print(f"[yellow]Ошибка генерации ответа: {e}[/yellow]")
@@ -560,7 +576,9 @@ class ConsultationTester:
 async def run_test_scenario(
     scenario_path: str,
     verbose: bool = True,
-    input_dir: Optional[str] = None
+    input_dir: Optional[str] = None,
+    cassette: Optional[str] = None,
+    cassette_mode: Optional[str] = None,
 ) -> TestResult:
     """
     Convenience function to run a test from a scenario file.
@@ -569,6 +587,9 @@ async def run_test_scenario(
         scenario_path: Path to YAML scenario file
         verbose: Show detailed output
         input_dir: Path to documents folder (overrides scenario config)
+        cassette: LLM cassette file; client and consultant share one
+                  recording/replaying LLM client (see src/llm/cassette.py)
+        cassette_mode: record / replay / auto (default: auto)
 
     Returns:
         TestResult
@@ -588,12 +609,22 @@ async def run_test_scenario(
         if "input_dir" in docs_config:
             docs_dir = Path(docs_config["input_dir"])
 
-    client = SimulatedClient.from_yaml(scenario_path)
+    llm_client = None
+    if cassette:
+        from src.llm.factory import create_llm_client
+        llm_client = create_llm_client(cassette=cassette, cassette_mode=cassette_mode)
+
+    client = SimulatedClient.from_yaml(scenario_path, llm_client=llm_client)
     tester = ConsultationTester(
         client=client,
         verbose=verbose,
-        input_dir=docs_dir
+        input_dir=docs_dir,
+        llm_client=llm_client,
     )
 
     scenario_name = Path(scenario_path).stem
-    return await tester.run(scenario_name=scenario_name)
+    try:
+        return await tester.run(scenario_name=scenario_name)
+    finally:
+        if llm_client is not None and hasattr(llm_client, "aclose"):
+            await llm_client.aclose()
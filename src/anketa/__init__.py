@@ -13,6 +13,7 @@ v3.1 Data Cleaning Components:
 - DialogueCleaner: Removes dialogue markers from field values
 - SmartExtractor: Role-based data extraction from dialogue
 - AnketaPostProcessor: Comprehensive post-processing pipeline
+- RuleEngine: Compiled YAML rules for contextual list post-processing
 """
 
 from src.anketa.schema import FinalAnketa, AgentFunction, Integration
@@ -21,7 +22,7 @@ from src.anketa.generator import AnketaGenerator
 from src.anketa.review_service import AnketaReviewService, create_review_service
 from src.anketa.markdown_parser import AnketaMarkdownParser, parse_anketa_markdown
 from src.anketa.data_cleaner import (
-    JSONRepair, DialogueCleaner, SmartExtractor, AnketaPostProcessor
+    JSONRepair, DialogueCleaner, SmartExtractor, AnketaPostProcessor, RuleEngine
 )
 
 __all__ = [
@@ -44,4 +45,5 @@ __all__ = [
     'DialogueCleaner',
     'SmartExtractor',
     'AnketaPostProcessor',
+    'RuleEngine',
 ]
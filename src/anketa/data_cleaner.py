@@ -6,14 +6,20 @@ Handles:
 - Dialogue marker removal
 - Field value sanitization
 - Role-based data extraction from dialogue
+- Compiled YAML rules for contextual list post-processing (RuleEngine)
 """
 
 import re
 import json
-from typing import Any, Dict, List, Optional, Tuple
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 from dataclasses import dataclass
 
 import structlog
+import yaml
+
+from src.serialization import loads
 
 logger = structlog.get_logger("anketa")
 
@@ -45,6 +51,24 @@ class JSONRepair:
         (r'/\*.*?\*/', '', re.DOTALL),
     ]
 
+    # Single-pass repair (repair()): token regexes scan whole runs at C speed
+    _WS_RE = re.compile(r'\s+')
+    _DQ_CHUNK_RE = re.compile(r'[^"\\\x00-\x1f]+')
+    _SQ_CHUNK_RE = re.compile(r'[^\'"\\\x00-\x1f]+')
+    _NUMBER_RE = re.compile(r'-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?')
+    _WORD_RE = re.compile(r'[^\W\d]\w*')
+    _BARE_VALUE_RE = re.compile(r'[^,}\]\n]*')
+    _HEX4_RE = re.compile(r'[0-9a-fA-F]{4}')
+    _LITERALS = {
+        'true': 'true', 'false': 'false', 'null': 'null',
+        'True': 'true', 'False': 'false', 'None': 'null', 'undefined': 'null',
+    }
+    _VALID_ESCAPES = frozenset('"\\/bfnrt')
+    _CONTROL_ESCAPES = {'\n': '\\n', '\r': '\\r', '\t': '\\t'}
+
+    # repair() states: what the current container expects next
+    _KEY, _COLON, _VALUE, _ITEM, _NEXT = range(5)
+
     @classmethod
     def parse(cls, text: str, max_retries: int = 3) -> Tuple[Dict[str, Any], bool]:
         """
@@ -52,7 +76,7 @@ class JSONRepair:
 
         Args:
             text: Raw text potentially containing JSON
-            max_retries: Number of repair attempts
+            max_retries: Number of legacy repair attempts (last resort)
 
         Returns:
             Tuple of (parsed_dict, was_repaired)
@@ -63,42 +87,264 @@ class JSONRepair:
         # Step 1: Extract JSON from markdown
         json_text = cls._extract_json(text)
 
-        # Step 2: Try direct parse
+        # Step 2: Try direct parse (orjson fast path)
+        try:
+            return loads(json_text), False
+        except json.JSONDecodeError:
+            pass
+
+        # Step 3: Single-pass repair of the raw text (keeps truncated tails
+        # that _extract_json cuts at the last '}')
         try:
-            return json.loads(json_text), False
+            result = loads(cls.repair(text))
+            logger.info("JSON repaired in single pass", original_length=len(text))
+            return result, True
         except json.JSONDecodeError:
             pass
 
-        # Step 3: Apply incremental fixes
+        # Step 4: Legacy regex pipeline
+        return cls._parse_legacy(json_text, max_retries), True
+
+    @classmethod
+    def _parse_legacy(cls, json_text: str, max_retries: int = 3) -> Any:
+        """Regex-based repair pipeline (pre-repair() behaviour, kept as last resort)."""
+        # Apply incremental fixes
         repaired = json_text
         for i in range(max_retries):
             repaired = cls._apply_fixes(repaired)
             try:
-                result = json.loads(repaired)
+                result = loads(repaired)
                 logger.info(f"JSON repaired after {i+1} fix iterations")
-                return result, True
+                return result
             except json.JSONDecodeError:
                 continue
 
-        # Step 4: Try balanced extraction
+        # Try balanced extraction
         balanced = cls._find_balanced_json(repaired)
         try:
-            return json.loads(balanced), True
+            return loads(balanced)
         except json.JSONDecodeError:
             pass
 
-        # Step 5: Try minimal extraction (just first level)
+        # Try minimal extraction (just first level)
         minimal = cls._extract_minimal_json(repaired)
         try:
-            return json.loads(minimal), True
+            return loads(minimal)
         except json.JSONDecodeError as e:
             logger.error(
                 "All JSON repair attempts failed",
-                original_length=len(text),
+                original_length=len(json_text),
                 error=str(e)
             )
             raise
 
+    @classmethod
+    def repair(cls, text: str) -> str:
+        """
+        Repair the first JSON object in text in a single sweep.
+
+        State machine over tokens, handles in one pass: markdown fences and
+        surrounding text, trailing/duplicate/missing commas, comments, single
+        quotes, unquoted keys and values, Python literals, raw control
+        characters and unescaped quotes inside strings, mismatched brackets
+        and truncated output (open strings and containers are closed).
+
+        Returns:
+            Compact JSON text (not guaranteed valid for arbitrary garbage)
+        """
+        fence = text.find('```')
+        start = text.find('{', fence + 3) if fence != -1 else -1
+        if start == -1:
+            start = text.find('{')
+        if start == -1:
+            return text.strip()
+
+        KEY, COLON, VALUE, ITEM, NEXT = cls._KEY, cls._COLON, cls._VALUE, cls._ITEM, cls._NEXT
+        n = len(text)
+        out: List[str] = []
+        stack: List[str] = []  # expected closers
+        skipped = {'}': 0, ']': 0}  # duplicated openers ("{{" from prompt templates)
+        state = VALUE
+        pending_comma = False
+
+        def begin_value() -> int:
+            """Insert a missing comma/colon before a token; return effective state."""
+            nonlocal state, pending_comma
+            if state == NEXT:
+                pending_comma = True
+                state = KEY if stack[-1] == '}' else ITEM
+            elif state == COLON:
+                out.append(':')
+                state = VALUE
+            if pending_comma:
+                out.append(',')
+                pending_comma = False
+            return state
+
+        i = start
+        while i < n:
+            c = text[i]
+
+            if c in ' \t\r\n':
+                i = cls._WS_RE.match(text, i).end()
+
+            elif c == '"' or c == "'":
+                token, i = cls._scan_string(text, i, c)
+                key = begin_value() == KEY
+                out.append(token)
+                state = COLON if key else NEXT
+
+            elif c == '{' or c == '[':
+                i += 1
+                if stack and state == KEY:
+                    skipped['}' if c == '{' else ']'] += 1
+                    continue
+                begin_value()
+                out.append(c)
+                stack.append('}' if c == '{' else ']')
+                state = KEY if c == '{' else ITEM
+
+            elif c == '}' or c == ']':
+                i += 1
+                if skipped[c]:
+                    skipped[c] -= 1
+                    continue
+                if c not in stack:
+                    continue  # stray closer
+                while True:
+                    closer = stack.pop()
+                    if state == COLON:
+                        out.append(':null')
+                    elif state == VALUE:
+                        out.append('null')
+                    pending_comma = False  # trailing comma
+                    out.append(closer)
+                    state = NEXT
+                    if closer == c:
+                        break
+                if not stack:
+                    break  # first top-level object is complete
+
+            elif c == ',':
+                i += 1
+                if state in (COLON, VALUE):
+                    # "key", / "key": ,  → missing value
+                    out.append(':null' if state == COLON else 'null')
+                    state = NEXT
+                if state == NEXT:
+                    pending_comma = True
+                    state = KEY if stack[-1] == '}' else ITEM
+
+            elif c == ':':
+                i += 1
+                if state == COLON:
+                    out.append(':')
+                    state = VALUE
+
+            elif c == '/' and text.startswith('//', i) or c == '#':
+                end = text.find('\n', i)
+                i = n if end == -1 else end
+            elif c == '/' and text.startswith('/*', i):
+                end = text.find('*/', i + 2)
+                i = n if end == -1 else end + 2
+
+            else:
+                number = cls._NUMBER_RE.match(text, i) if c in '-0123456789' else None
+                if number:
+                    i = number.end()
+                    if begin_value() == KEY:
+                        out.append(f'"{number.group()}"')
+                        state = COLON
+                    else:
+                        out.append(number.group())
+                        state = NEXT
+                    continue
+
+                word = cls._WORD_RE.match(text, i)
+                if not word:
+                    i += 1  # stray character ("...", "+", etc.)
+                    continue
+                if begin_value() == KEY:
+                    i = word.end()
+                    out.append(json.dumps(word.group(), ensure_ascii=False))
+                    state = COLON
+                    continue
+                bare = cls._BARE_VALUE_RE.match(text, i)
+                i = bare.end()
+                value = bare.group().strip()
+                literal = cls._LITERALS.get(value)
+                out.append(literal or json.dumps(value, ensure_ascii=False))
+                state = NEXT
+
+        # Truncated output: complete the last pair and close open containers
+        if stack:
+            if state == COLON:
+                out.append(':null')
+            elif state == VALUE:
+                out.append('null')
+            out.extend(reversed(stack))
+
+        return ''.join(out)
+
+    @classmethod
+    def _scan_string(cls, text: str, i: int, quote: str) -> Tuple[str, int]:
+        """
+        Scan a string token starting at text[i] (the opening quote).
+
+        A quote closes the string only if followed by , : } ] a comment, a
+        newline, whitespace + another quote (missing comma) or the end of
+        text; otherwise it is an unescaped inner quote.
+
+        Returns:
+            Tuple of (double-quoted JSON string, index after the token)
+        """
+        n = len(text)
+        chunk_re = cls._DQ_CHUNK_RE if quote == '"' else cls._SQ_CHUNK_RE
+        buf = ['"']
+        j = i + 1
+        while j < n:
+            chunk = chunk_re.match(text, j)
+            if chunk:
+                buf.append(chunk.group())
+                j = chunk.end()
+                if j >= n:
+                    break
+
+            c = text[j]
+            if c == quote:
+                ws = cls._WS_RE.match(text, j + 1)
+                k = ws.end() if ws else j + 1
+                if k >= n or text[k] in ',:}]/' or (ws and ('\n' in ws.group() or text[k] == '"')):
+                    buf.append('"')
+                    return ''.join(buf), j + 1
+                buf.append('\\"' if quote == '"' else "'")
+                j += 1
+            elif c == '"':
+                buf.append('\\"')  # inside a single-quoted string
+                j += 1
+            elif c == '\\':
+                nxt = text[j + 1] if j + 1 < n else ''
+                if nxt and nxt in cls._VALID_ESCAPES:
+                    buf.append(text[j:j + 2])
+                    j += 2
+                elif nxt == 'u' and cls._HEX4_RE.match(text, j + 2):
+                    buf.append(text[j:j + 6])
+                    j += 6
+                elif nxt == "'":
+                    buf.append("'")
+                    j += 2
+                else:
+                    buf.append('\\\\')
+                    j += 1
+            else:
+                # Raw control character (LLMs put real newlines into strings)
+                buf.append(cls._CONTROL_ESCAPES.get(c) or f'\\u{ord(c):04x}')
+                j += 1
+
+        # Truncated inside the string
+        buf.append('"')
+        return ''.join(buf), n
+
     @classmethod
     def _extract_json(cls, text: str) -> str:
         """Extract JSON content from markdown or mixed text."""
@@ -241,10 +487,203 @@ class JSONRepair:
         return text
 
 
+# ============================================================================
+# RULE ENGINE
+# ============================================================================
+
+ANKETA_RULES_PATH = Path(__file__).parent.parent.parent / "config" / "anketa_rules.yaml"
+
+AGENT_ROLES = ('assistant', 'agent')
+CLIENT_ROLES = ('user', 'client', 'клиент')
+
+
+@dataclass(frozen=True)
+class MessageFeatures:
+    """Result of a single scan over one dialogue message."""
+    terms: FrozenSet[str]
+    affirmative: bool
+
+
+@dataclass
+class OfferRule:
+    """Option the consultant may offer: filled into a list field on "да, все"."""
+    alternatives: List[FrozenSet[str]]  # OR of AND-groups of terms
+    value: Dict[str, Any]
+
+    def matches(self, terms: FrozenSet[str]) -> bool:
+        return any(group <= terms for group in self.alternatives)
+
+
+class RuleEngine:
+    """
+    Compiled rules for contextual list post-processing.
+
+    Rules are loaded from config/anketa_rules.yaml. All terms of all offer
+    rules are compiled into ONE regex, so each message is scanned once for
+    every detector (terms + affirmative answer). Scan results are cached per
+    message text: on repeated extraction cycles only new turns are scanned.
+    """
+
+    def __init__(
+        self,
+        rules: Optional[Dict[str, Any]] = None,
+        rules_path: Optional[Path] = None,
+        cache_size: int = 2048,
+    ):
+        """
+        Initialize engine.
+
+        Args:
+            rules: Rules dict (same structure as anketa_rules.yaml).
+                   If None - loaded from rules_path.
+            rules_path: Path to YAML rules. Default: config/anketa_rules.yaml
+            cache_size: Max number of cached message scans
+        """
+        if rules is None:
+            rules = self._load_rules(rules_path or ANKETA_RULES_PATH)
+
+        self.targets: Dict[str, List[OfferRule]] = {}
+        for target in ('agent_functions', 'integrations'):
+            self.targets[target] = [
+                OfferRule(
+                    alternatives=[frozenset(t.lower() for t in group) for group in rule.get('match', [])],
+                    value=dict(rule.get('value', {})),
+                )
+                for rule in rules.get(target) or []
+            ]
+
+        affirmative = rules.get('affirmative') or []
+        self._affirmative_re = (
+            re.compile('|'.join(f'(?:{p})' for p in affirmative), re.IGNORECASE)
+            if affirmative else None
+        )
+
+        terms = {
+            term
+            for rules_list in self.targets.values()
+            for rule in rules_list
+            for group in rule.alternatives
+            for term in group
+        }
+        # Длинные термины первыми; термины-подстроки найденного термина
+        # добавляются через _implied (lookahead даёт одно совпадение на позицию)
+        ordered = sorted(terms, key=lambda t: (-len(t), t))
+        self._terms_re = (
+            re.compile('(?=(' + '|'.join(re.escape(t) for t in ordered) + '))')
+            if ordered else None
+        )
+        self._implied = {
+            term: frozenset(other for other in terms if other in term)
+            for term in terms
+        }
+
+        self.scan = lru_cache(maxsize=cache_size)(self._scan)
+
+    @staticmethod
+    def _load_rules(path: Path) -> Dict[str, Any]:
+        """Load rules YAML. Missing file -> empty rules (post-processing disabled)."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return yaml.safe_load(f) or {}
+        except FileNotFoundError:
+            logger.warning("Anketa rules file not found", path=str(path))
+            return {}
+
+    def _scan(self, content: str) -> MessageFeatures:
+        """Single pass over a message: all offer terms + affirmative answer."""
+        text = content.lower()
+        found = set()
+        if self._terms_re is not None:
+            for match in self._terms_re.finditer(text):
+                found |= self._implied[match.group(1)]
+        affirmative = bool(self._affirmative_re and self._affirmative_re.search(text))
+        return MessageFeatures(terms=frozenset(found), affirmative=affirmative)
+
+    def offers(self, target: str, features: MessageFeatures) -> List[Dict[str, Any]]:
+        """Options of the target list mentioned in a scanned message."""
+        if not features.terms:
+            return []
+        return [
+            dict(rule.value)
+            for rule in self.targets.get(target, [])
+            if rule.matches(features.terms)
+        ]
+
+    def fill_contextual_lists(
+        self,
+        data: Dict[str, Any],
+        dialogue: List[Dict[str, str]],
+    ) -> Dict[str, Any]:
+        """
+        Fill empty list fields from "agent offers -> client agrees" pairs.
+
+        For each empty target the first agent message mentioning options and
+        followed by an affirmative client answer wins. One pass over the
+        dialogue serves all targets.
+        """
+        pending = [
+            target for target, rules in self.targets.items()
+            if rules and not data.get(target)
+        ]
+        if not pending:
+            return data
+
+        for i in range(len(dialogue) - 1):
+            msg = dialogue[i]
+            if msg.get('role', '').lower() not in AGENT_ROLES:
+                continue
+            next_msg = dialogue[i + 1]
+            if next_msg.get('role', '').lower() not in CLIENT_ROLES:
+                continue
+
+            features = self.scan(msg.get('content') or '')
+            if not features.terms or not self.scan(next_msg.get('content') or '').affirmative:
+                continue
+
+            for target in list(pending):
+                mentioned = self.offers(target, features)
+                if mentioned:
+                    data[target] = mentioned
+                    pending.remove(target)
+                    logger.debug(
+                        f"Contextual post-processing filled {target}",
+                        count=len(mentioned)
+                    )
+            if not pending:
+                break
+
+        return data
+
+
+_rule_engine: Optional[RuleEngine] = None
+
+
+def get_rule_engine() -> RuleEngine:
+    """Get shared RuleEngine (rules compiled once per process)."""
+    global _rule_engine
+    if _rule_engine is None:
+        _rule_engine = RuleEngine()
+    return _rule_engine
+
+
 # ============================================================================
 # DIALOGUE CLEANER
 # ============================================================================
 
+def _combine_patterns(patterns: List[re.Pattern]) -> re.Pattern:
+    """
+    Compile patterns into one alternation (flags kept as scoped inline groups).
+
+    combined.search(text) matches iff any of the patterns matches.
+    """
+    flag_letters = ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm'), (re.DOTALL, 's'))
+    parts = []
+    for p in patterns:
+        letters = ''.join(letter for flag, letter in flag_letters if p.flags & flag)
+        parts.append(f'(?{letters}:{p.pattern})' if letters else f'(?:{p.pattern})')
+    return re.compile('|'.join(parts))
+
+
 @dataclass
 class DialoguePattern:
     """Pattern for detecting dialogue contamination."""
@@ -347,6 +786,11 @@ class DialogueCleaner:
         'agent_purpose', 'business_description', 'specialization'
     }
 
+    # One search instead of a loop per pattern: most values are clean,
+    # and for them the per-pattern loop is skipped entirely
+    _ANY_DIALOGUE_PATTERN = _combine_patterns([p.pattern for p in DIALOGUE_PATTERNS])
+    _ANY_FULL_DIALOGUE_INDICATOR = _combine_patterns(FULL_DIALOGUE_INDICATORS)
+
     def __init__(self, strict_mode: bool = True):
         """
         Initialize cleaner.
@@ -412,21 +856,21 @@ class DialogueCleaner:
         min_severity = "low" if (self.strict_mode or is_strict_field) else "high"
 
         # v3.2: For strict fields, check if entire value is dialogue (should be rejected)
-        if is_strict_field:
-            for indicator in self.FULL_DIALOGUE_INDICATORS:
-                if indicator.search(cleaned):
-                    changes.append(f"{field_name}: rejected full dialogue value")
-                    logger.debug(
-                        "Rejected dialogue value for strict field",
-                        field=field_name,
-                        value_preview=cleaned[:50]
-                    )
-                    return "", changes
+        if is_strict_field and self._ANY_FULL_DIALOGUE_INDICATOR.search(cleaned):
+            changes.append(f"{field_name}: rejected full dialogue value")
+            logger.debug(
+                "Rejected dialogue value for strict field",
+                field=field_name,
+                value_preview=cleaned[:50]
+            )
+            return "", changes
 
         severity_order = {"high": 0, "medium": 1, "low": 2}
 
-        # Apply patterns
-        for pattern_info in self.DIALOGUE_PATTERNS:
+        # Apply patterns (a pattern can only match after a substitution
+        # if some pattern matched before it, so the prefilter is exact)
+        patterns = self.DIALOGUE_PATTERNS if self._ANY_DIALOGUE_PATTERN.search(cleaned) else ()
+        for pattern_info in patterns:
             if severity_order[pattern_info.severity] > severity_order[min_severity]:
                 continue
 
@@ -557,14 +1001,29 @@ class SmartExtractor:
         'точка': '.', 'dot': '.',
     }
 
-    def __init__(self):
-        """Initialize extractor with compiled patterns."""
+    def __init__(self, cache_size: int = 2048):
+        """
+        Initialize extractor with compiled patterns.
+
+        Args:
+            cache_size: Max number of messages with cached speech-to-text tokens
+        """
         self._compiled_patterns = {}
         for field, patterns in self.EXTRACTION_PATTERNS.items():
             self._compiled_patterns[field] = [
                 re.compile(p, re.IGNORECASE | re.UNICODE)
                 for p in patterns
             ]
+        # Токены каждого сообщения нормализуются один раз: при повторных
+        # циклах извлечения обрабатываются только новые реплики
+        self._message_tokens = lru_cache(maxsize=cache_size)(self._map_speech_tokens)
+
+    def _map_speech_tokens(self, text: str) -> Tuple[str, ...]:
+        """Map speech-to-text words of one text to digits/symbols (no merging)."""
+        return tuple(
+            self.WORD_TO_DIGIT.get(word.lower().strip('.,!?;:'), word)
+            for word in text.split()
+        )
 
     def _normalize_speech_to_text(self, text: str) -> str:
         """
@@ -574,13 +1033,11 @@ class SmartExtractor:
             "плюс сорок три шесть шесть четыре" → "плюс 43 6 6 4"
             "channel собака gmail точка com" → "channel@gmail.com"
         """
-        words = text.split()
-        normalized = []
-
-        for word in words:
-            word_lower = word.lower().strip('.,!?;:')
-            normalized.append(self.WORD_TO_DIGIT.get(word_lower, word))
+        return self._merge_compound_numbers(list(self._map_speech_tokens(text)))
 
+    @staticmethod
+    def _merge_compound_numbers(normalized: List[str]) -> str:
+        """Merge mapped tokens into text, joining tens + units ("40 3" → "43")."""
         # Merge compound numbers: "40 3" → "43", "50 7" → "57", etc.
         # BUT NOT: "900 0" (сотни) or "7 9" (single digits)
         result = []
@@ -627,9 +1084,13 @@ class SmartExtractor:
             if msg.get('role', '').lower() in ('user', 'client', 'клиент')
         ]
 
-        # Combine all client text and normalize speech-to-text words
-        client_text = ' '.join(client_messages)
-        client_text = self._normalize_speech_to_text(client_text)
+        # Combine all client text and normalize speech-to-text words.
+        # Equivalent to normalizing the joined text: tokens are mapped per
+        # message (cached), numbers are merged across the whole sequence.
+        tokens: List[str] = []
+        for content in client_messages:
+            tokens.extend(self._message_tokens(content))
+        client_text = self._merge_compound_numbers(tokens)
 
         # Extract each field
         for field, patterns in self._compiled_patterns.items():
@@ -640,33 +1101,7 @@ class SmartExtractor:
             for pattern in patterns:
                 match = pattern.search(client_text)
                 if match:
-                    # Handle multi-group patterns (e.g., email with "эт" and "точка")
-                    if field == 'contact_email' and match.lastindex and match.lastindex > 1:
-                        # Reconstruct email from groups: "channel . my . honey @ gmail . com" -> channel.my.honey@gmail.com
-                        groups = [g for g in match.groups() if g]
-                        if len(groups) >= 2:
-                            # Remove extra spaces from username part: "channel . my . honey" -> "channel.my.honey"
-                            username = groups[0].replace(' . ', '.').replace(' ', '').strip()
-                            domain = groups[1].strip('. ')
-                            value = f"{username}@{domain}"
-                            if len(groups) >= 3:
-                                tld = groups[2].strip('. ')
-                                value = f"{value}.{tld}"
-                        else:
-                            value = match.group(1).strip()
-                    elif field == 'contact_phone':
-                        # Handle different phone patterns
-                        if match.lastindex and match.lastindex > 1:
-                            # Multi-group pattern: reconstruct from groups
-                            groups = [g for g in match.groups() if g]
-                            value = '+' + ''.join(groups).replace(' ', '')
-                        else:
-                            # Single group pattern: "Плюс 40 3 6 6 4..." -> "+4036647550358 0"
-                            raw = match.group(1).strip()
-                            # Remove all spaces and add +
-                            value = '+' + raw.replace(' ', '')
-                    else:
-                        value = match.group(1).strip()
+                    value = self._value_from_match(field, match)
 
                     # Basic validation
                     if self._validate_extracted_value(field, value):
@@ -675,6 +1110,36 @@ class SmartExtractor:
 
         return extracted
 
+    def _value_from_match(self, field: str, match: re.Match) -> str:
+        """Build field value from a pattern match."""
+        # Handle multi-group patterns (e.g., email with "эт" and "точка")
+        if field == 'contact_email' and match.lastindex and match.lastindex > 1:
+            # Reconstruct email from groups: "channel . my . honey @ gmail . com" -> channel.my.honey@gmail.com
+            groups = [g for g in match.groups() if g]
+            if len(groups) >= 2:
+                # Remove extra spaces from username part: "channel . my . honey" -> "channel.my.honey"
+                username = groups[0].replace(' . ', '.').replace(' ', '').strip()
+                domain = groups[1].strip('. ')
+                value = f"{username}@{domain}"
+                if len(groups) >= 3:
+                    tld = groups[2].strip('. ')
+                    value = f"{value}.{tld}"
+                return value
+            return match.group(1).strip()
+
+        if field == 'contact_phone':
+            # Handle different phone patterns
+            if match.lastindex and match.lastindex > 1:
+                # Multi-group pattern: reconstruct from groups
+                groups = [g for g in match.groups() if g]
+                return '+' + ''.join(groups).replace(' ', '')
+            # Single group pattern: "Плюс 40 3 6 6 4..." -> "+4036647550358 0"
+            raw = match.group(1).strip()
+            # Remove all spaces and add +
+            return '+' + raw.replace(' ', '')
+
+        return match.group(1).strip()
+
     def _validate_extracted_value(self, field: str, value: str) -> bool:
         """Validate that extracted value makes sense for field type."""
         if not value or len(value) < 2:
@@ -732,6 +1197,109 @@ class SmartExtractor:
         return merged
 
 
+@dataclass
+class FieldHit:
+    """Best-so-far value of a field with the position it was found at."""
+    value: str
+    rank: int       # index of the matched pattern in EXTRACTION_PATTERNS[field]
+    message: int    # sequence number of the message (in order first seen)
+    position: int   # match offset in the normalized message text
+
+
+class IncrementalSmartExtractor(SmartExtractor):
+    """
+    Stateful SmartExtractor for repeated extraction over a growing dialogue.
+
+    Each client message is normalized and matched once (messages are
+    identified by id or by a hash of role/timestamp/content). Per field the
+    best hit is kept: higher-priority pattern first, then the earliest
+    message and position. Cost per call is O(new text).
+
+    A new message is scanned together with the last TAIL_CHARS of the
+    previous client message, so a phone or email split across two STT
+    segments is still found; hits survive even when old messages are
+    trimmed from the history.
+    """
+
+    TAIL_CHARS = 48
+
+    def __init__(self):
+        super().__init__(cache_size=0)
+        self._seen: Dict[int, int] = {}  # message key -> sequence number
+        self.best: Dict[str, FieldHit] = {}
+        self._tail = ""  # конец предыдущей клиентской реплики (нормализованный)
+        self._tail_seq = -1
+        self._tail_offset = 0  # позиция начала _tail в той реплике
+
+    @staticmethod
+    def _message_key(msg: Dict[str, Any]) -> int:
+        if msg.get('id') is not None:
+            return hash(('id', msg['id']))
+        return hash((msg.get('role', ''), msg.get('timestamp'), msg.get('content', '')))
+
+    def update(self, dialogue: List[Dict[str, str]]) -> int:
+        """
+        Process client messages not seen before.
+
+        Returns:
+            Number of newly processed messages
+        """
+        processed = 0
+        for msg in dialogue:
+            if msg.get('role', '').lower() not in ('user', 'client', 'клиент'):
+                continue
+            key = self._message_key(msg)
+            if key in self._seen:
+                continue
+            seq = self._seen[key] = len(self._seen)
+            self._process_message(seq, self._normalize_speech_to_text(msg.get('content') or ''))
+            processed += 1
+        return processed
+
+    def _process_message(self, seq: int, text: str) -> None:
+        # Хвост предыдущей реплики + новая: совпадения целиком внутри хвоста уже проверены
+        boundary = len(self._tail) + 1 if self._tail else 0
+        scan = f"{self._tail} {text}" if self._tail else text
+        for field, patterns in self._compiled_patterns.items():
+            current = self.best.get(field)
+            # Более поздняя реплика выигрывает только более приоритетным паттерном
+            limit = current.rank if current else len(patterns)
+            for rank, pattern in enumerate(patterns[:limit]):
+                match = next((m for m in pattern.finditer(scan) if m.end() > boundary), None)
+                if not match:
+                    continue
+                value = self._value_from_match(field, match)
+                if self._validate_extracted_value(field, value):
+                    if match.start() < boundary:
+                        hit_seq, position = self._tail_seq, self._tail_offset + match.start()
+                    else:
+                        hit_seq, position = seq, match.start() - boundary
+                    self.best[field] = FieldHit(value=value, rank=rank, message=hit_seq, position=position)
+                    break
+        self._remember_tail(seq, text)
+
+    def _remember_tail(self, seq: int, text: str) -> None:
+        start = max(0, len(text) - self.TAIL_CHARS)
+        if start and text[start - 1] != " ":
+            # Не начинать хвост с обрывка слова или числа
+            space = text.find(" ", start)
+            start = space + 1 if space != -1 else len(text)
+        self._tail, self._tail_seq, self._tail_offset = text[start:], seq, start
+
+    def extract_from_dialogue(
+        self,
+        dialogue: List[Dict[str, str]],
+        existing_data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Process new messages and return best-so-far values (same contract as SmartExtractor)."""
+        self.update(dialogue)
+        return {
+            field: hit.value
+            for field, hit in self.best.items()
+            if not (existing_data and existing_data.get(field))
+        }
+
+
 # ============================================================================
 # ANKETA POST-PROCESSOR
 # ============================================================================
@@ -0,0 +1,262 @@
+"""
+Export Service — кэш артефактов экспорта и рендер в пуле процессов.
+
+Экспорт анкеты (markdown, print-HTML, PDF) — чистая функция от данных сессии,
+поэтому результат кэшируется по (session_id, формат, версия сессии): версия —
+anketa_version + updated_at из SessionManager.get_session_version, любая
+запись в сессию даёт новый ключ. Повторный экспорт без изменений не трогает
+ни БД (кроме дешёвого чтения версии), ни рендер.
+
+Рендер (FinalAnketa → markdown → HTML/PDF) CPU-bound и идёт в
+ProcessPoolExecutor (spawn), чтобы не блокировать event loop сервера при
+пакетной выгрузке десятков анкет. EXPORT_WORKERS=0 — рендер в потоке
+(asyncio.to_thread), без отдельных процессов.
+
+Usage:
+    service = get_export_service()
+    artifact = await service.export(session_id, version_key, load_session, "pdf")
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger("anketa")
+
+EXPORT_FORMATS = ("md", "html", "pdf")
+EXPORT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ExportArtifact:
+    """Готовый файл экспорта."""
+
+    content: bytes
+    filename: str
+    media_type: str
+    disposition: str  # "attachment" | "inline"
+
+    @property
+    def size(self) -> int:
+        return len(self.content)
+
+
+def build_export(
+    anketa_data: Optional[Dict[str, Any]],
+    anketa_md: Optional[str],
+    company_name: str,
+    session_type: str,
+    fmt: str,
+) -> ExportArtifact:
+    """
+    Render one export artifact (runs in a worker process).
+
+    Markdown is regenerated from anketa_data: anketa_md in DB may be stale
+    (Bug #9, generated from a sliding window before merge).
+    """
+    from src.anketa import exporter
+
+    if anketa_data:
+        try:
+            from src.anketa.generator import AnketaGenerator
+            from src.anketa.schema import FinalAnketa
+
+            anketa_md = AnketaGenerator.render_markdown(FinalAnketa(**anketa_data))
+        except Exception:
+            pass  # fallback to cached anketa_md
+    anketa_md = anketa_md or ""
+
+    if fmt == "md":
+        content, filename = exporter.export_markdown(anketa_md, company_name)
+        return ExportArtifact(content, filename, "text/markdown", "attachment")
+
+    if fmt == "pdf":
+        try:
+            content, filename = exporter.export_pdf(anketa_md, company_name, session_type)
+            return ExportArtifact(content, filename, "application/pdf", "inline")
+        except ImportError:
+            logger.warning("PyMuPDF not available, exporting print-ready HTML instead of PDF")
+
+    content, filename = exporter.export_print_html(anketa_md, company_name, session_type)
+    return ExportArtifact(content, filename, "text/html", "inline")
+
+
+class ExportCache:
+    """
+    In-memory LRU артефактов, ограниченный суммарным размером.
+
+    На сессию и формат хранится одна версия: put() новой версии вытесняет
+    старую, чтобы правки анкеты не копили устаревшие PDF.
+    """
+
+    def __init__(self, max_bytes: int = EXPORT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, ExportArtifact]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, session_id: str, fmt: str, version: str) -> Optional[ExportArtifact]:
+        key = (session_id, fmt)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, session_id: str, fmt: str, version: str, artifact: ExportArtifact) -> None:
+        if artifact.size > self.max_bytes:
+            return
+        key = (session_id, fmt)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1].size
+            self._entries[key] = (version, artifact)
+            self._bytes += artifact.size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+
+    def forget(self, session_id: str) -> None:
+        """Drop all formats of a session (e.g. after deletion)."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == session_id]:
+                self._bytes -= self._entries.pop(key)[1].size
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _export_workers() -> int:
+    try:
+        return max(0, int(os.getenv("EXPORT_WORKERS", str(min(2, os.cpu_count() or 1)))))
+    except ValueError:
+        return 1
+
+
+class ExportService:
+    """Кэшированный экспорт с рендером в пуле процессов (workers=0 — в потоке)."""
+
+    def __init__(self, workers: Optional[int] = None, cache: Optional[ExportCache] = None):
+        self.workers = _export_workers() if workers is None else workers
+        self.cache = cache or ExportCache()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._inflight: Dict[Tuple[str, str, str], "asyncio.Future[Optional[ExportArtifact]]"] = {}
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Process pool (spawn: safe to start from threaded servers)."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop worker processes (server shutdown); the next export starts a fresh pool."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+
+    async def render(
+        self,
+        anketa_data: Optional[Dict[str, Any]],
+        anketa_md: Optional[str],
+        company_name: str,
+        session_type: str,
+        fmt: str,
+    ) -> ExportArtifact:
+        """Render without cache: in the process pool, or in a thread if workers=0 / the pool broke."""
+        args = (anketa_data, anketa_md, company_name, session_type, fmt)
+        if self.workers > 0:
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(self._get_pool(), build_export, *args)
+            except BrokenProcessPool as e:
+                logger.warning("export_pool_failed", error=str(e), format=fmt)
+                self.shutdown()
+        return await asyncio.to_thread(build_export, *args)
+
+    async def export(
+        self,
+        session_id: str,
+        version: str,
+        load: Callable[[], Awaitable[Optional[Tuple[Optional[Dict[str, Any]], Optional[str], str, str]]]],
+        fmt: str,
+    ) -> Optional[ExportArtifact]:
+        """
+        Cached artifact of a session export.
+
+        Args:
+            session_id: Session ID.
+            version: Session version key (anketa_version + updated_at).
+            load: Coroutine returning (anketa_data, anketa_md, company_name, session_type)
+                or None if the session is gone; called only on cache miss.
+            fmt: One of EXPORT_FORMATS.
+
+        Returns:
+            ExportArtifact, or None if load() found no session.
+        """
+        cached = self.cache.get(session_id, fmt, version)
+        if cached is not None:
+            return cached
+
+        # Одновременные запросы одной версии (двойной клик, пакет + одиночный) рендерятся один раз.
+        # Рендер — отдельная задача: отмена одного ожидающего (клиент пакета отключился)
+        # не отменяет его для остальных.
+        key = (session_id, fmt, version)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._produce(session_id, version, load, fmt))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    async def _produce(
+        self,
+        session_id: str,
+        version: str,
+        load: Callable[[], Awaitable[Optional[Tuple[Optional[Dict[str, Any]], Optional[str], str, str]]]],
+        fmt: str,
+    ) -> Optional[ExportArtifact]:
+        """Load and render one export version, then cache it."""
+        source = await load()
+        if source is None:
+            return None
+        artifact = await self.render(*source, fmt)
+        self.cache.put(session_id, fmt, version, artifact)
+        return artifact
+
+    def _finish(self, key: Tuple[str, str, str], task: "asyncio.Future[Optional[ExportArtifact]]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved: every waiter may have been cancelled
+
+
+_service: Optional[ExportService] = None
+
+
+def get_export_service() -> ExportService:
+    """Process-wide export service (EXPORT_WORKERS processes)."""
+    global _service
+    if _service is None:
+        _service = ExportService()
+    return _service
@@ -1,9 +1,27 @@
 """
-Anketa Exporter — MD + Print-ready HTML for PDF export.
+Anketa Exporter — MD, print-ready HTML and PDF (PyMuPDF Story, без браузера).
 """
 
+import io
 from typing import Any, Optional
 
+import structlog
+
+logger = structlog.get_logger("anketa")
+
+# PDF: A4, поля 2 см (как @page в print-HTML)
+_PDF_MARGIN_PT = 56
+_PDF_CSS = """
+body { font-family: sans-serif; font-size: 10pt; color: #1a1a2e; line-height: 1.4; }
+h1 { font-size: 16pt; color: #6366f1; }
+h2 { font-size: 13pt; color: #312e81; margin-top: 14pt; }
+h3 { font-size: 11pt; color: #4338ca; }
+th, td { border: 1px solid #d1d5db; padding: 3pt 5pt; text-align: left; }
+th { background-color: #f3f4f6; }
+blockquote { color: #4b5563; font-style: italic; }
+.meta { color: #666666; font-size: 9pt; }
+"""
+
 
 def export_markdown(anketa_md: str, company_name: str = "") -> tuple[bytes, str]:
     """
@@ -86,6 +104,43 @@ def export_print_html(anketa_md: str, company_name: str = "", session_type: str
     return html.encode("utf-8"), filename
 
 
+def export_pdf(anketa_md: str, company_name: str = "", session_type: str = "consultation") -> tuple[bytes, str]:
+    """
+    Render anketa markdown to a PDF document (PyMuPDF Story).
+
+    CPU-bound; the server runs it in a worker process (src/anketa/export_service.py).
+    Raises ImportError if PyMuPDF is not installed.
+
+    Returns: (pdf_bytes, filename)
+    """
+    import fitz
+
+    safe_name = "".join(c for c in company_name if c.isalnum() or c in " _-")[:30].strip() or "anketa"
+    filename = f"{safe_name}.pdf"
+    type_label = "Интервью" if session_type == "interview" else "Консультация"
+
+    html = (
+        f"<h1>Hanc.AI — {_escape(company_name or 'Анкета')}</h1>"
+        f"<p class=\"meta\">{type_label}</p>"
+        f"{_md_to_html(anketa_md)}"
+    )
+
+    buffer = io.BytesIO()
+    story = fitz.Story(html=html, user_css=_PDF_CSS)
+    writer = fitz.DocumentWriter(buffer)
+    mediabox = fitz.paper_rect("a4")
+    where = mediabox + (_PDF_MARGIN_PT, _PDF_MARGIN_PT, -_PDF_MARGIN_PT, -_PDF_MARGIN_PT)
+    more = True
+    while more:
+        device = writer.begin_page(mediabox)
+        more, _ = story.place(where)
+        story.draw(device)
+        writer.end_page()
+    writer.close()
+
+    return buffer.getvalue(), filename
+
+
 def _escape(text: str) -> str:
     """HTML-escape a string."""
     return (text
@@ -104,6 +159,7 @@ def _md_to_html(md: str) -> str:
     - - list items
     - numbered lists
     - > blockquotes
+    - | tables | (first row → header, |---| separator skipped)
     - empty lines → paragraph breaks
     """
     if not md:
@@ -114,10 +170,19 @@ def _md_to_html(md: str) -> str:
     in_list = False
     in_ol = False
     in_blockquote = False
+    table_rows: list = []
 
     for line in lines:
         stripped = line.strip()
 
+        # Tables: collect rows, emit when the table ends
+        if stripped.startswith("|"):
+            table_rows.append(stripped)
+            continue
+        if table_rows:
+            html_parts.append(_table_to_html(table_rows))
+            table_rows = []
+
         # Close open lists/quotes if needed
         if in_list and not stripped.startswith("- ") and not stripped.startswith("* "):
             html_parts.append("</ul>")
@@ -169,6 +234,8 @@ def _md_to_html(md: str) -> str:
             html_parts.append(f"<p>{_inline(stripped)}</p>")
 
     # Close any open tags
+    if table_rows:
+        html_parts.append(_table_to_html(table_rows))
     if in_list:
         html_parts.append("</ul>")
     if in_ol:
@@ -179,6 +246,22 @@ def _md_to_html(md: str) -> str:
     return "\n".join(html_parts)
 
 
+def _table_to_html(rows: list) -> str:
+    """Markdown pipe table → <table>."""
+    cells = [
+        [cell.strip() for cell in row.strip("|").split("|")]
+        for row in rows
+        if not set(row) <= set("|-: ")  # separator |---|---|
+    ]
+    if not cells:
+        return ""
+    head, body = cells[0], cells[1:]
+    parts = ["<table>", "<tr>" + "".join(f"<th>{_inline(c)}</th>" for c in head) + "</tr>"]
+    parts.extend("<tr>" + "".join(f"<td>{_inline(c)}</td>" for c in row) + "</tr>" for row in body)
+    parts.append("</table>")
+    return "\n".join(parts)
+
+
 def _inline(text: str) -> str:
     """Process inline markdown: **bold**, *italic*."""
     import re
@@ -11,7 +11,9 @@ v3.1 Improvements:
 - AnketaPostProcessor for comprehensive post-processing pipeline
 """
 
+import asyncio
 import json
+import os
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -28,12 +30,33 @@ from src.anketa.schema import (
     InterviewAnketa, QAPair
 )
 from src.anketa.data_cleaner import (
-    JSONRepair, DialogueCleaner, SmartExtractor, AnketaPostProcessor
+    JSONRepair, DialogueCleaner, SmartExtractor, AnketaPostProcessor, get_rule_engine
 )
 from src.config.prompt_loader import get_prompt, render_prompt
 
 logger = structlog.get_logger("anketa")
 
+# Группы блоков v2.0 для секционной генерации экспертного контента
+# (EXPERT_CONTENT_MODE=sectioned): каждая группа — отдельный запрос к LLM.
+# Схемы и требования — prompts/anketa/expert.yaml → sections.<group>
+EXPERT_SECTIONS: Dict[str, Dict[str, Any]] = {
+    "dialogue": {
+        "fields": ("faq_items", "objection_handlers", "sample_dialogue",
+                   "tone_of_voice", "error_handling_scripts"),
+        "max_tokens": 3500,
+    },
+    "business": {
+        "fields": ("financial_metrics", "competitors", "market_insights",
+                   "target_segments", "competitive_advantages"),
+        "max_tokens": 2500,
+    },
+    "launch": {
+        "fields": ("escalation_rules", "success_kpis", "launch_checklist",
+                   "ai_recommendations", "follow_up_sequence"),
+        "max_tokens": 2500,
+    },
+}
+
 
 class AnketaExtractor:
     """Extracts structured questionnaire data from consultation dialogue."""
@@ -43,7 +66,9 @@ class AnketaExtractor:
         llm=None,
         strict_cleaning: bool = True,
         use_smart_extraction: bool = True,
-        max_json_retries: int = 3
+        max_json_retries: int = 3,
+        expert_mode: Optional[str] = None,
+        expert_concurrency: Optional[int] = None,
     ):
         """
         Initialize extractor with v3.1 improvements.
@@ -53,6 +78,9 @@ class AnketaExtractor:
             strict_cleaning: If True, aggressively remove dialogue contamination
             use_smart_extraction: If True, use SmartExtractor for dialogue parsing
             max_json_retries: Number of JSON repair attempts
+            expert_mode: "single" (one LLM call for all v2.0 blocks) or "sectioned"
+                (concurrent calls per EXPERT_SECTIONS group). Default: EXPERT_CONTENT_MODE
+            expert_concurrency: Max concurrent section calls. Default: EXPERT_CONTENT_CONCURRENCY
         """
         # FAILSAFE: НИКОГДА не использовать deepseek-reasoner для extraction!
         # deepseek-reasoner слишком медленный (180-220 sec) для real-time extraction
@@ -74,10 +102,15 @@ class AnketaExtractor:
         self.strict_cleaning = strict_cleaning
         self.use_smart_extraction = use_smart_extraction
         self.max_json_retries = max_json_retries
+        self.expert_mode = (expert_mode or os.getenv("EXPERT_CONTENT_MODE", "single")).lower()
+        self.expert_concurrency = max(
+            1, expert_concurrency or int(os.getenv("EXPERT_CONTENT_CONCURRENCY", str(len(EXPERT_SECTIONS))))
+        )
 
         # Initialize v3.1 components
         self.cleaner = DialogueCleaner(strict_mode=strict_cleaning)
         self.smart_extractor = SmartExtractor() if use_smart_extraction else None
+        self.rule_engine = get_rule_engine()
         self.post_processor = AnketaPostProcessor(
             strict_cleaning=strict_cleaning,
             normalize_values=True,
@@ -418,56 +451,6 @@ class AnketaExtractor:
                 results.append(str(o))
         return str(results)
 
-    def _extract_json_from_markdown(self, text: str) -> str:
-        """Extract JSON content from markdown code blocks."""
-        if "```json" in text:
-            return text.split("```json")[1].split("```")[0]
-        if "```" in text:
-            parts = text.split("```")
-            if len(parts) >= 2:
-                return parts[1]
-        return text
-
-    def _fix_common_json_errors(self, text: str) -> str:
-        """Fix common JSON syntax errors."""
-        import re
-        # Fix trailing commas before ] or }
-        fixed = re.sub(r',\s*([}\]])', r'\1', text)
-        return fixed
-
-    def _find_balanced_json(self, text: str) -> str:
-        """Find the first balanced JSON object in text (string-aware).
-
-        R16-04: Track start position of first '{' to exclude any preamble text.
-        """
-        brace_count = 0
-        start_pos = -1
-        in_string = False
-        escape_next = False
-        for i, char in enumerate(text):
-            if escape_next:
-                escape_next = False
-                continue
-            if in_string:
-                if char == '\\':
-                    escape_next = True
-                    continue
-                if char == '"':
-                    in_string = False
-                continue
-            if char == '"':
-                in_string = True
-                continue
-            if char == '{':
-                if brace_count == 0:
-                    start_pos = i
-                brace_count += 1
-            elif char == '}':
-                brace_count -= 1
-                if brace_count == 0 and start_pos >= 0:
-                    return text[start_pos:i + 1]
-        return text
-
     def _parse_json_with_repair(self, response: str) -> Tuple[Dict[str, Any], bool]:
         """
         Parse JSON with v3.1 robust repair mechanism.
@@ -481,37 +464,8 @@ class AnketaExtractor:
 
     def _parse_json_response(self, response: str) -> Dict[str, Any]:
         """Parse JSON from LLM response with robust error handling (legacy method)."""
-        json_text = self._extract_json_from_markdown(response.strip())
-
-        # Find JSON object boundaries
-        start = json_text.find('{')
-        end = json_text.rfind('}')
-        if start != -1 and end != -1:
-            json_text = json_text[start:end + 1]
-
-        # Try direct parse
-        try:
-            return json.loads(json_text)
-        except json.JSONDecodeError:
-            pass
-
-        # Try with fixes
-        fixed_json = self._fix_common_json_errors(json_text)
-        try:
-            return json.loads(fixed_json)
-        except json.JSONDecodeError:
-            pass
-
-        # Try partial extraction
-        partial = self._find_balanced_json(json_text)
-        partial = self._fix_common_json_errors(partial)
-        try:
-            return json.loads(partial)
-        except json.JSONDecodeError:
-            pass
-
-        # Last resort: raise original error
-        return json.loads(json_text)
+        data, _ = JSONRepair.parse(response, max_retries=self.max_json_retries)
+        return data
 
     def _fallback_contact_extraction(self, dialogue: List[Dict[str, str]]) -> Dict[str, str]:
         """
@@ -596,110 +550,9 @@ class AnketaExtractor:
         Post-process list fields to handle contextual "да/нет" answers.
 
         SPRINT 2: If agent mentions options and user says "да все" / "да, интересно",
-        fill all mentioned options.
+        fill all mentioned options. Rules: config/anketa_rules.yaml (RuleEngine).
         """
-        # Define affirmative patterns
-        affirmative_patterns = [
-            r'да\s+все',
-            r'все\s+интересн',
-            r'все\s+подходит',
-            r'всё\s+устра',
-            r'да,?\s+однозначно',
-            r'конечно',
-            r'именно\s+так',
-            r'подходит',
-        ]
-
-        import re
-        affirmative_re = re.compile('|'.join(affirmative_patterns), re.IGNORECASE)
-
-        # Process agent_functions
-        if not data.get('agent_functions') or len(data.get('agent_functions', [])) == 0:
-            for i, msg in enumerate(dialogue):
-                if msg.get('role', '').lower() in ('assistant', 'agent'):
-                    content = msg['content'].lower()
-
-                    # Check if agent mentioned roles
-                    roles_mentioned = []
-                    if 'администратор' in content:
-                        roles_mentioned.append({
-                            "name": "администратор",
-                            "description": "приём звонков и запись на приём 24/7",
-                            "priority": "high"
-                        })
-                    if 'напоминатель' in content or 'напоминани' in content:
-                        roles_mentioned.append({
-                            "name": "напоминатель",
-                            "description": "напоминания клиентам о записи",
-                            "priority": "medium"
-                        })
-                    if 'консультант' in content:
-                        roles_mentioned.append({
-                            "name": "консультант",
-                            "description": "консультации по услугам и ценам",
-                            "priority": "medium"
-                        })
-                    if 'маршрутизатор' in content or 'направл' in content or 'переключ' in content:
-                        roles_mentioned.append({
-                            "name": "маршрутизатор",
-                            "description": "направление звонков нужным специалистам",
-                            "priority": "medium"
-                        })
-
-                    # Check next user message for affirmative
-                    if roles_mentioned and i + 1 < len(dialogue):
-                        next_msg = dialogue[i + 1]
-                        if next_msg.get('role', '').lower() in ('user', 'client', 'клиент'):
-                            user_response = next_msg['content'].lower()
-                            if affirmative_re.search(user_response):
-                                data['agent_functions'] = roles_mentioned
-                                logger.debug(
-                                    "Contextual post-processing filled agent_functions",
-                                    count=len(roles_mentioned)
-                                )
-                                break
-
-        # Process integrations
-        if not data.get('integrations') or len(data.get('integrations', [])) == 0:
-            for i, msg in enumerate(dialogue):
-                if msg.get('role', '').lower() in ('assistant', 'agent'):
-                    content = msg['content'].lower()
-
-                    # Check if agent mentioned integrations
-                    integrations_mentioned = []
-                    if 'crm' in content or ('систем' in content and 'учёт' in content):
-                        integrations_mentioned.append({
-                            "name": "CRM",
-                            "purpose": "интеграция с системой учёта клиентов",
-                            "required": True
-                        })
-                    if ('календар' in content and 'интеграц' in content) or ('запис' in content and 'интеграц' in content):
-                        integrations_mentioned.append({
-                            "name": "Календарь",
-                            "purpose": "синхронизация записей",
-                            "required": True
-                        })
-                    if 'телефон' in content and 'интеграц' in content:
-                        integrations_mentioned.append({
-                            "name": "Телефония",
-                            "purpose": "интеграция с телефонной системой",
-                            "required": True
-                        })
-
-                    # Check next user message for affirmative
-                    if integrations_mentioned and i + 1 < len(dialogue):
-                        next_msg = dialogue[i + 1]
-                        if next_msg.get('role', '').lower() in ('user', 'client', 'клиент'):
-                            user_response = next_msg['content'].lower()
-                            if affirmative_re.search(user_response):
-                                data['integrations'] = integrations_mentioned
-                                logger.debug(
-                                    "Contextual post-processing filled integrations",
-                                    count=len(integrations_mentioned)
-                                )
-                                break
-
-        return data
+        return self.rule_engine.fill_contextual_lists(data, dialogue)
 
     def _build_anketa(self, data: Dict[str, Any], duration_seconds: float) -> FinalAnketa:
         """Build FinalAnketa from extracted data."""
@@ -1203,7 +1056,10 @@ class AnketaExtractor:
         # Build context for AI generation
         context = self._build_expert_context(anketa, document_context)
 
-        # Generate all expert blocks in a single LLM call for efficiency
+        if self.expert_mode == "sectioned":
+            return await self._generate_expert_content_sectioned(anketa, context)
+
+        # Generate all expert blocks in a single LLM call
         prompt = self._build_expert_generation_prompt(context)
 
         # Load system prompt from YAML
@@ -1234,6 +1090,63 @@ class AnketaExtractor:
 
         return anketa
 
+    async def _generate_expert_content_sectioned(
+        self, anketa: FinalAnketa, context: Dict[str, Any]
+    ) -> FinalAnketa:
+        """
+        Generate expert content as concurrent per-group requests (EXPERT_SECTIONS).
+
+        Wall-clock time is bounded by the slowest group instead of one long
+        generation. Successful groups are merged via _merge_expert_content;
+        a failed group gets fallback content for its own fields only.
+        """
+        system_prompt = get_prompt("anketa/expert", "system_prompt")
+        semaphore = asyncio.Semaphore(self.expert_concurrency)
+
+        async def generate(section: str) -> Dict[str, Any]:
+            spec = EXPERT_SECTIONS[section]
+            prompt = self._build_expert_section_prompt(section, context)
+            async with semaphore:
+                response = await self.llm.chat(
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.3,
+                    max_tokens=spec["max_tokens"]
+                )
+            data = self._parse_json_response(response)
+            section_data = {key: data[key] for key in spec["fields"] if key in data}
+            if not section_data:
+                raise ValueError(f"no {section} blocks in response")
+            return section_data
+
+        sections = list(EXPERT_SECTIONS)
+        results = await asyncio.gather(*(generate(s) for s in sections), return_exceptions=True)
+
+        expert_data: Dict[str, Any] = {}
+        failed = []
+        for section, result in zip(sections, results):
+            if isinstance(result, BaseException):
+                failed.append(section)
+                logger.warning("expert_section_failed", section=section, error=str(result))
+            else:
+                expert_data.update(result)
+
+        anketa = self._merge_expert_content(anketa, expert_data)
+
+        if failed:
+            fallback = self._generate_fallback_expert_content(anketa.model_copy(deep=True))
+            for section in failed:
+                for field_name in EXPERT_SECTIONS[section]["fields"]:
+                    setattr(anketa, field_name, getattr(fallback, field_name))
+
+        logger.info("Expert content generated (sectioned)",
+                    sections=len(sections), failed=failed,
+                    faq_count=len(anketa.faq_items),
+                    kpis_count=len(anketa.success_kpis))
+        return anketa
+
     def _build_expert_context(
         self, anketa: FinalAnketa, document_context: Optional[Any] = None
     ) -> Dict[str, Any]:
@@ -1328,6 +1241,22 @@ class AnketaExtractor:
             document_summary=document_summary,
         )
 
+    def _build_expert_section_prompt(self, section: str, context: Dict[str, Any]) -> str:
+        """Build the prompt for one EXPERT_SECTIONS group from YAML."""
+        spec = get_prompt("anketa/expert", f"sections.{section}")
+        # Блоки группы подставляются первыми — их {{industry}}/{{country}} раскрываются ниже
+        return render_prompt(
+            "anketa/expert", "section_prompt_template",
+            section_schema=spec["schema"].strip(),
+            section_requirements=spec["requirements"].strip(),
+            company_name=context.get('company_name', 'компания'),
+            industry=context.get('industry', 'бизнес'),
+            agent_purpose=context.get('agent_purpose', 'консультирование клиентов'),
+            country=context.get('country_name', '') or context.get('country', ''),
+            currency=context.get('currency', ''),
+            document_summary=context.get('document_summary', ''),
+        )
+
     def _merge_expert_content(self, anketa: FinalAnketa, data: Dict[str, Any]) -> FinalAnketa:
         """Merge AI-generated expert content into anketa."""
 
@@ -2,14 +2,16 @@
 AnketaGenerator - generates documents from FinalAnketa.
 
 Supports:
-- Markdown format (human-readable)
+- Markdown format (human-readable), section-memoized (AnketaMarkdownRenderer)
 - JSON format (machine-readable)
 """
 
 import json
+import threading
+from collections import OrderedDict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
 
 import structlog
 
@@ -52,11 +54,11 @@ class AnketaGenerator:
             safe_name = self._safe_filename(anketa.company_name)
             filename = f"{safe_name}_{timestamp}.md"
 
-        content = self._render_markdown(anketa)
         filepath = self.output_dir / filename
 
+        # Секции пишутся в файл по одной, без сборки всего документа в строку
         with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+            get_markdown_renderer().write(anketa, f)
 
         logger.info("Markdown anketa saved", path=str(filepath))
         return filepath
@@ -101,6 +103,8 @@ class AnketaGenerator:
         Generate Markdown content from anketa (static version).
 
         Use this when you don't need to save files, just generate content.
+        Sections are memoized per anketa_id (see AnketaMarkdownRenderer):
+        only sections whose fields changed since the last call are re-rendered.
 
         Args:
             anketa: Populated FinalAnketa instance
@@ -108,27 +112,32 @@ class AnketaGenerator:
         Returns:
             Markdown content as string
         """
-        generator = AnketaGenerator.__new__(AnketaGenerator)
-        return generator._render_markdown(anketa)
+        return get_markdown_renderer().render(anketa)
 
     def _render_markdown(self, anketa: FinalAnketa) -> str:
-        """Render Markdown content from anketa v2.0."""
+        """Render Markdown content from anketa v2.0 (all sections, no cache)."""
+        return "\n".join(
+            getattr(self, method)(anketa) for _, method, _ in MARKDOWN_SECTIONS
+        )
 
-        completion_rate = anketa.completion_rate()
-        duration_min = anketa.consultation_duration_seconds / 60
+    # ============ SECTIONS ============
+    #
+    # Each section depends only on the fields listed for it in MARKDOWN_SECTIONS.
 
-        sections = [
-            # Header
-            f"""# Анкета: {anketa.company_name}
+    def _section_header(self, anketa: FinalAnketa) -> str:
+        duration_min = anketa.consultation_duration_seconds / 60
+        return f"""# Анкета: {anketa.company_name}
 
 **Дата создания:** {anketa.created_at.strftime('%Y-%m-%d %H:%M')}
 **Версия:** {anketa.anketa_version}
 **Длительность консультации:** {duration_min:.1f} мин
-**Заполненность:** {completion_rate:.0%}
+**Заполненность:** {anketa.completion_rate():.0%}
 
 ---
+"""
 
-## 1. Информация о компании
+    def _section_company(self, anketa: FinalAnketa) -> str:
+        return f"""## 1. Информация о компании
 
 | Поле | Значение |
 |------|----------|
@@ -149,10 +158,10 @@ class AnketaGenerator:
 
 ### Типы клиентов
 
-{self._render_list(anketa.client_types)}""",
+{self._render_list(anketa.client_types)}"""
 
-            # Business Context
-            f"""---
+    def _section_business_context(self, anketa: FinalAnketa) -> str:
+        return f"""---
 
 ## 2. Бизнес-контекст
 
@@ -166,10 +175,10 @@ class AnketaGenerator:
 
 ### Ограничения
 
-{self._render_list(anketa.constraints)}""",
+{self._render_list(anketa.constraints)}"""
 
-            # Voice Agent
-            f"""---
+    def _section_voice_agent(self, anketa: FinalAnketa) -> str:
+        return f"""---
 
 ## 3. Голосовой агент
 
@@ -187,52 +196,52 @@ class AnketaGenerator:
 
 ### Дополнительные функции
 
-{self._render_functions(anketa.additional_functions)}""",
+{self._render_functions(anketa.additional_functions)}"""
 
-            # All Functions
-            f"""---
+    def _section_agent_functions(self, anketa: FinalAnketa) -> str:
+        return f"""---
 
 ## 4. Все функции агента
 
-{self._render_functions(anketa.agent_functions)}""",
+{self._render_functions(anketa.agent_functions)}"""
 
-            # Integrations
-            f"""---
+    def _section_integrations(self, anketa: FinalAnketa) -> str:
+        return f"""---
 
 ## 5. Интеграции
 
-{self._render_integrations(anketa.integrations)}""",
+{self._render_integrations(anketa.integrations)}"""
 
-            # FAQ with answers (v2.0)
-            f"""---
+    def _section_faq(self, anketa: FinalAnketa) -> str:
+        return f"""---
 
 ## 6. FAQ с ответами
 
-{self._render_faq_items(anketa.faq_items)}""",
+{self._render_faq_items(anketa.faq_items)}"""
 
-            # Objection Handling (v2.0)
-            f"""---
+    def _section_objections(self, anketa: FinalAnketa) -> str:
+        return f"""---
 
 ## 7. Работа с возражениями
 
-{self._render_objection_handlers(anketa.objection_handlers)}""",
+{self._render_objection_handlers(anketa.objection_handlers)}"""
 
-            # Sample Dialogue (v2.0)
-            f"""---
+    def _section_sample_dialogue(self, anketa: FinalAnketa) -> str:
+        return f"""---
 
 ## 8. Пример диалога
 
-{self._render_sample_dialogue(anketa.sample_dialogue)}""",
+{self._render_sample_dialogue(anketa.sample_dialogue)}"""
 
-            # Financial Model (v2.0)
-            f"""---
+    def _section_financial_model(self, anketa: FinalAnketa) -> str:
+        return f"""---
 
 ## 9. Финансовая модель
 
-{self._render_financial_metrics(anketa.financial_metrics)}""",
+{self._render_financial_metrics(anketa.financial_metrics)}"""
 
-            # Market Analysis (v2.0)
-            f"""---
+    def _section_market(self, anketa: FinalAnketa) -> str:
+        return f"""---
 
 ## 10. Анализ рынка
 
@@ -246,81 +255,78 @@ class AnketaGenerator:
 
 ### Конкурентные преимущества клиента
 
-{self._render_list(anketa.competitive_advantages)}""",
+{self._render_list(anketa.competitive_advantages)}"""
 
-            # Target Segments (v2.0)
-            f"""---
+    def _section_target_segments(self, anketa: FinalAnketa) -> str:
+        return f"""---
 
 ## 11. Целевые сегменты
 
-{self._render_target_segments(anketa.target_segments)}""",
+{self._render_target_segments(anketa.target_segments)}"""
 
-            # Escalation Rules (v2.0)
-            f"""---
+    def _section_escalation(self, anketa: FinalAnketa) -> str:
+        return f"""---
 
 ## 12. Правила эскалации
 
-{self._render_escalation_rules(anketa.escalation_rules)}""",
+{self._render_escalation_rules(anketa.escalation_rules)}"""
 
-            # Success KPIs (v2.0)
-            f"""---
+    def _section_kpis(self, anketa: FinalAnketa) -> str:
+        return f"""---
 
 ## 13. KPI и метрики успеха
 
-{self._render_success_kpis(anketa.success_kpis)}""",
+{self._render_success_kpis(anketa.success_kpis)}"""
 
-            # Launch Checklist (v2.0)
-            f"""---
+    def _section_launch_checklist(self, anketa: FinalAnketa) -> str:
+        return f"""---
 
 ## 14. Чеклист запуска
 
-{self._render_launch_checklist(anketa.launch_checklist)}""",
+{self._render_launch_checklist(anketa.launch_checklist)}"""
 
-            # AI Recommendations (v2.0)
-            f"""---
+    def _section_ai_recommendations(self, anketa: FinalAnketa) -> str:
+        return f"""---
 
 ## 15. Рекомендации AI-эксперта
 
-{self._render_ai_recommendations(anketa.ai_recommendations)}""",
+{self._render_ai_recommendations(anketa.ai_recommendations)}"""
 
-            # Tone of Voice (v2.0)
-            f"""---
+    def _section_tone_of_voice(self, anketa: FinalAnketa) -> str:
+        return f"""---
 
 ## 16. Тон коммуникации
 
-{self._render_tone_of_voice(anketa.tone_of_voice)}""",
+{self._render_tone_of_voice(anketa.tone_of_voice)}"""
 
-            # Error Handling Scripts (v2.0)
-            f"""---
+    def _section_error_scripts(self, anketa: FinalAnketa) -> str:
+        return f"""---
 
 ## 17. Скрипты обработки ошибок
 
-{self._render_error_handling_scripts(anketa.error_handling_scripts)}""",
+{self._render_error_handling_scripts(anketa.error_handling_scripts)}"""
 
-            # Follow-up Sequence (v2.0)
-            f"""---
+    def _section_follow_up(self, anketa: FinalAnketa) -> str:
+        return f"""---
 
 ## 18. Последовательность follow-up
 
-{self._render_list(anketa.follow_up_sequence)}""",
+{self._render_list(anketa.follow_up_sequence)}"""
 
-            # Metadata
-            f"""---
+    def _section_metadata(self, anketa: FinalAnketa) -> str:
+        return f"""---
 
 ## Метаданные
 
 - **Создано:** {anketa.created_at.strftime('%Y-%m-%d %H:%M:%S')}
 - **Версия анкеты:** {anketa.anketa_version}
 - **Длительность консультации:** {anketa.consultation_duration_seconds:.0f} сек
-- **Заполненность анкеты:** {completion_rate:.0%}
+- **Заполненность анкеты:** {anketa.completion_rate():.0%}
 
 ---
 
 *Сгенерировано автоматически системой ConsultantInterviewer v2.0*
 """
-        ]
-
-        return "\n".join(sections)
 
     def _render_list(self, items: List[str]) -> str:
         """Render list as markdown bullets."""
@@ -637,6 +643,117 @@ class AnketaGenerator:
         return "\n".join(lines)
 
 
+# ============ INCREMENTAL MARKDOWN ============
+#
+# render_markdown вызывается на каждом цикле экстракции голосового агента,
+# при экспорте и финализации, а между вызовами обычно меняются одно-два поля.
+# Секция перерисовывается, только если изменилось одно из её полей; header и
+# метаданные показывают completion_rate и зависят от COMPLETION_FIELDS.
+
+_RATE_FIELDS = FinalAnketa.COMPLETION_FIELDS
+
+# (name, AnketaGenerator method, fields the section reads) in document order
+MARKDOWN_SECTIONS: Tuple[Tuple[str, str, Tuple[str, ...]], ...] = (
+    ("header", "_section_header",
+     ("company_name", "created_at", "anketa_version", "consultation_duration_seconds") + _RATE_FIELDS),
+    ("company", "_section_company",
+     ("company_name", "industry", "specialization", "website", "contact_name", "contact_role",
+      "business_description", "services", "client_types")),
+    ("business_context", "_section_business_context", ("current_problems", "business_goals", "constraints")),
+    ("voice_agent", "_section_voice_agent",
+     ("agent_name", "agent_purpose", "voice_gender", "voice_tone", "language", "call_direction",
+      "main_function", "additional_functions")),
+    ("agent_functions", "_section_agent_functions", ("agent_functions",)),
+    ("integrations", "_section_integrations", ("integrations",)),
+    ("faq", "_section_faq", ("faq_items",)),
+    ("objections", "_section_objections", ("objection_handlers",)),
+    ("sample_dialogue", "_section_sample_dialogue", ("sample_dialogue",)),
+    ("financial_model", "_section_financial_model", ("financial_metrics",)),
+    ("market", "_section_market", ("competitors", "market_insights", "competitive_advantages")),
+    ("target_segments", "_section_target_segments", ("target_segments",)),
+    ("escalation", "_section_escalation", ("escalation_rules",)),
+    ("kpis", "_section_kpis", ("success_kpis",)),
+    ("launch_checklist", "_section_launch_checklist", ("launch_checklist",)),
+    ("ai_recommendations", "_section_ai_recommendations", ("ai_recommendations",)),
+    ("tone_of_voice", "_section_tone_of_voice", ("tone_of_voice",)),
+    ("error_scripts", "_section_error_scripts", ("error_handling_scripts",)),
+    ("follow_up", "_section_follow_up", ("follow_up_sequence",)),
+    ("metadata", "_section_metadata",
+     ("created_at", "anketa_version", "consultation_duration_seconds") + _RATE_FIELDS),
+)
+
+
+class AnketaMarkdownRenderer:
+    """
+    Section-memoized markdown rendering, keyed by anketa_id.
+
+    A section's key is the JSON values of the fields it reads, taken from
+    the cached anketa.to_json_dict() (plain lists/dicts compare far faster
+    than pydantic models). A section is re-rendered only when its key
+    changed; the output is identical to AnketaGenerator._render_markdown.
+    As with to_json_dict(), changes inside nested lists are not tracked —
+    reassign the field instead.
+    """
+
+    def __init__(self, max_anketas: int = 64):
+        self.max_anketas = max_anketas
+        self._generator = AnketaGenerator.__new__(AnketaGenerator)
+        self._states: "OrderedDict[str, Dict[str, Tuple[Tuple[Any, ...], str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.rendered = 0  # sections rendered (for stats/benchmarks)
+        self.reused = 0    # sections served from cache
+
+    def render(self, anketa: FinalAnketa) -> str:
+        """Full markdown, re-rendering only dirty sections."""
+        return "\n".join(self.iter_sections(anketa))
+
+    def iter_sections(self, anketa: FinalAnketa) -> Iterator[str]:
+        """Section texts in document order (join with "\n" for the full document)."""
+        with self._lock:
+            state = self._states.pop(anketa.anketa_id, None) or {}
+            self._states[anketa.anketa_id] = state
+            while len(self._states) > self.max_anketas:
+                self._states.popitem(last=False)
+
+        dump = anketa.to_json_dict()
+        for name, method, fields in MARKDOWN_SECTIONS:
+            key = tuple(dump[field] for field in fields)
+            cached = state.get(name)
+            if cached is not None and cached[0] == key:
+                self.reused += 1
+                yield cached[1]
+                continue
+            text = getattr(self._generator, method)(anketa)
+            state[name] = (key, text)
+            self.rendered += 1
+            yield text
+
+    def write(self, anketa: FinalAnketa, fp: TextIO) -> int:
+        """Stream markdown into a text file section by section. Returns characters written."""
+        written = 0
+        for index, text in enumerate(self.iter_sections(anketa)):
+            if index:
+                written += fp.write("\n")
+            written += fp.write(text)
+        return written
+
+    def forget(self, anketa_id: str) -> None:
+        """Drop cached sections of one anketa."""
+        with self._lock:
+            self._states.pop(anketa_id, None)
+
+
+_markdown_renderer: Optional[AnketaMarkdownRenderer] = None
+
+
+def get_markdown_renderer() -> AnketaMarkdownRenderer:
+    """Process-wide renderer used by AnketaGenerator.render_markdown / to_markdown."""
+    global _markdown_renderer
+    if _markdown_renderer is None:
+        _markdown_renderer = AnketaMarkdownRenderer()
+    return _markdown_renderer
+
+
 def generate_anketa_files(anketa: FinalAnketa, output_dir: str = "output/anketas") -> dict:
     """
     Convenience function to generate both Markdown and JSON files.
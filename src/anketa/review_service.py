@@ -9,7 +9,7 @@ Provides:
 - Markdown → FinalAnketa synchronization
 """
 
-from typing import Optional, Literal
+from typing import Callable, Optional, Literal
 
 import structlog
 from rich.console import Console
@@ -57,18 +57,35 @@ class AnketaReviewService:
 
     MAX_RETRIES = 3
 
-    def __init__(self, config: Optional[ReviewConfig] = None):
+    def __init__(
+        self,
+        config: Optional[ReviewConfig] = None,
+        prompt_fn: Optional[Callable[..., str]] = None,
+        output_console: Optional[Console] = None,
+    ):
         """
         Initialize the review service.
 
         Args:
             config: Optional ReviewConfig for DocumentReviewer
+            prompt_fn: Replacement for Rich Prompt.ask (same signature),
+                used by non-interactive runs such as the client simulator;
+                yes/no confirmations go through it too (choices ["y", "n"])
+            output_console: Rich Console for output (e.g. Console(quiet=True)
+                in batch runs); defaults to the module console
         """
         self.config = config or self._default_config()
+        self.prompt_fn = prompt_fn
+        self.output_console = output_console
         self.generator = AnketaGenerator()
         self.parser = AnketaMarkdownParser()
         self.doc_parser = DocumentParser(self.config)
 
+    @property
+    def console(self) -> Console:
+        """Output console: the injected one or the module console."""
+        return self.output_console or console
+
     def _default_config(self) -> ReviewConfig:
         """Create default review configuration."""
         return ReviewConfig(
@@ -123,11 +140,11 @@ class AnketaReviewService:
         action = self.prompt_action()
 
         if action == "cancel":
-            console.print("\n[yellow]Отменено[/yellow]")
+            self.console.print("\n[yellow]Отменено[/yellow]")
             return None
 
         if action == "save":
-            console.print("\n[green]✓ Сохраняем без изменений[/green]")
+            self.console.print("\n[green]✓ Сохраняем без изменений[/green]")
             return anketa
 
         # Step 3: Open editor with retry
@@ -155,7 +172,7 @@ class AnketaReviewService:
                 document_id=f"anketa_{original_anketa.company_name}"
             )
 
-            console.print(f"\n[cyan]Открываю редактор...[/cyan]")
+            self.console.print(f"\n[cyan]Открываю редактор...[/cyan]")
             result = reviewer.review(current_markdown)
 
             # Handle different statuses
@@ -163,46 +180,46 @@ class AnketaReviewService:
                 return self._handle_cancelled(original_anketa)
 
             if result.status == ReviewStatus.TIMEOUT:
-                console.print("\n[yellow]⏰ Время редактирования истекло[/yellow]")
+                self.console.print("\n[yellow]⏰ Время редактирования истекло[/yellow]")
                 return self._handle_cancelled(original_anketa)
 
             if result.status == ReviewStatus.ERROR:
-                console.print(f"\n[red]Ошибка: {result.errors}[/red]")
+                self.console.print(f"\n[red]Ошибка: {result.errors}[/red]")
                 return self._handle_cancelled(original_anketa)
 
             if result.status == ReviewStatus.VALIDATION_FAILED:
                 errors = result.errors
                 current_markdown = result.content
-                console.print(f"\n[yellow]Ошибки валидации (попытка {attempt + 1}/{self.MAX_RETRIES}):[/yellow]")
+                self.console.print(f"\n[yellow]Ошибки валидации (попытка {attempt + 1}/{self.MAX_RETRIES}):[/yellow]")
                 for e in errors:
-                    console.print(f"  • {e}")
+                    self.console.print(f"  • {e}")
 
                 if attempt < self.MAX_RETRIES - 1:
-                    if Confirm.ask("Открыть редактор снова для исправления?", default=True):
+                    if self._confirm("Открыть редактор снова для исправления?", default=True):
                         continue
                     else:
                         return self._handle_cancelled(original_anketa)
                 else:
-                    console.print("[red]Превышено количество попыток[/red]")
+                    self.console.print("[red]Превышено количество попыток[/red]")
                     return self._handle_cancelled(original_anketa)
 
             # Success - show diff and confirm
             if result.changed:
                 changes = self.show_diff(original_markdown, result.content)
 
-                if not Confirm.ask("Сохранить изменения?", default=True):
+                if not self._confirm("Сохранить изменения?", default=True):
                     return self._handle_cancelled(original_anketa)
 
                 # Parse changes back to model
                 try:
                     updated_anketa = self.parser.parse(result.content, original_anketa)
-                    console.print("\n[green]✓ Анкета обновлена[/green]")
+                    self.console.print("\n[green]✓ Анкета обновлена[/green]")
                     return updated_anketa
                 except Exception as e:
-                    console.print(f"\n[red]Ошибка парсинга: {e}[/red]")
+                    self.console.print(f"\n[red]Ошибка парсинга: {e}[/red]")
                     return self._handle_cancelled(original_anketa)
             else:
-                console.print("\n[green]✓ Без изменений[/green]")
+                self.console.print("\n[green]✓ Без изменений[/green]")
                 return original_anketa
 
         return None
@@ -219,20 +236,33 @@ class AnketaReviewService:
 
     def _handle_cancelled(self, original: FinalAnketa) -> Optional[FinalAnketa]:
         """Handle cancelled review - ask whether to save original."""
-        console.print()
-        choice = Prompt.ask(
+        self.console.print()
+        choice = self._ask(
             "Сохранить оригинальную версию?",
             choices=["y", "n"],
             default="y"
         )
 
         if choice == "y":
-            console.print("[green]✓ Сохраняем оригинал[/green]")
+            self.console.print("[green]✓ Сохраняем оригинал[/green]")
             return original
         else:
-            console.print("[yellow]Отменено[/yellow]")
+            self.console.print("[yellow]Отменено[/yellow]")
             return None
 
+    def _ask(self, prompt_text: str, **kwargs) -> str:
+        """Ask via injected prompt_fn or interactive Rich Prompt."""
+        if self.prompt_fn is not None:
+            return self.prompt_fn(prompt_text, **kwargs)
+        return Prompt.ask(prompt_text, **kwargs)
+
+    def _confirm(self, prompt_text: str, default: bool = True) -> bool:
+        """Yes/no via injected prompt_fn or interactive Rich Confirm."""
+        if self.prompt_fn is not None:
+            answer = self.prompt_fn(prompt_text, choices=["y", "n"], default="y" if default else "n")
+            return str(answer).strip().lower() == "y"
+        return Confirm.ask(prompt_text, default=default)
+
     def show_preview(self, anketa: FinalAnketa) -> None:
         """Display anketa preview in CLI."""
         completion = anketa.completion_rate()
@@ -256,18 +286,18 @@ class AnketaReviewService:
             border_style="cyan"
         )
 
-        console.print()
-        console.print(panel)
+        self.console.print()
+        self.console.print(panel)
 
     def prompt_action(self) -> Literal["open", "save", "cancel"]:
         """Prompt user for action."""
-        console.print()
-        console.print("[O] Открыть редактор")
-        console.print("[S] Сохранить как есть")
-        console.print("[C] Отмена")
-        console.print()
+        self.console.print()
+        self.console.print("[O] Открыть редактор")
+        self.console.print("[S] Сохранить как есть")
+        self.console.print("[C] Отмена")
+        self.console.print()
 
-        choice = Prompt.ask(
+        choice = self._ask(
             "Выберите действие",
             choices=["o", "s", "c"],
             default="o"
@@ -279,8 +309,8 @@ class AnketaReviewService:
         """Show diff between original and edited content."""
         changes = self.doc_parser.count_changes(original, edited)
 
-        console.print()
-        console.print(Panel(
+        self.console.print()
+        self.console.print(Panel(
             f"[green]+{changes['added']}[/green] добавлено  "
             f"[red]-{changes['removed']}[/red] удалено  "
             f"[yellow]~{changes['modified']}[/yellow] изменено",
@@ -6,9 +6,10 @@ Contains all data needed to build a voice agent PLUS AI-generated insights.
 """
 
 from datetime import datetime, timezone
-from typing import List, Optional, Dict, Any
+from functools import lru_cache
+from typing import Any, ClassVar, Dict, List, Optional, Tuple
 from uuid import uuid4
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, TypeAdapter
 
 
 # === BASIC MODELS ===
@@ -133,9 +134,72 @@ class QAPair(BaseModel):
     follow_ups: List[str] = Field(default_factory=list, description="Follow-up questions")
 
 
+# === TRUSTED DATA FAST PATHS ===
+#
+# Анкета проходит через JSON несколько раз за цикл экстракции (dump → merge
+# с БД → модель для markdown → dump для API). Поля, совпадающие с дампом уже
+# валидной модели, повторно не валидируются: merge_json() переиспользует
+# её объекты (model_copy без валидации) и проверяет только изменённые поля
+# через закэшированные TypeAdapter'ы.
+
+@lru_cache(maxsize=None)
+def field_adapter(model_cls: type, field_name: str) -> TypeAdapter:
+    """Cached TypeAdapter for one field of a model (building one costs ~1 ms)."""
+    return TypeAdapter(model_cls.model_fields[field_name].annotation)
+
+
+class AnketaModel(BaseModel):
+    """
+    Base of FinalAnketa / InterviewAnketa: cached JSON dump and trusted merge.
+
+    to_json_dict() caches model_dump(mode="json") until a field is reassigned.
+    Changes inside nested lists (anketa.services.append(...)) are not tracked —
+    reassign the field instead.
+    """
+
+    _json_cache: Optional[Dict[str, Any]] = PrivateAttr(default=None)
+
+    def to_json_dict(self) -> Dict[str, Any]:
+        """model_dump(mode="json"), cached; returns a shallow copy safe to update."""
+        if self._json_cache is None:
+            self._json_cache = self.model_dump(mode="json")
+        return dict(self._json_cache)
+
+    def merge_json(self, data: Dict[str, Any]):
+        """
+        Copy of this model with JSON data applied (as FinalAnketa(**{**dump, **data}) would).
+
+        Only fields whose value differs from to_json_dict() are validated;
+        unknown keys are ignored. Raises ValidationError for an invalid field.
+        The copy inherits the JSON dump with only the updated fields re-dumped.
+        """
+        current = self.to_json_dict()
+        fields = type(self).model_fields
+        update = {
+            key: field_adapter(type(self), key).validate_python(value)
+            for key, value in data.items()
+            if key in fields and current.get(key) != value
+        }
+        copy = self.model_copy(update=update)
+        for key, value in update.items():
+            current[key] = field_adapter(type(self), key).dump_python(value, mode="json")
+        copy._json_cache = current
+        return copy
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in type(self).model_fields:
+            self._json_cache = None
+
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False):
+        copy = super().model_copy(update=update, deep=deep)
+        copy._json_cache = None
+        return copy
+
+
 # === MAIN ANKETA MODEL ===
 
-class FinalAnketa(BaseModel):
+class FinalAnketa(AnketaModel):
     """
     Complete questionnaire for creating a voice agent.
 
@@ -340,6 +404,21 @@ class FinalAnketa(BaseModel):
     full_responses: Dict[str, Any] = Field(default_factory=dict, description="Raw responses from interview")
     quality_metrics: Dict[str, float] = Field(default_factory=dict, description="Quality metrics for this anketa")
 
+    # Fields counted by completion_rate (the markdown renderer re-renders
+    # sections showing the rate only when one of them changes)
+    COMPLETION_FIELDS: ClassVar[Tuple[str, ...]] = (
+        # Блок 1: Компания (3)
+        'company_name', 'industry', 'business_description',
+        # Блок 2: Услуги (3)
+        'services', 'current_problems', 'business_goals',
+        # Блок 3: Агент (3)
+        'agent_name', 'agent_purpose', 'agent_functions',
+        # Блок 4: Контакты (3) - теперь обязательны
+        'contact_name', 'contact_phone', 'contact_email',
+        # Блок 5: Дополнительно (3)
+        'voice_gender', 'voice_tone', 'call_direction',
+    )
+
     # Default values that should NOT count as "filled" for completion_rate
     _SCHEMA_DEFAULTS = {
         'voice_gender': 'female',
@@ -357,32 +436,7 @@ class FinalAnketa(BaseModel):
 
         Returns: float 0.0-1.0 (filled_count / 15)
         """
-        required_fields = {
-            # Блок 1: Компания (3)
-            'company_name': self.company_name,
-            'industry': self.industry,
-            'business_description': self.business_description,
-
-            # Блок 2: Услуги (3)
-            'services': self.services,
-            'current_problems': self.current_problems,
-            'business_goals': self.business_goals,
-
-            # Блок 3: Агент (3)
-            'agent_name': self.agent_name,
-            'agent_purpose': self.agent_purpose,
-            'agent_functions': self.agent_functions,
-
-            # Блок 4: Контакты (3) - теперь обязательны
-            'contact_name': self.contact_name,
-            'contact_phone': self.contact_phone,
-            'contact_email': self.contact_email,
-
-            # Блок 5: Дополнительно (3)
-            'voice_gender': self.voice_gender,
-            'voice_tone': self.voice_tone,
-            'call_direction': self.call_direction,
-        }
+        required_fields = {name: getattr(self, name) for name in self.COMPLETION_FIELDS}
 
         filled_count = 0
         defaulted_count = 0
@@ -452,7 +506,7 @@ class FinalAnketa(BaseModel):
 
 # === INTERVIEW ANKETA MODEL ===
 
-class InterviewAnketa(BaseModel):
+class InterviewAnketa(AnketaModel):
     """
     Anketa for interview mode — structured Q&A collection.
 
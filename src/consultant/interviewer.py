@@ -11,7 +11,7 @@ import json
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 from rich.console import Console
 from rich.panel import Panel
@@ -38,6 +38,9 @@ from src.documents import DocumentContext
 
 console = Console()
 
+# Источник ввода пользователя: (prompt_text, **kwargs как у Prompt.ask) -> ответ
+InputProvider = Callable[..., Awaitable[str]]
+
 
 # ============================================================================
 # CONSULTATION CONFIG
@@ -160,6 +163,9 @@ class ConsultantInterviewer:
         knowledge_manager: Optional[IndustryKnowledgeManager] = None,
         document_context: Optional[DocumentContext] = None,
         input_dir: Optional[str] = None,
+        input_provider: Optional[InputProvider] = None,
+        review_service: Optional[Any] = None,  # AnketaReviewService
+        output_console: Optional[Console] = None,
     ):
         """
         Инициализация консультанта.
@@ -174,6 +180,11 @@ class ConsultantInterviewer:
             knowledge_manager: Менеджер базы знаний по отраслям (v3.2)
             document_context: Контекст из документов клиента (v3.2)
             input_dir: Путь к папке с документами клиента (v3.2)
+            input_provider: Асинхронный источник ответов пользователя вместо
+                Prompt.ask (симулятор клиента, тесты)
+            review_service: Сервис ревью анкеты (по умолчанию интерактивный)
+            output_console: Rich Console для вывода (например, Console(quiet=True)
+                при параллельном прогоне сценариев)
         """
         from pathlib import Path
 
@@ -181,6 +192,9 @@ class ConsultantInterviewer:
         self.deepseek = deepseek_client or create_llm_client()
         self.research_engine = research_engine
         self.locale = locale
+        self.input_provider = input_provider
+        self.review_service = review_service
+        self.console = output_console or console
 
         # v3.1: Use ConsultationConfig for all settings
         self.config = config or ConsultationConfig.from_name(config_profile)
@@ -237,10 +251,10 @@ class ConsultantInterviewer:
                 from src.documents import DocumentAnalyzer
                 analyzer = DocumentAnalyzer(self.deepseek)
                 self.document_context = await analyzer.analyze(self._pending_docs)
-                console.print(f"[cyan]Загружено {len(self._pending_docs)} документов[/cyan]")
+                self.console.print(f"[cyan]Загружено {len(self._pending_docs)} документов[/cyan]")
                 self._pending_docs = None
             except Exception as e:
-                console.print(f"[yellow]Не удалось проанализировать документы: {e}[/yellow]")
+                self.console.print(f"[yellow]Не удалось проанализировать документы: {e}[/yellow]")
                 self._pending_docs = None
 
         self._show_welcome()
@@ -259,7 +273,7 @@ class ConsultantInterviewer:
             return await self._refinement_phase()
 
         except KeyboardInterrupt:
-            console.print("\n[yellow]Консультация прервана[/yellow]")
+            self.console.print("\n[yellow]Консультация прервана[/yellow]")
             return {"status": "interrupted", "collected": self.collected.to_anketa_dict()}
 
     def _show_welcome(self):
@@ -271,7 +285,7 @@ class ConsultantInterviewer:
             f"[green]{ConsultantPhase.REFINEMENT.display_name}[/green]",
         ])
 
-        console.print(Panel(
+        self.console.print(Panel(
             f"[bold cyan]AI-КОНСУЛЬТАНТ[/bold cyan]\n\n"
             f"Паттерн: [green]{self.pattern.value}[/green]\n\n"
             f"[bold]Как это работает:[/bold]\n"
@@ -299,7 +313,7 @@ class ConsultantInterviewer:
             turn_count += 1
 
             # Получаем ввод
-            user_input = Prompt.ask("\n[green]Вы[/green]")
+            user_input = await self._ask("\n[green]Вы[/green]")
 
             if self._handle_command(user_input, turn_count):
                 continue
@@ -316,7 +330,7 @@ class ConsultantInterviewer:
                 self.collected.update_field("website", website, source="discovery")
 
             # Получаем ответ AI
-            console.print("[dim]Думаю...[/dim]")
+            self.console.print("[dim]Думаю...[/dim]")
 
             ai_response = await self._get_discovery_response(system_prompt, user_input)
 
@@ -329,11 +343,11 @@ class ConsultantInterviewer:
 
             # Проверяем готовность к переходу
             if turn_count >= self.discovery_max_turns:
-                console.print("\n[yellow]Достаточно информации для анализа![/yellow]")
+                self.console.print("\n[yellow]Достаточно информации для анализа![/yellow]")
                 break
 
             if self._ready_for_analysis(turn_count):
-                if self._confirm_transition("Перейти к анализу?"):
+                if await self._confirm_transition("Перейти к анализу?"):
                     break
 
         self._transition_phase(ConsultantPhase.ANALYSIS)
@@ -422,11 +436,11 @@ class ConsultantInterviewer:
         # Запуск исследования (если есть Research Engine)
         research_data = None
         if self.research_engine:
-            console.print("[dim]Провожу исследование...[/dim]")
+            self.console.print("[dim]Провожу исследование...[/dim]")
             research_data = await self._run_research()
 
         # Формируем анализ
-        console.print("[dim]Анализирую бизнес...[/dim]")
+        self.console.print("[dim]Анализирую бизнес...[/dim]")
         self.business_analysis = await self._create_business_analysis(research_data)
 
         # Показываем анализ
@@ -435,23 +449,23 @@ class ConsultantInterviewer:
 
         # Получаем подтверждение
         while True:
-            confirmation = Prompt.ask(
+            confirmation = await self._ask(
                 "\n[cyan]Я правильно понял? (да/нет/уточнить)[/cyan]",
                 default="да"
             )
 
             if confirmation.lower() in ['да', 'yes', 'y', 'д']:
                 self.business_analysis.user_confirmed = True
-                console.print("[green]Отлично! Перехожу к предложению.[/green]")
+                self.console.print("[green]Отлично! Перехожу к предложению.[/green]")
                 break
             elif confirmation.lower() in ['нет', 'no', 'n', 'н']:
-                correction = Prompt.ask("[yellow]Что я понял неверно?[/yellow]")
+                correction = await self._ask("[yellow]Что я понял неверно?[/yellow]")
                 await self._apply_analysis_correction(correction)
                 # Показываем обновлённый анализ
                 analysis_text = self._format_analysis(self.business_analysis, research_data)
                 self._show_ai_message(analysis_text)
             else:
-                clarification = Prompt.ask("[yellow]Что уточнить?[/yellow]")
+                clarification = await self._ask("[yellow]Что уточнить?[/yellow]")
                 await self._apply_analysis_correction(clarification)
 
         self._transition_phase(ConsultantPhase.PROPOSAL)
@@ -525,7 +539,7 @@ class ConsultantInterviewer:
                 constraints=data.get("constraints", []),
             )
         except Exception as e:
-            console.print(f"[red]Ошибка анализа: {e}[/red]")
+            self.console.print(f"[red]Ошибка анализа: {e}[/red]")
             return BusinessAnalysis()
 
     def _format_analysis(self, analysis: BusinessAnalysis, research_data: Optional[Dict] = None) -> str:
@@ -607,7 +621,7 @@ class ConsultantInterviewer:
                 company_name=self.collected.fields.get('company_name', {}).get('value')
             )
         except Exception as e:
-            console.print(f"[dim]Исследование недоступно: {e}[/dim]")
+            self.console.print(f"[dim]Исследование недоступно: {e}[/dim]")
             return None
 
     # ===== PHASE 3: PROPOSAL =====
@@ -616,7 +630,7 @@ class ConsultantInterviewer:
         """Фаза Proposal — предложение решения."""
         self._show_phase_banner(ConsultantPhase.PROPOSAL)
 
-        console.print("[dim]Формирую предложение...[/dim]")
+        self.console.print("[dim]Формирую предложение...[/dim]")
 
         # Генерируем предложение
         self.proposed_solution = await self._create_proposal()
@@ -627,23 +641,23 @@ class ConsultantInterviewer:
 
         # Обсуждение
         while True:
-            response = Prompt.ask(
+            response = await self._ask(
                 "\n[cyan]Что думаете? (согласен/изменить/обсудить)[/cyan]",
                 default="согласен"
             )
 
             if response.lower() in ['согласен', 'да', 'ok', 'ок', 'accept']:
                 self.proposed_solution.user_confirmed = True
-                console.print("[green]Отлично! Переходим к заполнению анкеты.[/green]")
+                self.console.print("[green]Отлично! Переходим к заполнению анкеты.[/green]")
                 break
             elif response.lower() in ['изменить', 'modify', 'change']:
-                change = Prompt.ask("[yellow]Что хотите изменить?[/yellow]")
+                change = await self._ask("[yellow]Что хотите изменить?[/yellow]")
                 await self._apply_proposal_change(change)
                 # Показываем обновлённое предложение
                 proposal_text = self.proposed_solution.to_proposal_text()
                 self._show_ai_message(proposal_text)
             else:
-                discussion = Prompt.ask("[yellow]Что обсудить?[/yellow]")
+                discussion = await self._ask("[yellow]Что обсудить?[/yellow]")
                 await self._discuss_proposal(discussion)
 
         self._transition_phase(ConsultantPhase.REFINEMENT)
@@ -714,7 +728,7 @@ class ConsultantInterviewer:
                 expected_results=data.get("expected_results")
             )
         except Exception as e:
-            console.print(f"[red]Ошибка создания предложения: {e}[/red]")
+            self.console.print(f"[red]Ошибка создания предложения: {e}[/red]")
             return ProposedSolution(
                 main_function=ProposedFunction(
                     name="Голосовой агент",
@@ -727,7 +741,7 @@ class ConsultantInterviewer:
     async def _apply_proposal_change(self, change: str):
         """Применить изменение к предложению."""
         self.proposed_solution.modifications.append(change)
-        console.print(f"[dim]Учтено: {change}[/dim]")
+        self.console.print(f"[dim]Учтено: {change}[/dim]")
 
     async def _discuss_proposal(self, topic: str):
         """Обсудить аспект предложения."""
@@ -755,7 +769,7 @@ class ConsultantInterviewer:
 
         # Показываем прогресс
         stats = self.collected.get_completion_stats()
-        console.print(f"\n[bold]Уже заполнено: {stats['complete']}/{stats['total']} полей[/bold]")
+        self.console.print(f"\n[bold]Уже заполнено: {stats['complete']}/{stats['total']} полей[/bold]")
 
         # Собираем недостающие поля
         missing_required = self.collected.get_missing_required_fields()
@@ -765,13 +779,13 @@ class ConsultantInterviewer:
 
         if fields_to_ask:
             intro = get_prompt("consultant/refinement", "intro_message")
-            console.print(Panel(intro, border_style="green"))
+            self.console.print(Panel(intro, border_style="green"))
 
             for i, field in enumerate(fields_to_ask, 1):
                 await self._ask_refinement_question(field, i, len(fields_to_ask))
 
         # Генерация финальной анкеты через новый модуль
-        console.print("\n[dim]Извлекаю структурированные данные...[/dim]")
+        self.console.print("\n[dim]Извлекаю структурированные данные...[/dim]")
 
         from src.anketa.extractor import AnketaExtractor
         from src.anketa.generator import AnketaGenerator
@@ -793,19 +807,19 @@ class ConsultantInterviewer:
 
             # === REVIEW STEP ===
             # Даём пользователю возможность проверить и отредактировать анкету
-            review_service = AnketaReviewService()
+            review_service = self.review_service or AnketaReviewService()
             reviewed_anketa = review_service.finalize(anketa)
 
             if reviewed_anketa is None:
                 # Пользователь отменил — не сохраняем
-                console.print("\n[yellow]Анкета не сохранена[/yellow]")
+                self.console.print("\n[yellow]Анкета не сохранена[/yellow]")
                 return {"status": "cancelled", "collected": self.collected.to_anketa_dict()}
 
             anketa = reviewed_anketa
             # === END REVIEW STEP ===
 
             # Генерируем файлы через OutputManager
-            console.print("[dim]Генерирую документы...[/dim]")
+            self.console.print("[dim]Генерирую документы...[/dim]")
             from src.output import OutputManager
 
             output_manager = OutputManager()
@@ -830,16 +844,16 @@ class ConsultantInterviewer:
                 start_time=self.start_time
             )
 
-            console.print("\n[green]Документы сохранены:[/green]")
-            console.print(f"  Папка: {company_dir}")
-            console.print(f"  Анкета: {md_path.name}")
-            console.print(f"  Диалог: {dialogue_path.name}")
+            self.console.print("\n[green]Документы сохранены:[/green]")
+            self.console.print(f"  Папка: {company_dir}")
+            self.console.print(f"  Анкета: {md_path.name}")
+            self.console.print(f"  Диалог: {dialogue_path.name}")
 
             # Показываем краткую сводку
             self._show_anketa_summary(anketa)
 
         except Exception as e:
-            console.print(f"[red]Ошибка генерации анкеты: {e}[/red]")
+            self.console.print(f"[red]Ошибка генерации анкеты: {e}[/red]")
             return {"status": "error", "error": str(e)}
 
         self._transition_phase(ConsultantPhase.COMPLETED)
@@ -858,17 +872,17 @@ class ConsultantInterviewer:
 
     async def _ask_refinement_question(self, field, current: int, total: int):
         """Задать вопрос для поля."""
-        console.print(f"\n[dim]━━━ Поле {current}/{total} ━━━[/dim]")
+        self.console.print(f"\n[dim]━━━ Поле {current}/{total} ━━━[/dim]")
 
         priority_icon = "⭐" if field.priority == FieldPriority.REQUIRED else "○"
-        console.print(f"[cyan]{priority_icon} {field.display_name}[/cyan]")
+        self.console.print(f"[cyan]{priority_icon} {field.display_name}[/cyan]")
 
         # Предложение на основе контекста
         suggestion = self._get_field_suggestion(field)
         if suggestion:
-            console.print(f"[dim]Предлагаю: {suggestion}[/dim]")
+            self.console.print(f"[dim]Предлагаю: {suggestion}[/dim]")
 
-        answer = Prompt.ask("[green]Ваш ответ (или Enter для предложения)[/green]")
+        answer = await self._ask("[green]Ваш ответ (или Enter для предложения)[/green]")
 
         if not answer.strip() and suggestion:
             answer = suggestion
@@ -877,7 +891,7 @@ class ConsultantInterviewer:
             return
 
         self.collected.update_field(field.field_id, answer, source="refinement", confidence=1.0)
-        console.print("[green]✓[/green]")
+        self.console.print("[green]✓[/green]")
 
     def _get_field_suggestion(self, field) -> Optional[str]:
         """Получить предложение для поля."""
@@ -944,45 +958,45 @@ class ConsultantInterviewer:
         """Показать результаты."""
         duration = (datetime.now(timezone.utc) - self.start_time).total_seconds()
 
-        console.print("\n" + "=" * 50)
-        console.print("[bold green]КОНСУЛЬТАЦИЯ ЗАВЕРШЕНА![/bold green]")
-        console.print("=" * 50)
+        self.console.print("\n" + "=" * 50)
+        self.console.print("[bold green]КОНСУЛЬТАЦИЯ ЗАВЕРШЕНА![/bold green]")
+        self.console.print("=" * 50)
 
-        console.print(f"\n[bold]Статистика:[/bold]")
-        console.print(f"  Длительность: {duration/60:.1f} мин")
-        console.print(f"  Сообщений: {len(self.dialogue_history)}")
+        self.console.print(f"\n[bold]Статистика:[/bold]")
+        self.console.print(f"  Длительность: {duration/60:.1f} мин")
+        self.console.print(f"  Сообщений: {len(self.dialogue_history)}")
 
         stats = self.collected.get_completion_stats()
-        console.print(f"  Полей заполнено: {stats['complete']}/{stats['total']}")
+        self.console.print(f"  Полей заполнено: {stats['complete']}/{stats['total']}")
 
-        console.print(f"\n[bold]Файлы:[/bold]")
-        console.print(f"  JSON: [cyan]{result.get('json', 'N/A')}[/cyan]")
-        console.print(f"  Markdown: [cyan]{result.get('markdown', 'N/A')}[/cyan]")
+        self.console.print(f"\n[bold]Файлы:[/bold]")
+        self.console.print(f"  JSON: [cyan]{result.get('json', 'N/A')}[/cyan]")
+        self.console.print(f"  Markdown: [cyan]{result.get('markdown', 'N/A')}[/cyan]")
 
     def _show_anketa_summary(self, anketa):
         """Показать краткую сводку анкеты."""
         from src.anketa.schema import FinalAnketa
 
-        console.print("\n" + "=" * 50)
-        console.print("[bold green]КОНСУЛЬТАЦИЯ ЗАВЕРШЕНА![/bold green]")
-        console.print("=" * 50)
+        self.console.print("\n" + "=" * 50)
+        self.console.print("[bold green]КОНСУЛЬТАЦИЯ ЗАВЕРШЕНА![/bold green]")
+        self.console.print("=" * 50)
 
         duration = anketa.consultation_duration_seconds
-        console.print(f"\n[bold]Статистика:[/bold]")
-        console.print(f"  Длительность: {duration/60:.1f} мин")
-        console.print(f"  Сообщений: {len(self.dialogue_history)}")
-        console.print(f"  Заполненность: {anketa.completion_rate():.0%}")
+        self.console.print(f"\n[bold]Статистика:[/bold]")
+        self.console.print(f"  Длительность: {duration/60:.1f} мин")
+        self.console.print(f"  Сообщений: {len(self.dialogue_history)}")
+        self.console.print(f"  Заполненность: {anketa.completion_rate():.0%}")
 
-        console.print(f"\n[bold]Компания:[/bold] {anketa.company_name}")
-        console.print(f"[bold]Отрасль:[/bold] {anketa.industry}")
+        self.console.print(f"\n[bold]Компания:[/bold] {anketa.company_name}")
+        self.console.print(f"[bold]Отрасль:[/bold] {anketa.industry}")
 
         if anketa.agent_name:
-            console.print(f"[bold]Агент:[/bold] {anketa.agent_name}")
+            self.console.print(f"[bold]Агент:[/bold] {anketa.agent_name}")
         if anketa.main_function:
-            console.print(f"[bold]Основная функция:[/bold] {anketa.main_function.name}")
+            self.console.print(f"[bold]Основная функция:[/bold] {anketa.main_function.name}")
 
         if anketa.integrations:
-            console.print(f"[bold]Интеграции:[/bold] {', '.join(i.name for i in anketa.integrations)}")
+            self.console.print(f"[bold]Интеграции:[/bold] {', '.join(i.name for i in anketa.integrations)}")
 
     def _get_session_stats(self) -> Dict[str, Any]:
         """Статистика сессии."""
@@ -996,6 +1010,12 @@ class ConsultantInterviewer:
 
     # ===== HELPERS =====
 
+    async def _ask(self, prompt_text: str, **kwargs) -> str:
+        """Получить ввод пользователя: через input_provider или Rich Prompt."""
+        if self.input_provider is not None:
+            return await self.input_provider(prompt_text, **kwargs)
+        return Prompt.ask(prompt_text, **kwargs)
+
     def _handle_command(self, user_input: str, turn_count: int) -> bool:
         """Обработать команду. Возвращает True если команда обработана."""
         cmd = user_input.lower().strip()
@@ -1011,7 +1031,7 @@ class ConsultantInterviewer:
             if turn_count >= self.discovery_min_turns:
                 self.phase = ConsultantPhase.ANALYSIS
             else:
-                console.print(f"[yellow]Минимум {self.discovery_min_turns} ходов (сейчас {turn_count})[/yellow]")
+                self.console.print(f"[yellow]Минимум {self.discovery_min_turns} ходов (сейчас {turn_count})[/yellow]")
             return True
 
         return False
@@ -1028,15 +1048,15 @@ class ConsultantInterviewer:
 
         description = t(f"phases.{phase.value}.description")
 
-        console.print()
-        console.print(Panel(
+        self.console.print()
+        self.console.print(Panel(
             f"[bold {color}]═══ {phase.display_name.upper()} ═══[/bold {color}]\n\n{description}",
             border_style=color
         ))
 
     def _show_ai_message(self, message: str):
         """Показать сообщение AI."""
-        console.print(Panel(
+        self.console.print(Panel(
             Markdown(message),
             title="[magenta]AI-Консультант[/magenta]",
             border_style="magenta"
@@ -1045,20 +1065,20 @@ class ConsultantInterviewer:
     def _show_status(self):
         """Показать статус."""
         stats = self.collected.get_completion_stats()
-        console.print(f"\n[bold]Статус:[/bold]")
-        console.print(f"  Фаза: [cyan]{self.phase.display_name}[/cyan]")
-        console.print(f"  Заполнено: {stats['complete']}/{stats['total']} ({stats['completion_percentage']:.0f}%)")
+        self.console.print(f"\n[bold]Статус:[/bold]")
+        self.console.print(f"  Фаза: [cyan]{self.phase.display_name}[/cyan]")
+        self.console.print(f"  Заполнено: {stats['complete']}/{stats['total']} ({stats['completion_percentage']:.0f}%)")
 
     def _transition_phase(self, new_phase: ConsultantPhase):
         """Перейти в новую фазу."""
         old_phase = self.phase
         self.phase = new_phase
-        console.print(f"\n[dim]━━━ {old_phase.display_name} → {new_phase.display_name} ━━━[/dim]")
+        self.console.print(f"\n[dim]━━━ {old_phase.display_name} → {new_phase.display_name} ━━━[/dim]")
 
-    def _confirm_transition(self, message: str) -> bool:
+    async def _confirm_transition(self, message: str) -> bool:
         """Запросить подтверждение перехода."""
-        console.print(f"\n[cyan]{message} (да/нет)[/cyan]")
-        response = Prompt.ask("", default="да")
+        self.console.print(f"\n[cyan]{message} (да/нет)[/cyan]")
+        response = await self._ask("", default="да")
         return response.lower() in ['да', 'yes', 'y', 'д']
 
     def _extract_website(self, text: str) -> Optional[str]:
@@ -1128,7 +1148,7 @@ class ConsultantInterviewer:
         if industry_id:
             self.industry_profile = self.knowledge_manager.get_profile(industry_id)
             if self.industry_profile:
-                console.print(f"[dim]Загружен профиль отрасли: {industry_id}[/dim]")
+                self.console.print(f"[dim]Загружен профиль отрасли: {industry_id}[/dim]")
 
     def _detect_industry_from_dialogue(self):
         """Определить отрасль из истории диалога."""
@@ -1146,7 +1166,7 @@ class ConsultantInterviewer:
             if industry_id:
                 self.industry_profile = self.knowledge_manager.get_profile(industry_id)
                 if self.industry_profile:
-                    console.print(f"[dim]Определена отрасль: {industry_id}[/dim]")
+                    self.console.print(f"[dim]Определена отрасль: {industry_id}[/dim]")
 
     def get_industry_context(self) -> str:
         """
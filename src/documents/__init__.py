@@ -6,6 +6,7 @@ Provides:
 - DocumentParser: Parses PDF, DOCX, MD, XLSX files
 - DocumentAnalyzer: LLM-based document analysis
 - DocumentContext: Context from all documents for interview
+- DocumentIndex: BM25 index of document fragments (per-session, data/doc_index)
 
 Usage:
     from src.documents import DocumentLoader, DocumentAnalyzer, DocumentContext
@@ -40,6 +41,12 @@ from .analyzer import (
     DocumentAnalyzer,
 )
 
+from .retrieval import (
+    DocumentIndex,
+    DocumentIndexStore,
+    get_document_index_store,
+)
+
 
 __all__ = [
     # Models
@@ -53,4 +60,9 @@ __all__ = [
 
     # Analyzer
     "DocumentAnalyzer",
+
+    # Retrieval
+    "DocumentIndex",
+    "DocumentIndexStore",
+    "get_document_index_store",
 ]
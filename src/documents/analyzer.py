@@ -2,11 +2,16 @@
 Document Analyzer - LLM-based document analysis.
 
 v1.0: Initial implementation
+v1.1: Map-reduce режим для больших загрузок — чанки документов анализируются
+      конкурентно батчами с лимитом токенов, затем результаты сливаются
+      с дедупликацией (вместо обрезки каждого документа до 20K символов)
 """
 
+import asyncio
 import json
+import os
 import re
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import structlog
 
@@ -14,6 +19,30 @@ from .models import DocumentContext, ParsedDocument
 
 logger = structlog.get_logger("documents")
 
+# Больше этого одиночный анализ обрезает текст (_llm_analyze: 30K) — включается map-reduce
+MAP_REDUCE_THRESHOLD_CHARS = 30000
+MAP_BATCH_TOKENS = 4000
+MAP_MAX_BATCHES = 48
+CHARS_PER_TOKEN = 3  # грубая оценка для русского текста
+DEFAULT_MAP_CONCURRENCY = 4
+
+DOC_TYPE_LABELS = {
+    "pdf": "PDF",
+    "md": "Markdown",
+    "docx": "Word",
+    "xlsx": "Excel",
+    "txt": "Текст",
+}
+
+
+def _map_concurrency_from_env() -> int:
+    raw = os.getenv("DOCUMENT_ANALYSIS_CONCURRENCY", str(DEFAULT_MAP_CONCURRENCY))
+    try:
+        return int(raw)
+    except ValueError:
+        logger.warning("invalid_document_analysis_concurrency", value=raw, default=DEFAULT_MAP_CONCURRENCY)
+        return DEFAULT_MAP_CONCURRENCY
+
 
 class DocumentAnalyzer:
     """
@@ -22,14 +51,26 @@ class DocumentAnalyzer:
     Извлекает ключевые факты, услуги, контакты из документов.
     """
 
-    def __init__(self, llm_client: Optional[Any] = None):
+    def __init__(
+        self,
+        llm_client: Optional[Any] = None,
+        map_reduce_threshold_chars: int = MAP_REDUCE_THRESHOLD_CHARS,
+        map_batch_tokens: int = MAP_BATCH_TOKENS,
+        map_concurrency: Optional[int] = None,
+    ):
         """
         Инициализация анализатора.
 
         Args:
             llm_client: Клиент LLM (DeepSeekClient). Если None - используется lazy loading.
+            map_reduce_threshold_chars: С какого объёма текста включается map-reduce
+            map_batch_tokens: Лимит токенов текста в одном map-запросе
+            map_concurrency: Одновременных map-запросов. Default: DOCUMENT_ANALYSIS_CONCURRENCY or 4
         """
         self._llm_client = llm_client
+        self.map_reduce_threshold_chars = map_reduce_threshold_chars
+        self.map_batch_tokens = max(100, map_batch_tokens)
+        self.map_concurrency = max(1, map_concurrency or _map_concurrency_from_env())
 
     @property
     def llm(self):
@@ -40,12 +81,18 @@ class DocumentAnalyzer:
             self._llm_client = create_llm_client()
         return self._llm_client
 
-    async def analyze(self, documents: List[ParsedDocument]) -> DocumentContext:
+    async def analyze(
+        self,
+        documents: List[ParsedDocument],
+        map_reduce: Optional[bool] = None,
+    ) -> DocumentContext:
         """
         Проанализировать все документы и создать контекст.
 
         Args:
             documents: Список распарсенных документов
+            map_reduce: Режим анализа. None — автоматически по объёму текста
+                (больше map_reduce_threshold_chars → map-reduce)
 
         Returns:
             DocumentContext с извлечённой информацией
@@ -53,11 +100,19 @@ class DocumentAnalyzer:
         if not documents:
             return DocumentContext()
 
-        # Объединяем текст всех документов
-        combined_text = self._combine_documents(documents)
+        if map_reduce is None:
+            total_chars = sum(len(doc.full_text) for doc in documents)
+            map_reduce = total_chars > self.map_reduce_threshold_chars
 
-        # Анализируем через LLM
-        analysis = await self._llm_analyze(combined_text)
+        if map_reduce:
+            # Весь текст батчами; услуги и FAQ по документам приходят из map-шага
+            analysis = await self._map_reduce_analyze(documents)
+        else:
+            # Объединяем текст всех документов
+            combined_text = self._combine_documents(documents)
+
+            # Анализируем через LLM
+            analysis = await self._llm_analyze(combined_text)
 
         # Per-document structured extraction (services, FAQ) for ALL doc types
         all_services = list(analysis.get("services", []))
@@ -74,7 +129,7 @@ class DocumentAnalyzer:
                 doc.extracted_contacts = regex_contacts
 
             # LLM-based extraction only for docs with meaningful content (>50 words)
-            if doc.word_count < 50:
+            if map_reduce or doc.word_count < 50:
                 continue
 
             try:
@@ -109,6 +164,7 @@ class DocumentAnalyzer:
         logger.info(
             "Documents analyzed",
             documents_count=len(documents),
+            mode="map_reduce" if map_reduce else "single",
             key_facts=len(context.key_facts),
             services=len(context.services_mentioned),
             contacts=len(context.all_contacts),
@@ -125,13 +181,7 @@ class DocumentAnalyzer:
         parts = []
 
         for doc in documents:
-            doc_type_label = {
-                "pdf": "PDF",
-                "md": "Markdown",
-                "docx": "Word",
-                "xlsx": "Excel",
-                "txt": "Текст",
-            }.get(doc.doc_type, doc.doc_type.upper())
+            doc_type_label = DOC_TYPE_LABELS.get(doc.doc_type, doc.doc_type.upper())
             parts.append(f"\n=== Документ [{doc_type_label}]: {doc.filename} ===\n")
             parts.append(doc.full_text[:20000])  # 20K per doc
 
@@ -178,6 +228,181 @@ class DocumentAnalyzer:
             logger.error("LLM analysis failed", error=str(e))
             return {}
 
+    # ============ MAP-REDUCE ============
+
+    def _build_batches(self, documents: List[ParsedDocument]) -> List[Tuple[int, str]]:
+        """
+        Разбить чанки документов на батчи не больше map_batch_tokens.
+
+        Батч не пересекает границу документа: услуги и FAQ из map-ответа
+        привязываются к своему документу. Возвращает (индекс документа, текст).
+        """
+        budget = self.map_batch_tokens * CHARS_PER_TOKEN
+        batches: List[Tuple[int, str]] = []
+
+        for doc_index, doc in enumerate(documents):
+            parts: List[str] = []
+            size = 0
+            for chunk in doc.chunks:
+                content = chunk.content.strip()
+                while content:
+                    piece, content = content[:budget], content[budget:]
+                    label = self._chunk_label(chunk)
+                    piece = f"[{label}]\n{piece}" if label else piece
+                    if parts and size + len(piece) > budget:
+                        batches.append((doc_index, "\n\n".join(parts)))
+                        parts, size = [], 0
+                    parts.append(piece)
+                    size += len(piece) + 2
+            if parts:
+                batches.append((doc_index, "\n\n".join(parts)))
+
+        if len(batches) > MAP_MAX_BATCHES:
+            logger.warning(
+                "document_analysis_batches_capped",
+                batches=len(batches),
+                max_batches=MAP_MAX_BATCHES,
+            )
+            batches = batches[:MAP_MAX_BATCHES]
+        return batches
+
+    @staticmethod
+    def _chunk_label(chunk) -> str:
+        if chunk.page is not None:
+            return f"стр. {chunk.page}"
+        parts = [p for p in (chunk.section, f"строки {chunk.row_range}" if chunk.row_range else None) if p]
+        return ", ".join(parts)
+
+    async def _map_reduce_analyze(self, documents: List[ParsedDocument]) -> Dict[str, Any]:
+        """
+        Map: батчи анализируются конкурентно (не больше map_concurrency запросов).
+        Reduce: факты, услуги, цены, контакты, вопросы сливаются с дедупликацией,
+        сводка собирается из сводок батчей одним коротким запросом.
+        """
+        batches = self._build_batches(documents)
+        semaphore = asyncio.Semaphore(self.map_concurrency)
+
+        async def analyze_batch(index: int, doc_index: int, text: str) -> Dict[str, Any]:
+            doc = documents[doc_index]
+            async with semaphore:
+                return await self._llm_analyze_batch(text, doc, index + 1, len(batches))
+
+        results = await asyncio.gather(
+            *(analyze_batch(i, doc_index, text) for i, (doc_index, text) in enumerate(batches)),
+            return_exceptions=True,
+        )
+
+        partials: List[Dict[str, Any]] = []
+        per_doc: Dict[int, List[Dict[str, Any]]] = {}
+        for (doc_index, _), result in zip(batches, results):
+            if isinstance(result, BaseException) or not result:
+                if isinstance(result, BaseException):
+                    logger.warning("document_batch_analysis_failed", filename=documents[doc_index].filename, error=str(result))
+                continue
+            partials.append(result)
+            per_doc.setdefault(doc_index, []).append(result)
+
+        for doc_index, doc_partials in per_doc.items():
+            doc = documents[doc_index]
+            doc.extracted_services = _dedupe_strings(s for p in doc_partials for s in _as_list(p.get("services")))
+            doc.extracted_faq = _dedupe_dicts(
+                (f for p in doc_partials for f in _as_list(p.get("faq"))), key="question"
+            )
+            doc.extracted_prices = _dedupe_dicts(
+                (pr for p in doc_partials for pr in _as_list(p.get("prices"))), key=("service", "price")
+            )
+
+        analysis = self._merge_partials(partials)
+        if partials:
+            analysis["summary"] = await self._llm_reduce_summary(partials)
+
+        logger.info(
+            "document_map_reduce_done",
+            batches=len(batches),
+            succeeded=len(partials),
+            key_facts=len(analysis.get("key_facts", [])),
+        )
+        return analysis
+
+    def _merge_partials(self, partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Reduce без LLM: объединение списков с дедупликацией, первый непустой контакт."""
+        contacts: Dict[str, str] = {}
+        for partial in partials:
+            raw = partial.get("contacts")
+            for key, value in (raw.items() if isinstance(raw, dict) else ()):
+                if value and not contacts.get(key):
+                    contacts[key] = value
+
+        return {
+            "summary": "",
+            "key_facts": _dedupe_strings(f for p in partials for f in _as_list(p.get("key_facts"))),
+            "services": _dedupe_strings(s for p in partials for s in _as_list(p.get("services"))),
+            "contacts": contacts,
+            "prices": _dedupe_dicts(
+                (pr for p in partials for pr in _as_list(p.get("prices"))), key=("service", "price")
+            ),
+            "questions": _dedupe_strings(q for p in partials for q in _as_list(p.get("questions"))),
+        }
+
+    async def _llm_analyze_batch(
+        self, text: str, doc: ParsedDocument, number: int, total: int
+    ) -> Dict[str, Any]:
+        """Map-шаг: анализ одного батча чанков документа."""
+        doc_type_label = DOC_TYPE_LABELS.get(doc.doc_type, doc.doc_type.upper())
+        prompt = f"""Это фрагмент {number} из {total} документов клиента. Извлеки из НЕГО структурированную информацию.
+
+=== Документ [{doc_type_label}]: {doc.filename} ===
+{text}
+
+Верни JSON с полями:
+{{
+    "summary": "1-2 предложения о содержании фрагмента",
+    "key_facts": ["Факт 1", "Факт 2", ...],
+    "services": ["Услуга 1", ...],
+    "contacts": {{"телефон": "...", "email": "...", "адрес": "...", "сайт": "..."}},
+    "prices": [{{"service": "...", "price": "..."}}],
+    "faq": [{{"question": "Вопрос?", "answer": "Ответ"}}],
+    "questions": ["Что неясно и стоит уточнить у клиента"]
+}}
+
+ВАЖНО:
+- Только то, что есть в этом фрагменте; если чего-то нет — оставь пустым
+- Извлекай ВСЕ услуги и цены фрагмента (прайс-листы — полностью)
+- Финансовые данные, команда, клиентопоток, интеграции — в key_facts
+- Верни ТОЛЬКО валидный JSON без markdown"""
+
+        response = await self.llm.chat(
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.2,
+        )
+        return self._parse_json_response(response)
+
+    async def _llm_reduce_summary(self, partials: List[Dict[str, Any]]) -> str:
+        """Reduce-шаг: общая сводка по сводкам батчей (без полного текста)."""
+        summaries = [p.get("summary") for p in partials if isinstance(p.get("summary"), str) and p.get("summary")]
+        if not summaries:
+            return ""
+        if len(summaries) == 1:
+            return summaries[0]
+
+        joined = "\n".join(f"- {s}" for s in summaries)
+        prompt = f"""Ниже сводки фрагментов документов клиента. Составь общую сводку (3-5 предложений),
+покрывающую ВСЕ документы — и правовые, и бизнес-анализ, и экономику.
+
+{joined[:20000]}
+
+Верни только текст сводки."""
+
+        try:
+            response = await self.llm.chat(
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.3,
+            )
+            return response.strip()
+        except Exception as e:
+            logger.warning("document_summary_reduce_failed", error=str(e))
+            return " ".join(summaries)[:2000]
+
     def _parse_json_response(self, response: str) -> Dict[str, Any]:
         """Извлечь JSON из ответа LLM."""
         # Пробуем напрямую
@@ -370,3 +595,37 @@ class DocumentAnalyzer:
                         facts.append(fact)
 
         return facts
+
+
+def _as_list(value: Any) -> List[Any]:
+    return value if isinstance(value, list) else []
+
+
+def _dedupe_strings(items) -> List[str]:
+    """Уникальные строки в порядке появления (без учёта регистра и крайних пробелов)."""
+    seen = set()
+    result = []
+    for item in items:
+        if not isinstance(item, str) or not item.strip():
+            continue
+        key = " ".join(item.lower().split())
+        if key not in seen:
+            seen.add(key)
+            result.append(item.strip())
+    return result
+
+
+def _dedupe_dicts(items, key) -> List[Dict[str, Any]]:
+    """Уникальные словари по значению поля (или кортежа полей) без учёта регистра."""
+    fields = (key,) if isinstance(key, str) else key
+    seen = set()
+    result = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        ident = tuple(" ".join(str(item.get(f, "")).lower().split()) for f in fields)
+        if not any(ident) or ident in seen:
+            continue
+        seen.add(ident)
+        result.append(item)
+    return result
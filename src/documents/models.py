@@ -4,9 +4,9 @@ Document Analysis Models - Pydantic models for document parsing and analysis.
 v1.0: Initial implementation
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 class DocumentChunk(BaseModel):
@@ -34,15 +34,31 @@ class ParsedDocument(BaseModel):
     extracted_prices: List[Dict[str, Any]] = Field(default_factory=list)
     extracted_contacts: Dict[str, str] = Field(default_factory=dict)
 
+    # Кэш full_text/word_count: сбрасывается при присваивании chunks,
+    # ключ (id списка, длина) ловит дополнение списка на месте
+    _text_cache: Optional[Tuple[Tuple[int, int], str, int]] = PrivateAttr(default=None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == "chunks":
+            self._text_cache = None
+        super().__setattr__(name, value)
+
+    def _cached_text(self) -> Tuple[str, int]:
+        key = (id(self.chunks), len(self.chunks))
+        if self._text_cache is None or self._text_cache[0] != key:
+            text = "\n\n".join(chunk.content for chunk in self.chunks if chunk.content)
+            self._text_cache = (key, text, len(text.split()))
+        return self._text_cache[1], self._text_cache[2]
+
     @property
     def full_text(self) -> str:
         """Объединённый текст всех чанков."""
-        return "\n\n".join(chunk.content for chunk in self.chunks if chunk.content)
+        return self._cached_text()[0]
 
     @property
     def word_count(self) -> int:
         """Количество слов в документе."""
-        return len(self.full_text.split())
+        return self._cached_text()[1]
 
 
 class DocumentContext(BaseModel):
@@ -2,11 +2,17 @@
 Document Parser - unified parser for PDF, DOCX, MD, XLSX files.
 
 v1.0: Initial implementation
+v1.1: Streaming mode — XLSX читается read-only итератором и режется на чанки
+      по диапазонам строк (с лимитом строк), большие PDF извлекаются
+      диапазонами страниц параллельно в процессах
 """
 
+import multiprocessing
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 import structlog
 
@@ -14,6 +20,53 @@ from .models import DocumentChunk, ParsedDocument
 
 logger = structlog.get_logger("documents")
 
+XLSX_ROWS_PER_CHUNK = 200
+XLSX_MAX_ROWS = 50_000  # на лист; остальное отбрасывается (metadata["truncated_sheets"])
+PDF_PARALLEL_MIN_PAGES = 40
+PDF_PAGES_PER_TASK = 16
+
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _pdf_workers() -> int:
+    try:
+        workers = int(os.getenv("DOCUMENT_PARSE_WORKERS", "0"))
+    except ValueError:
+        workers = 0
+    return workers if workers > 0 else min(4, os.cpu_count() or 1)
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Process pool for PDF page ranges (spawn: safe to start from threaded servers)."""
+    global _pdf_pool
+    if _pdf_pool is None:
+        _pdf_pool = ProcessPoolExecutor(
+            max_workers=_pdf_workers(),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pdf_pool
+
+
+def _reset_pdf_pool(wait: bool = False) -> None:
+    """Drop the pool (broken or on shutdown); the next large PDF starts a fresh one."""
+    global _pdf_pool
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(wait=wait, cancel_futures=True)
+        _pdf_pool = None
+
+
+def _extract_pdf_pages(file_path: str, start: int, stop: int) -> List[Tuple[int, str]]:
+    """Text of pages [start, stop) as (page_number, text); runs in worker processes."""
+    import fitz
+
+    pages = []
+    with fitz.open(file_path) as doc:
+        for index in range(start, min(stop, len(doc))):
+            text = doc[index].get_text().strip()
+            if text:
+                pages.append((index + 1, text))
+    return pages
+
 
 class DocumentParser:
     """
@@ -24,8 +77,23 @@ class DocumentParser:
 
     SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".md", ".xlsx", ".xls", ".txt"}
 
-    def __init__(self):
-        """Инициализация парсера."""
+    def __init__(
+        self,
+        xlsx_rows_per_chunk: int = XLSX_ROWS_PER_CHUNK,
+        xlsx_max_rows: int = XLSX_MAX_ROWS,
+        pdf_parallel_min_pages: int = PDF_PARALLEL_MIN_PAGES,
+    ):
+        """
+        Инициализация парсера.
+
+        Args:
+            xlsx_rows_per_chunk: Строк XLSX в одном чанке
+            xlsx_max_rows: Лимит непустых строк на лист
+            pdf_parallel_min_pages: С какого числа страниц PDF извлекается в процессах
+        """
+        self.xlsx_rows_per_chunk = max(1, xlsx_rows_per_chunk)
+        self.xlsx_max_rows = xlsx_max_rows
+        self.pdf_parallel_min_pages = pdf_parallel_min_pages
         self._check_dependencies()
 
     def _check_dependencies(self):
@@ -110,31 +178,31 @@ class DocumentParser:
         return None
 
     def _parse_pdf(self, file_path: Path) -> Optional[ParsedDocument]:
-        """Парсинг PDF файла."""
+        """Парсинг PDF файла (большие документы — диапазонами страниц в процессах)."""
         if not self._has_pymupdf:
             logger.error("PyMuPDF not available")
             return None
 
         import fitz
 
-        chunks = []
         metadata = {}
 
         with fitz.open(file_path) as doc:
-            metadata["pages"] = len(doc)
+            page_count = len(doc)
+            metadata["pages"] = page_count
             metadata["title"] = doc.metadata.get("title", "")
             metadata["author"] = doc.metadata.get("author", "")
 
-            for page_num, page in enumerate(doc, start=1):
-                text = page.get_text()
-                if text.strip():
-                    chunks.append(
-                        DocumentChunk(
-                            content=text.strip(),
-                            doc_type="pdf",
-                            page=page_num,
-                        )
-                    )
+        pages = None
+        if page_count >= self.pdf_parallel_min_pages and _pdf_workers() > 1:
+            pages = self._extract_pdf_parallel(file_path, page_count)
+        if pages is None:
+            pages = _extract_pdf_pages(str(file_path), 0, page_count)
+
+        chunks = [
+            DocumentChunk(content=text, doc_type="pdf", page=page_num)
+            for page_num, text in pages
+        ]
 
         logger.info("PDF parsed", path=str(file_path), pages=len(chunks))
 
@@ -146,6 +214,21 @@ class DocumentParser:
             metadata=metadata,
         )
 
+    def _extract_pdf_parallel(self, file_path: Path, page_count: int) -> Optional[List[Tuple[int, str]]]:
+        """Page ranges in the process pool; None (serial fallback) if the pool fails."""
+        ranges = [
+            (start, min(start + PDF_PAGES_PER_TASK, page_count))
+            for start in range(0, page_count, PDF_PAGES_PER_TASK)
+        ]
+        try:
+            pool = _get_pdf_pool()
+            futures = [pool.submit(_extract_pdf_pages, str(file_path), start, stop) for start, stop in ranges]
+            return [page for future in futures for page in future.result()]
+        except Exception as e:
+            logger.warning("PDF parallel extraction failed, parsing serially", path=str(file_path), error=str(e))
+            _reset_pdf_pool()
+            return None
+
     def _parse_docx(self, file_path: Path) -> Optional[ParsedDocument]:
         """Парсинг DOCX файла."""
         if not self._has_docx:
@@ -279,40 +362,52 @@ class DocumentParser:
         )
 
     def _parse_xlsx(self, file_path: Path) -> Optional[ParsedDocument]:
-        """Парсинг XLSX файла."""
+        """Парсинг XLSX файла: read-only итератор, чанки по диапазонам строк."""
         if not self._has_openpyxl:
             logger.error("openpyxl not available")
             return None
 
         from openpyxl import load_workbook
 
-        wb = load_workbook(file_path, data_only=True)
+        # read_only: строки читаются потоком, лист не материализуется целиком
+        wb = load_workbook(file_path, read_only=True, data_only=True)
         chunks = []
         metadata = {"sheets": wb.sheetnames}
+        truncated = []
 
-        for sheet_name in wb.sheetnames:
-            ws = wb[sheet_name]
-            rows_data = []
-
-            for row in ws.iter_rows(values_only=True):
-                # Фильтруем пустые строки
-                if any(cell is not None for cell in row):
-                    row_text = " | ".join(
-                        str(cell) if cell is not None else "" for cell in row
-                    )
-                    rows_data.append(row_text)
-
-            if rows_data:
-                chunks.append(
-                    DocumentChunk(
-                        content="\n".join(rows_data),
-                        doc_type="xlsx",
-                        section=sheet_name,
-                        row_range=f"1-{len(rows_data)}",
-                    )
-                )
-
-        logger.info("XLSX parsed", path=str(file_path), sheets=len(chunks))
+        try:
+            for ws in wb.worksheets:
+                rows_data = []
+                first_row = None
+                rows_seen = 0
+
+                for row_num, row in enumerate(ws.iter_rows(values_only=True), start=1):
+                    # Фильтруем пустые строки
+                    if not any(cell is not None for cell in row):
+                        continue
+                    rows_seen += 1
+                    if rows_seen > self.xlsx_max_rows:
+                        truncated.append(ws.title)
+                        break
+                    if first_row is None:
+                        first_row = row_num
+                    rows_data.append(self._xlsx_row_text(row))
+                    last_row = row_num
+
+                    if len(rows_data) >= self.xlsx_rows_per_chunk:
+                        chunks.append(self._xlsx_chunk(rows_data, ws.title, first_row, last_row))
+                        rows_data, first_row = [], None
+
+                if rows_data:
+                    chunks.append(self._xlsx_chunk(rows_data, ws.title, first_row, last_row))
+        finally:
+            wb.close()  # read-only книга держит файл открытым
+
+        if truncated:
+            metadata["truncated_sheets"] = truncated
+            logger.warning("XLSX rows truncated", path=str(file_path), sheets=truncated, max_rows=self.xlsx_max_rows)
+
+        logger.info("XLSX parsed", path=str(file_path), chunks=len(chunks))
 
         return ParsedDocument(
             filename=file_path.name,
@@ -322,6 +417,23 @@ class DocumentParser:
             metadata=metadata,
         )
 
+    @staticmethod
+    def _xlsx_row_text(row: tuple) -> str:
+        # read-only режим дополняет строки пустыми ячейками до ширины листа
+        cells = list(row)
+        while cells and cells[-1] is None:
+            cells.pop()
+        return " | ".join(str(cell) if cell is not None else "" for cell in cells)
+
+    @staticmethod
+    def _xlsx_chunk(rows_data: List[str], sheet_name: str, first_row: int, last_row: int) -> DocumentChunk:
+        return DocumentChunk(
+            content="\n".join(rows_data),
+            doc_type="xlsx",
+            section=sheet_name,
+            row_range=f"{first_row}-{last_row}",
+        )
+
 
 class DocumentLoader:
     """
@@ -0,0 +1,314 @@
+"""
+Document Retrieval - лексический поиск по документам клиента (BM25).
+
+Индекс строится при загрузке документов и хранится на диске по сессии
+(data/doc_index/{session_id}.json); повторная загрузка дополняет его так же,
+как SessionManager.update_document_context сливает document_context.
+Голосовой агент запрашивает top-k фрагментов по последней реплике клиента
+вместо того, чтобы держать в инструкциях полный текст документов.
+
+- Фрагменты: чанки парсера (страница PDF, лист XLSX, секция DOCX/MD),
+  порезанные по строкам до ~PASSAGE_CHARS символов
+- Термины: слова в нижнем регистре, ё → е, русские слова — через
+  get_russian_stem (как в IndustryMatcher), числа сохраняются (цены, артикулы)
+- Ранжирование: Okapi BM25 (k1=1.5, b=0.75) по инвертированному индексу
+
+Usage:
+    index = DocumentIndex.build(parsed_docs)
+    store = get_document_index_store()
+    store.add(session_id, index)  # повторная загрузка: одноимённые файлы заменяются
+    hits = store.search(session_id, "сколько стоит МРТ колена", top_k=5)
+"""
+
+import math
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import structlog
+
+from src.knowledge.matcher import get_russian_stem
+from src.serialization import dumps_bytes, loads
+
+from .models import DocumentChunk, ParsedDocument
+
+logger = structlog.get_logger("documents")
+
+INDEX_VERSION = 1
+PASSAGE_CHARS = 800
+DEFAULT_TOP_K = 5
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"[а-яёa-z0-9]+")
+_CYRILLIC_RE = re.compile(r"[а-я]")
+
+
+def tokenize(text: str) -> List[str]:
+    """Термины текста: нижний регистр, ё → е, русские основы, без однобуквенных слов."""
+    terms = []
+    for word in _TOKEN_RE.findall(text.lower().replace("ё", "е")):
+        if len(word) < 2 and not word.isdigit():
+            continue
+        terms.append(get_russian_stem(word) if _CYRILLIC_RE.match(word) else word)
+    return terms
+
+
+@dataclass
+class Passage:
+    """Фрагмент документа в индексе."""
+
+    text: str
+    filename: str
+    doc_type: str
+    section: Optional[str] = None
+    page: Optional[int] = None
+    row_range: Optional[str] = None
+
+    @property
+    def source(self) -> str:
+        """Человекочитаемое происхождение: файл, страница/строки/секция."""
+        parts = [self.filename]
+        if self.page is not None:
+            parts.append(f"стр. {self.page}")
+        if self.row_range:
+            parts.append(f"строки {self.row_range}")
+        if self.section:
+            parts.append(self.section)
+        return ", ".join(parts)
+
+
+@dataclass
+class ChunkHit:
+    """Результат поиска."""
+
+    passage: Passage
+    score: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self.passage)
+        data["source"] = self.passage.source
+        data["score"] = round(self.score, 4)
+        return data
+
+
+def split_chunk(chunk: DocumentChunk, filename: str, max_chars: int = PASSAGE_CHARS) -> List[Passage]:
+    """Порезать чанк парсера на фрагменты по строкам (длинные строки — по словам)."""
+    def passage(text: str) -> Passage:
+        return Passage(
+            text=text,
+            filename=filename,
+            doc_type=chunk.doc_type,
+            section=chunk.section,
+            page=chunk.page,
+            row_range=chunk.row_range,
+        )
+
+    passages: List[Passage] = []
+    buffer: List[str] = []
+    size = 0
+    for line in _split_long_lines(chunk.content.splitlines(), max_chars):
+        if buffer and size + len(line) > max_chars:
+            passages.append(passage("\n".join(buffer)))
+            buffer, size = [], 0
+        buffer.append(line)
+        size += len(line) + 1
+    if buffer:
+        passages.append(passage("\n".join(buffer)))
+    return [p for p in passages if p.text.strip()]
+
+
+def _split_long_lines(lines: Iterable[str], max_chars: int) -> Iterable[str]:
+    for line in lines:
+        line = line.rstrip()
+        while len(line) > max_chars:
+            cut = line.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            yield line[:cut]
+            line = line[cut:].lstrip()
+        if line:
+            yield line
+
+
+class DocumentIndex:
+    """BM25-индекс фрагментов документов одной сессии."""
+
+    def __init__(
+        self,
+        passages: List[Passage],
+        lengths: List[int],
+        postings: Dict[str, List[Tuple[int, int]]],
+    ):
+        self.passages = passages
+        self.lengths = lengths
+        self.postings = postings
+        self.avg_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+
+    @classmethod
+    def build(cls, documents: Iterable[ParsedDocument], max_chars: int = PASSAGE_CHARS) -> "DocumentIndex":
+        """Построить индекс по распарсенным документам."""
+        passages: List[Passage] = []
+        for doc in documents:
+            for chunk in doc.chunks:
+                if chunk.content:
+                    passages.extend(split_chunk(chunk, doc.filename, max_chars))
+        return cls.from_passages(passages)
+
+    @classmethod
+    def from_passages(cls, passages: List[Passage]) -> "DocumentIndex":
+        lengths: List[int] = []
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for idx, passage in enumerate(passages):
+            terms = tokenize(passage.text)
+            lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                postings.setdefault(term, []).append((idx, tf))
+        return cls(passages, lengths, postings)
+
+    def merged_with(self, newer: "DocumentIndex") -> "DocumentIndex":
+        """Индекс после повторной загрузки: файлы из newer заменяют одноимённые (как в сессии)."""
+        replaced = {p.filename for p in newer.passages}
+        kept = [p for p in self.passages if p.filename not in replaced]
+        return DocumentIndex.from_passages(kept + newer.passages)
+
+    @property
+    def filenames(self) -> List[str]:
+        return list(dict.fromkeys(p.filename for p in self.passages))
+
+    def __len__(self) -> int:
+        return len(self.passages)
+
+    def search(self, query: str, top_k: int = DEFAULT_TOP_K) -> List[ChunkHit]:
+        """Top-k фрагментов по BM25 для запроса (например, последней реплики клиента)."""
+        if not self.passages or top_k <= 0:
+            return []
+        total = len(self.passages)
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            for idx, tf in postings:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[idx] / (self.avg_length or 1))
+                scores[idx] = scores.get(idx, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+        return [ChunkHit(passage=self.passages[idx], score=score) for idx, score in best]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": INDEX_VERSION,
+            "passages": [asdict(p) for p in self.passages],
+            "lengths": self.lengths,
+            "postings": self.postings,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DocumentIndex":
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported document index version: {data.get('version')}")
+        return cls(
+            passages=[Passage(**p) for p in data["passages"]],
+            lengths=data["lengths"],
+            postings={term: [tuple(entry) for entry in entries] for term, entries in data["postings"].items()},
+        )
+
+
+def format_hits_for_prompt(hits: List[ChunkHit]) -> str:
+    """Фрагменты для ответа агенту: источник + текст."""
+    return "\n\n".join(f"[{hit.passage.source}]\n{hit.passage.text}" for hit in hits)
+
+
+class DocumentIndexStore:
+    """
+    Индексы документов по сессиям на диске с небольшим in-memory LRU.
+
+    Запись атомарная (tmp + replace); загруженный индекс перечитывается,
+    если файл изменился (повторная загрузка документов).
+    """
+
+    def __init__(self, root: str = "data/doc_index", max_cached: int = 32):
+        self.root = Path(root)
+        self.max_cached = max_cached
+        self._cache: "OrderedDict[str, Tuple[int, DocumentIndex]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # add(): load → merge → save без гонок
+
+    def path(self, session_id: str) -> Path:
+        return self.root / f"{session_id}.json"
+
+    def save(self, session_id: str, index: DocumentIndex) -> Path:
+        """Сохранить индекс сессии (заменяет предыдущий)."""
+        path = self.path(session_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(dumps_bytes(index.to_dict()))
+        os.replace(tmp, path)
+        with self._lock:
+            self._cache.pop(session_id, None)
+        logger.info("document_index_saved", session_id=session_id, passages=len(index))
+        return path
+
+    def add(self, session_id: str, index: DocumentIndex) -> DocumentIndex:
+        """Добавить документы новой загрузки к индексу сессии и сохранить."""
+        with self._write_lock:
+            existing = self.load(session_id)
+            merged = existing.merged_with(index) if existing is not None else index
+            self.save(session_id, merged)
+        return merged
+
+    def load(self, session_id: str) -> Optional[DocumentIndex]:
+        """Индекс сессии или None, если документы не загружались."""
+        path = self.path(session_id)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            cached = self._cache.get(session_id)
+            if cached is not None and cached[0] == mtime:
+                self._cache.move_to_end(session_id)
+                return cached[1]
+
+        try:
+            index = DocumentIndex.from_dict(loads(path.read_bytes()))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("document_index_load_failed", session_id=session_id, error=str(e))
+            return None
+
+        with self._lock:
+            self._cache[session_id] = (mtime, index)
+            self._cache.move_to_end(session_id)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        return index
+
+    def search(self, session_id: str, query: str, top_k: int = DEFAULT_TOP_K) -> List[ChunkHit]:
+        """Top-k фрагментов документов сессии; пусто, если индекса нет."""
+        index = self.load(session_id)
+        return index.search(query, top_k) if index is not None else []
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._cache.pop(session_id, None)
+        self.path(session_id).unlink(missing_ok=True)
+
+
+_store: Optional[DocumentIndexStore] = None
+
+
+def get_document_index_store() -> DocumentIndexStore:
+    """Process-wide store (data/doc_index)."""
+    global _store
+    if _store is None:
+        _store = DocumentIndexStore()
+    return _store
@@ -0,0 +1,24 @@
+"""
+Background Jobs Module.
+
+Durable очередь фоновых задач (SQLite) и воркеры:
+- JobQueue  — постановка, захват с арендой, ретраи, журнал шагов
+- JobWorker — корутины, выполняющие задачи с backoff
+"""
+
+from src.jobs.queue import DONE, FAILED, PENDING, RUNNING, Job, JobQueue
+from src.jobs.worker import JobLeaseLost, JobSteps, JobStepsFailed, JobWorker, backoff_delay
+
+__all__ = [
+    "Job",
+    "JobLeaseLost",
+    "JobQueue",
+    "JobSteps",
+    "JobStepsFailed",
+    "JobWorker",
+    "backoff_delay",
+    "PENDING",
+    "RUNNING",
+    "DONE",
+    "FAILED",
+]
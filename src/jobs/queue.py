@@ -0,0 +1,464 @@
+"""
+Job Queue.
+
+Локальная durable-очередь фоновых задач в SQLite (data/jobs.db).
+
+Используется для пост-сессионной финализации: агент только ставит задачу
+в очередь и освобождается, а воркер (scripts/run_jobs.py) выполняет её.
+Пока задача выполняется, воркер продлевает аренду (lease); если процесс
+воркера перезапущен посреди задачи, аренда истекает и задачу забирает
+другой воркер.
+
+- Идемпотентность: повторная постановка с тем же idempotency_key
+  возвращает существующую задачу.
+- Шаги: задача отмечает завершённые шаги (job_steps), при повторной
+  попытке они пропускаются — уведомления не уходят дважды.
+- Ретраи: экспоненциальный backoff, после max_attempts — статус failed.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import structlog
+
+logger = structlog.get_logger("session")
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+JOB_STATUSES = (PENDING, RUNNING, DONE, FAILED)
+
+DEFAULT_MAX_ATTEMPTS = 5
+# Аренда задачи воркером; по истечении задачу может забрать другой воркер
+DEFAULT_LEASE_SECONDS = 15 * 60
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+@dataclass
+class Job:
+    """Задача очереди."""
+
+    job_id: str
+    kind: str
+    idempotency_key: str
+    payload: Dict[str, Any]
+    status: str = PENDING
+    session_id: Optional[str] = None
+    attempts: int = 0
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    run_after: float = 0.0
+    last_error: Optional[str] = None
+    locked_by: Optional[str] = None
+    created_at: str = ""
+    updated_at: str = ""
+    steps: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self, include_payload: bool = False) -> Dict[str, Any]:
+        """Представление для API (payload может быть большим — только по запросу)."""
+        data = {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "idempotency_key": self.idempotency_key,
+            "status": self.status,
+            "session_id": self.session_id,
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "run_after": datetime.fromtimestamp(self.run_after, timezone.utc).isoformat() if self.run_after else None,
+            "last_error": self.last_error,
+            "locked_by": self.locked_by,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "steps": self.steps,
+        }
+        if include_payload:
+            data["payload"] = self.payload
+        return data
+
+
+class JobQueue:
+    """
+    Очередь задач в SQLite.
+
+    Thread-safe (одно соединение под RLock, как в SessionManager); несколько
+    процессов разделяют файл через WAL, захват задачи — в BEGIN IMMEDIATE.
+    """
+
+    def __init__(self, db_path: str = "data/jobs.db"):
+        """
+        Args:
+            db_path: Путь к файлу SQLite (директория создаётся автоматически)
+        """
+        self.db_path = db_path
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        # isolation_level=None — транзакции управляются явно (BEGIN IMMEDIATE при захвате)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                idempotency_key TEXT NOT NULL UNIQUE,
+                session_id TEXT,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL DEFAULT 5,
+                run_after REAL NOT NULL DEFAULT 0,
+                locked_by TEXT,
+                locked_until REAL,
+                last_error TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, run_after)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_jobs_session ON jobs (session_id)"
+        )
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_steps (
+                job_id TEXT NOT NULL,
+                step TEXT NOT NULL,
+                result TEXT,
+                completed_at TEXT NOT NULL,
+                PRIMARY KEY (job_id, step)
+            )
+        """)
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        idempotency_key: str,
+        session_id: Optional[str] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        delay: float = 0.0,
+    ) -> Job:
+        """
+        Поставить задачу в очередь.
+
+        Повторная постановка с тем же idempotency_key ничего не меняет и
+        возвращает уже существующую задачу.
+        """
+        now = _now_iso()
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            cursor = self._conn.execute(
+                """
+                INSERT OR IGNORE INTO jobs (
+                    job_id, kind, idempotency_key, session_id, payload,
+                    max_attempts, run_after, created_at, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    job_id, kind, idempotency_key, session_id,
+                    json.dumps(payload, ensure_ascii=False, default=str),
+                    max_attempts, time.time() + delay, now, now,
+                ),
+            )
+            if cursor.rowcount == 0:
+                existing = self.get_by_key(idempotency_key)
+                logger.info("job_enqueue_duplicate", kind=kind, key=idempotency_key,
+                            job_id=existing.job_id if existing else None)
+                return existing
+        logger.info("job_enqueued", kind=kind, job_id=job_id, key=idempotency_key, session_id=session_id)
+        return self.get(job_id)
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def claim(
+        self,
+        worker_id: str,
+        kinds: Optional[List[str]] = None,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    ) -> Optional[Job]:
+        """
+        Атомарно забрать готовую задачу (pending с наступившим run_after или
+        running с истёкшей арендой). Увеличивает attempts.
+        """
+        now = time.time()
+        kind_clause = ""
+        params: List[Any] = [now, now]
+        if kinds:
+            kind_clause = f" AND kind IN ({','.join('?' * len(kinds))})"
+            params.extend(kinds)
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Аренда истекла, а попытки кончились — задача уже не будет выполнена
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, last_error = COALESCE(last_error, 'lease expired'), "
+                    "locked_by = NULL, locked_until = NULL, updated_at = ? "
+                    "WHERE status = ? AND locked_until < ? AND attempts >= max_attempts",
+                    (FAILED, _now_iso(), RUNNING, now),
+                )
+                row = self._conn.execute(
+                    f"""
+                    SELECT job_id FROM jobs
+                    WHERE ((status = 'pending' AND run_after <= ?)
+                           OR (status = 'running' AND locked_until < ?))
+                      AND attempts < max_attempts{kind_clause}
+                    ORDER BY run_after, created_at
+                    LIMIT 1
+                    """,
+                    params,
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, locked_by = ?, "
+                    "locked_until = ?, updated_at = ? WHERE job_id = ?",
+                    (RUNNING, worker_id, now + lease_seconds, _now_iso(), row["job_id"]),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get(row["job_id"])
+
+    def complete(self, job_id: str, worker_id: Optional[str] = None) -> bool:
+        """
+        Отметить задачу выполненной.
+
+        Args:
+            job_id: Задача
+            worker_id: Воркер, забравший задачу (locked_by из claim); если его
+                       аренду уже перехватил другой воркер, статус не меняется
+
+        Returns:
+            False, если аренда потеряна
+        """
+        owner_clause, params = self._owner_clause(worker_id)
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, locked_by = NULL, locked_until = NULL, "
+                f"last_error = NULL, updated_at = ? WHERE job_id = ?{owner_clause}",
+                (DONE, _now_iso(), job_id, *params),
+            )
+        if cursor.rowcount == 0:
+            logger.warning("job_lease_lost", job_id=job_id, worker_id=worker_id, action="complete")
+            return False
+        logger.info("job_done", job_id=job_id)
+        return True
+
+    def fail(
+        self,
+        job_id: str,
+        error: str,
+        retry_delay: Optional[float],
+        worker_id: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Отметить попытку неудачной.
+
+        Args:
+            job_id: Задача
+            error: Текст ошибки (сохраняется в last_error)
+            retry_delay: Через сколько секунд повторить; None — без повтора
+            worker_id: Воркер, забравший задачу (см. complete)
+
+        Returns:
+            Новый статус: pending (будет повтор) или failed; None — аренда
+            потеряна, задачей уже владеет другой воркер
+        """
+        owner_clause, params = self._owner_clause(worker_id)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return FAILED
+            retry = retry_delay is not None and row["attempts"] < row["max_attempts"]
+            status = PENDING if retry else FAILED
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, run_after = ?, last_error = ?, locked_by = NULL, "
+                f"locked_until = NULL, updated_at = ? WHERE job_id = ?{owner_clause}",
+                (status, time.time() + (retry_delay or 0.0), error[:2000], _now_iso(), job_id, *params),
+            )
+        if cursor.rowcount == 0:
+            logger.warning("job_lease_lost", job_id=job_id, worker_id=worker_id, action="fail",
+                           error=error[:200])
+            return None
+        logger.warning("job_attempt_failed", job_id=job_id, status=status,
+                       attempts=row["attempts"], error=error[:200])
+        return status
+
+    def renew(self, job_id: str, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        """
+        Продлить аренду выполняющейся задачи (heartbeat воркера).
+
+        Returns:
+            False, если аренда потеряна (задачу забрал другой воркер)
+        """
+        owner_clause, params = self._owner_clause(worker_id)
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE jobs SET locked_until = ? WHERE job_id = ?{owner_clause}",
+                (time.time() + lease_seconds, job_id, *params),
+            )
+        if cursor.rowcount == 0:
+            logger.warning("job_lease_lost", job_id=job_id, worker_id=worker_id, action="renew")
+            return False
+        return True
+
+    @staticmethod
+    def _owner_clause(worker_id: Optional[str]):
+        """Условие «задача всё ещё арендована этим воркером» для UPDATE."""
+        if worker_id is None:
+            return "", ()
+        return " AND status = 'running' AND locked_by = ?", (worker_id,)
+
+    def retry(self, job_id: str) -> bool:
+        """Вернуть failed задачу в очередь (ручной повтор, попытки сбрасываются)."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = 0, run_after = ?, updated_at = ? "
+                "WHERE job_id = ? AND status = ?",
+                (PENDING, time.time(), _now_iso(), job_id, FAILED),
+            )
+        return cursor.rowcount > 0
+
+    # ------------------------------------------------------------------
+    # Steps (идемпотентность внутри задачи)
+    # ------------------------------------------------------------------
+
+    def completed_steps(self, job_id: str) -> Dict[str, Any]:
+        """Завершённые шаги задачи: {step: result}."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT step, result FROM job_steps WHERE job_id = ? ORDER BY completed_at",
+                (job_id,),
+            ).fetchall()
+        return {row["step"]: json.loads(row["result"]) if row["result"] else None for row in rows}
+
+    def mark_step(self, job_id: str, step: str, result: Any = None, worker_id: Optional[str] = None) -> bool:
+        """
+        Отметить шаг выполненным (повторная отметка — no-op).
+
+        Args:
+            worker_id: Воркер, забравший задачу (см. complete); если его аренду
+                       перехватил другой воркер, шаг не отмечается
+
+        Returns:
+            False, если аренда потеряна
+        """
+        owner_clause, params = self._owner_clause(worker_id)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                owned = not owner_clause or self._conn.execute(
+                    f"SELECT 1 FROM jobs WHERE job_id = ?{owner_clause}", (job_id, *params)
+                ).fetchone() is not None
+                if owned:
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO job_steps (job_id, step, result, completed_at) VALUES (?, ?, ?, ?)",
+                        (job_id, step,
+                         json.dumps(result, ensure_ascii=False, default=str) if result is not None else None,
+                         _now_iso()),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if not owned:
+            logger.warning("job_lease_lost", job_id=job_id, worker_id=worker_id, action="mark_step", step=step)
+        return owned
+
+    # ------------------------------------------------------------------
+    # Status
+    # ------------------------------------------------------------------
+
+    def _job_from_row(self, row: sqlite3.Row, with_steps: bool = True) -> Job:
+        return Job(
+            job_id=row["job_id"],
+            kind=row["kind"],
+            idempotency_key=row["idempotency_key"],
+            payload=json.loads(row["payload"]),
+            status=row["status"],
+            session_id=row["session_id"],
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+            run_after=row["run_after"],
+            last_error=row["last_error"],
+            locked_by=row["locked_by"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+            steps=self.completed_steps(row["job_id"]) if with_steps else {},
+        )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._job_from_row(row) if row else None
+
+    def get_by_key(self, idempotency_key: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+            ).fetchone()
+        return self._job_from_row(row) if row else None
+
+    def list_jobs(
+        self,
+        status: Optional[str] = None,
+        session_id: Optional[str] = None,
+        kind: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[Job]:
+        """Последние задачи (новые первыми) с фильтрами."""
+        clauses, params = [], []
+        for column, value in (("status", status), ("session_id", session_id), ("kind", kind)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM jobs{where} ORDER BY created_at DESC LIMIT ?", params
+            ).fetchall()
+            return [self._job_from_row(row) for row in rows]
+
+    def stats(self) -> Dict[str, int]:
+        """Количество задач по статусам."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in JOB_STATUSES}
+        counts.update({row["status"]: row["n"] for row in rows})
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def default_worker_id() -> str:
+    """Идентификатор воркера для locked_by: host:pid."""
+    return f"{socket.gethostname()}:{os.getpid()}"
@@ -0,0 +1,209 @@
+"""
+Job Worker.
+
+Корутины-воркеры, выполняющие задачи из JobQueue:
+claim → handler(job, steps) → complete / fail с backoff. Пока обработчик
+работает, аренда задачи продлевается (heartbeat).
+
+Обработчик получает JobSteps — журнал шагов задачи. Шаги, завершённые в
+предыдущих попытках, пропускаются; ошибки шагов копятся и в конце
+поднимаются одним исключением, чтобы задача ушла на повтор.
+"""
+
+import asyncio
+import traceback
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import structlog
+
+from src.jobs.queue import DEFAULT_LEASE_SECONDS, Job, JobQueue, default_worker_id
+
+logger = structlog.get_logger("session")
+
+
+class JobStepsFailed(RuntimeError):
+    """Один или несколько шагов задачи завершились ошибкой (задача будет повторена)."""
+
+    def __init__(self, failures: Dict[str, str]):
+        self.failures = failures
+        super().__init__("; ".join(f"{step}: {error}" for step, error in failures.items()))
+
+
+class JobLeaseLost(RuntimeError):
+    """Аренду задачи перехватил другой воркер — эта попытка прерывается."""
+
+
+class JobSteps:
+    """Журнал шагов одной попытки задачи (поверх job_steps в очереди)."""
+
+    def __init__(self, queue: JobQueue, job: Job):
+        self._queue = queue
+        self.job = job
+        self._done: Dict[str, Any] = dict(job.steps)
+        self.failures: Dict[str, str] = {}
+
+    @property
+    def started(self) -> bool:
+        """Хотя бы один шаг уже выполнен (в этой или прошлой попытке)."""
+        return bool(self._done)
+
+    @property
+    def last_attempt(self) -> bool:
+        """Попытка последняя: после неё повтора не будет."""
+        return self.job.attempts >= self.job.max_attempts
+
+    def is_done(self, step: str) -> bool:
+        return step in self._done
+
+    def result(self, step: str) -> Any:
+        return self._done.get(step)
+
+    def mark(self, step: str, result: Any = None) -> None:
+        """
+        Отметить шаг выполненным (сохраняется сразу — переживает падение воркера).
+
+        Raises:
+            JobLeaseLost: задачу уже выполняет другой воркер
+        """
+        if not self._queue.mark_step(self.job.job_id, step, result, self.job.locked_by):
+            raise JobLeaseLost(f"job {self.job.job_id} is leased by another worker")
+        self._done[step] = result
+
+    def fail(self, step: str, error: Exception) -> None:
+        """Запомнить ошибку шага; остальные шаги продолжают выполняться."""
+        self.failures[step] = f"{type(error).__name__}: {error}"
+
+    def raise_if_failed(self) -> None:
+        if self.failures:
+            raise JobStepsFailed(self.failures)
+
+
+JobHandler = Callable[[Job, JobSteps], Awaitable[None]]
+
+
+def backoff_delay(attempt: int, base: float = 5.0, cap: float = 600.0) -> float:
+    """Экспоненциальная задержка перед повтором: base * 2^(attempt-1), не больше cap."""
+    return min(cap, base * (2 ** max(attempt - 1, 0)))
+
+
+class JobWorker:
+    """
+    Пул корутин, выполняющих задачи очереди.
+
+    Usage:
+        worker = JobWorker(queue, {"finalize_session": handler}, concurrency=2)
+        await worker.run()        # до worker.stop()
+        await worker.run_once()   # одна задача (тесты, скрипты)
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Dict[str, JobHandler],
+        concurrency: int = 2,
+        poll_interval: float = 1.0,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        backoff_base: float = 5.0,
+        backoff_cap: float = 600.0,
+        worker_id: Optional[str] = None,
+    ):
+        """
+        Args:
+            queue: Очередь задач
+            handlers: Обработчики по kind
+            concurrency: Сколько задач выполняется одновременно
+            poll_interval: Пауза опроса пустой очереди (сек)
+            lease_seconds: Аренда задачи; продлевается каждую треть срока, пока
+                           задача выполняется. Без продления (воркер завис или
+                           упал) задачу может забрать другой воркер
+            backoff_base: Задержка перед первым повтором (сек)
+            backoff_cap: Максимальная задержка перед повтором (сек)
+            worker_id: Идентификатор для locked_by (по умолчанию host:pid)
+        """
+        self.queue = queue
+        self.handlers = handlers
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.worker_id = worker_id or default_worker_id()
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        """Остановить воркеры после текущих задач."""
+        self._stopping.set()
+
+    async def run(self) -> None:
+        """Запустить concurrency циклов опроса до stop()."""
+        self._stopping.clear()
+        logger.info("job_worker_started", worker_id=self.worker_id, concurrency=self.concurrency,
+                    kinds=sorted(self.handlers))
+        await asyncio.gather(*(self._loop(i) for i in range(self.concurrency)))
+        logger.info("job_worker_stopped", worker_id=self.worker_id)
+
+    async def _loop(self, slot: int) -> None:
+        while not self._stopping.is_set():
+            try:
+                worked = await self.run_once(slot)
+            except Exception as e:
+                # Ошибка самой очереди (например, SQLite busy) — не роняем воркер
+                logger.error("job_worker_loop_error", slot=slot, error=str(e))
+                worked = False
+            if not worked:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def run_once(self, slot: int = 0) -> bool:
+        """
+        Забрать и выполнить одну задачу.
+
+        Returns:
+            True, если задача была (успешно или нет), False — очередь пуста
+        """
+        job = await asyncio.to_thread(
+            self.queue.claim, f"{self.worker_id}/{slot}", list(self.handlers), self.lease_seconds
+        )
+        if job is None:
+            return False
+
+        steps = JobSteps(self.queue, job)
+        log = logger.bind(job_id=job.job_id, kind=job.kind, attempt=job.attempts, session_id=job.session_id)
+        log.info("job_started", done_steps=sorted(job.steps))
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            try:
+                await self.handlers[job.kind](job, steps)
+            finally:
+                heartbeat.cancel()
+            steps.raise_if_failed()
+        except Exception as e:
+            delay = backoff_delay(job.attempts, self.backoff_base, self.backoff_cap)
+            status = await asyncio.to_thread(
+                self.queue.fail, job.job_id, f"{type(e).__name__}: {e}", delay, job.locked_by
+            )
+            if status is not None:
+                log.warning("job_failed", status=status, retry_in=delay if status == "pending" else None,
+                            error=str(e), traceback=traceback.format_exc() if status == "failed" else None)
+            return True
+
+        # Аренда могла истечь и задачу забрал другой воркер — его статус не трогаем
+        await asyncio.to_thread(self.queue.complete, job.job_id, job.locked_by)
+        return True
+
+    async def _heartbeat(self, job: Job) -> None:
+        """Продлевать аренду задачи, пока выполняется обработчик."""
+        interval = self.lease_seconds / 3
+        if interval <= 0:
+            return
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                renewed = await asyncio.to_thread(self.queue.renew, job.job_id, job.locked_by, self.lease_seconds)
+            except Exception as e:
+                logger.warning("job_lease_renew_failed", job_id=job.job_id, error=str(e))
+                continue
+            if not renewed:
+                return
@@ -13,6 +13,30 @@ from .loader import IndustryProfileLoader
 
 logger = structlog.get_logger("knowledge")
 
+# Типичные окончания существительных/прилагательных
+_RUSSIAN_ENDINGS = (
+    'ками', 'ость', 'ение', 'ание',
+    'ами', 'ями', 'ией', 'ием', 'ого', 'его',
+    'ов', 'ев', 'ей', 'ий', 'ый', 'ой', 'ая',
+    'ие', 'ые', 'ое', 'ую', 'юю', 'ах', 'ях',
+    'ом', 'ем', 'им', 'ым', 'их', 'ых',
+    'и', 'ы', 'а', 'я', 'у', 'ю', 'е', 'о'
+)
+
+
+def get_russian_stem(word: str) -> str:
+    """
+    Получить примерный корень русского слова (без морфологической библиотеки).
+
+    Убирает типичные русские окончания для matching.
+    """
+    word_lower = word.lower()
+    for ending in _RUSSIAN_ENDINGS:
+        if len(word_lower) > len(ending) + 3 and word_lower.endswith(ending):
+            return word_lower[:-len(ending)]
+
+    return word_lower
+
 
 class IndustryMatcher:
     """
@@ -30,6 +54,10 @@ class IndustryMatcher:
         """
         self.loader = loader or IndustryProfileLoader()
         self._alias_map: Dict[str, str] = {}  # alias -> industry_id
+        # Скомпилированные паттерны (alias, industry_id, pattern): aliases больше,
+        # чем кэш модуля re (512), и без предкомпиляции каждый detect() заново
+        # компилирует все паттерны
+        self._patterns: List[Tuple[str, str, re.Pattern]] = []
         self._loaded = False
 
     def _build_alias_map(self):
@@ -56,31 +84,21 @@ class IndustryMatcher:
                     if len(alias) >= 3:
                         self._alias_map[alias.lower()] = industry_id
 
+        self._patterns = [
+            (alias, industry_id, re.compile(self._make_word_pattern(alias), re.IGNORECASE))
+            for alias, industry_id in self._alias_map.items()
+        ]
         self._loaded = True
         logger.info("Alias map built", total_aliases=len(self._alias_map))
 
-    def _get_russian_stem(self, word: str) -> str:
-        """
-        Получить примерный корень русского слова (без морфологической библиотеки).
-
-        Убирает типичные русские окончания для matching.
-        """
-        # Типичные окончания существительных/прилагательных
-        endings = [
-            'ками', 'ками', 'ость', 'ение', 'ание',
-            'ами', 'ями', 'ией', 'ием', 'ого', 'его',
-            'ов', 'ев', 'ей', 'ий', 'ый', 'ой', 'ая',
-            'ие', 'ые', 'ое', 'ую', 'юю', 'ах', 'ях',
-            'ом', 'ем', 'им', 'ым', 'их', 'ых',
-            'и', 'ы', 'а', 'я', 'у', 'ю', 'е', 'о'
-        ]
-
-        word_lower = word.lower()
-        for ending in endings:
-            if len(word_lower) > len(ending) + 3 and word_lower.endswith(ending):
-                return word_lower[:-len(ending)]
+    def warm(self) -> int:
+        """Build the alias map and compiled patterns ahead of the first detect(); returns alias count."""
+        self._build_alias_map()
+        return len(self._alias_map)
 
-        return word_lower
+    def _get_russian_stem(self, word: str) -> str:
+        """Получить примерный корень русского слова (см. get_russian_stem)."""
+        return get_russian_stem(word)
 
     def _make_word_pattern(self, word: str) -> str:
         """
@@ -123,10 +141,9 @@ class IndustryMatcher:
         # Считаем совпадения для каждой отрасли
         scores: Dict[str, int] = {}
 
-        for alias, industry_id in self._alias_map.items():
+        for _, industry_id, pattern in self._patterns:
             # Ищем как целое слово (с поддержкой кириллицы)
-            pattern = self._make_word_pattern(alias)
-            matches = len(re.findall(pattern, text_lower, re.IGNORECASE))
+            matches = len(pattern.findall(text_lower))
 
             if matches > 0:
                 scores[industry_id] = scores.get(industry_id, 0) + matches
@@ -162,9 +179,8 @@ class IndustryMatcher:
         text_lower = text.lower()
         scores: Dict[str, int] = {}
 
-        for alias, industry_id in self._alias_map.items():
-            pattern = self._make_word_pattern(alias)
-            matches = len(re.findall(pattern, text_lower, re.IGNORECASE))
+        for _, industry_id, pattern in self._patterns:
+            matches = len(pattern.findall(text_lower))
 
             if matches > 0:
                 scores[industry_id] = scores.get(industry_id, 0) + matches
@@ -223,12 +239,11 @@ class IndustryMatcher:
         text_lower = text.lower()
         found = []
 
-        for alias, ind_id in self._alias_map.items():
+        for alias, ind_id, pattern in self._patterns:
             if ind_id != industry_id:
                 continue
 
-            pattern = self._make_word_pattern(alias)
-            if re.search(pattern, text_lower, re.IGNORECASE):
+            if pattern.search(text_lower):
                 found.append(alias)
 
         return found
@@ -236,5 +251,6 @@ class IndustryMatcher:
     def reload(self):
         """Перезагрузить данные."""
         self._alias_map.clear()
+        self._patterns = []
         self._loaded = False
         self.loader.reload()
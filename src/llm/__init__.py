@@ -5,6 +5,7 @@ from src.llm.deepseek import DeepSeekClient
 from src.llm.azure_chat import AzureChatClient
 from src.llm.anthropic_client import AnthropicClient
 from src.llm.factory import create_llm_client, get_available_providers
+from src.llm.cassette import CassetteTransport, CassetteMissError
 from src.llm.anketa_generator import LLMAnketaGenerator
 
 __all__ = [
@@ -14,5 +15,7 @@ __all__ = [
     "AnthropicClient",
     "create_llm_client",
     "get_available_providers",
+    "CassetteTransport",
+    "CassetteMissError",
     "LLMAnketaGenerator",
 ]
@@ -18,6 +18,8 @@ import httpx
 from typing import Optional, Dict, Any, List
 from dotenv import load_dotenv
 
+from src.llm.cassette import with_pool_limits
+
 load_dotenv()
 logger = logging.getLogger("anthropic")
 
@@ -35,6 +37,7 @@ class AnthropicClient:
         self,
         api_key: Optional[str] = None,
         model: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
     ):
         self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
         self.model = model or os.getenv("ANTHROPIC_MODEL", "claude-sonnet-4-5-20250929")
@@ -43,6 +46,7 @@ class AnthropicClient:
             raise ValueError("ANTHROPIC_API_KEY not set")
 
         self._http_client: Optional[httpx.AsyncClient] = None
+        self._transport = transport
 
     async def aclose(self):
         """R21-04: Close the underlying httpx client to release TCP connections."""
@@ -53,8 +57,10 @@ class AnthropicClient:
     def _get_http_client(self) -> httpx.AsyncClient:
         """Get or create a reusable httpx client."""
         if self._http_client is None or self._http_client.is_closed:
+            limits = httpx.Limits(max_connections=5, max_keepalive_connections=3)
             self._http_client = httpx.AsyncClient(
-                limits=httpx.Limits(max_connections=5, max_keepalive_connections=3),
+                limits=limits,
+                transport=with_pool_limits(self._transport, limits),
             )
         return self._http_client
 
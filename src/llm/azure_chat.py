@@ -12,6 +12,8 @@ import httpx
 from typing import Optional, Dict, Any, List
 from dotenv import load_dotenv
 
+from src.llm.cassette import with_pool_limits
+
 load_dotenv()
 logger = logging.getLogger("azure_chat")
 
@@ -27,7 +29,8 @@ class AzureChatClient:
         api_key: Optional[str] = None,
         endpoint: Optional[str] = None,
         deployment: Optional[str] = None,
-        api_version: Optional[str] = None
+        api_version: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
     ):
         self.api_key = api_key or os.getenv("AZURE_CHAT_OPENAI_API_KEY")
         self.endpoint = (endpoint or os.getenv("AZURE_CHAT_OPENAI_ENDPOINT", "")).rstrip("/")
@@ -42,6 +45,7 @@ class AzureChatClient:
             raise ValueError("AZURE_CHAT_OPENAI_DEPLOYMENT_NAME not set")
 
         self._http_client: Optional[httpx.AsyncClient] = None
+        self._transport = transport
 
     async def aclose(self):
         """R21-02: Close the underlying httpx client to release TCP connections."""
@@ -52,8 +56,10 @@ class AzureChatClient:
     def _get_http_client(self) -> httpx.AsyncClient:
         """Get or create a reusable httpx client."""
         if self._http_client is None or self._http_client.is_closed:
+            limits = httpx.Limits(max_connections=5, max_keepalive_connections=3)
             self._http_client = httpx.AsyncClient(
-                limits=httpx.Limits(max_connections=5, max_keepalive_connections=3),
+                limits=limits,
+                transport=with_pool_limits(self._transport, limits),
             )
         return self._http_client
 
@@ -0,0 +1,286 @@
+"""
+LLM Cassette — запись и воспроизведение HTTP-обменов с LLM провайдерами.
+
+CassetteTransport встраивается в httpx.AsyncClient любого LLM клиента
+(DeepSeek/OpenAI/xAI, Azure, Anthropic) и работает в трёх режимах:
+  - record — запросы уходят в сеть, ответы и их латентность пишутся в файл
+  - replay — ответы берутся только из файла, сеть не используется
+  - auto   — воспроизведение при наличии записи, иначе запись
+
+Ключ запроса — sha256 от метода, пути и канонического JSON тела.
+Заголовки и хост в ключ не входят: API ключи не попадают в файл,
+а кассета, записанная на одном endpoint, воспроизводится на другом.
+
+httpx игнорирует limits= клиента, если передан transport=, поэтому клиенты
+передают свои httpx.Limits кассете (with_pool_limits): запись идёт через
+AsyncHTTPTransport с тем же пулом, а воспроизведение ограничивает число
+одновременных ответов max_connections, как пул в production.
+
+Записанные ответы копятся в памяти и пишутся в файл при aclose()/flush()
+(и при выходе из процесса), а не после каждого ответа.
+
+Использование:
+    from src.llm.factory import create_llm_client
+
+    client = create_llm_client("deepseek", cassette="tests/cassettes/run.json",
+                               cassette_mode="replay")
+
+Или через окружение: LLM_CASSETTE, LLM_CASSETTE_MODE, LLM_CASSETTE_LATENCY.
+"""
+
+import asyncio
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+import weakref
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+import structlog
+
+logger = structlog.get_logger("llm")
+
+RECORD = "record"
+REPLAY = "replay"
+AUTO = "auto"
+MODES = (RECORD, REPLAY, AUTO)
+
+CASSETTE_VERSION = 1
+
+# Заголовки ответа, которые имеет смысл сохранить (остальные — шум и трекинг)
+_KEPT_HEADERS = ("content-type",)
+
+
+# Записывающие транспорты, ещё не собранные GC: сбрасываются одним atexit-хуком
+_recorders: "weakref.WeakSet[CassetteTransport]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_recorders() -> None:
+    """Flush transports whose clients were never closed."""
+    for transport in list(_recorders):
+        transport.flush()
+
+
+class CassetteMissError(LookupError):
+    """В режиме replay запрос не найден в кассете."""
+
+
+def request_key(request: httpx.Request) -> str:
+    """Стабильный ключ запроса: метод + путь + канонический JSON тела."""
+    body = request.content or b""
+    try:
+        canonical = json.dumps(
+            json.loads(body), ensure_ascii=False, sort_keys=True, separators=(",", ":")
+        )
+    except (TypeError, ValueError):
+        canonical = body.decode("utf-8", errors="replace")
+    payload = f"{request.method}\n{request.url.path}\n{canonical}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """
+    httpx транспорт с записью и воспроизведением ответов.
+
+    Одинаковые запросы (например, повторный extraction на той же истории)
+    хранятся списком и воспроизводятся по порядку; после исчерпания
+    повторяется последний ответ.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = AUTO,
+        latency_scale: float = 0.0,
+        inner: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Args:
+            path: JSON-файл кассеты (директория создаётся при записи)
+            mode: record / replay / auto
+            latency_scale: Множитель записанной латентности при воспроизведении
+                           (0 — мгновенно, 1 — как в оригинале)
+            inner: Реальный транспорт для записи (по умолчанию AsyncHTTPTransport)
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: '{mode}'. Supported: {', '.join(MODES)}")
+
+        self.path = Path(path)
+        self.mode = mode
+        self.latency_scale = max(0.0, latency_scale)
+        self._inner = inner
+        self._lock = threading.Lock()
+        self._cursors: Dict[str, int] = {}
+        self._interactions: Dict[str, List[Dict[str, Any]]] = self._load()
+        self._dirty = False
+        self._limits: Optional[httpx.Limits] = None
+        self._pool: Optional[asyncio.Semaphore] = None
+        self._pool_loop: Optional[asyncio.AbstractEventLoop] = None
+        if mode != REPLAY:
+            # Страховка для клиентов, которые не закрываются явно
+            _recorders.add(self)
+
+    def use_limits(self, limits: httpx.Limits) -> None:
+        """Apply the owning client's pool limits (httpx ignores them when transport= is set)."""
+        self._limits = limits
+        if self._inner is None and self.mode != REPLAY:
+            self._inner = httpx.AsyncHTTPTransport(limits=limits)
+
+    # ------------------------------------------------------------------
+    # Transport API
+    # ------------------------------------------------------------------
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        key = request_key(request)
+
+        if self.mode != RECORD:
+            recorded = self._next(key)
+            if recorded is not None:
+                return await self._replay(request, recorded)
+            if self.mode == REPLAY:
+                raise CassetteMissError(
+                    f"No recorded response for {request.method} {request.url.path} "
+                    f"(key={key[:12]}) in {self.path}"
+                )
+
+        return await self._record(request, key)
+
+    async def aclose(self) -> None:
+        self.flush()
+        if self._inner is not None:
+            await self._inner.aclose()
+
+    def flush(self) -> None:
+        """Write recorded interactions to the cassette file if anything changed."""
+        with self._lock:
+            if self._dirty:
+                self._save()
+                self._dirty = False
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return sum(len(items) for items in self._interactions.values())
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._interactions
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _next(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            items = self._interactions.get(key)
+            if not items:
+                return None
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            return items[min(cursor, len(items) - 1)]
+
+    def _replay_pool(self) -> Optional[asyncio.Semaphore]:
+        """Semaphore of max_connections for the running loop (None without limits)."""
+        if self._limits is None or self._limits.max_connections is None:
+            return None
+        loop = asyncio.get_running_loop()
+        if self._pool is None or self._pool_loop is not loop:
+            self._pool = asyncio.Semaphore(self._limits.max_connections)
+            self._pool_loop = loop
+        return self._pool
+
+    async def _replay(self, request: httpx.Request, recorded: Dict[str, Any]) -> httpx.Response:
+        if self.latency_scale:
+            delay = recorded.get("latency_ms", 0) / 1000 * self.latency_scale
+            pool = self._replay_pool()
+            if pool is None:
+                await asyncio.sleep(delay)
+            else:
+                # Запросы сверх пула ждут соединение, как в production
+                async with pool:
+                    await asyncio.sleep(delay)
+        return httpx.Response(
+            status_code=recorded["status"],
+            headers=recorded.get("headers") or {},
+            content=recorded.get("body", "").encode("utf-8"),
+            request=request,
+        )
+
+    async def _record(self, request: httpx.Request, key: str) -> httpx.Response:
+        if self._inner is None:
+            self._inner = httpx.AsyncHTTPTransport()
+
+        start = time.monotonic()
+        response = await self._inner.handle_async_request(request)
+        body = await response.aread()
+        latency_ms = int((time.monotonic() - start) * 1000)
+
+        headers = {
+            name: response.headers[name] for name in _KEPT_HEADERS if name in response.headers
+        }
+        interaction = {
+            "request": {"method": request.method, "path": request.url.path},
+            "status": response.status_code,
+            "headers": headers,
+            "body": body.decode("utf-8", errors="replace"),
+            "latency_ms": latency_ms,
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+        }
+        with self._lock:
+            self._interactions.setdefault(key, []).append(interaction)
+            # Курсор сдвигается, чтобы в режиме auto следующий такой же запрос
+            # не воспроизвёл только что записанный ответ вместо нового
+            self._cursors[key] = len(self._interactions[key])
+            self._dirty = True
+
+        logger.debug(
+            "cassette_recorded",
+            path=request.url.path, status=response.status_code, latency_ms=latency_ms,
+        )
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            content=body,
+            request=request,
+        )
+
+    def _load(self) -> Dict[str, List[Dict[str, Any]]]:
+        if not self.path.exists():
+            if self.mode == REPLAY:
+                raise FileNotFoundError(f"Cassette not found: {self.path}")
+            return {}
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        if self.mode == RECORD:
+            # Перезапись: новая сессия записи начинается с чистой кассеты
+            return {}
+        return data.get("interactions", {})
+
+    def _save(self) -> None:
+        """Атомарно записать кассету (tmp + replace), вызывается под self._lock из flush()."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(
+            json.dumps(
+                {"version": CASSETTE_VERSION, "interactions": self._interactions},
+                ensure_ascii=False, indent=2,
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
+
+
+def with_pool_limits(
+    transport: Optional[httpx.AsyncBaseTransport], limits: httpx.Limits
+) -> Optional[httpx.AsyncBaseTransport]:
+    """Transport for httpx.AsyncClient(limits=limits, transport=...): cassettes get the limits."""
+    if isinstance(transport, CassetteTransport):
+        transport.use_limits(limits)
+    return transport
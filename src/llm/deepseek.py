@@ -30,6 +30,7 @@ class DeepSeekClient(OpenAICompatibleClient):
         api_key: Optional[str] = None,
         endpoint: Optional[str] = None,
         model: Optional[str] = None,
+        transport=None,
     ):
         super().__init__(
             api_key=api_key or os.getenv("DEEPSEEK_API_KEY", ""),
@@ -37,6 +38,7 @@ class DeepSeekClient(OpenAICompatibleClient):
             model=model or os.getenv("DEEPSEEK_MODEL", "deepseek-chat"),
             logger_name="deepseek",
             env_key="DEEPSEEK_API_KEY",
+            transport=transport,
         )
 
     async def analyze_answer(
@@ -19,6 +19,10 @@ LLM Client Factory — единая точка создания LLM клиент
 
     # Все клиенты имеют одинаковый интерфейс:
     response = await client.chat(messages=[...], temperature=0.7, max_tokens=8192)
+
+    # Запись/воспроизведение ответов (см. src/llm/cassette.py)
+    client = create_llm_client("azure", cassette="tests/cassettes/run.json",
+                               cassette_mode="replay")
 """
 
 import os
@@ -35,7 +39,16 @@ _PROVIDER_REGISTRY: List[Dict[str, str]] = [
 ]
 
 
-def create_llm_client(provider: Optional[str] = None):
+# Заглушка ключа для режима replay: запросы не уходят в сеть
+_REPLAY_PLACEHOLDER_KEY = "cassette-replay"
+
+
+def create_llm_client(
+    provider: Optional[str] = None,
+    cassette: Optional[str] = None,
+    cassette_mode: Optional[str] = None,
+    cassette_latency: Optional[float] = None,
+):
     """
     Создать LLM клиент по имени провайдера.
 
@@ -43,6 +56,10 @@ def create_llm_client(provider: Optional[str] = None):
         provider: Имя провайдера ("deepseek", "azure", "openai", "anthropic", "xai").
                   Если не указан — берётся из LLM_PROVIDER env var,
                   по умолчанию "deepseek".
+        cassette: Путь к кассете записи/воспроизведения (или LLM_CASSETTE env var).
+        cassette_mode: record / replay / auto (или LLM_CASSETTE_MODE, по умолчанию auto).
+        cassette_latency: Множитель записанной латентности при воспроизведении
+                          (или LLM_CASSETTE_LATENCY, по умолчанию 0).
 
     Returns:
         Клиент с методом chat(messages, temperature, max_tokens) -> str
@@ -52,36 +69,61 @@ def create_llm_client(provider: Optional[str] = None):
 
     provider = provider.lower().strip()
 
+    transport = None
+    replay = False
+    cassette = cassette or os.getenv("LLM_CASSETTE") or None
+    if cassette:
+        from src.llm.cassette import AUTO, REPLAY, CassetteTransport
+        mode = (cassette_mode or os.getenv("LLM_CASSETTE_MODE") or AUTO).lower().strip()
+        if cassette_latency is None:
+            cassette_latency = float(os.getenv("LLM_CASSETTE_LATENCY", "0") or 0)
+        transport = CassetteTransport(cassette, mode=mode, latency_scale=cassette_latency)
+        replay = mode == REPLAY
+
+    def _env(name: str, default: str = "") -> str:
+        # В replay ключи и endpoint не нужны — подставляем заглушки
+        value = os.getenv(name, default)
+        return value or (_REPLAY_PLACEHOLDER_KEY if replay else "")
+
     if provider == "deepseek":
         from src.llm.deepseek import DeepSeekClient
-        return DeepSeekClient()
+        return DeepSeekClient(api_key=_env("DEEPSEEK_API_KEY"), transport=transport)
 
     elif provider in ("azure", "azure_openai"):
         from src.llm.azure_chat import AzureChatClient
-        return AzureChatClient()
+        if not replay:
+            return AzureChatClient(transport=transport)
+        return AzureChatClient(
+            api_key=_env("AZURE_CHAT_OPENAI_API_KEY"),
+            endpoint=os.getenv("AZURE_CHAT_OPENAI_ENDPOINT") or "https://cassette.invalid",
+            deployment=_env("AZURE_CHAT_OPENAI_DEPLOYMENT_NAME"),
+            transport=transport,
+        )
 
     elif provider == "openai":
         from src.llm.openai_client import OpenAICompatibleClient
         return OpenAICompatibleClient(
-            api_key=os.getenv("OPENAI_API_KEY", ""),
+            api_key=_env("OPENAI_API_KEY"),
             endpoint=os.getenv("OPENAI_API_ENDPOINT", "https://api.openai.com/v1"),
             model=os.getenv("OPENAI_MODEL", "gpt-4.1-mini"),
             logger_name="openai",
             env_key="OPENAI_API_KEY",
+            transport=transport,
         )
 
     elif provider == "anthropic":
         from src.llm.anthropic_client import AnthropicClient
-        return AnthropicClient()
+        return AnthropicClient(api_key=_env("ANTHROPIC_API_KEY"), transport=transport)
 
     elif provider in ("xai", "grok"):
         from src.llm.openai_client import OpenAICompatibleClient
         return OpenAICompatibleClient(
-            api_key=os.getenv("XAI_API_KEY", ""),
+            api_key=_env("XAI_API_KEY"),
             endpoint=os.getenv("XAI_API_ENDPOINT", "https://api.x.ai/v1"),
             model=os.getenv("XAI_MODEL", "grok-3-mini"),
             logger_name="xai",
             env_key="XAI_API_KEY",
+            transport=transport,
         )
 
     else:
@@ -14,6 +14,8 @@ import logging
 import httpx
 from typing import Optional, Dict, Any, List
 
+from src.llm.cassette import with_pool_limits
+
 MAX_RETRIES = 3
 RETRY_DELAY = 2.0
 
@@ -28,12 +30,15 @@ class OpenAICompatibleClient:
         model: str,
         logger_name: str = "openai_compat",
         env_key: str = "API_KEY",
+        transport: Optional[httpx.AsyncBaseTransport] = None,
     ):
         self.api_key = api_key
         self.endpoint = endpoint.rstrip("/")
         self.model = model
         self._log = logging.getLogger(logger_name)
         self._http_client: Optional[httpx.AsyncClient] = None
+        # Подменяемый транспорт (например, CassetteTransport для записи/воспроизведения)
+        self._transport = transport
 
         if not self.api_key:
             raise ValueError(f"{logger_name}: API key not set (set {env_key})")
@@ -104,8 +109,10 @@ class OpenAICompatibleClient:
     def _get_http_client(self) -> httpx.AsyncClient:
         """Get or create a reusable httpx client."""
         if self._http_client is None or self._http_client.is_closed:
+            limits = httpx.Limits(max_connections=5, max_keepalive_connections=3)
             self._http_client = httpx.AsyncClient(
-                limits=httpx.Limits(max_connections=5, max_keepalive_connections=3),
+                limits=limits,
+                transport=with_pool_limits(self._transport, limits),
             )
         return self._http_client
 
@@ -1,4 +1,5 @@
+from src.notifications.delivery import NotificationDispatcher, OutboundMessage, get_dispatcher
 from src.notifications.manager import NotificationManager
 from src.notifications.models import NotificationConfig
 
-__all__ = ["NotificationManager", "NotificationConfig"]
+__all__ = ["NotificationManager", "NotificationConfig", "NotificationDispatcher", "OutboundMessage", "get_dispatcher"]
@@ -0,0 +1,582 @@
+"""
+Notification Delivery — асинхронная доставка email и webhook-уведомлений.
+
+NotificationManager только формирует сообщения и ставит их в очередь;
+доставкой занимается NotificationDispatcher (один на процесс):
+
+- Очередь: ограниченная asyncio.Queue, несколько корутин-доставщиков.
+  Переполнение не блокирует вызывающего — сообщение уходит в dead-letter.
+- SMTP: пул постоянных соединений (STARTTLS + login один раз на соединение),
+  отправка в потоке; соединение, простоявшее дольше SMTP_IDLE_SECONDS или
+  закрытое сервером, переоткрывается.
+- Webhooks: общий aiohttp.ClientSession; тело и подпись HMAC считаются при
+  постановке в очередь, повторы отправляют байт-в-байт то же самое.
+- Повторы: экспоненциальный backoff (как у очереди задач), после
+  max_attempts или при постоянной ошибке (4xx, отказ получателя) —
+  запись в dead-letter (JSONL), replay_dead_letters() ставит их обратно
+  (из консоли: python scripts/run_jobs.py --replay-dead-letters).
+- Конфиг: config/notifications.yaml кэшируется и перечитывается при
+  изменении mtime файла.
+
+Usage:
+    dispatcher = get_dispatcher()
+    dispatcher.submit(OutboundMessage.webhook(url, body, headers, event="on_confirm"))
+    await dispatcher.close()  # при остановке процесса
+"""
+
+import asyncio
+import os
+import smtplib
+import ssl
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import structlog
+import yaml
+
+from src.jobs.worker import backoff_delay
+from src.notifications.models import EmailConfig, NotificationConfig
+from src.serialization import dumps_bytes, loads
+
+logger = structlog.get_logger("notifications")
+
+DEFAULT_QUEUE_SIZE = 1000
+DEFAULT_DELIVERY_WORKERS = 4
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_DEAD_LETTER_PATH = "data/notifications_dead_letter.jsonl"
+RETRY_BACKOFF_BASE = 2.0
+RETRY_BACKOFF_CAP = 120.0
+SMTP_POOL_SIZE = 2
+SMTP_IDLE_SECONDS = 60.0
+SMTP_TIMEOUT_SECONDS = 30
+
+# HTTP-коды webhook, после которых имеет смысл повторить
+_RETRYABLE_HTTP = {408, 425, 429}
+
+
+class PermanentDeliveryError(Exception):
+    """Повтор не поможет (адрес отклонён, 4xx от webhook) — сразу в dead-letter."""
+
+
+# ----------------------------------------------------------------------
+# Config cache
+# ----------------------------------------------------------------------
+
+
+class _ConfigCache:
+    """NotificationConfig по пути файла; перечитывается при изменении mtime."""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[Optional[int], NotificationConfig]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: Path, default_yaml: str) -> NotificationConfig:
+        key = str(path)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == mtime and mtime is not None:
+                return cached[1]
+
+            if mtime is None:
+                if not default_yaml:
+                    return NotificationConfig()
+                logger.info("notifications_config_not_found", path=key, action="creating_default")
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(default_yaml, encoding="utf-8")
+                config = NotificationConfig()
+                mtime = path.stat().st_mtime_ns
+            else:
+                try:
+                    raw = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+                    config = NotificationConfig(**raw)
+                except Exception as exc:
+                    logger.error("notifications_config_load_error", error=str(exc))
+                    config = NotificationConfig()
+                if cached is not None:
+                    logger.info("notifications_config_reloaded", path=key)
+
+            self._entries[key] = (mtime, config)
+            return config
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_config_cache = _ConfigCache()
+
+
+def load_notification_config(path: str, default_yaml: str = "") -> NotificationConfig:
+    """Cached config of a notifications YAML (re-read when the file changes)."""
+    return _config_cache.get(Path(path), default_yaml)
+
+
+# ----------------------------------------------------------------------
+# Messages
+# ----------------------------------------------------------------------
+
+
+@dataclass
+class OutboundMessage:
+    """Сообщение в очереди доставки (сериализуемо для dead-letter)."""
+
+    kind: str  # "email" | "webhook"
+    target: str  # адрес получателя или URL
+    event: str = ""
+    session_id: Optional[str] = None
+    subject: str = ""
+    body: str = ""  # HTML письма или JSON webhook (UTF-8)
+    headers: Dict[str, str] = field(default_factory=dict)
+    config_path: str = ""  # откуда брать SMTP-настройки и таймаут при доставке
+    message_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    attempts: int = 0
+    last_error: Optional[str] = None
+    created_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+
+    @classmethod
+    def email(cls, to_address: str, subject: str, body_html: str, **kwargs) -> "OutboundMessage":
+        return cls(kind="email", target=to_address, subject=subject, body=body_html, **kwargs)
+
+    @classmethod
+    def webhook(cls, url: str, body: bytes, headers: Dict[str, str], **kwargs) -> "OutboundMessage":
+        return cls(kind="webhook", target=url, body=body.decode("utf-8"), headers=dict(headers), **kwargs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "OutboundMessage":
+        known = {f for f in cls.__dataclass_fields__}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+
+# ----------------------------------------------------------------------
+# SMTP connection pool
+# ----------------------------------------------------------------------
+
+
+def _smtp_key(cfg: EmailConfig) -> Tuple:
+    return (cfg.smtp_server, cfg.smtp_port, cfg.use_tls, cfg.username, cfg.password)
+
+
+class SMTPPool:
+    """
+    Постоянные SMTP-соединения (синхронный smtplib, вызывается из потоков).
+
+    Соединение открывается с STARTTLS/login один раз и переиспользуется;
+    смена настроек (перечитанный конфиг) закрывает старые соединения.
+    """
+
+    def __init__(self, size: int = SMTP_POOL_SIZE, idle_seconds: float = SMTP_IDLE_SECONDS):
+        self.size = max(1, size)
+        self.idle_seconds = idle_seconds
+        self._idle: List[Tuple[float, smtplib.SMTP]] = []
+        self._key: Optional[Tuple] = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self.connects = 0
+
+    def _connect(self, cfg: EmailConfig) -> smtplib.SMTP:
+        server = smtplib.SMTP(cfg.smtp_server, cfg.smtp_port, timeout=SMTP_TIMEOUT_SECONDS)
+        try:
+            if cfg.use_tls:
+                server.starttls(context=ssl.create_default_context())
+            if cfg.username and cfg.password:
+                server.login(cfg.username, cfg.password)
+        except Exception:
+            _quit(server)
+            raise
+        self.connects += 1
+        return server
+
+    def _acquire(self, cfg: EmailConfig) -> smtplib.SMTP:
+        key = _smtp_key(cfg)
+        stale: List[smtplib.SMTP] = []
+        server = None
+        with self._lock:
+            if key != self._key:
+                stale = [conn for _, conn in self._idle]
+                self._idle.clear()
+                self._key = key
+            now = time.monotonic()
+            while self._idle and server is None:
+                last_used, conn = self._idle.pop()
+                if now - last_used < self.idle_seconds:
+                    server = conn
+                else:
+                    stale.append(conn)
+        for conn in stale:
+            _quit(conn)
+        return server or self._connect(cfg)
+
+    def _release(self, cfg: EmailConfig, server: smtplib.SMTP) -> None:
+        with self._lock:
+            if _smtp_key(cfg) == self._key and len(self._idle) < self.size:
+                self._idle.append((time.monotonic(), server))
+                return
+        _quit(server)
+
+    def send(self, cfg: EmailConfig, to_address: str, message: str) -> None:
+        """Send one message; a dropped pooled connection is reopened once."""
+        with self._slots:
+            server = self._acquire(cfg)
+            try:
+                server.sendmail(cfg.from_address, to_address, message)
+            except smtplib.SMTPServerDisconnected:
+                _quit(server)
+                server = self._connect(cfg)
+                try:
+                    server.sendmail(cfg.from_address, to_address, message)
+                except Exception:
+                    _quit(server)
+                    raise
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused) as exc:
+                # Соединение исправно — вернуть в пул; сообщение не доставить
+                self._release(cfg, server)
+                raise PermanentDeliveryError(str(exc)) from exc
+            except Exception:
+                _quit(server)
+                raise
+            self._release(cfg, server)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for _, conn in idle:
+            _quit(conn)
+
+
+def _quit(server: smtplib.SMTP) -> None:
+    try:
+        server.quit()
+    except Exception:
+        try:
+            server.close()
+        except Exception:
+            pass
+
+
+def build_email(cfg: EmailConfig, to_address: str, subject: str, body_html: str) -> str:
+    """MIME message (HTML, UTF-8) as a string for sendmail."""
+    msg = MIMEMultipart("alternative")
+    msg["From"] = cfg.from_address
+    msg["To"] = to_address
+    msg["Subject"] = subject
+    msg.attach(MIMEText(body_html, "html", "utf-8"))
+    return msg.as_string()
+
+
+# ----------------------------------------------------------------------
+# Dispatcher
+# ----------------------------------------------------------------------
+
+
+class NotificationDispatcher:
+    """Очередь исходящих уведомлений с повторами и dead-letter."""
+
+    def __init__(
+        self,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        workers: int = DEFAULT_DELIVERY_WORKERS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        dead_letter_path: Optional[str] = None,
+        backoff_base: float = RETRY_BACKOFF_BASE,
+        backoff_cap: float = RETRY_BACKOFF_CAP,
+        smtp_pool: Optional[SMTPPool] = None,
+    ):
+        """
+        Args:
+            queue_size: Максимум сообщений в очереди (сверх — в dead-letter)
+            workers: Корутин доставки
+            max_attempts: Попыток на сообщение
+            dead_letter_path: JSONL недоставленных (по умолчанию NOTIFICATIONS_DEAD_LETTER)
+            backoff_base: Задержка перед первым повтором (сек)
+            backoff_cap: Максимальная задержка перед повтором (сек)
+            smtp_pool: Пул SMTP-соединений
+        """
+        self.queue_size = queue_size
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.dead_letter_path = Path(
+            dead_letter_path or os.getenv("NOTIFICATIONS_DEAD_LETTER", DEFAULT_DEAD_LETTER_PATH)
+        )
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.smtp = smtp_pool or SMTPPool()
+        self.delivered = 0
+        self.dead_lettered = 0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._retries: Dict[str, Tuple[asyncio.TimerHandle, OutboundMessage]] = {}
+        self._waiters: Dict[str, asyncio.Future] = {}
+        self._http = None
+        self._dead_letter_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def _ensure_started(self) -> asyncio.Queue:
+        """Queue and workers of the running loop (recreated if the loop changed)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Прежний loop (тесты, перезапуск) мёртв: его задачи и сессия недоступны
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._retries.clear()
+            self._waiters.clear()
+            self._http = None
+            self._tasks = [loop.create_task(self._worker(i)) for i in range(self.workers)]
+        return self._queue
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """
+        Stop delivery: wait up to timeout for queued messages, dead-letter the
+        rest (including scheduled retries), close HTTP session and SMTP connections.
+        """
+        if self._loop is asyncio.get_running_loop() and self._queue is not None:
+            pending = list(self._waiters.values())
+            if pending:
+                await asyncio.wait(pending, timeout=timeout)
+
+            for handle, message in list(self._retries.values()):
+                handle.cancel()
+                self._dead_letter(message, "shutdown")
+            self._retries.clear()
+            while not self._queue.empty():
+                self._dead_letter(self._queue.get_nowait(), "shutdown")
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            if self._http is not None:
+                await self._http.close()
+
+        self._loop = self._queue = self._http = None
+        self._tasks = []
+        self._waiters.clear()
+        await asyncio.to_thread(self.smtp.close)
+
+    # ------------------------------------------------------------------
+    # Submit / wait
+    # ------------------------------------------------------------------
+
+    def submit(self, message: OutboundMessage) -> bool:
+        """
+        Enqueue a message without blocking.
+
+        Returns:
+            False if the queue is full (the message goes to dead-letter).
+        """
+        queue = self._ensure_started()
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning("notification_queue_full", kind=message.kind, session_id=message.session_id)
+            self._dead_letter(message, "queue_full")
+            return False
+        self._waiters[message.message_id] = self._loop.create_future()
+        return True
+
+    async def wait(self, message_ids: Iterable[str], timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the messages are delivered or dead-lettered.
+
+        Returns:
+            True if all were delivered.
+        """
+        futures = [self._waiters[mid] for mid in message_ids if mid in self._waiters]
+        if not futures:
+            return True
+        done, _ = await asyncio.wait(futures, timeout=timeout)
+        return len(done) == len(futures) and all(f.result() for f in done)
+
+    @property
+    def pending(self) -> int:
+        """Messages queued, in delivery or waiting for a retry."""
+        return len(self._waiters)
+
+    # ------------------------------------------------------------------
+    # Delivery
+    # ------------------------------------------------------------------
+
+    async def _worker(self, slot: int) -> None:
+        queue = self._queue
+        while True:
+            message = await queue.get()
+            try:
+                await self._attempt(message)
+            except Exception as exc:  # не роняем доставщика
+                logger.error("notification_worker_error", slot=slot, error=str(exc))
+            finally:
+                queue.task_done()
+
+    async def _attempt(self, message: OutboundMessage) -> None:
+        message.attempts += 1
+        log = logger.bind(
+            kind=message.kind, notification_event=message.event,
+            session_id=message.session_id, attempt=message.attempts,
+        )
+        try:
+            if message.kind == "email":
+                await self._send_email(message)
+            elif message.kind == "webhook":
+                await self._send_webhook(message)
+            else:
+                raise PermanentDeliveryError(f"unknown message kind: {message.kind}")
+        except PermanentDeliveryError as exc:
+            message.last_error = str(exc)
+            log.error("notification_rejected", error=str(exc))
+            self._dead_letter(message, "rejected")
+            return
+        except Exception as exc:
+            message.last_error = f"{type(exc).__name__}: {exc}"
+            if message.attempts >= self.max_attempts:
+                log.error("notification_failed", error=message.last_error)
+                self._dead_letter(message, "max_attempts")
+                return
+            delay = backoff_delay(message.attempts, self.backoff_base, self.backoff_cap)
+            log.warning("notification_retry_scheduled", error=message.last_error, retry_in=delay)
+            self._schedule_retry(message, delay)
+            return
+
+        self.delivered += 1
+        log.info("notification_delivered", target=message.target)
+        self._resolve(message, True)
+
+    def _schedule_retry(self, message: OutboundMessage, delay: float) -> None:
+        def _requeue():
+            self._retries.pop(message.message_id, None)
+            try:
+                self._queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._dead_letter(message, "queue_full")
+
+        handle = self._loop.call_later(delay, _requeue)
+        self._retries[message.message_id] = (handle, message)
+
+    async def _send_email(self, message: OutboundMessage) -> None:
+        cfg = load_notification_config(message.config_path).email
+        mime = build_email(cfg, message.target, message.subject, message.body)
+        await asyncio.to_thread(self.smtp.send, cfg, message.target, mime)
+
+    async def _send_webhook(self, message: OutboundMessage) -> None:
+        import aiohttp
+
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession()
+        timeout_seconds = (
+            load_notification_config(message.config_path).webhooks.timeout_seconds
+            if message.config_path else 10
+        )
+        async with self._http.post(
+            message.target,
+            data=message.body.encode("utf-8"),
+            headers=message.headers,
+            timeout=aiohttp.ClientTimeout(total=timeout_seconds),
+        ) as resp:
+            if resp.status < 300:
+                return
+            if resp.status >= 500 or resp.status in _RETRYABLE_HTTP:
+                raise RuntimeError(f"webhook returned HTTP {resp.status}")
+            raise PermanentDeliveryError(f"webhook returned HTTP {resp.status}")
+
+    def _resolve(self, message: OutboundMessage, delivered: bool) -> None:
+        waiter = self._waiters.pop(message.message_id, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(delivered)
+
+    # ------------------------------------------------------------------
+    # Dead-letter
+    # ------------------------------------------------------------------
+
+    def _dead_letter(self, message: OutboundMessage, reason: str) -> None:
+        self.dead_lettered += 1
+        entry = message.to_dict()
+        entry["reason"] = reason
+        entry["failed_at"] = datetime.now(timezone.utc).isoformat()
+        try:
+            with self._dead_letter_lock:
+                self.dead_letter_path.parent.mkdir(parents=True, exist_ok=True)
+                with self.dead_letter_path.open("ab") as f:
+                    f.write(dumps_bytes(entry) + b"\n")
+        except OSError as exc:
+            logger.error("notification_dead_letter_write_failed", error=str(exc), path=str(self.dead_letter_path))
+        logger.warning(
+            "notification_dead_lettered", reason=reason, kind=message.kind,
+            session_id=message.session_id, attempts=message.attempts,
+        )
+        self._resolve(message, False)
+
+    def read_dead_letters(self) -> List[Dict[str, Any]]:
+        """Entries of the dead-letter file (oldest first)."""
+        try:
+            lines = self.dead_letter_path.read_bytes().splitlines()
+        except FileNotFoundError:
+            return []
+        return [loads(line) for line in lines if line.strip()]
+
+    def replay_dead_letters(self) -> int:
+        """Requeue dead-lettered messages with fresh attempts; returns how many were queued."""
+        return len(self._requeue_dead_letters())
+
+    async def redeliver_dead_letters(self, timeout: Optional[float] = None) -> Tuple[int, int]:
+        """
+        Replay the dead-letter file in the running loop and wait for delivery.
+
+        Entry point for operators (scripts/run_jobs.py --replay-dead-letters):
+        messages that fail again go back to the dead-letter file.
+
+        Returns:
+            (queued, delivered)
+        """
+        message_ids = self._requeue_dead_letters()
+        if not message_ids:
+            return 0, 0
+        futures = [self._waiters[mid] for mid in message_ids if mid in self._waiters]
+        if futures:
+            await asyncio.wait(futures, timeout=timeout)
+        delivered = sum(1 for f in futures if f.done() and f.result())
+        logger.info("notification_dead_letters_redelivered", queued=len(message_ids), delivered=delivered)
+        return len(message_ids), delivered
+
+    def _requeue_dead_letters(self) -> List[str]:
+        with self._dead_letter_lock:
+            entries = self.read_dead_letters()
+            self.dead_letter_path.unlink(missing_ok=True)
+        queued = []
+        for entry in entries:
+            message = OutboundMessage.from_dict(entry)
+            message.attempts = 0
+            if self.submit(message):
+                queued.append(message.message_id)
+        logger.info("notification_dead_letters_replayed", total=len(entries), queued=len(queued))
+        return queued
+
+
+_dispatcher: Optional[NotificationDispatcher] = None
+
+
+def get_dispatcher() -> NotificationDispatcher:
+    """Process-wide dispatcher (NOTIFICATIONS_DEAD_LETTER, NOTIFICATION_WORKERS)."""
+    global _dispatcher
+    if _dispatcher is None:
+        try:
+            workers = int(os.getenv("NOTIFICATION_WORKERS", str(DEFAULT_DELIVERY_WORKERS)))
+        except ValueError:
+            workers = DEFAULT_DELIVERY_WORKERS
+        _dispatcher = NotificationDispatcher(workers=workers)
+    return _dispatcher
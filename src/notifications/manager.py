@@ -5,28 +5,30 @@ Sends email notifications to the manager when an anketa is confirmed,
 optionally sends session links to clients, and triggers webhook events.
 
 All notification methods are async and designed to be fire-and-forget:
-they log success/failure but never raise exceptions to the caller.
+they build the message, hand it to the delivery queue
+(src/notifications/delivery.py) and never raise exceptions to the caller.
+Delivery, retries and the dead-letter file are handled by the dispatcher.
 """
 
-import asyncio
 import hashlib
 import hmac
-import json
 import os
-import smtplib
-import ssl
 from datetime import datetime, timezone
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
 from pathlib import Path
 from typing import Any, Dict, Optional
 
 import structlog
-import yaml
 
 from html import escape as _html_escape
 
+from src.notifications.delivery import (
+    NotificationDispatcher,
+    OutboundMessage,
+    get_dispatcher,
+    load_notification_config,
+)
 from src.notifications.models import NotificationConfig
+from src.serialization import dumps_bytes
 
 logger = structlog.get_logger("notifications")
 
@@ -64,93 +66,117 @@ webhooks:
 class NotificationManager:
     """Manages email and webhook notifications for consultation sessions.
 
+    Cheap to construct: the config is cached per file (re-read when it
+    changes) and all managers share the process-wide dispatcher.
+
     Usage::
 
         notifier = NotificationManager()
         await notifier.on_session_confirmed(session)
     """
 
-    def __init__(self, config_path: str = DEFAULT_CONFIG_PATH) -> None:
+    def __init__(
+        self,
+        config_path: str = DEFAULT_CONFIG_PATH,
+        dispatcher: Optional[NotificationDispatcher] = None,
+    ) -> None:
         self.config_path = Path(config_path)
-        self.config = self._load_config()
+        self.dispatcher = dispatcher or get_dispatcher()
+        # Создаёт файл с настройками по умолчанию, если его нет
+        self._load_config()
 
     # ------------------------------------------------------------------
     # Config loading
     # ------------------------------------------------------------------
 
+    @property
+    def config(self) -> NotificationConfig:
+        """Current config (cached; picks up edits of the YAML file)."""
+        return self._load_config()
+
     def _load_config(self) -> NotificationConfig:
         """Load notification config from YAML, creating a default file if absent."""
-        if not self.config_path.exists():
-            logger.info(
-                "notifications_config_not_found",
-                path=str(self.config_path),
-                action="creating_default",
-            )
-            self.config_path.parent.mkdir(parents=True, exist_ok=True)
-            self.config_path.write_text(_DEFAULT_CONFIG_YAML, encoding="utf-8")
-            return NotificationConfig()
-
-        try:
-            raw = yaml.safe_load(self.config_path.read_text(encoding="utf-8")) or {}
-            return NotificationConfig(**raw)
-        except Exception as exc:
-            logger.error("notifications_config_load_error", error=str(exc))
-            return NotificationConfig()
+        return load_notification_config(str(self.config_path), _DEFAULT_CONFIG_YAML)
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
-    async def on_session_confirmed(self, session: Any) -> None:
+    async def on_session_confirmed(
+        self, session: Any, wait: bool = False, timeout: Optional[float] = None
+    ) -> bool:
         """Called when an anketa is confirmed.
 
-        Triggers manager email and on_confirm webhook in parallel-safe manner.
-        Errors are caught and logged; the caller is never blocked.
+        Queues manager email and on_confirm webhook. Errors are caught and
+        logged; the caller is never blocked unless ``wait`` is set.
+
+        Args:
+            wait: Wait until the messages are delivered or dead-lettered
+                (durable job steps: the step ends when delivery is settled).
+            timeout: Max seconds to wait.
+
+        Returns:
+            False if waited and some message was not delivered.
         """
         logger.info(
             "notification_session_confirmed",
             session_id=getattr(session, "session_id", None),
         )
 
-        await self.send_manager_notification(session)
-        await self.trigger_webhook("on_confirm", session)
-
-    async def send_manager_notification(self, session: Any) -> None:
-        """Send an email to the manager with the anketa summary."""
+        message_ids = [
+            mid for mid in (
+                await self.send_manager_notification(session),
+                await self.trigger_webhook("on_confirm", session),
+            ) if mid
+        ]
+        if wait and message_ids:
+            return await self.dispatcher.wait(message_ids, timeout=timeout)
+        return True
+
+    def _submit(self, message: OutboundMessage) -> Optional[str]:
+        message.config_path = str(self.config_path)
+        return message.message_id if self.dispatcher.submit(message) else None
+
+    async def send_manager_notification(self, session: Any) -> Optional[str]:
+        """Queue an email to the manager with the anketa summary.
+
+        Returns:
+            Message ID in the delivery queue, or None if skipped/failed.
+        """
         email_cfg = self.config.email
         if not email_cfg.enabled:
             logger.debug("manager_email_skipped", reason="email_disabled")
-            return
+            return None
 
         try:
             company = getattr(session, "company_name", None) or "Без названия"
             subject = email_cfg.manager_subject.format(company_name=company)
             body = self._build_manager_email_body(session)
 
-            await asyncio.to_thread(
-                self._send_email,
-                to_address=email_cfg.manager_email,
-                subject=subject,
-                body_html=body,
-            )
+            message_id = self._submit(OutboundMessage.email(
+                email_cfg.manager_email, subject, body,
+                event="manager_email", session_id=getattr(session, "session_id", None),
+            ))
             logger.info(
-                "manager_email_sent",
+                "manager_email_queued",
                 to=email_cfg.manager_email,
                 session_id=getattr(session, "session_id", None),
             )
+            return message_id
         except Exception as exc:
             logger.error(
                 "manager_email_failed",
                 error=str(exc),
                 session_id=getattr(session, "session_id", None),
             )
+            return None
 
-    async def send_client_link(self, email: str, session: Any) -> None:
-        """Send the unique session link to the client."""
+    async def send_client_link(self, email: str, session: Any) -> Optional[str]:
+        """Queue the unique session link to the client."""
         email_cfg = self.config.email
         if not email_cfg.enabled:
             logger.debug("client_email_skipped", reason="email_disabled")
-            return
+            return None
 
         try:
             unique_link = getattr(session, "unique_link", "")
@@ -159,46 +185,49 @@ class NotificationManager:
 
             body = self._build_client_email_body(session, unique_link)
 
-            await asyncio.to_thread(
-                self._send_email,
-                to_address=email,
-                subject=subject,
-                body_html=body,
-            )
+            message_id = self._submit(OutboundMessage.email(
+                email, subject, body,
+                event="client_link", session_id=getattr(session, "session_id", None),
+            ))
             logger.info(
-                "client_email_sent",
+                "client_email_queued",
                 to=email,
                 session_id=getattr(session, "session_id", None),
             )
+            return message_id
         except Exception as exc:
             logger.error(
                 "client_email_failed",
                 error=str(exc),
                 session_id=getattr(session, "session_id", None),
             )
+            return None
 
-    async def trigger_webhook(self, event_type: str, session: Any) -> None:
-        """POST session data to the configured webhook URL.
+    async def trigger_webhook(self, event_type: str, session: Any) -> Optional[str]:
+        """Queue a POST of session data to the configured webhook URL.
 
-        Includes ``X-Webhook-Signature`` header (HMAC-SHA256 of body).
+        Includes ``X-Webhook-Signature`` header (HMAC-SHA256 of body) and
+        ``X-Webhook-Id`` (same on retries, for receiver-side deduplication).
         """
         wh_cfg = self.config.webhooks
         if not wh_cfg.enabled:
             logger.debug("webhook_skipped", reason="webhooks_disabled")
-            return
+            return None
 
         url = getattr(wh_cfg, event_type, "")
         if not url:
             logger.debug("webhook_skipped", reason="no_url", event_type=event_type)
-            return
+            return None
 
         try:
-            import aiohttp
-
             payload = self._build_webhook_payload(event_type, session)
-            body_bytes = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+            # created_at и прочие datetime — в формате str(dt), как раньше
+            body_bytes = dumps_bytes(payload, default=str)
 
-            headers: Dict[str, str] = {"Content-Type": "application/json"}
+            message = OutboundMessage.webhook(
+                url, body_bytes, {}, event=event_type, session_id=getattr(session, "session_id", None),
+            )
+            headers: Dict[str, str] = {"Content-Type": "application/json", "X-Webhook-Id": message.message_id}
 
             if wh_cfg.secret:
                 signature = hmac.new(
@@ -207,23 +236,16 @@ class NotificationManager:
                     hashlib.sha256,
                 ).hexdigest()
                 headers["X-Webhook-Signature"] = signature
+            message.headers = headers
 
-            timeout = aiohttp.ClientTimeout(total=wh_cfg.timeout_seconds)
-
-            async with aiohttp.ClientSession(timeout=timeout) as http:
-                async with http.post(url, data=body_bytes, headers=headers) as resp:
-                    logger.info(
-                        "webhook_triggered",
-                        event_type=event_type,
-                        url=url,
-                        status=resp.status,
-                        session_id=getattr(session, "session_id", None),
-                    )
-        except ImportError:
-            logger.warning(
-                "webhook_aiohttp_missing",
-                detail="Install aiohttp to enable webhook support: pip install aiohttp",
+            message_id = self._submit(message)
+            logger.info(
+                "webhook_queued",
+                event_type=event_type,
+                url=url,
+                session_id=getattr(session, "session_id", None),
             )
+            return message_id
         except Exception as exc:
             logger.error(
                 "webhook_failed",
@@ -232,34 +254,12 @@ class NotificationManager:
                 error=str(exc),
                 session_id=getattr(session, "session_id", None),
             )
+            return None
 
     # ------------------------------------------------------------------
     # Email helpers
     # ------------------------------------------------------------------
 
-    def _send_email(self, to_address: str, subject: str, body_html: str) -> None:
-        """Send an email via SMTP (synchronous, called from async context)."""
-        email_cfg = self.config.email
-
-        msg = MIMEMultipart("alternative")
-        msg["From"] = email_cfg.from_address
-        msg["To"] = to_address
-        msg["Subject"] = subject
-        msg.attach(MIMEText(body_html, "html", "utf-8"))
-
-        if email_cfg.use_tls:
-            context = ssl.create_default_context()
-            with smtplib.SMTP(email_cfg.smtp_server, email_cfg.smtp_port, timeout=30) as server:
-                server.starttls(context=context)
-                if email_cfg.username and email_cfg.password:
-                    server.login(email_cfg.username, email_cfg.password)
-                server.sendmail(email_cfg.from_address, to_address, msg.as_string())
-        else:
-            with smtplib.SMTP(email_cfg.smtp_server, email_cfg.smtp_port, timeout=30) as server:
-                if email_cfg.username and email_cfg.password:
-                    server.login(email_cfg.username, email_cfg.password)
-                server.sendmail(email_cfg.from_address, to_address, msg.as_string())
-
     def _build_manager_email_body(self, session: Any) -> str:
         """Build an HTML email body with the anketa summary for the manager."""
         # R6-04: Escape all user-provided data to prevent HTML injection
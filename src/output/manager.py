@@ -12,7 +12,6 @@ Output Manager - управление структурой папки output/.
             └── ...
 """
 
-import json
 import re
 import unicodedata
 from datetime import datetime, timezone
@@ -21,6 +20,8 @@ from typing import Any, Dict, List, Optional
 
 import structlog
 
+from src.serialization import dumps_bytes
+
 logger = structlog.get_logger("output")
 
 
@@ -107,10 +108,7 @@ class OutputManager:
                 return obj.isoformat()
             raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
 
-        json_path.write_text(
-            json.dumps(anketa_json, ensure_ascii=False, indent=2, default=json_serializer),
-            encoding="utf-8"
-        )
+        json_path.write_bytes(dumps_bytes(anketa_json, indent=True, default=json_serializer))
 
         logger.info(
             "Anketa saved",
@@ -7,11 +7,14 @@ Research Engine Module.
 - RAG (Azure Cognitive Search)
 """
 
+from src.research.cache import ResearchCache, get_research_cache
 from src.research.engine import ResearchEngine, ResearchResult
 from src.research.website_parser import WebsiteParser
 from src.research.web_search import WebSearchClient
 
 __all__ = [
+    "ResearchCache",
+    "get_research_cache",
     "ResearchEngine",
     "ResearchResult",
     "WebsiteParser",
@@ -0,0 +1,247 @@
+"""
+Research Cache.
+
+Дисковый кэш результатов исследования (SQLite) с TTL:
+- website  — данные сайта клиента по нормализованному домену (+ ETag/Last-Modified)
+- search   — результаты веб-поиска по отрасли
+- insights — синтезированные LLM инсайты
+
+Перед диском стоит небольшой in-memory LRU, поэтому повторное исследование
+тех же клиентов и отраслей в пределах процесса не трогает даже SQLite.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import structlog
+
+logger = structlog.get_logger("research")
+
+WEBSITE = "website"
+SEARCH = "search"
+INSIGHTS = "insights"
+
+# TTL по умолчанию (секунды)
+DEFAULT_TTLS: Dict[str, float] = {
+    WEBSITE: 3 * 24 * 3600,
+    SEARCH: 7 * 24 * 3600,
+    INSIGHTS: 7 * 24 * 3600,
+}
+
+# Устаревшие записи хранятся ещё столько времени для ревалидации по ETag
+_STALE_RETENTION = 30 * 24 * 3600
+_MEMORY_ENTRIES = 256
+
+
+@dataclass
+class CacheEntry:
+    """Запись кэша."""
+
+    value: Any
+    expires_at: float
+    validators: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+
+def normalize_domain(url: str) -> str:
+    """Ключ сайта: хост в нижнем регистре без www и порта."""
+    if "://" not in url:
+        url = f"https://{url}"
+    host = (urlparse(url).hostname or "").lower().rstrip(".")
+    return host[4:] if host.startswith("www.") else host
+
+
+def normalize_industry(industry: str) -> str:
+    """Ключ отрасли: без регистра и лишних пробелов."""
+    return " ".join(industry.lower().split())
+
+
+def make_key(*parts: Any) -> str:
+    """Стабильный хэш-ключ для составных входных данных (например, промпта синтеза)."""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResearchCache:
+    """
+    TTL-кэш результатов исследования в SQLite с in-memory LRU.
+
+    Thread-safe (одно соединение под RLock, как в SessionManager).
+    """
+
+    def __init__(
+        self,
+        db_path: str = "data/research_cache.db",
+        ttls: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Args:
+            db_path: Путь к файлу SQLite (директория создаётся автоматически)
+            ttls: Переопределение TTL по пространствам имён
+        """
+        self.db_path = db_path
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._memory: "OrderedDict[Tuple[str, str], CacheEntry]" = OrderedDict()
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS research_cache (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                validators TEXT,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, namespace: str, key: str) -> Optional[CacheEntry]:
+        """
+        Получить запись (в том числе устаревшую — для ревалидации).
+
+        Returns:
+            CacheEntry или None, если записи нет
+        """
+        mem_key = (namespace, key)
+        with self._lock:
+            entry = self._memory.get(mem_key)
+            if entry is not None:
+                self._memory.move_to_end(mem_key)
+                return entry
+
+            row = self._conn.execute(
+                "SELECT value, validators, expires_at FROM research_cache "
+                "WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+            if row is None:
+                return None
+            try:
+                entry = CacheEntry(
+                    value=json.loads(row[0]),
+                    expires_at=row[2],
+                    validators=json.loads(row[1]) if row[1] else {},
+                )
+            except (TypeError, ValueError):
+                logger.warning("research_cache_corrupt_entry", namespace=namespace, key=key)
+                return None
+            self._remember(mem_key, entry)
+            return entry
+
+    def get_fresh(self, namespace: str, key: str) -> Optional[Any]:
+        """Значение, если запись есть и не истекла."""
+        entry = self.get(namespace, key)
+        if entry is not None and entry.is_fresh:
+            return entry.value
+        return None
+
+    def set(
+        self,
+        namespace: str,
+        key: str,
+        value: Any,
+        validators: Optional[Dict[str, str]] = None,
+        ttl: Optional[float] = None,
+    ) -> None:
+        """Сохранить значение (должно сериализоваться в JSON)."""
+        now = time.time()
+        ttl = self.ttls.get(namespace, DEFAULT_TTLS[SEARCH]) if ttl is None else ttl
+        entry = CacheEntry(value=value, expires_at=now + ttl, validators=dict(validators or {}))
+        try:
+            payload = json.dumps(value, ensure_ascii=False, default=str)
+        except (TypeError, ValueError) as e:
+            logger.warning("research_cache_unserializable", namespace=namespace, error=str(e))
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO research_cache "
+                "(namespace, key, value, validators, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    namespace, key, payload,
+                    json.dumps(entry.validators) if entry.validators else None,
+                    now, entry.expires_at,
+                ),
+            )
+            self._conn.commit()
+            self._remember((namespace, key), entry)
+
+    def touch(self, namespace: str, key: str, ttl: Optional[float] = None) -> None:
+        """Продлить TTL записи (например, после ответа 304 Not Modified)."""
+        ttl = self.ttls.get(namespace, DEFAULT_TTLS[SEARCH]) if ttl is None else ttl
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._conn.execute(
+                "UPDATE research_cache SET expires_at = ? WHERE namespace = ? AND key = ?",
+                (expires_at, namespace, key),
+            )
+            self._conn.commit()
+            entry = self._memory.get((namespace, key))
+            if entry is not None:
+                entry.expires_at = expires_at
+
+    def purge_expired(self, retention: float = _STALE_RETENTION) -> int:
+        """Удалить записи, истёкшие более retention секунд назад."""
+        cutoff = time.time() - retention
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM research_cache WHERE expires_at < ?", (cutoff,)
+            )
+            self._conn.commit()
+            self._memory = OrderedDict(
+                (k, v) for k, v in self._memory.items() if v.expires_at >= cutoff
+            )
+            return cursor.rowcount
+
+    def close(self) -> None:
+        """Закрыть соединение с БД."""
+        with self._lock:
+            self._conn.close()
+
+    def _remember(self, mem_key: Tuple[str, str], entry: CacheEntry) -> None:
+        self._memory[mem_key] = entry
+        self._memory.move_to_end(mem_key)
+        while len(self._memory) > _MEMORY_ENTRIES:
+            self._memory.popitem(last=False)
+
+
+_default_cache: Optional[ResearchCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_research_cache() -> ResearchCache:
+    """Общий для процесса кэш исследований (data/research_cache.db).
+
+    При первом открытии удаляет давно истёкшие записи, иначе файл растёт
+    от сессии к сессии без ограничений.
+    """
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                cache = ResearchCache()
+                try:
+                    removed = cache.purge_expired()
+                    if removed:
+                        logger.info("research_cache_purged", removed=removed)
+                except sqlite3.Error as e:
+                    logger.warning("research_cache_purge_failed", error=str(e))
+                _default_cache = cache
+    return _default_cache
@@ -13,6 +13,15 @@ from urllib.parse import urlparse
 from pydantic import BaseModel, Field
 import structlog
 
+from src.research.cache import (
+    INSIGHTS,
+    SEARCH,
+    WEBSITE,
+    ResearchCache,
+    make_key,
+    normalize_domain,
+    normalize_industry,
+)
 from src.research.website_parser import WebsiteParser
 from src.research.web_search import WebSearchClient
 from src.llm.factory import create_llm_client
@@ -70,6 +79,10 @@ class ResearchEngine:
     - Website Parser: анализ сайта клиента
     - Web Search: поиск информации об отрасли
     - RAG: похожие кейсы из базы знаний (TODO)
+
+    С ResearchCache результаты парсинга сайта (по домену, с ревалидацией
+    по ETag/Last-Modified), веб-поиска (по отрасли) и синтеза переиспользуются
+    между сессиями.
     """
 
     def __init__(
@@ -78,7 +91,8 @@ class ResearchEngine:
         web_search_client: Optional[WebSearchClient] = None,
         enable_web_search: bool = True,
         enable_website_parser: bool = True,
-        enable_rag: bool = False  # TODO: реализовать
+        enable_rag: bool = False,  # TODO: реализовать
+        cache: Optional[ResearchCache] = None,
     ):
         """
         Инициализация Research Engine.
@@ -89,6 +103,7 @@ class ResearchEngine:
             enable_web_search: Включить веб-поиск
             enable_website_parser: Включить парсинг сайтов
             enable_rag: Включить RAG (Azure Cognitive Search)
+            cache: Кэш результатов (None — без кэширования)
         """
         self.deepseek = deepseek_client or create_llm_client()
         self.web_search = web_search_client or WebSearchClient()
@@ -97,6 +112,7 @@ class ResearchEngine:
         self.enable_web_search = enable_web_search
         self.enable_website_parser = enable_website_parser
         self.enable_rag = enable_rag
+        self.cache = cache
 
     async def research(
         self,
@@ -167,14 +183,40 @@ class ResearchEngine:
         """Парсить сайт клиента."""
         if not self._is_safe_url(url):
             return {"type": "website", "error": "URL blocked by security policy"}
+
+        key = normalize_domain(url)
+        entry = self.cache.get(WEBSITE, key) if self.cache and key else None
+        if entry is not None and entry.is_fresh:
+            return {"type": "website", "data": entry.value}
+
         try:
-            data = await self.website_parser.parse(url)
-            return {"type": "website", "data": data}
+            # Обход главной + страниц услуг/цен/контактов в рамках бюджета времени
+            if entry is not None and entry.validators:
+                data = await self.website_parser.parse_multiple_pages(
+                    url, validators=entry.validators
+                )
+            else:
+                data = await self.website_parser.parse_multiple_pages(url)
         except Exception as e:
             return {"type": "website", "error": str(e)}
 
+        if entry is not None and data.get("not_modified"):
+            self.cache.touch(WEBSITE, key)
+            return {"type": "website", "data": entry.value}
+
+        validators = data.pop("validators", None)
+        if self.cache and key and "error" not in data:
+            self.cache.set(WEBSITE, key, data, validators=validators)
+        return {"type": "website", "data": data}
+
     async def _search_industry(self, industry: str) -> Dict[str, Any]:
         """Поиск информации об отрасли."""
+        key = normalize_industry(industry)
+        if self.cache:
+            cached = self.cache.get_fresh(SEARCH, key)
+            if cached is not None:
+                return {"type": "web_search", "data": cached}
+
         try:
             queries = [
                 f"{industry} голосовой агент автоматизация",
@@ -187,6 +229,9 @@ class ResearchEngine:
                 results = await self.web_search.search(query, max_results=3)
                 all_results.extend(results)
 
+            # Пустой ответ (нет API-ключей / сбой) не кэшируем
+            if self.cache and all_results:
+                self.cache.set(SEARCH, key, all_results)
             return {"type": "web_search", "data": all_results}
         except Exception as e:
             return {"type": "web_search", "error": str(e)}
@@ -223,6 +268,15 @@ class ResearchEngine:
         context: Optional[str]
     ) -> ResearchResult:
         """Синтезировать инсайты из собранных данных."""
+        cache_key = make_key(
+            normalize_industry(industry or ""), result.website_data, context
+        )
+        if self.cache:
+            cached = self.cache.get_fresh(INSIGHTS, cache_key)
+            if cached is not None:
+                self._apply_insights(result, cached)
+                return result
+
         prompt = f"""Проанализируй собранные данные об отрасли и бизнесе.
 
 ОТРАСЛЬ: {industry or 'не указана'}
@@ -262,10 +316,13 @@ class ResearchEngine:
 
             data = json.loads(json_text)
 
-            result.industry_insights = data.get("industry_insights", [])
-            result.best_practices = data.get("best_practices", [])
-            result.compliance_notes = data.get("compliance_notes", [])
-            result.confidence_score = 0.8
+            self._apply_insights(result, data)
+            if self.cache:
+                self.cache.set(INSIGHTS, cache_key, {
+                    "industry_insights": result.industry_insights,
+                    "best_practices": result.best_practices,
+                    "compliance_notes": result.compliance_notes,
+                })
 
         except Exception as e:
             # R16-10: Log synthesis failures instead of silently swallowing
@@ -274,3 +331,11 @@ class ResearchEngine:
             )
 
         return result
+
+    @staticmethod
+    def _apply_insights(result: ResearchResult, data: Dict[str, Any]) -> None:
+        """Перенести синтезированные инсайты в ResearchResult."""
+        result.industry_insights = data.get("industry_insights", [])
+        result.best_practices = data.get("best_practices", [])
+        result.compliance_notes = data.get("compliance_notes", [])
+        result.confidence_score = 0.8
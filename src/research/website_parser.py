@@ -4,17 +4,59 @@ Website Parser.
 Парсинг сайтов клиентов для извлечения информации.
 """
 
+import asyncio
 import ipaddress
 import re
 import socket
-from typing import Any, Dict, List, Optional
-from urllib.parse import urljoin, urlparse
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urldefrag, urlparse
 
 import httpx
+import structlog
+
+logger = structlog.get_logger("research")
 
 # R9-18: Maximum response size (5 MB) to prevent OOM
 _MAX_RESPONSE_SIZE = 5 * 1024 * 1024
 
+# Обход сайта: ключевые слова в URL/тексте ссылки → тип страницы.
+# Порядок групп задаёт приоритет при выборе страниц для обхода.
+_CRAWL_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "prices": (
+        "price", "pricing", "tarif", "tariff", "ceny", "tseny", "prais", "prajs",
+        "stoimost", "цены", "прайс", "тариф", "стоимость",
+    ),
+    "services": (
+        "service", "uslugi", "usluga", "catalog", "katalog", "product",
+        "услуги", "услуга", "каталог", "продукц", "направлен",
+    ),
+    "contacts": ("contact", "kontakt", "контакт", "feedback"),
+    "about": ("about", "o-nas", "o_nas", "o-kompanii", "company", "о нас", "о компании"),
+}
+
+# Ссылки на файлы и служебные страницы не обходим
+_SKIP_LINK_RE = re.compile(
+    r'\.(?:pdf|jpe?g|png|gif|svg|webp|zip|rar|docx?|xlsx?|mp4|mp3)(?:$|\?)'
+    r'|^(?:mailto|tel|javascript|whatsapp):',
+    re.IGNORECASE,
+)
+_LINK_RE = re.compile(
+    r'<a\b[^>]*?href=["\']([^"\'#][^"\']*)["\'][^>]*>(.*?)</a>',
+    re.IGNORECASE | re.DOTALL,
+)
+_NOISE_RE = re.compile(r'<(script|style|noscript)\b[^>]*>.*?</\1>', re.IGNORECASE | re.DOTALL)
+_PRICE_RE = re.compile(
+    r'(?:от\s+)?\d[\d\s\u00a0]{0,9}(?:[.,]\d{1,2})?\s?(?:₽|руб\.?|р\.|\$|€|EUR|USD|RUB|тг|₸|сум)',
+    re.IGNORECASE,
+)
+_ADDRESS_RE = re.compile(
+    r'(?:г\.\s?[А-ЯЁ][а-яё\-]+,?\s*)?'
+    r'(?:ул\.|улица|пр-т|проспект|пер\.|переулок|наб\.|набережная|шоссе|бульвар|б-р)'
+    r'\s?[А-ЯЁA-Z0-9][^<>\n]{2,60}?\d+[а-яА-Я]?',
+)
+
 
 def _is_safe_url(url: str) -> bool:
     """R9-03: Reject private/internal IPs and non-HTTP schemes to prevent SSRF.
@@ -52,17 +94,36 @@ def _is_safe_url(url: str) -> bool:
 class WebsiteParser:
     """Парсер веб-сайтов."""
 
-    def __init__(self, timeout: float = 30.0):
+    def __init__(
+        self,
+        timeout: float = 30.0,
+        client: Optional[httpx.AsyncClient] = None,
+        max_pages: int = 8,
+        crawl_budget: float = 15.0,
+        per_host_concurrency: int = 3,
+        politeness_delay: float = 0.2,
+    ):
         """
         Инициализация парсера.
 
         Args:
             timeout: Таймаут запросов в секундах
+            client: Общий httpx.AsyncClient (follow_redirects=False); если не
+                задан, на каждый обход создаётся собственный пул соединений
+            max_pages: Максимум страниц при обходе сайта (включая главную)
+            crawl_budget: Общий бюджет времени на обход сайта в секундах
+            per_host_concurrency: Максимум одновременных запросов к одному хосту
+            politeness_delay: Минимальный интервал между запросами к хосту
         """
         self.timeout = timeout
         self.headers = {
             "User-Agent": "Mozilla/5.0 (compatible; VoiceInterviewerBot/1.0)"
         }
+        self._client = client
+        self.max_pages = max_pages
+        self.crawl_budget = crawl_budget
+        self.per_host_concurrency = per_host_concurrency
+        self.politeness_delay = politeness_delay
 
     async def parse(self, url: str) -> Dict[str, Any]:
         """
@@ -75,40 +136,96 @@ class WebsiteParser:
             Словарь с извлечённой информацией
         """
         # Нормализуем URL
-        if not url.startswith(('http://', 'https://')):
-            url = f"https://{url}"
+        url = self._normalize_url(url)
 
         # R9-03: SSRF protection — reject internal/private URLs
         if not _is_safe_url(url):
             return {"error": "URL points to a private/internal address", "url": url}
 
+        async with self._client_context() as client:
+            fetched = await self._fetch(client, url)
+        if "error" in fetched:
+            return fetched
+
+        return self._extract_page(fetched["html"], fetched["url"])
+
+    @staticmethod
+    def _normalize_url(url: str) -> str:
+        """Добавить схему к «голому» домену."""
+        if not url.startswith(('http://', 'https://')):
+            url = f"https://{url}"
+        return url
+
+    @asynccontextmanager
+    async def _client_context(self, **limits: int) -> AsyncIterator[httpx.AsyncClient]:
+        """HTTP-клиент: внешний (переданный в конструктор) или временный на один обход."""
+        if self._client is not None:
+            yield self._client
+            return
+        kwargs: Dict[str, Any] = {"timeout": self.timeout, "follow_redirects": False}
+        if limits:
+            kwargs["limits"] = httpx.Limits(**limits)
+        async with httpx.AsyncClient(**kwargs) as client:
+            yield client
+
+    async def _fetch(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        limiter: Optional["_HostLimiter"] = None,
+        validators: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """Загрузить одну страницу с SSRF-проверкой каждого редиректа.
+
+        Args:
+            validators: {"etag": ..., "last_modified": ...} для условного GET
+
+        Returns:
+            {"url": финальный URL, "html": ..., "validators": {...}},
+            {"url": ..., "not_modified": True} на 304 или {"error": ..., "url": ...}
+        """
+        headers = self.headers
+        if validators:
+            headers = dict(self.headers)
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
         # R21-18: Validate each redirect hop for SSRF (don't blindly follow_redirects)
-        async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=False) as client:
-            try:
-                response = None
-                for _hop in range(5):
-                    response = await client.get(url, headers=self.headers)
-                    if response.status_code in (301, 302, 303, 307, 308):
-                        location = response.headers.get("location", "")
-                        # R22-02: Resolve relative URLs before SSRF check
-                        url = urljoin(url, location)
-                        if not _is_safe_url(url):
-                            return {"error": "Redirect to unsafe URL blocked", "url": url}
-                    else:
-                        break
-                response.raise_for_status()
-                # R9-18: Limit response size to prevent OOM
-                content_length = int(response.headers.get('content-length', 0))
-                if content_length > _MAX_RESPONSE_SIZE:
-                    return {"error": "Response too large", "url": url}
-                html = response.text
-                if len(html) > _MAX_RESPONSE_SIZE:
-                    html = html[:_MAX_RESPONSE_SIZE]
-            except Exception as e:
-                return {"error": str(e), "url": url}
-
-        # Извлекаем данные
-        result = {
+        try:
+            response = None
+            for _hop in range(5):
+                if limiter is not None:
+                    async with limiter.slot(url):
+                        response = await client.get(url, headers=headers)
+                else:
+                    response = await client.get(url, headers=headers)
+                if response.status_code in (301, 302, 303, 307, 308):
+                    location = response.headers.get("location", "")
+                    # R22-02: Resolve relative URLs before SSRF check
+                    url = urljoin(url, location)
+                    if not _is_safe_url(url):
+                        return {"error": "Redirect to unsafe URL blocked", "url": url}
+                else:
+                    break
+            if validators and response.status_code == 304:
+                return {"url": url, "not_modified": True}
+            response.raise_for_status()
+            # R9-18: Limit response size to prevent OOM
+            content_length = int(response.headers.get('content-length', 0))
+            if content_length > _MAX_RESPONSE_SIZE:
+                return {"error": "Response too large", "url": url}
+            html = response.text
+            if len(html) > _MAX_RESPONSE_SIZE:
+                html = html[:_MAX_RESPONSE_SIZE]
+        except Exception as e:
+            return {"error": str(e), "url": url}
+        return {"url": url, "html": html, "validators": _response_validators(response)}
+
+    def _extract_page(self, html: str, url: str) -> Dict[str, Any]:
+        """Извлечь данные из HTML одной страницы."""
+        return {
             "url": url,
             "title": self._extract_title(html),
             "description": self._extract_meta_description(html),
@@ -117,8 +234,6 @@ class WebsiteParser:
             "social_links": self._extract_social_links(html, url),
         }
 
-        return result
-
     def _extract_title(self, html: str) -> Optional[str]:
         """Извлечь title страницы."""
         match = re.search(r'<title[^>]*>([^<]+)</title>', html, re.IGNORECASE)
@@ -215,17 +330,238 @@ class WebsiteParser:
 
         return social
 
-    async def parse_multiple_pages(self, base_url: str, max_pages: int = 3) -> Dict[str, Any]:
+    def _extract_prices(self, html: str) -> List[str]:
+        """Извлечь упоминания цен (число + валюта)."""
+        text = re.sub(r'<[^>]+>', ' ', _NOISE_RE.sub(' ', html))
+        prices: List[str] = []
+        for match in _PRICE_RE.finditer(text):
+            value = re.sub(r'[\s\u00a0]+', ' ', match.group(0)).strip()
+            if value not in prices:
+                prices.append(value)
+            if len(prices) >= 10:
+                break
+        return prices
+
+    def _extract_address(self, html: str) -> Optional[str]:
+        """Извлечь почтовый адрес (российский формат «ул. …, д.»)."""
+        text = re.sub(r'<[^>]+>', ' ', _NOISE_RE.sub(' ', html))
+        match = _ADDRESS_RE.search(text)
+        if match:
+            return re.sub(r'\s+', ' ', match.group(0)).strip(' ,')
+        return None
+
+    def _discover_links(self, html: str, page_url: str) -> List[str]:
+        """Найти на странице ссылки того же сайта на услуги, цены, контакты, «о нас».
+
+        Returns:
+            URL в порядке приоритета (цены → услуги → контакты → о компании)
         """
-        Парсить несколько страниц сайта.
+        origin = _site_key(page_url)
+        ranked: List[Tuple[int, int, str]] = []
+        seen = set()
+        groups = list(_CRAWL_KEYWORDS.values())
+
+        for position, match in enumerate(_LINK_RE.finditer(html)):
+            href = match.group(1).strip()
+            if _SKIP_LINK_RE.search(href):
+                continue
+            link, _ = urldefrag(urljoin(page_url, href))
+            if _site_key(link) != origin or link.rstrip('/') == page_url.rstrip('/'):
+                continue
+            if link in seen:
+                continue
+            haystack = (urlparse(link).path + " " + re.sub(r'<[^>]+>', ' ', match.group(2))).lower()
+            for rank, keywords in enumerate(groups):
+                if any(keyword in haystack for keyword in keywords):
+                    seen.add(link)
+                    ranked.append((rank, position, link))
+                    break
+
+        ranked.sort()
+        return [link for _, _, link in ranked]
+
+    @staticmethod
+    def _merge_page(result: Dict[str, Any], page: Dict[str, Any]) -> None:
+        """Дополнить сводный результат данными со страницы (без перезаписи)."""
+        for key in ("title", "description"):
+            if not result.get(key) and page.get(key):
+                result[key] = page[key]
+        for key, limit in (("services", 20), ("prices", 20)):
+            merged = result.setdefault(key, [])
+            for item in page.get(key, []):
+                if item not in merged and len(merged) < limit:
+                    merged.append(item)
+        for key in ("contacts", "social_links"):
+            merged = result.setdefault(key, {})
+            for name, value in (page.get(key) or {}).items():
+                if value and not merged.get(name):
+                    merged[name] = value
+
+    @staticmethod
+    def _is_complete(result: Dict[str, Any]) -> bool:
+        """Собраны ли ключевые поля — тогда обход можно прекратить досрочно."""
+        contacts = result.get("contacts") or {}
+        return bool(
+            contacts.get("phone")
+            and contacts.get("email")
+            and contacts.get("address")
+            and len(result.get("services", [])) >= 5
+            and result.get("prices")
+        )
+
+    async def parse_multiple_pages(
+        self,
+        base_url: str,
+        max_pages: Optional[int] = None,
+        time_budget: Optional[float] = None,
+        validators: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Обойти несколько страниц сайта и объединить данные.
+
+        С главной страницы берутся ссылки того же сайта на услуги, цены,
+        контакты и «о компании»; они загружаются параллельно через общий пул
+        соединений с лимитом запросов на хост. Обход останавливается по
+        исчерпании бюджета времени или как только собраны ключевые поля.
 
         Args:
             base_url: Базовый URL
-            max_pages: Максимум страниц
+            max_pages: Максимум страниц (по умолчанию self.max_pages)
+            time_budget: Бюджет времени в секундах (по умолчанию self.crawl_budget)
+            validators: ETag/Last-Modified главной страницы из кэша; если сайт
+                ответил 304, обход не выполняется
 
         Returns:
-            Объединённые данные
+            Объединённые данные (поля parse() + prices, pages и validators)
+            либо {"url": ..., "not_modified": True}
         """
-        # Простая реализация — парсим только главную
-        # TODO: Добавить обход ссылок
-        return await self.parse(base_url)
+        max_pages = self.max_pages if max_pages is None else max_pages
+        time_budget = self.crawl_budget if time_budget is None else time_budget
+
+        url = self._normalize_url(base_url)
+        # R9-03: SSRF protection — reject internal/private URLs
+        if not _is_safe_url(url):
+            return {"error": "URL points to a private/internal address", "url": url}
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + time_budget
+        limiter = _HostLimiter(self.per_host_concurrency, self.politeness_delay)
+
+        async with self._client_context(
+            max_connections=self.per_host_concurrency * 2,
+            max_keepalive_connections=self.per_host_concurrency,
+        ) as client:
+            try:
+                home = await asyncio.wait_for(
+                    self._fetch(client, url, limiter, validators), timeout=time_budget
+                )
+            except asyncio.TimeoutError:
+                return {"error": "Crawl time budget exceeded", "url": url}
+            if "error" in home or home.get("not_modified"):
+                return home
+
+            result = self._extract_page(home["html"], home["url"])
+            self._fill_page_extras(result, home["html"])
+            result["pages"] = [home["url"]]
+            result["validators"] = home["validators"]
+
+            links = self._discover_links(home["html"], home["url"])[:max(max_pages - 1, 0)]
+            if not links or self._is_complete(result):
+                return result
+
+            pending = {
+                asyncio.create_task(self._crawl_page(client, link, limiter))
+                for link in links
+            }
+            try:
+                while pending:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        logger.info("crawl_budget_exhausted", url=url, pages=len(result["pages"]))
+                        break
+                    done, pending = await asyncio.wait(
+                        pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        page = task.result()
+                        if page is None:
+                            continue
+                        self._merge_page(result, page)
+                        result["pages"].append(page["url"])
+                    if self._is_complete(result):
+                        logger.info("crawl_complete_early", url=url, pages=len(result["pages"]))
+                        break
+            finally:
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    await asyncio.gather(*pending, return_exceptions=True)
+
+        return result
+
+    def _fill_page_extras(self, page: Dict[str, Any], html: str) -> None:
+        """Поля, которые собираются только при обходе сайта."""
+        page["prices"] = self._extract_prices(html)
+        if not page["contacts"].get("address"):
+            page["contacts"]["address"] = self._extract_address(html)
+
+    async def _crawl_page(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        limiter: "_HostLimiter",
+    ) -> Optional[Dict[str, Any]]:
+        """Загрузить и разобрать вложенную страницу; ошибки не прерывают обход."""
+        # Ссылка со страницы может вести на соседний хост (www./без www, другой
+        # порт) с приватным адресом — проверяем так же, как стартовый URL
+        if not _is_safe_url(url):
+            logger.debug("crawl_page_unsafe_url", url=url)
+            return None
+        fetched = await self._fetch(client, url, limiter)
+        if "error" in fetched:
+            logger.debug("crawl_page_failed", url=url, error=fetched["error"])
+            return None
+        page = self._extract_page(fetched["html"], fetched["url"])
+        self._fill_page_extras(page, fetched["html"])
+        return page
+
+
+def _response_validators(response: httpx.Response) -> Dict[str, str]:
+    """ETag / Last-Modified ответа для последующей ревалидации кэша."""
+    validators = {}
+    for header, key in (("etag", "etag"), ("last-modified", "last_modified")):
+        value = response.headers.get(header)
+        if isinstance(value, str) and value:
+            validators[key] = value
+    return validators
+
+
+def _site_key(url: str) -> str:
+    """Ключ «того же сайта»: хост без www (схема http/https не различается)."""
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class _HostLimiter:
+    """Ограничение параллелизма и частоты запросов к одному хосту."""
+
+    def __init__(self, concurrency: int, delay: float):
+        self._concurrency = max(concurrency, 1)
+        self._delay = delay
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._last_start: Dict[str, float] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        host = _site_key(url)
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self._concurrency))
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with semaphore:
+            # Politeness: разносим начала запросов к хосту на self._delay
+            async with lock:
+                wait = self._last_start.get(host, 0.0) + self._delay - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._last_start[host] = time.monotonic()
+            yield
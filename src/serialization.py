@@ -0,0 +1,90 @@
+"""
+Центральная JSON-сериализация: orjson, если установлен, иначе stdlib json.
+
+Используется на горячих путях: колонки SessionManager (SQLite), ответы API,
+HTTP-запросы голосового агента к веб-серверу, файлы анкет, вебхуки.
+
+Совместимость со stdlib:
+- Юникод не экранируется (как ensure_ascii=False)
+- default=... получает datetime/dataclass так же, как в json.dumps
+- Нестроковые ключи (int, bool, None) приводятся к строкам
+- Ошибки: TypeError при кодировании, json.JSONDecodeError при разборе
+"""
+
+import json
+from typing import Any, Callable, Optional, Union
+
+from starlette.responses import JSONResponse
+
+try:
+    import orjson  # Optional: в 3-10 раз быстрее stdlib json
+except ImportError:
+    orjson = None
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson else 0
+# С default= datetime/dataclass отдаются в default, как в stdlib json
+_ORJSON_PASSTHROUGH = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS) if orjson else 0
+
+
+def dumps_bytes(
+    obj: Any,
+    *,
+    indent: bool = False,
+    default: Optional[Callable[[Any], Any]] = None,
+) -> bytes:
+    """
+    Serialize obj to UTF-8 JSON bytes.
+
+    Args:
+        obj: Object to serialize
+        indent: Pretty-print with 2-space indent
+        default: Fallback for unsupported types (as in json.dumps)
+    """
+    if orjson is not None:
+        option = _ORJSON_OPTIONS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if default is not None:
+            option |= _ORJSON_PASSTHROUGH
+        try:
+            return orjson.dumps(obj, default=default, option=option)
+        except orjson.JSONEncodeError:
+            # Целые > 64 бит и прочие случаи, которые stdlib умеет
+            pass
+    return _stdlib_dumps(obj, indent, default).encode("utf-8")
+
+
+def dumps(
+    obj: Any,
+    *,
+    indent: bool = False,
+    default: Optional[Callable[[Any], Any]] = None,
+) -> str:
+    """Serialize obj to a JSON string (for TEXT columns and files)."""
+    if orjson is None:
+        return _stdlib_dumps(obj, indent, default)
+    return dumps_bytes(obj, indent=indent, default=default).decode("utf-8")
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    """Parse JSON from str or bytes."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # NaN/Infinity и большие целые orjson не принимает — проверяем stdlib
+            pass
+    return json.loads(data)
+
+
+def _stdlib_dumps(obj: Any, indent: bool, default: Optional[Callable[[Any], Any]]) -> str:
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2, default=default)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=default)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered through dumps_bytes (orjson when available)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
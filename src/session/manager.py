@@ -6,22 +6,43 @@ Stores dialogue_history and anketa_data as JSON text in SQLite columns.
 Thread-safe with check_same_thread=False.
 """
 
-import json
 import sqlite3
 import threading
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, List, Optional
 
 import structlog
 
+from src import serialization
 from src.session.models import ConsultationSession, SessionStatus, VALID_STATUSES
 from src.session.status import validate_transition
 from src.session.exceptions import InvalidTransitionError
 
 logger = structlog.get_logger("session")
 
+# Слушатель изменений: (session_id, event, data); event — "anketa" | "dialogue" | "status" | "metadata"
+SessionListener = Callable[[str, str, dict], None]
+
+
+def compute_completion_rate(anketa_data: Optional[dict], session_id: str = None) -> float:
+    """completion_rate of anketa_data (FinalAnketa or InterviewAnketa), 0.0 if invalid."""
+    if not anketa_data:
+        return 0.0
+    try:
+        from src.anketa.schema import FinalAnketa, InterviewAnketa
+
+        # Detect anketa type
+        if anketa_data.get('anketa_type') == 'interview':
+            anketa = InterviewAnketa(**anketa_data)
+        else:
+            anketa = FinalAnketa(**anketa_data)
+        return anketa.completion_rate()
+    except Exception as e:
+        logger.warning("completion_rate_calc_failed", error=str(e), session_id=session_id)
+        return 0.0
+
 
 class SessionManager:
     """
@@ -61,8 +82,36 @@ class SessionManager:
         # Run database migrations
         self._run_migrations()
 
+        # Подписчики на изменения сессий (push-обновления в веб-сервере)
+        self._listeners: List[SessionListener] = []
+
         logger.info("session_manager_initialized", db_path=db_path)
 
+    def add_listener(self, listener: SessionListener) -> None:
+        """
+        Subscribe to committed session changes.
+
+        Listeners are called synchronously after each successful commit
+        (possibly while the manager lock is held), so they must be fast and
+        must not call back into the manager. Adding the same listener twice
+        is a no-op.
+        """
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: SessionListener) -> None:
+        """Unsubscribe a listener added with add_listener()."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, session_id: str, event: str, data: dict) -> None:
+        """Call listeners; a failing listener never breaks the write path."""
+        for listener in list(self._listeners):
+            try:
+                listener(session_id, event, data)
+            except Exception as e:
+                logger.warning("session_listener_failed", session_id=session_id, change=event, error=str(e))
+
     def _create_table(self):
         """Create the sessions table if it doesn't exist."""
         self._conn.execute("""
@@ -79,35 +128,52 @@ class SessionManager:
                 company_name TEXT,
                 contact_name TEXT,
                 duration_seconds REAL NOT NULL DEFAULT 0.0,
-                output_dir TEXT
+                output_dir TEXT,
+                anketa_version INTEGER NOT NULL DEFAULT 0,
+                completion_rate REAL NOT NULL DEFAULT 0.0
             )
         """)
         self._conn.commit()
 
-        # Migration: add document_context column for existing DBs
-        try:
-            self._conn.execute("SELECT document_context FROM sessions LIMIT 1")
-        except sqlite3.OperationalError as e:
-            if "no such column" in str(e).lower():
-                self._conn.execute("ALTER TABLE sessions ADD COLUMN document_context TEXT")
-                self._conn.commit()
-                logger.info("migration_added_document_context_column")
-            else:
-                raise
-
-        # Migration: add voice_config column for existing DBs
-        try:
-            self._conn.execute("SELECT voice_config FROM sessions LIMIT 1")
-        except sqlite3.OperationalError as e:
-            if "no such column" in str(e).lower():
-                self._conn.execute("ALTER TABLE sessions ADD COLUMN voice_config TEXT")
-                self._conn.commit()
-                logger.info("migration_added_voice_config_column")
-            else:
-                raise
+        # Migrations: add columns for existing DBs
+        for column, ddl in (
+            ("document_context", "TEXT"),
+            ("voice_config", "TEXT"),
+            # Версия анкеты (ETag) и completion_rate, посчитанный при записи
+            ("anketa_version", "INTEGER NOT NULL DEFAULT 0"),
+            ("completion_rate", "REAL NOT NULL DEFAULT 0.0"),
+        ):
+            try:
+                self._conn.execute(f"SELECT {column} FROM sessions LIMIT 1")
+            except sqlite3.OperationalError as e:
+                if "no such column" in str(e).lower():
+                    self._conn.execute(f"ALTER TABLE sessions ADD COLUMN {column} {ddl}")
+                    self._conn.commit()
+                    logger.info(f"migration_added_{column}_column")
+                    if column == "completion_rate":
+                        self._backfill_completion_rates()
+                else:
+                    raise
 
         logger.debug("sessions_table_ensured")
 
+    def _backfill_completion_rates(self):
+        """Fill the new completion_rate column for sessions that already have an anketa."""
+        rows = self._conn.execute(
+            "SELECT session_id, anketa_data FROM sessions WHERE anketa_data IS NOT NULL"
+        ).fetchall()
+        for row in rows:
+            try:
+                anketa_data = serialization.loads(row["anketa_data"])
+            except (TypeError, ValueError):
+                continue
+            self._conn.execute(
+                "UPDATE sessions SET completion_rate = ? WHERE session_id = ?",
+                (compute_completion_rate(anketa_data, row["session_id"]), row["session_id"]),
+            )
+        self._conn.commit()
+        logger.info("migration_backfilled_completion_rate", count=len(rows))
+
     def _run_migrations(self):
         """Run database migrations for status normalization and schema updates."""
         try:
@@ -133,15 +199,17 @@ class SessionManager:
             status=row["status"],
             created_at=datetime.fromisoformat(row["created_at"]),
             updated_at=datetime.fromisoformat(row["updated_at"]),
-            dialogue_history=json.loads(row["dialogue_history"]),
-            anketa_data=json.loads(row["anketa_data"]) if row["anketa_data"] else None,
+            dialogue_history=serialization.loads(row["dialogue_history"]),
+            anketa_data=serialization.loads(row["anketa_data"]) if row["anketa_data"] else None,
             anketa_md=row["anketa_md"],
-            document_context=json.loads(row["document_context"]) if row["document_context"] else None,
-            voice_config=json.loads(row["voice_config"]) if row["voice_config"] else None,
+            document_context=serialization.loads(row["document_context"]) if row["document_context"] else None,
+            voice_config=serialization.loads(row["voice_config"]) if row["voice_config"] else None,
             company_name=row["company_name"],
             contact_name=row["contact_name"],
             duration_seconds=row["duration_seconds"],
             output_dir=row["output_dir"],
+            anketa_version=row["anketa_version"],
+            completion_rate=row["completion_rate"],
         )
 
     def create_session(self, room_name: str = "", voice_config: dict = None) -> ConsultationSession:
@@ -190,14 +258,14 @@ class SessionManager:
                             session.status,
                             session.created_at.isoformat(),
                             session.updated_at.isoformat(),
-                            json.dumps(session.dialogue_history, ensure_ascii=False),
+                            serialization.dumps(session.dialogue_history),
                             None,  # anketa_data
                             None,  # anketa_md
                             None,  # company_name
                             None,  # contact_name
                             session.duration_seconds,
                             None,  # output_dir
-                            json.dumps(voice_config, ensure_ascii=False) if voice_config else None,
+                            serialization.dumps(voice_config) if voice_config else None,
                         ),
                     )
                     self._conn.commit()
@@ -301,6 +369,17 @@ class SessionManager:
 
         session.updated_at = datetime.now(timezone.utc)
 
+        # Версия анкеты растёт только при изменении анкеты
+        anketa_changed = existing is None or (
+            existing.anketa_data != session.anketa_data or existing.anketa_md != session.anketa_md
+        )
+        if anketa_changed:
+            session.completion_rate = compute_completion_rate(session.anketa_data, session.session_id)
+            session.anketa_version = (existing.anketa_version if existing else session.anketa_version) + 1
+        elif existing is not None:
+            session.completion_rate = existing.completion_rate
+            session.anketa_version = existing.anketa_version
+
         cursor = self._conn.execute(
             """
             UPDATE sessions SET
@@ -316,7 +395,9 @@ class SessionManager:
                 contact_name = ?,
                 duration_seconds = ?,
                 output_dir = ?,
-                voice_config = ?
+                voice_config = ?,
+                anketa_version = ?,
+                completion_rate = ?
             WHERE session_id = ?
             """,
             (
@@ -324,15 +405,17 @@ class SessionManager:
                 session.unique_link,
                 session.status,
                 session.updated_at.isoformat(),
-                json.dumps(session.dialogue_history, ensure_ascii=False),
-                json.dumps(session.anketa_data, ensure_ascii=False) if session.anketa_data else None,
+                serialization.dumps(session.dialogue_history),
+                serialization.dumps(session.anketa_data) if session.anketa_data else None,
                 session.anketa_md,
-                json.dumps(session.document_context, ensure_ascii=False) if session.document_context else None,
+                serialization.dumps(session.document_context) if session.document_context else None,
                 session.company_name,
                 session.contact_name,
                 session.duration_seconds,
                 session.output_dir,
-                json.dumps(session.voice_config, ensure_ascii=False) if session.voice_config else None,
+                serialization.dumps(session.voice_config) if session.voice_config else None,
+                session.anketa_version,
+                session.completion_rate,
                 session.session_id,
             ),
         )
@@ -342,6 +425,14 @@ class SessionManager:
             logger.warning("session_update_no_rows", session_id=session.session_id)
             return False
 
+        self._notify(session.session_id, "anketa", {
+            "anketa_data": session.anketa_data or {},
+            "anketa_md": session.anketa_md,
+            "updated_at": session.updated_at.isoformat(),
+            "anketa_version": session.anketa_version,
+            "completion_rate": session.completion_rate,
+        })
+        self._notify(session.session_id, "status", {"status": session.status})
         logger.info("session_updated", session_id=session.session_id)
         return True
 
@@ -412,45 +503,46 @@ class SessionManager:
         existing_anketa = copy.deepcopy(session.anketa_data) if session.anketa_data else {}
         self._deep_merge(existing_anketa, anketa_data)
 
+        # Ничего не изменилось — не трогаем строку, версия (ETag) остаётся прежней
+        if existing_anketa == (session.anketa_data or {}) and anketa_md in (None, session.anketa_md):
+            logger.debug("session_anketa_unchanged", session_id=session_id)
+            return True
+
         # 3. Update database with merged data
         # R4-14: Only overwrite anketa_md if a new value is provided
         now = datetime.now(timezone.utc)
-        if anketa_md is not None:
-            cursor = self._conn.execute(
-                """
-                UPDATE sessions SET
-                    anketa_data = ?,
-                    anketa_md = ?,
-                    updated_at = ?
-                WHERE session_id = ?
-                """,
-                (
-                    json.dumps(existing_anketa, ensure_ascii=False),
-                    anketa_md,
-                    now.isoformat(),
-                    session_id,
-                ),
-            )
-        else:
-            cursor = self._conn.execute(
-                """
-                UPDATE sessions SET
-                    anketa_data = ?,
-                    updated_at = ?
-                WHERE session_id = ?
-                """,
-                (
-                    json.dumps(existing_anketa, ensure_ascii=False),
-                    now.isoformat(),
-                    session_id,
-                ),
-            )
+        completion_rate = compute_completion_rate(existing_anketa, session_id)
+        cursor = self._conn.execute(
+            """
+            UPDATE sessions SET
+                anketa_data = ?,
+                anketa_md = COALESCE(?, anketa_md),
+                updated_at = ?,
+                anketa_version = anketa_version + 1,
+                completion_rate = ?
+            WHERE session_id = ?
+            """,
+            (
+                serialization.dumps(existing_anketa),
+                anketa_md,
+                now.isoformat(),
+                completion_rate,
+                session_id,
+            ),
+        )
         self._conn.commit()
 
         if cursor.rowcount == 0:
             logger.warning("session_anketa_update_no_rows", session_id=session_id)
             return False
 
+        self._notify(session_id, "anketa", {
+            "anketa_data": existing_anketa,
+            "anketa_md": anketa_md,
+            "updated_at": now.isoformat(),
+            "anketa_version": session.anketa_version + 1,
+            "completion_rate": completion_rate,
+        })
         logger.info("session_anketa_updated", session_id=session_id)
         return True
 
@@ -490,7 +582,7 @@ class SessionManager:
                 WHERE session_id = ?
                 """,
                 (
-                    json.dumps(merged, ensure_ascii=False),
+                    serialization.dumps(merged),
                     now.isoformat(),
                     session_id,
                 ),
@@ -654,6 +746,8 @@ class SessionManager:
                 logger.warning("session_status_update_no_rows", session_id=session_id)
                 return False
 
+            self._notify(session_id, "status", {"status": status.value})
+
         logger.info("session_status_updated", session_id=session_id, status=status.value)
         return True
 
@@ -679,7 +773,13 @@ class SessionManager:
                 params,
             )
             self._conn.commit()
-            return cursor.rowcount > 0
+            if cursor.rowcount == 0:
+                return False
+            self._notify(session_id, "metadata", {
+                k: v for k, v in (("company_name", company_name), ("contact_name", contact_name))
+                if v is not None
+            })
+            return True
 
     def update_voice_config(self, session_id: str, config_updates: dict) -> bool:
         """Atomically merge updates into voice_config (R14-06: no full-session overwrite).
@@ -701,7 +801,7 @@ class SessionManager:
             now = datetime.now(timezone.utc)
             cursor = self._conn.execute(
                 "UPDATE sessions SET voice_config = ?, updated_at = ? WHERE session_id = ?",
-                (json.dumps(existing, ensure_ascii=False), now.isoformat(), session_id),
+                (serialization.dumps(existing), now.isoformat(), session_id),
             )
             self._conn.commit()
             return cursor.rowcount > 0
@@ -728,15 +828,62 @@ class SessionManager:
             if validated_status:
                 cursor = self._conn.execute(
                     "UPDATE sessions SET dialogue_history = ?, duration_seconds = ?, status = ?, updated_at = ? WHERE session_id = ?",
-                    (json.dumps(dialogue_history, ensure_ascii=False), duration_seconds, validated_status, now.isoformat(), session_id),
+                    (serialization.dumps(dialogue_history), duration_seconds, validated_status, now.isoformat(), session_id),
                 )
             else:
                 cursor = self._conn.execute(
                     "UPDATE sessions SET dialogue_history = ?, duration_seconds = ?, updated_at = ? WHERE session_id = ?",
-                    (json.dumps(dialogue_history, ensure_ascii=False), duration_seconds, now.isoformat(), session_id),
+                    (serialization.dumps(dialogue_history), duration_seconds, now.isoformat(), session_id),
                 )
             self._conn.commit()
-            return cursor.rowcount > 0
+            if cursor.rowcount == 0:
+                return False
+            self._notify(session_id, "dialogue", {
+                "message_count": len(dialogue_history),
+                "duration_seconds": duration_seconds,
+            })
+            if validated_status:
+                self._notify(session_id, "status", {"status": validated_status})
+            return True
+
+    def get_session_version(self, session_id: str) -> Optional[dict]:
+        """
+        Cheap version lookup for conditional GET (no JSON decoding).
+
+        Every write bumps updated_at; anketa writes also bump anketa_version.
+
+        Returns:
+            {"anketa_version", "updated_at", "status", "company_name"} or None
+            if the session doesn't exist.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT anketa_version, updated_at, status, company_name FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "anketa_version": row["anketa_version"],
+            "updated_at": row["updated_at"],
+            "status": row["status"],
+            "company_name": row["company_name"],
+        }
+
+    def sessions_list_version(self, status: str = None) -> tuple:
+        """
+        Cheap version of the session list for conditional GET: (count, max updated_at).
+
+        Any create/update/delete changes at least one of the two.
+        """
+        with self._lock:
+            if status:
+                row = self._conn.execute(
+                    "SELECT COUNT(*), MAX(updated_at) FROM sessions WHERE status = ?", (status,)
+                ).fetchone()
+            else:
+                row = self._conn.execute("SELECT COUNT(*), MAX(updated_at) FROM sessions").fetchone()
+        return row[0], row[1]
 
     def list_sessions_summary(self, status: str = None, limit: int = 50, offset: int = 0) -> tuple:
         """
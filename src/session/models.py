@@ -72,6 +72,8 @@ class ConsultationSession(BaseModel):
         default=None,
         description="Anketa rendered as Markdown"
     )
+    anketa_version: int = Field(default=0, description="Monotonic anketa revision (bumped on every anketa change)")
+    completion_rate: float = Field(default=0.0, description="Anketa completion rate, computed at write time")
 
     # Documents (uploaded by client during consultation)
     document_context: Optional[Dict[str, Any]] = Field(
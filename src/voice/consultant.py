@@ -22,8 +22,10 @@ import asyncio
 import os
 import sys
 import threading
+import time
 import traceback
 import uuid
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
@@ -35,9 +37,6 @@ _shared_http_client: httpx.AsyncClient | None = None
 # R6-09: Background task reference set (prevent GC of fire-and-forget tasks in agent process)
 _agent_bg_tasks: set = set()
 
-# P4.3: Global extraction semaphore — limits concurrent LLM calls to avoid rate limit cascading
-_extraction_semaphore: asyncio.Semaphore | None = None
-
 
 def _track_agent_task(task):
     """Keep a reference to prevent GC of fire-and-forget asyncio tasks."""
@@ -60,13 +59,17 @@ async def _get_http_client() -> httpx.AsyncClient:
                 _http_client_lock = asyncio.Lock()
     async with _http_client_lock:
         if _shared_http_client is None or _shared_http_client.is_closed:
-            _shared_http_client = httpx.AsyncClient(
-                timeout=10.0,
-                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
-            )
+            _shared_http_client = _new_http_client()
         return _shared_http_client
 
 
+def _new_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=10.0,
+        limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+    )
+
+
 from src.logging_config import setup_logging
 
 setup_logging("agent")
@@ -75,8 +78,10 @@ import structlog
 from livekit.agents import (
     AutoSubscribe,
     JobContext,
+    JobProcess,
     WorkerOptions,
     cli,
+    function_tool,
 )
 from livekit.agents.voice import Agent as VoiceAgent, AgentSession
 from livekit.agents.voice.room_io import RoomInputOptions
@@ -89,8 +94,19 @@ from src.config.prompt_loader import get_prompt
 from src.llm.factory import create_llm_client
 from src.knowledge import IndustryKnowledgeManager, EnrichedContextBuilder
 from src.output import OutputManager
+from src.serialization import dumps, dumps_bytes, loads
 from src.session.manager import SessionManager
 from src.session.models import SessionStatus, RuntimeStatus
+from src.voice.instructions import InstructionComposer
+from src.voice.pipeline import get_extraction_pipeline
+from src.voice.workers import (
+    LOAD_THRESHOLD,
+    RoomLoadReporter,
+    WorkerLoadProbe,
+    heartbeat_url,
+    worker_capacity,
+    worker_id,
+)
 
 # ---------------------------------------------------------------------------
 # Monkey-patch: LiveKit SDK Tee.aclose() crashes on Python 3.14
@@ -140,6 +156,7 @@ class VoiceConsultationSession:
         self._agent_speaking = False  # True while agent is generating speech
         self._pending_instructions = None  # Buffered instructions to apply after speech ends
         self._latest_instructions = None  # R14-03: Track latest desired instructions for read consistency
+        self.instructions = InstructionComposer()  # Секции инструкций агента (base, KB, reminder, review...)
         self.research_done = False  # True after background research launched
         self.current_phase = "discovery"  # discovery → analysis → proposal → refinement
         self.detected_industry_id = None  # Cached industry ID
@@ -147,12 +164,16 @@ class VoiceConsultationSession:
         self._detected_phone: Optional[str] = None  # Last phone used for country detection
         self._cached_extractor = None  # R4-18: reuse AnketaExtractor across extractions
         self._cached_extractor_provider = None  # R17-04: track provider to invalidate on change
+        self._contact_extractor = None  # IncrementalSmartExtractor for the contact fallback
         self._last_extraction_time = 0  # R19-02: timestamp of last successful extraction
         # R23-01: Per-session circuit breaker (was global, blocking all sessions)
         self._extraction_consecutive_failures = 0
         self._extraction_backoff_until = 0.0
         # R23-08: Guard against concurrent finalization on rapid disconnect/reconnect
         self._finalization_started = False
+        self.ended_at: Optional[datetime] = None  # Фиксирует длительность для отложенной финализации
+        self.job_started_at: Optional[float] = None  # perf_counter() входа в entrypoint
+        self.first_speech_ms: Optional[float] = None  # time-to-first-agent-speech
 
     MAX_DIALOGUE_MESSAGES = 500  # R10-09: Prevent unbounded memory growth
 
@@ -177,7 +198,35 @@ class VoiceConsultationSession:
 
     def get_duration_seconds(self) -> float:
         """Получить длительность сессии в секундах."""
-        return (datetime.now(timezone.utc) - self.start_time).total_seconds()
+        end = self.ended_at or datetime.now(timezone.utc)
+        return (end - self.start_time).total_seconds()
+
+    def mark_agent_speech(self) -> Optional[float]:
+        """Record the first agent speech; returns time-to-first-speech (ms) once, None afterwards."""
+        if self.first_speech_ms is not None or self.job_started_at is None:
+            return None
+        self.first_speech_ms = round((time.perf_counter() - self.job_started_at) * 1000, 1)
+        return self.first_speech_ms
+
+    def to_job_payload(self) -> Dict[str, Any]:
+        """Снимок для задачи финализации (переживает перезапуск агента)."""
+        return {
+            "session_id": self.session_id,
+            "room_name": self.room_name,
+            "start_time": self.start_time.isoformat(),
+            "ended_at": (self.ended_at or datetime.now(timezone.utc)).isoformat(),
+            "dialogue_history": self.dialogue_history,
+        }
+
+    @classmethod
+    def from_job_payload(cls, payload: Dict[str, Any]) -> "VoiceConsultationSession":
+        """Восстановить консультацию из снимка to_job_payload()."""
+        consultation = cls(room_name=payload.get("room_name", ""))
+        consultation.session_id = payload["session_id"]
+        consultation.start_time = datetime.fromisoformat(payload["start_time"])
+        consultation.ended_at = datetime.fromisoformat(payload["ended_at"])
+        consultation.dialogue_history = list(payload.get("dialogue_history") or [])
+        return consultation
 
     def get_company_name(self) -> str:
         """Попытаться извлечь название компании из диалога."""
@@ -189,9 +238,102 @@ class VoiceConsultationSession:
         return f"session_{self.session_id}"
 
 
-async def finalize_consultation(consultation: VoiceConsultationSession):
+def _final_extraction_context(db_session) -> tuple:
+    """consultation_type и document_context сессии для финальной экстракции."""
+    consultation_type = "consultation"
+    doc_context = None
+    if db_session and db_session.voice_config:
+        consultation_type = db_session.voice_config.get("consultation_type", "consultation")
+    if db_session and db_session.document_context:
+        try:
+            from src.documents import DocumentContext
+            doc_context = DocumentContext(**db_session.document_context)
+        except Exception:
+            pass
+    return consultation_type, doc_context
+
+
+async def _extract_final_anketa(consultation: VoiceConsultationSession, db_session=None) -> Dict[str, Any]:
+    """
+    Единственная финальная экстракция анкеты по всему диалогу.
+
+    Один вызов extract() — с document_context и экспертным контентом; результат
+    используется и для файлов, и для БД, и для PostgreSQL/уведомлений.
+
+    Returns:
+        {"anketa_data", "anketa_md", "is_fallback"} — JSON-совместимый
+        (сохраняется как результат шага задачи финализации)
+    """
+    consultation_type, doc_context = _final_extraction_context(db_session)
+
+    # R19-03: Reuse cached extractor to avoid redundant LLM client creation
+    # B13-03: Always use DeepSeek for extraction, NOT voice_config's Azure
+    if consultation._cached_extractor:
+        extractor = consultation._cached_extractor
+    else:
+        llm = _create_extraction_llm()
+        extractor = AnketaExtractor(llm)
+
+    anketa = await extractor.extract(
+        dialogue_history=consultation.dialogue_history,
+        duration_seconds=consultation.get_duration_seconds(),
+        document_context=doc_context,
+        consultation_type=consultation_type,
+    )
+    return {
+        "anketa_data": anketa.to_json_dict(),
+        "anketa_md": AnketaGenerator.render_markdown(anketa),
+        # R22-07: fallback-анкета не должна перезаписывать данные в БД
+        "is_fallback": getattr(anketa, '_is_fallback', None) is True,
+    }
+
+
+def _save_final_files(consultation: VoiceConsultationSession, final: Dict[str, Any]) -> None:
+    """Сохранить анкету и диалог в output/ (OutputManager)."""
+    anketa_data = final["anketa_data"]
+    company_name = anketa_data.get("company_name") or consultation.get_company_name()
+
+    output_manager = OutputManager()
+    company_dir = output_manager.get_company_dir(
+        company_name,
+        consultation.start_time
+    )
+
+    anketa_paths = output_manager.save_anketa(company_dir, final["anketa_md"], anketa_data)
+
+    dialogue_path = output_manager.save_dialogue(
+        company_dir=company_dir,
+        dialogue_history=consultation.dialogue_history,
+        company_name=company_name,
+        client_name=anketa_data.get("contact_name") or "Клиент",
+        duration_seconds=consultation.get_duration_seconds(),
+        start_time=consultation.start_time
+    )
+
+    anketa_log.info(
+        "=== FINALIZE DONE ===",
+        session_id=consultation.session_id,
+        output_dir=str(company_dir),
+        anketa_md=str(anketa_paths["md"]),
+        anketa_json=str(anketa_paths["json"]),
+        dialogue=str(dialogue_path)
+    )
+
+
+async def finalize_consultation(
+    consultation: VoiceConsultationSession,
+    final: Optional[Dict[str, Any]] = None,
+) -> Optional[Dict[str, Any]]:
     """
     Генерирует анкету и сохраняет результаты после завершения разговора.
+
+    Args:
+        consultation: Завершённая консультация
+        final: Результат _extract_final_anketa(), если экстракция уже сделана
+               (_finalize_and_save) — тогда только сохраняются файлы
+
+    Returns:
+        Результат финальной экстракции или None (короткий диалог / ошибка)
     """
     anketa_log.info(
         "=== FINALIZE START ===",
@@ -203,66 +345,25 @@ async def finalize_consultation(consultation: VoiceConsultationSession):
     if len(consultation.dialogue_history) < 2:
         anketa_log.info("FINALIZE: Not enough dialogue to generate anketa, skipping")
         consultation.runtime_status = RuntimeStatus.COMPLETED
-        return
-
-    # v5.0: Determine consultation type for routing
-    _ct = "consultation"
-    _fin_session = None
-    try:
-        _fin_session = _session_mgr.get_session(consultation.session_id)
-        if _fin_session and _fin_session.voice_config:
-            _ct = _fin_session.voice_config.get("consultation_type", "consultation")
-    except Exception:
-        pass
+        return None
 
     try:
-        # R19-03: Reuse cached extractor to avoid redundant LLM client creation
-        # B13-03: Always use DeepSeek for extraction, NOT voice_config's Azure
-        if consultation._cached_extractor:
-            extractor = consultation._cached_extractor
-        else:
-            llm = create_llm_client("deepseek")
-            extractor = AnketaExtractor(llm)
-
-        anketa = await extractor.extract(
-            dialogue_history=consultation.dialogue_history,
-            duration_seconds=consultation.get_duration_seconds(),
-            consultation_type=_ct,
-        )
-
-        company_name = anketa.company_name or consultation.get_company_name()
-        anketa_log.info("FINALIZE: Anketa extracted", company=company_name)
-
-        output_manager = OutputManager()
-        company_dir = output_manager.get_company_dir(
-            company_name,
-            consultation.start_time
-        )
-
-        anketa_md = AnketaGenerator.render_markdown(anketa)
-        anketa_json = anketa.model_dump(mode="json")
-
-        anketa_paths = output_manager.save_anketa(company_dir, anketa_md, anketa_json)
-
-        dialogue_path = output_manager.save_dialogue(
-            company_dir=company_dir,
-            dialogue_history=consultation.dialogue_history,
-            company_name=company_name,
-            client_name=anketa.contact_name or "Клиент",
-            duration_seconds=consultation.get_duration_seconds(),
-            start_time=consultation.start_time
-        )
+        if final is None:
+            # v5.0: consultation_type (и document_context) из сессии, если она есть
+            _fin_session = None
+            try:
+                _fin_session = _session_mgr.get_session(consultation.session_id)
+            except Exception:
+                pass
+            final = await _extract_final_anketa(consultation, _fin_session)
+            anketa_log.info(
+                "FINALIZE: Anketa extracted",
+                company=final["anketa_data"].get("company_name") or consultation.get_company_name(),
+            )
 
+        await asyncio.to_thread(_save_final_files, consultation, final)
         consultation.runtime_status = RuntimeStatus.COMPLETED
-
-        anketa_log.info(
-            "=== FINALIZE DONE ===",
-            session_id=consultation.session_id,
-            output_dir=str(company_dir),
-            anketa_md=str(anketa_paths["md"]),
-            anketa_json=str(anketa_paths["json"]),
-            dialogue=str(dialogue_path)
-        )
+        return final
 
     except Exception as e:
         consultation.runtime_status = RuntimeStatus.ERROR
@@ -273,6 +374,7 @@ async def finalize_consultation(consultation: VoiceConsultationSession):
             error_type=type(e).__name__,
             traceback=traceback.format_exc(),
         )
+        return None
 
 
 def get_system_prompt() -> str:
@@ -515,6 +617,137 @@ def _try_get_postgres():
     return None
 
 
+# ---------------------------------------------------------------------------
+# Worker prewarm — ресурсы уровня процесса
+# ---------------------------------------------------------------------------
+# LiveKit держит пул заранее поднятых процессов (num_idle_processes) и вызывает
+# prewarm_fnc в каждом до того, как процессу достанется комната. Всё, что иначе
+# грузилось бы при первом звонке на пути к приветствию и первому извлечению
+# (YAML промптов, индекс KB и карта aliases, страны, HTTP/LLM клиенты, проверка
+# Redis/PostgreSQL), загружается здесь один раз на процесс.
+# ---------------------------------------------------------------------------
+
+# Промпты голосового агента и извлечения анкеты
+_PREWARM_PROMPTS = (
+    "voice/consultant",
+    "voice/interviewer",
+    "voice/review",
+    "anketa/extract",
+    "anketa/expert",
+)
+
+_worker_prewarmed = False
+# Клиент извлечения, созданный в prewarm (с готовым пулом соединений);
+# забирает первая консультация процесса, дальше — create_llm_client()
+_prewarmed_llm = None
+_prewarmed_llm_lock = threading.Lock()
+
+
+def _create_extraction_llm():
+    """DeepSeek client for anketa extraction (the prewarmed one if still unused)."""
+    global _prewarmed_llm
+    with _prewarmed_llm_lock:
+        llm, _prewarmed_llm = _prewarmed_llm, None
+    # B14: Explicit "deepseek" — create_llm_client(None) reads LLM_PROVIDER env which may be "azure"
+    return llm if llm is not None else create_llm_client("deepseek")
+
+
+def _warm_prompts() -> None:
+    for path in _PREWARM_PROMPTS:
+        get_prompt(path)
+
+
+def _warm_knowledge() -> None:
+    from src.knowledge.country_detector import get_country_detector
+
+    _get_kb_manager().matcher.warm()
+    get_country_detector()
+
+
+def _warm_http_clients() -> None:
+    global _shared_http_client, _prewarmed_llm
+    # Клиенты создаются без event loop: пул соединений и SSL-контекст готовы,
+    # сами соединения открываются при первом запросе уже в loop задания
+    if _shared_http_client is None or _shared_http_client.is_closed:
+        _shared_http_client = _new_http_client()
+    with _prewarmed_llm_lock:
+        if _prewarmed_llm is None:
+            llm = create_llm_client("deepseek")
+            if hasattr(llm, "_get_http_client"):
+                llm._get_http_client()
+            _prewarmed_llm = llm
+
+
+def _probe_storage() -> None:
+    _try_get_redis()
+    _try_get_postgres()
+
+
+def warm_worker_resources() -> Dict[str, float]:
+    """
+    Load process-level resources once (idempotent).
+
+    Failures are logged and skipped: the entrypoint falls back to lazy loading.
+    Returns per-step durations in ms.
+    """
+    global _worker_prewarmed
+    timings: Dict[str, float] = {}
+    for name, step in (
+        ("prompts", _warm_prompts),
+        ("knowledge", _warm_knowledge),
+        ("http_clients", _warm_http_clients),
+    ):
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            logger.warning("prewarm_step_failed", step=name, error=str(e))
+        timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+    # Проверки Redis/PostgreSQL ходят в сеть без таймаута подключения — в фоне,
+    # чтобы недоступный хост не сорвал initialize_process_timeout
+    threading.Thread(target=_probe_storage, name="prewarm-storage", daemon=True).start()
+    _worker_prewarmed = True
+    return timings
+
+
+# Нагрузка воркера для LiveKit и heartbeat на веб-сервер (в процессе воркера)
+_load_probe: Optional[WorkerLoadProbe] = None
+
+
+def _worker_load(worker) -> float:
+    """LiveKit load_fnc: occupied room slots of this worker (see src/voice/workers.py)."""
+    global _load_probe
+    if _load_probe is None:
+        # Без AGENT_MAX_ROOMS — стандартная загрузка LiveKit по CPU
+        _load_probe = WorkerLoadProbe(base_load=WorkerOptions.load_fnc)
+    return _load_probe(worker)
+
+
+async def _send_room_load(payload: Dict[str, Any]) -> bool:
+    """POST a job-process load report to the web server (never raises)."""
+    try:
+        client = await _get_http_client()
+        response = await client.post(heartbeat_url(), content=dumps_bytes(payload), headers=_JSON_HEADERS)
+        return response.status_code == 200
+    except Exception as e:
+        logger.debug("room_load_report_failed", room=payload.get("room"), error=str(e))
+        return False
+
+
+def prewarm(proc: JobProcess) -> None:
+    """LiveKit prewarm_fnc: runs once in each job process before it gets a room."""
+    start = time.perf_counter()
+    timings = warm_worker_resources()
+    proc.userdata["prewarm_ms"] = timings
+    logger.info(
+        "worker_prewarmed",
+        pid=os.getpid(),
+        total_ms=round((time.perf_counter() - start) * 1000, 1),
+        **timings,
+    )
+
+
 # ---------------------------------------------------------------------------
 # API Integration - Update anketa via web server API
 # ---------------------------------------------------------------------------
@@ -523,6 +756,10 @@ def _try_get_postgres():
 # Therefore, voice agent MUST use HTTP API to update anketa, not direct DB writes.
 # ---------------------------------------------------------------------------
 
+# Тела запросов кодируются через src.serialization (orjson), а не json= httpx
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
 async def _update_anketa_via_api(
     session_id: str,
     anketa_data: dict,
@@ -547,7 +784,7 @@ async def _update_anketa_via_api(
 
     try:
         client = await _get_http_client()
-        response = await client.put(url, json=payload)
+        response = await client.put(url, content=dumps_bytes(payload), headers=_JSON_HEADERS)
 
         if response.status_code == 200:
             logger.info(
@@ -599,7 +836,7 @@ async def _update_dialogue_via_api(
 
     try:
         client = await _get_http_client()
-        response = await client.put(url, json=payload)
+        response = await client.put(url, content=dumps_bytes(payload), headers=_JSON_HEADERS)
 
         if response.status_code == 200:
             logger.info(
@@ -648,8 +885,10 @@ async def _run_background_research(
 ):
     """Run background research on client's website and inject results."""
     try:
+        from src.research.cache import get_research_cache
         from src.research.engine import ResearchEngine
-        engine = ResearchEngine()
+        # Кэш по домену/отрасли: повторные клиенты и отрасли не требуют сети и LLM
+        engine = ResearchEngine(cache=get_research_cache())
         result = await engine.research(
             website=website,
             industry=industry,
@@ -677,13 +916,10 @@ async def _run_background_research(
         research_context = " | ".join(parts)
         consultation.research_done = True
 
-        # Inject into agent instructions (R19-02: Use _update_instructions_safe for buffering)
+        # Inject into agent instructions (R19-02: buffered during speech via _update_instructions_safe)
         if agent_session is not None:
-            current = getattr(consultation, '_latest_instructions', None) \
-                or getattr(getattr(agent_session, '_activity', None), 'instructions', '') \
-                or get_system_prompt()
-            updated = f"{current}\n\n### Данные исследования:\n{research_context}"
-            await _update_instructions_safe(consultation, agent_session, updated)
+            consultation.instructions.set("research", f"### Данные исследования:\n{research_context}")
+            await _push_instructions(consultation, agent_session)
             anketa_log.info(
                 "research_injected",
                 session_id=session_id,
@@ -1098,6 +1334,60 @@ async def _update_instructions_safe(
         await activity.update_instructions(new_instructions)
 
 
+async def _push_instructions(
+    consultation: VoiceConsultationSession,
+    agent_session: Optional[AgentSession],
+) -> bool:
+    """Send the composed instructions if they changed since the last push.
+
+    Returns True if an update was sent (or buffered during speech).
+    """
+    activity = getattr(agent_session, '_activity', None)
+    if not activity or not hasattr(activity, 'update_instructions'):
+        return False
+    composer = consultation.instructions
+    if not composer.has("base"):
+        # Entrypoint задаёт base при создании агента; иначе агент создан с промптом консультанта
+        composer.ensure_base(get_system_prompt())
+    if not composer.changed:
+        anketa_log.debug("instructions_unchanged", composed_hash=composer.composed_hash)
+        return False
+    digest = composer.composed_hash
+    await _update_instructions_safe(consultation, agent_session, composer.compose())
+    composer.mark_pushed(digest)
+    return True
+
+
+DOCUMENT_SEARCH_TOP_K = 4
+
+
+def _build_document_search_tool(session_id: str):
+    """Function tool for the realtime model: BM25 search over the session's documents.
+
+    The index is built by the web server at upload time (data/doc_index), so
+    documents uploaded mid-session are searchable without re-creating the agent.
+    """
+    async def search_documents(query: str) -> str:
+        """Найти фрагменты документов, загруженных клиентом (прайс-листы, презентации,
+        регламенты). Вызывай, когда клиент спрашивает о ценах, цифрах, условиях или
+        деталях из своих документов.
+
+        Args:
+            query: Вопрос клиента или ключевые слова (последняя реплика клиента)
+        """
+        from src.documents.retrieval import format_hits_for_prompt, get_document_index_store
+
+        hits = await asyncio.to_thread(
+            get_document_index_store().search, session_id, query, DOCUMENT_SEARCH_TOP_K
+        )
+        anketa_log.info("document_search", session_id=session_id, query=query[:80], hits=len(hits))
+        if not hits:
+            return "В документах клиента ничего не найдено по этому запросу."
+        return format_hits_for_prompt(hits)
+
+    return function_tool(search_documents)
+
+
 async def _announce_documents_received(agent_session: AgentSession, doc_ctx: dict):
     """BUG #1 fix: Trigger agent to proactively acknowledge document receipt.
 
@@ -1138,559 +1428,614 @@ async def _announce_documents_received(agent_session: AgentSession, doc_ctx: dic
         logger.warning("failed_to_announce_documents", error=str(e))
 
 
-async def _extract_and_update_anketa(
-    consultation: VoiceConsultationSession,
-    session_id: str,
-    agent_session: Optional[AgentSession] = None,
-):
-    """Extract anketa from current dialogue and update in DB.
+@dataclass
+class _ExtractionSnapshot:
+    """Snapshot stage result: what the LLM call and the later stages read."""
 
-    v5.0: Uses sliding window for performance optimization.
-    - Early conversation (< 12 msgs): full dialogue
-    - Later (>= 12 msgs): last 12 messages only
+    dialogue_history: List[Dict]
+    dialogue_filtered: List[Dict]
+    dialogue_for_extraction: List[Dict]
+    is_windowed: bool
+    db_session: Any
+    doc_context: Any
+    consultation_type: str
+    extractor: AnketaExtractor
 
-    Also injects industry KB context into the voice agent on first extraction
-    (when industry can be detected from dialogue).
-    """
-    import time
-    _semaphore_acquired = False
 
-    # R23-01: Per-session circuit breaker (was global, blocked ALL sessions on single failure)
-    if time.time() < consultation._extraction_backoff_until:
+def _read_extraction_snapshot(
+    consultation: VoiceConsultationSession,
+    session_id: str,
+) -> Optional[_ExtractionSnapshot]:
+    """Stage 1: dialogue window, DB session and extractor (None if too early to extract)."""
+    dialogue_history = consultation.dialogue_history
+
+    # v5.0: КРИТИЧНО - минимум 4 сообщения для quality extraction
+    if len(dialogue_history) < 4:
         anketa_log.debug(
-            "extraction_backoff_active",
+            "extraction_skipped_insufficient_messages",
             session_id=session_id,
-            remaining=round(consultation._extraction_backoff_until - time.time()),
+            message_count=len(dialogue_history),
         )
-        return
-
-    try:
-        dialogue_history = consultation.dialogue_history
+        return None
 
-        # v5.0: КРИТИЧНО - минимум 4 сообщения для quality extraction
-        if len(dialogue_history) < 4:
-            anketa_log.debug(
-                "extraction_skipped_insufficient_messages",
-                session_id=session_id,
-                message_count=len(dialogue_history),
-            )
-            return
+    # ===== FIX #4: FILTER REVIEW PHASE =====
+    dialogue_filtered = _filter_review_phase(dialogue_history)
 
-        # ===== FIX #4: FILTER REVIEW PHASE =====
-        dialogue_filtered = _filter_review_phase(dialogue_history)
+    # ===== SLIDING WINDOW OPTIMIZATION =====
+    try:
+        WINDOW_SIZE = int(os.getenv('EXTRACTION_WINDOW_SIZE', '12'))
+        WINDOW_SIZE = max(4, min(WINDOW_SIZE, 100))  # R26-09: 4 <= window <= 100
+    except (ValueError, TypeError):
+        WINDOW_SIZE = 12  # R18-08: Fallback on invalid env var
 
-        # ===== SLIDING WINDOW OPTIMIZATION =====
-        import os
+    dialogue_for_extraction = dialogue_filtered
+    is_windowed = False
 
-        try:
-            WINDOW_SIZE = int(os.getenv('EXTRACTION_WINDOW_SIZE', '12'))
-            WINDOW_SIZE = max(4, min(WINDOW_SIZE, 100))  # R26-09: 4 <= window <= 100
-        except (ValueError, TypeError):
-            WINDOW_SIZE = 12  # R18-08: Fallback on invalid env var
-
-        dialogue_for_extraction = dialogue_filtered
-        is_windowed = False
-
-        if len(dialogue_filtered) > WINDOW_SIZE:
-            dialogue_for_extraction = dialogue_filtered[-WINDOW_SIZE:]
-            is_windowed = True
-            anketa_log.debug(
-                "using_sliding_window",
-                session_id=session_id,
-                total_messages=len(dialogue_history),
-                filtered_messages=len(dialogue_filtered),
-                window_size=WINDOW_SIZE,
-            )
+    if len(dialogue_filtered) > WINDOW_SIZE:
+        dialogue_for_extraction = dialogue_filtered[-WINDOW_SIZE:]
+        is_windowed = True
+        anketa_log.debug(
+            "using_sliding_window",
+            session_id=session_id,
+            total_messages=len(dialogue_history),
+            filtered_messages=len(dialogue_filtered),
+            window_size=WINDOW_SIZE,
+        )
 
-        # ===== EXTRACTION =====
-        # P4.3: Acquire semaphore to limit concurrent LLM calls
-        global _extraction_semaphore
-        if _extraction_semaphore is None:
-            _max_concurrent = int(os.getenv('MAX_CONCURRENT_EXTRACTIONS', '10'))
-            _extraction_semaphore = asyncio.Semaphore(_max_concurrent)
-
-        _semaphore_acquired = True
-        await _extraction_semaphore.acquire()
-        start_time = time.time()
-
-        # Fetch document_context from DB if client uploaded files
-        doc_context = None
-        db_session = _session_mgr.get_session(session_id)
+    # Fetch document_context from DB if client uploaded files
+    doc_context = None
+    db_session = _session_mgr.get_session(session_id)
 
-        # v5.0: Determine consultation type for routing
-        _consultation_type = "consultation"
-        if db_session and db_session.voice_config:
-            _consultation_type = db_session.voice_config.get("consultation_type", "consultation")
+    # v5.0: Determine consultation type for routing
+    _consultation_type = "consultation"
+    if db_session and db_session.voice_config:
+        _consultation_type = db_session.voice_config.get("consultation_type", "consultation")
 
-        if db_session and db_session.document_context:
+    if db_session and db_session.document_context:
+        try:
+            from src.documents import DocumentContext
+            doc_context = DocumentContext(**db_session.document_context)
+        except Exception:
+            pass  # Use dict fallback — extractor handles both
+
+    # R4-18: Reuse cached extractor to avoid recreating LLM client per call
+    # Bug #7 fix: Always use default LLM (DeepSeek) for extraction, not voice_config's
+    # llm_provider (Azure). Azure gpt-4.1-mini takes 11-13s vs DeepSeek's 2-3s.
+    # B14: Explicit "deepseek" — create_llm_client(None) reads LLM_PROVIDER env which may be "azure"
+    if consultation._cached_extractor is None:
+        llm = _create_extraction_llm()
+        consultation._cached_extractor = AnketaExtractor(llm)
+        consultation._cached_extractor_provider = "deepseek"
+    extractor = consultation._cached_extractor
+
+    # Bug #12: Inject country context hint for extraction LLM
+    if consultation.detected_profile:
+        _meta = getattr(consultation.detected_profile, 'meta', None)
+        _country = getattr(_meta, 'country', None) if _meta else None
+        _currency = getattr(_meta, 'currency', None) if _meta else None
+        _country_name = getattr(_meta, 'country', _country) if _meta else None
+        # Look up human-readable name from countries meta
+        if _country:
             try:
-                from src.documents import DocumentContext
-                doc_context = DocumentContext(**db_session.document_context)
+                from src.knowledge.country_detector import get_country_detector
+                _cmeta = get_country_detector().get_country_meta(_country)
+                if _cmeta:
+                    _country_name = _cmeta.get('name', _country_name)
             except Exception:
-                pass  # Use dict fallback — extractor handles both
-
-        # R4-18: Reuse cached extractor to avoid recreating LLM client per call
-        # Bug #7 fix: Always use default LLM (DeepSeek) for extraction, not voice_config's
-        # llm_provider (Azure). Azure gpt-4.1-mini takes 11-13s vs DeepSeek's 2-3s.
-        # B14: Explicit "deepseek" — create_llm_client(None) reads LLM_PROVIDER env which may be "azure"
-        if consultation._cached_extractor is None:
-            llm = create_llm_client("deepseek")
-            consultation._cached_extractor = AnketaExtractor(llm)
-            consultation._cached_extractor_provider = "deepseek"
-        extractor = consultation._cached_extractor
+                pass
+        if _country and _currency:
+            country_hint = {
+                "role": "system",
+                "content": (
+                    f"Контекст: Страна клиента — {_country_name} ({_country.upper()}). "
+                    f"Валюта: {_currency}. Используй {_currency} для budget и всех цен."
+                )
+            }
+            dialogue_for_extraction = [country_hint] + list(dialogue_for_extraction)
+
+    return _ExtractionSnapshot(
+        dialogue_history=dialogue_history,
+        dialogue_filtered=dialogue_filtered,
+        dialogue_for_extraction=dialogue_for_extraction,
+        is_windowed=is_windowed,
+        db_session=db_session,
+        doc_context=doc_context,
+        consultation_type=_consultation_type,
+        extractor=extractor,
+    )
 
-        # Bug #12: Inject country context hint for extraction LLM
-        if consultation.detected_profile:
-            _meta = getattr(consultation.detected_profile, 'meta', None)
-            _country = getattr(_meta, 'country', None) if _meta else None
-            _currency = getattr(_meta, 'currency', None) if _meta else None
-            _country_name = getattr(_meta, 'country', _country) if _meta else None
-            # Look up human-readable name from countries meta
-            if _country:
-                try:
-                    from src.knowledge.country_detector import get_country_detector
-                    _cmeta = get_country_detector().get_country_meta(_country)
-                    if _cmeta:
-                        _country_name = _cmeta.get('name', _country_name)
-                except Exception:
-                    pass
-            if _country and _currency:
-                country_hint = {
-                    "role": "system",
-                    "content": (
-                        f"Контекст: Страна клиента — {_country_name} ({_country.upper()}). "
-                        f"Валюта: {_currency}. Используй {_currency} для budget и всех цен."
-                    )
-                }
-                dialogue_for_extraction = [country_hint] + list(dialogue_for_extraction)
-
-        # v5.0: Use sliding window dialogue instead of full history
-        anketa = await extractor.extract(
-            dialogue_history=dialogue_for_extraction,  # ← SLIDING WINDOW
-            duration_seconds=consultation.get_duration_seconds(),
-            document_context=doc_context,
-            consultation_type=_consultation_type,
-            skip_expert_content=True,  # P2.2: Skip expert content in real-time (saves 2-5s)
-        )
 
-        # R22-07: Skip DB update if extraction returned a fallback with auto-generated values
-        if getattr(anketa, '_is_fallback', None) is True:
-            anketa_log.warning(
-                "extraction_fallback_skipped",
-                session_id=session_id,
-                reason="fallback anketa would overwrite real data with auto-generated values",
-            )
-            return
+async def _persist_extraction(
+    consultation: VoiceConsultationSession,
+    session_id: str,
+    snapshot: _ExtractionSnapshot,
+    anketa,
+) -> dict:
+    """Stage 3: merge with the DB anketa and PUT it to the web server; returns merged anketa_data."""
+    import time
 
-        extraction_time = time.time() - start_time
-        completion_rate = anketa.completion_rate()
+    db_session = snapshot.db_session
+    doc_context = snapshot.doc_context
+    dialogue_filtered = snapshot.dialogue_filtered
+    is_windowed = snapshot.is_windowed
+
+    anketa_data = anketa.to_json_dict()
+
+    # ===== FIX #3: ACCUMULATIVE MERGE - preserve non-empty old values =====
+    # Если новый extraction вернул пустое поле, но в БД оно заполнено → СОХРАНЯЕМ старое
+    if db_session and db_session.anketa_data:
+        old_anketa = db_session.anketa_data
+
+        for key, old_value in old_anketa.items():
+            new_value = anketa_data.get(key)
+
+            # Если старое значение заполнено, а новое пустое → KEEP OLD
+            old_is_filled = False
+            new_is_filled = False
+
+            # Check if old value is filled
+            if isinstance(old_value, str):
+                old_is_filled = old_value.strip() != ''
+            elif isinstance(old_value, list):
+                old_is_filled = len(old_value) > 0
+            elif old_value is not None and old_value != {}:
+                old_is_filled = True
+
+            # Check if new value is filled
+            if isinstance(new_value, str):
+                new_is_filled = new_value.strip() != ''
+            elif isinstance(new_value, list):
+                new_is_filled = len(new_value) > 0
+            elif new_value is not None and new_value != {}:
+                new_is_filled = True
+
+            # Preserve old if filled and new is empty
+            if old_is_filled and not new_is_filled:
+                anketa_data[key] = old_value
+                anketa_log.debug(
+                    "preserving_old_value",
+                    session_id=session_id,
+                    field=key,
+                    reason="new_extraction_empty",
+                )
 
-        # v5.0 Phase 4: Enhanced performance monitoring
-        anketa_log.info(
-            "extraction_completed",
+        # После accumulative merge, применяем merge с user edits
+        anketa_data = _merge_anketa_data(old_anketa, anketa_data)
+        anketa_log.debug(
+            "anketa_merged_accumulative",
             session_id=session_id,
-            extraction_time=round(extraction_time, 2),
-            is_windowed=is_windowed,
-            message_count=len(dialogue_for_extraction),
-            total_dialogue_length=len(dialogue_history),
-            model=getattr(extractor.llm, 'model', getattr(extractor.llm, 'deployment', 'unknown')),
-            completion_rate=round(completion_rate, 2),
         )
 
-        anketa_data = anketa.model_dump(mode="json")
-
-        # ===== FIX #3: ACCUMULATIVE MERGE - preserve non-empty old values =====
-        # Если новый extraction вернул пустое поле, но в БД оно заполнено → СОХРАНЯЕМ старое
-        if db_session and db_session.anketa_data:
-            old_anketa = db_session.anketa_data
-
-            for key, old_value in old_anketa.items():
-                new_value = anketa_data.get(key)
-
-                # Если старое значение заполнено, а новое пустое → KEEP OLD
-                old_is_filled = False
-                new_is_filled = False
-
-                # Check if old value is filled
-                if isinstance(old_value, str):
-                    old_is_filled = old_value.strip() != ''
-                elif isinstance(old_value, list):
-                    old_is_filled = len(old_value) > 0
-                elif old_value is not None and old_value != {}:
-                    old_is_filled = True
-
-                # Check if new value is filled
-                if isinstance(new_value, str):
-                    new_is_filled = new_value.strip() != ''
-                elif isinstance(new_value, list):
-                    new_is_filled = len(new_value) > 0
-                elif new_value is not None and new_value != {}:
-                    new_is_filled = True
-
-                # Preserve old if filled and new is empty
-                if old_is_filled and not new_is_filled:
-                    anketa_data[key] = old_value
-                    anketa_log.debug(
-                        "preserving_old_value",
+    # ===== FIX: Contact fallback — regex on FULL dialogue when window misses them =====
+    CONTACT_FIELDS = ('contact_name', 'contact_phone', 'contact_email')
+    missing_contacts = [
+        f for f in CONTACT_FIELDS
+        if not str(anketa_data.get(f, '')).strip()
+    ]
+    if missing_contacts and is_windowed:
+        try:
+            if consultation._contact_extractor is None:
+                from src.anketa.data_cleaner import IncrementalSmartExtractor
+                consultation._contact_extractor = IncrementalSmartExtractor()
+            # Только новые реплики с прошлого цикла, лучшие значения хранятся между циклами
+            contacts = consultation._contact_extractor.extract_from_dialogue(dialogue_filtered)
+            for field in missing_contacts:
+                if contacts.get(field):
+                    anketa_data[field] = contacts[field]
+                    anketa_log.info(
+                        "contact_fallback_recovered",
                         session_id=session_id,
-                        field=key,
-                        reason="new_extraction_empty",
+                        field=field,
+                        value=contacts[field][:20],
                     )
-
-            # После accumulative merge, применяем merge с user edits
-            anketa_data = _merge_anketa_data(old_anketa, anketa_data)
-            anketa_log.debug(
-                "anketa_merged_accumulative",
+        except Exception as e:
+            anketa_log.warning(
+                "contact_fallback_failed",
                 session_id=session_id,
+                error=str(e),
             )
 
-        # ===== FIX: Contact fallback — regex on FULL dialogue when window misses them =====
-        CONTACT_FIELDS = ('contact_name', 'contact_phone', 'contact_email')
-        missing_contacts = [
-            f for f in CONTACT_FIELDS
-            if not str(anketa_data.get(f, '')).strip()
-        ]
-        if missing_contacts and is_windowed:
-            try:
-                from src.anketa.data_cleaner import SmartExtractor
-                smart = SmartExtractor()
-                contacts = smart.extract_from_dialogue(dialogue_filtered)
-                for field in missing_contacts:
-                    if contacts.get(field):
-                        anketa_data[field] = contacts[field]
-                        anketa_log.info(
-                            "contact_fallback_recovered",
-                            session_id=session_id,
-                            field=field,
-                            value=contacts[field][:20],
-                        )
-            except Exception as e:
-                anketa_log.warning(
-                    "contact_fallback_failed",
-                    session_id=session_id,
-                    error=str(e),
-                )
-
-        # Bug #6 fix: Generate anketa_md from MERGED data, not raw extraction.
-        # Sliding window may return partial data (e.g. last 12 msgs are goodbyes),
-        # but anketa_data after merge contains accumulated fields from all extractions.
-        try:
+    # Bug #6 fix: Generate anketa_md from MERGED data, not raw extraction.
+    # Sliding window may return partial data (e.g. last 12 msgs are goodbyes),
+    # but anketa_data after merge contains accumulated fields from all extractions.
+    try:
+        if isinstance(anketa, FinalAnketa):
+            # Валидируются только поля, изменённые merge'ем (из БД / правок клиента)
+            merged_anketa = anketa.merge_json(anketa_data)
+        else:
             merged_anketa = FinalAnketa(**anketa_data)
-            anketa_md = AnketaGenerator.render_markdown(merged_anketa)
-        except Exception:
-            anketa_md = AnketaGenerator.render_markdown(anketa)  # fallback to raw
-
-        # CRITICAL: Use API instead of direct DB write (voice agent = separate process)
-        # SQLite WAL mode isolates writes between processes → use HTTP API
-        await _update_anketa_via_api(session_id, anketa_data, anketa_md)
-        consultation._last_extraction_time = time.time()  # R19-02: Track for finalize dedup
-
-        # Note: update_metadata() is redundant - company_name/contact_name
-        # are already in anketa_data and will be updated via API
+        anketa_md = AnketaGenerator.render_markdown(merged_anketa)
+    except Exception:
+        anketa_md = AnketaGenerator.render_markdown(anketa)  # fallback to raw
 
-        anketa_log.info(
-            "periodic_anketa_extracted",
-            session_id=session_id,
-            company=anketa.company_name,
-            has_documents=doc_context is not None,
-        )
+    # CRITICAL: Use API instead of direct DB write (voice agent = separate process)
+    # SQLite WAL mode isolates writes between processes → use HTTP API
+    await _update_anketa_via_api(session_id, anketa_data, anketa_md)
+    consultation._last_extraction_time = time.time()  # R19-02: Track for finalize dedup
 
-        # R23-01: Reset per-session circuit breaker on success
-        consultation._extraction_consecutive_failures = 0
+    # Note: update_metadata() is redundant - company_name/contact_name
+    # are already in anketa_data and will be updated via API
 
-        # BUG #2 fix: Periodic dialogue persistence — prevent data loss on crash/disconnect
-        # dialogue_history was previously saved ONLY at finalize → if session never finishes,
-        # all messages are lost. Now we save alongside each extraction cycle.
-        if len(consultation.dialogue_history) > 0:
-            try:
-                await _update_dialogue_via_api(
-                    session_id,
-                    dialogue_history=consultation.dialogue_history,
-                    duration_seconds=consultation.get_duration_seconds(),
-                    status=None,  # Don't change status
-                )
-            except Exception as e:
-                anketa_log.warning("periodic_dialogue_save_failed", error=str(e))
+    anketa_log.info(
+        "periodic_anketa_extracted",
+        session_id=session_id,
+        company=anketa.company_name,
+        has_documents=doc_context is not None,
+    )
 
-        # --- Launch background research if website detected ---
-        if not consultation.research_done and anketa.website and _consultation_type != "interview":
-            consultation.research_done = True  # set early to prevent duplicates
-            industry_id_for_research = None
-            try:
-                mgr = _get_kb_manager()
-                user_text_r = " ".join(
-                    m.get("content", "") for m in consultation.dialogue_history
-                    if m.get("role") == "user"
-                )
-                industry_id_for_research = mgr.detect_industry(user_text_r)
-            except Exception as e:
-                anketa_log.debug("industry_detection_for_research_failed", error=str(e))
-            task = asyncio.create_task(_run_background_research(
-                consultation, session_id, agent_session,
-                website=anketa.website,
-                industry=industry_id_for_research,
-                company_name=anketa.company_name,
-            ))
-            _track_agent_task(task)  # R11-10: Prevent GC before completion
-            def _research_done(t):
-                if t.cancelled():
-                    return
-                exc = t.exception()
-                if exc:
-                    anketa_log.warning("background_research_failed", error=str(exc))
-            task.add_done_callback(_research_done)
-            anketa_log.info("research_launched", website=anketa.website)
+    # R23-01: Reset per-session circuit breaker on success
+    consultation._extraction_consecutive_failures = 0
 
-        # --- Update Redis hot cache ---
-        redis_mgr = _try_get_redis()
-        if redis_mgr:
-            try:
-                import json as _json
-                redis_key = f"voice:session:{session_id}"
-                redis_mgr.client.setex(
-                    redis_key,
-                    7200,
-                    _json.dumps({
-                        "session_id": session_id,
-                        "status": "active",
-                        "message_count": len(consultation.dialogue_history),
-                        "anketa_completion": anketa.completion_rate(),
-                        "industry": getattr(anketa, 'industry', None),
-                        "updated_at": datetime.now(timezone.utc).isoformat(),
-                    }),
-                )
-            except Exception as e:
-                anketa_log.debug("redis_cache_update_failed", error=str(e))
+    return anketa_data
 
-        # --- Inject/update industry KB context based on phase ---
-        # v5.0: Skip KB enrichment for interview mode (interviewer should be neutral)
-        if agent_session is not None and _consultation_type != "interview":
-            try:
-                # Detect industry and country — re-detect when phone appears or changes
-                current_phone = getattr(anketa, 'contact_phone', None) or ''
 
-                should_redetect = (
-                    consultation.detected_profile is None
-                    or (current_phone and current_phone != (consultation._detected_phone or ''))
-                )
+async def _persist_dialogue(
+    consultation: VoiceConsultationSession,
+    session_id: str,
+    anketa,
+) -> None:
+    """Stage 3 (cont.): dialogue PUT and the Redis hot cache — independent of agent updates."""
+    # BUG #2 fix: Periodic dialogue persistence — prevent data loss on crash/disconnect
+    # dialogue_history was previously saved ONLY at finalize → if session never finishes,
+    # all messages are lost. Now we save alongside each extraction cycle.
+    if len(consultation.dialogue_history) > 0:
+        try:
+            await _update_dialogue_via_api(
+                session_id,
+                dialogue_history=consultation.dialogue_history,
+                duration_seconds=consultation.get_duration_seconds(),
+                status=None,  # Don't change status
+            )
+        except Exception as e:
+            anketa_log.warning("periodic_dialogue_save_failed", error=str(e))
 
-                if should_redetect:
-                    from src.knowledge.country_detector import get_country_detector
+    # --- Update Redis hot cache ---
+    redis_mgr = _try_get_redis()
+    if redis_mgr:
+        try:
+            redis_key = f"voice:session:{session_id}"
+            redis_mgr.client.setex(
+                redis_key,
+                7200,
+                dumps({
+                    "session_id": session_id,
+                    "status": "active",
+                    "message_count": len(consultation.dialogue_history),
+                    "anketa_completion": anketa.completion_rate(),
+                    "industry": getattr(anketa, 'industry', None),
+                    "updated_at": datetime.now(timezone.utc).isoformat(),
+                }),
+            )
+        except Exception as e:
+            anketa_log.debug("redis_cache_update_failed", error=str(e))
 
-                    user_text = " ".join(
-                        m.get("content", "") for m in consultation.dialogue_history
-                        if m.get("role") == "user"
-                    )
-                    manager = _get_kb_manager()
-                    industry_id = (
-                        consultation.detected_industry_id
-                        or manager.detect_industry(user_text)
-                    )
 
-                    if industry_id:
-                        detector = get_country_detector()
-
-                        # BUG #3 fix: Extract phone/domain from document_context as fallback
-                        # Documents often contain +43/+49 phone numbers, .at/.de domains
-                        # that CountryDetector can use when dialogue phone is not yet known.
-                        doc_phone = None
-                        if db_session and db_session.document_context and isinstance(db_session.document_context, dict):
-                            doc_contacts = db_session.document_context.get('all_contacts', {})
-                            doc_phone = doc_contacts.get('phone', '') or doc_contacts.get('telefon', '') or ''
-                            # Also try to extract domain from email for country detection
-                            doc_email = doc_contacts.get('email', '')
-                            if doc_email and '@' in doc_email:
-                                doc_domain = doc_email.split('@')[1]
-                                # Append domain hint to user_text for detection
-                                if doc_domain:
-                                    user_text = user_text + f" website: {doc_domain}"
-
-                        effective_phone = current_phone or doc_phone
-                        region, country = detector.detect(
-                            phone=effective_phone or None,
-                            dialogue_text=user_text,
-                        )
-                        if region and country:
-                            profile = manager.loader.load_regional_profile(
-                                region, country, industry_id
-                            )
-                        else:
-                            profile = manager.get_profile(industry_id)
-
-                        # Check if country actually changed → reset KB enrichment
-                        old_profile = consultation.detected_profile
-                        if old_profile is not None:
-                            old_country = getattr(
-                                getattr(old_profile, 'meta', None), 'country', None
-                            )
-                            new_country = getattr(
-                                getattr(profile, 'meta', None), 'country', None
-                            )
-                            if old_country != new_country:
-                                consultation.kb_enriched = False
-                                anketa_log.info(
-                                    "country_redetected",
-                                    session_id=session_id,
-                                    old_country=old_country,
-                                    new_country=new_country,
-                                )
+async def _update_agent_after_extraction(
+    consultation: VoiceConsultationSession,
+    session_id: str,
+    agent_session: Optional[AgentSession],
+    snapshot: _ExtractionSnapshot,
+    anketa,
+    anketa_data: dict,
+) -> None:
+    """Stage 4: research launch, KB context, missing-fields reminder and review phase."""
+    db_session = snapshot.db_session
+    _consultation_type = snapshot.consultation_type
+    review_just_started = False
+
+    # --- Launch background research if website detected ---
+    if not consultation.research_done and anketa.website and _consultation_type != "interview":
+        consultation.research_done = True  # set early to prevent duplicates
+        industry_id_for_research = None
+        try:
+            mgr = _get_kb_manager()
+            user_text_r = " ".join(
+                m.get("content", "") for m in consultation.dialogue_history
+                if m.get("role") == "user"
+            )
+            industry_id_for_research = mgr.detect_industry(user_text_r)
+        except Exception as e:
+            anketa_log.debug("industry_detection_for_research_failed", error=str(e))
+        task = asyncio.create_task(_run_background_research(
+            consultation, session_id, agent_session,
+            website=anketa.website,
+            industry=industry_id_for_research,
+            company_name=anketa.company_name,
+        ))
+        _track_agent_task(task)  # R11-10: Prevent GC before completion
+        def _research_done(t):
+            if t.cancelled():
+                return
+            exc = t.exception()
+            if exc:
+                anketa_log.warning("background_research_failed", error=str(exc))
+        task.add_done_callback(_research_done)
+        anketa_log.info("research_launched", website=anketa.website)
+
+    # --- Inject/update industry KB context based on phase ---
+    # v5.0: Skip KB enrichment for interview mode (interviewer should be neutral)
+    if agent_session is not None and _consultation_type != "interview":
+        try:
+            # Detect industry and country — re-detect when phone appears or changes
+            current_phone = getattr(anketa, 'contact_phone', None) or ''
+
+            should_redetect = (
+                consultation.detected_profile is None
+                or (current_phone and current_phone != (consultation._detected_phone or ''))
+            )
 
-                        consultation.detected_profile = profile
-                        consultation.detected_industry_id = industry_id
-                        consultation._detected_phone = current_phone
+            if should_redetect:
+                from src.knowledge.country_detector import get_country_detector
 
-                # Detect phase and re-inject KB on phase change
-                if consultation.detected_profile:
-                    new_phase = _detect_consultation_phase(
-                        message_count=len(consultation.dialogue_history),
-                        completion_rate=anketa.completion_rate() if anketa else 0.0,
-                        review_started=consultation.review_started,
+                user_text = " ".join(
+                    m.get("content", "") for m in consultation.dialogue_history
+                    if m.get("role") == "user"
+                )
+                manager = _get_kb_manager()
+                industry_id = (
+                    consultation.detected_industry_id
+                    or manager.detect_industry(user_text)
+                )
+
+                if industry_id:
+                    detector = get_country_detector()
+
+                    # BUG #3 fix: Extract phone/domain from document_context as fallback
+                    # Documents often contain +43/+49 phone numbers, .at/.de domains
+                    # that CountryDetector can use when dialogue phone is not yet known.
+                    doc_phone = None
+                    if db_session and db_session.document_context and isinstance(db_session.document_context, dict):
+                        doc_contacts = db_session.document_context.get('all_contacts', {})
+                        doc_phone = doc_contacts.get('phone', '') or doc_contacts.get('telefon', '') or ''
+                        # Also try to extract domain from email for country detection
+                        doc_email = doc_contacts.get('email', '')
+                        if doc_email and '@' in doc_email:
+                            doc_domain = doc_email.split('@')[1]
+                            # Append domain hint to user_text for detection
+                            if doc_domain:
+                                user_text = user_text + f" website: {doc_domain}"
+
+                    effective_phone = current_phone or doc_phone
+                    region, country = detector.detect(
+                        phone=effective_phone or None,
+                        dialogue_text=user_text,
                     )
+                    if region and country:
+                        profile = manager.loader.load_regional_profile(
+                            region, country, industry_id
+                        )
+                    else:
+                        profile = manager.get_profile(industry_id)
 
-                    if new_phase != consultation.current_phase or not consultation.kb_enriched:
-                        consultation.current_phase = new_phase
-                        builder = EnrichedContextBuilder(_get_kb_manager())
-                        voice_context = builder.build_for_voice_full(
-                            consultation.dialogue_history,
-                            profile=consultation.detected_profile,
-                            phase=new_phase,
+                    # Check if country actually changed → reset KB enrichment
+                    old_profile = consultation.detected_profile
+                    if old_profile is not None:
+                        old_country = getattr(
+                            getattr(old_profile, 'meta', None), 'country', None
+                        )
+                        new_country = getattr(
+                            getattr(profile, 'meta', None), 'country', None
                         )
-                        if voice_context:
-                            base_prompt = get_system_prompt()
-                            enriched = f"{base_prompt}\n\n### Контекст отрасли ({new_phase}):\n{voice_context}"
-                            await _update_instructions_safe(consultation, agent_session, enriched)
-                            consultation.kb_enriched = True
+                        if old_country != new_country:
+                            consultation.kb_enriched = False
                             anketa_log.info(
-                                "KB context injected",
+                                "country_redetected",
                                 session_id=session_id,
-                                industry=consultation.detected_industry_id,
-                                phase=new_phase,
+                                old_country=old_country,
+                                new_country=new_country,
                             )
-            except Exception as e:
-                anketa_log.warning("KB injection failed (non-fatal)", error=str(e))
 
-        # --- Missing fields reminder: inject dynamic list into agent instructions ---
-        if not consultation.review_started and agent_session is not None:
-            try:
-                if _consultation_type == "interview":
-                    # Interview mode: use interview-specific fields
-                    missing = _get_missing_interview_fields(anketa_data)
-                    if missing:
-                        reminder = _build_missing_interview_fields_reminder(missing)
-                        marker = "### ⚠️ НЕСОБРАННАЯ ИНФОРМАЦИЯ"
-                    else:
-                        reminder = ""
-                        marker = None
-                else:
-                    # Consultation mode: use consultation-specific fields
-                    missing = _get_missing_fields(anketa_data)
-                    if missing:
-                        reminder = _build_missing_fields_reminder(missing)
-                        marker = "### ⚠️ НЕЗАПОЛНЕННЫЕ ПОЛЯ АНКЕТЫ"
-                    else:
-                        reminder = ""
-                        marker = None
-
-                if reminder:
-                    activity = getattr(agent_session, '_activity', None)
-                    if activity and hasattr(activity, 'update_instructions'):
-                        # R14-03: Use latest tracked instructions (may include buffered KB update)
-                        # instead of stale activity.instructions
-                        current_instructions = getattr(consultation, '_latest_instructions', None) \
-                            or getattr(activity, 'instructions', '') or ''
-                        # Strip previous reminder if present (both markers)
-                        for m in ["### ⚠️ НЕЗАПОЛНЕННЫЕ ПОЛЯ АНКЕТЫ", "### ⚠️ НЕСОБРАННАЯ ИНФОРМАЦИЯ"]:
-                            if m in current_instructions:
-                                current_instructions = current_instructions[:current_instructions.index(m)].rstrip()
-                        updated = current_instructions + reminder
-                        await _update_instructions_safe(consultation, agent_session, updated)
+                    consultation.detected_profile = profile
+                    consultation.detected_industry_id = industry_id
+                    consultation._detected_phone = current_phone
+
+            # Detect phase and re-inject KB on phase change
+            if consultation.detected_profile:
+                new_phase = _detect_consultation_phase(
+                    message_count=len(consultation.dialogue_history),
+                    completion_rate=anketa.completion_rate() if anketa else 0.0,
+                    review_started=consultation.review_started,
+                )
+
+                if new_phase != consultation.current_phase or not consultation.kb_enriched:
+                    consultation.current_phase = new_phase
+                    builder = EnrichedContextBuilder(_get_kb_manager())
+                    voice_context = builder.build_for_voice_full(
+                        consultation.dialogue_history,
+                        profile=consultation.detected_profile,
+                        phase=new_phase,
+                    )
+                    if voice_context:
+                        consultation.instructions.set(
+                            "kb", f"### Контекст отрасли ({new_phase}):\n{voice_context}"
+                        )
+                        consultation.kb_enriched = True
                         anketa_log.info(
-                            "missing_fields_reminder_injected",
+                            "KB context injected",
                             session_id=session_id,
-                            mode=_consultation_type,
-                            missing_count=len(missing),
-                            missing_fields=missing[:5],  # Log first 5 for brevity
+                            industry=consultation.detected_industry_id,
+                            phase=new_phase,
                         )
-            except Exception as e:
-                anketa_log.warning("missing_fields_reminder_failed", error=str(e))
+        except Exception as e:
+            anketa_log.warning("KB injection failed (non-fatal)", error=str(e))
 
-        # --- Review phase: switch to anketa verification when ready ---
-        if agent_session is not None:
-            try:
-                rate = anketa.completion_rate()
-                msg_count = len(consultation.dialogue_history)
+    # --- Missing fields reminder: inject dynamic list into agent instructions ---
+    if not consultation.review_started and agent_session is not None:
+        try:
+            if _consultation_type == "interview":
+                # Interview mode: use interview-specific fields
+                missing = _get_missing_interview_fields(anketa_data)
+                reminder = _build_missing_interview_fields_reminder(missing) if missing else ""
+            else:
+                # Consultation mode: use consultation-specific fields
+                missing = _get_missing_fields(anketa_data)
+                reminder = _build_missing_fields_reminder(missing) if missing else ""
+
+            # Секция заменяется целиком; без незаполненных полей напоминание снимается
+            if consultation.instructions.set("reminder", reminder) and reminder:
+                anketa_log.info(
+                    "missing_fields_reminder_injected",
+                    session_id=session_id,
+                    mode=_consultation_type,
+                    missing_count=len(missing),
+                    missing_fields=missing[:5],  # Log first 5 for brevity
+                )
+        except Exception as e:
+            anketa_log.warning("missing_fields_reminder_failed", error=str(e))
 
-                # RECOVERY: если review запущен но completion_rate упал (пользователь удалил поля)
-                # → вернуться в discovery mode
-                if consultation.review_started and rate < 0.7:
-                    consultation.review_started = False
+    # --- Review phase: switch to anketa verification when ready ---
+    if agent_session is not None:
+        try:
+            rate = anketa.completion_rate()
+            msg_count = len(consultation.dialogue_history)
+
+            # RECOVERY: если review запущен но completion_rate упал (пользователь удалил поля)
+            # → вернуться в discovery mode
+            if consultation.review_started and rate < 0.7:
+                consultation.review_started = False
+                anketa_log.info(
+                    "review_phase_recovery",
+                    session_id=session_id,
+                    completion_rate=rate,
+                    reason="completion_rate dropped below 0.7",
+                )
+                # Базовый промпт и KB-контекст остаются в своих секциях
+                consultation.instructions.clear("review")
+
+            # Переход в REVIEW только если:
+            # 1. completion_rate >= 90% (v5.0: почти все поля заполнены = 14/15)
+            # 2. Минимум 16 сообщений
+            # 3. ВСЕ обязательные поля заполнены (15 полей в v5.0, включая контакты)
+            if not consultation.review_started:
+                required_fields_filled = _check_required_fields(anketa_data)
+
+                if rate >= 0.9 and msg_count >= 16 and required_fields_filled:
+                    consultation.review_started = True
+                    summary = format_anketa_for_voice(anketa_data)
+                    review_prompt = get_review_system_prompt(summary)
+
+                    # FIX B1: review-секция добавляется к базовому промпту, а не заменяет его
+                    # (anti-hallucination правила, KB-контекст, знания о платформе сохраняются)
+                    consultation.instructions.clear("reminder")
+                    consultation.instructions.set("review", review_prompt)
+                    review_just_started = True
                     anketa_log.info(
-                        "review_phase_recovery",
+                        "review_phase_started",
                         session_id=session_id,
                         completion_rate=rate,
-                        reason="completion_rate dropped below 0.7",
+                        message_count=msg_count,
                     )
-                    # Re-inject base prompt with KB context
-                    activity = getattr(agent_session, '_activity', None)
-                    if activity and hasattr(activity, 'update_instructions'):
-                        base_prompt = get_system_prompt()
-                        if consultation.kb_enriched and consultation.detected_profile:
-                            builder = EnrichedContextBuilder(_get_kb_manager())
-                            voice_context = builder.build_for_voice_full(
-                                consultation.dialogue_history,
-                                profile=consultation.detected_profile,
-                                phase=consultation.current_phase,
-                            )
-                            if voice_context:
-                                base_prompt = f"{base_prompt}\n\n### Контекст отрасли ({consultation.current_phase}):\n{voice_context}"
-                        await _update_instructions_safe(consultation, agent_session, base_prompt)
-
-                # Переход в REVIEW только если:
-                # 1. completion_rate >= 90% (v5.0: почти все поля заполнены = 14/15)
-                # 2. Минимум 16 сообщений
-                # 3. ВСЕ обязательные поля заполнены (15 полей в v5.0, включая контакты)
-                if not consultation.review_started:
-                    required_fields_filled = _check_required_fields(anketa_data)
-
-                    if rate >= 0.9 and msg_count >= 16 and required_fields_filled:
-                        consultation.review_started = True
-                        summary = format_anketa_for_voice(anketa_data)
-                        review_prompt = get_review_system_prompt(summary)
-
-                        # FIX B1: APPEND review instructions to base prompt instead of replacing
-                        # This preserves anti-hallucination rules, KB context, and platform knowledge
-                        activity = getattr(agent_session, '_activity', None)
-                        if activity and hasattr(activity, 'update_instructions'):
-                            # R27-03: Prefer buffered instructions over stale activity.instructions
-                            current_instructions = getattr(consultation, '_latest_instructions', None) \
-                                or getattr(activity, 'instructions', None) or get_system_prompt()
-                            # Strip any previous missing fields reminder
-                            for m in ["### ⚠️ НЕЗАПОЛНЕННЫЕ ПОЛЯ АНКЕТЫ", "### ⚠️ НЕСОБРАННАЯ ИНФОРМАЦИЯ"]:
-                                if m in current_instructions:
-                                    current_instructions = current_instructions[:current_instructions.index(m)].rstrip()
-                            # Append review mode instructions to existing prompt
-                            combined_prompt = current_instructions + "\n\n" + review_prompt
-                            await _update_instructions_safe(consultation, agent_session, combined_prompt)
-                            await agent_session.generate_reply(
-                                user_input="[Начни проверку анкеты. Зачитай первый пункт и спроси подтверждение.]"
-                            )
-                            anketa_log.info(
-                                "review_phase_started",
-                                session_id=session_id,
-                                completion_rate=rate,
-                                message_count=msg_count,
-                            )
-                    elif msg_count >= 16:
-                        # Логируем почему НЕ перешли в REVIEW (для отладки)
-                        anketa_log.debug(
-                            "review_phase_not_ready",
-                            session_id=session_id,
-                            completion_rate=rate,
-                            message_count=msg_count,
-                            required_fields_filled=required_fields_filled,
-                        )
-            except Exception as e:
-                anketa_log.warning("review_phase_start_failed", error=str(e))
+                elif msg_count >= 16:
+                    # Логируем почему НЕ перешли в REVIEW (для отладки)
+                    anketa_log.debug(
+                        "review_phase_not_ready",
+                        session_id=session_id,
+                        completion_rate=rate,
+                        message_count=msg_count,
+                        required_fields_filled=required_fields_filled,
+                    )
+        except Exception as e:
+            anketa_log.warning("review_phase_start_failed", error=str(e))
+
+    # Не больше одного обновления инструкций за цикл — и только если композиция изменилась
+    if agent_session is not None:
+        try:
+            await _push_instructions(consultation, agent_session)
+            if review_just_started:
+                await agent_session.generate_reply(
+                    user_input="[Начни проверку анкеты. Зачитай первый пункт и спроси подтверждение.]"
+                )
+        except Exception as e:
+            anketa_log.warning("instructions_update_failed", session_id=session_id, error=str(e))
+
+
+async def _extract_and_update_anketa(
+    consultation: VoiceConsultationSession,
+    session_id: str,
+    agent_session: Optional[AgentSession] = None,
+):
+    """Extract anketa from current dialogue and update in DB.
+
+    v5.0: Uses sliding window for performance optimization.
+    - Early conversation (< 12 msgs): full dialogue
+    - Later (>= 12 msgs): last 12 messages only
+
+    Also injects industry KB context into the voice agent on first extraction
+    (when industry can be detected from dialogue).
+    """
+    import time
+
+    # R23-01: Per-session circuit breaker (was global, blocked ALL sessions on single failure)
+    if time.time() < consultation._extraction_backoff_until:
+        anketa_log.debug(
+            "extraction_backoff_active",
+            session_id=session_id,
+            remaining=round(consultation._extraction_backoff_until - time.time()),
+        )
+        return
+
+    pipeline = get_extraction_pipeline()
+
+    try:
+        async with pipeline.stage("snapshot"):
+            snapshot = _read_extraction_snapshot(consultation, session_id)
+        if snapshot is None:
+            return
+        extractor = snapshot.extractor
+        dialogue_history = snapshot.dialogue_history
+        dialogue_for_extraction = snapshot.dialogue_for_extraction
+        is_windowed = snapshot.is_windowed
+
+        # ===== EXTRACTION =====
+        # P4.3: Разрешение ограничивает одновременные LLM-вызовы и держится только на время вызова:
+        # запись в БД и обновление инструкций не блокируют экстракцию других сессий
+        async with pipeline.llm_permit():
+            start_time = time.time()
+            # v5.0: Use sliding window dialogue instead of full history
+            anketa = await extractor.extract(
+                dialogue_history=dialogue_for_extraction,  # ← SLIDING WINDOW
+                duration_seconds=consultation.get_duration_seconds(),
+                document_context=snapshot.doc_context,
+                consultation_type=snapshot.consultation_type,
+                skip_expert_content=True,  # P2.2: Skip expert content in real-time (saves 2-5s)
+            )
+
+        # R22-07: Skip DB update if extraction returned a fallback with auto-generated values
+        if getattr(anketa, '_is_fallback', None) is True:
+            anketa_log.warning(
+                "extraction_fallback_skipped",
+                session_id=session_id,
+                reason="fallback anketa would overwrite real data with auto-generated values",
+            )
+            return
+
+        extraction_time = time.time() - start_time
+        completion_rate = anketa.completion_rate()
+
+        # v5.0 Phase 4: Enhanced performance monitoring
+        anketa_log.info(
+            "extraction_completed",
+            session_id=session_id,
+            extraction_time=round(extraction_time, 2),
+            is_windowed=is_windowed,
+            message_count=len(dialogue_for_extraction),
+            total_dialogue_length=len(dialogue_history),
+            model=getattr(extractor.llm, 'model', getattr(extractor.llm, 'deployment', 'unknown')),
+            completion_rate=round(completion_rate, 2),
+            llm_queue_depth=pipeline.queue_depth("llm"),
+        )
+
+        async with pipeline.stage("persist"):
+            anketa_data = await _persist_extraction(consultation, session_id, snapshot, anketa)
+
+        # Диалог в БД и инструкции агента друг от друга не зависят — параллельно
+        await pipeline.run_concurrently(
+            ("persist", _persist_dialogue(consultation, session_id, anketa)),
+            ("agent", _update_agent_after_extraction(
+                consultation, session_id, agent_session, snapshot, anketa, anketa_data,
+            )),
+        )
+        anketa_log.debug("extraction_pipeline_stats", session_id=session_id, stages=pipeline.stats())
 
     except Exception as e:
         # R23-01: Per-session exponential backoff (2, 4, 8, 16, 32, 60s max)
@@ -1704,39 +2049,242 @@ async def _extract_and_update_anketa(
             backoff_seconds=backoff,
             exc_info=True,
         )
-    finally:
-        # P4.3: Release semaphore only if we acquired it
-        if _extraction_semaphore is not None and _semaphore_acquired:
-            _extraction_semaphore.release()
+
+
+def _step_done(steps, name: str) -> bool:
+    """Шаг уже выполнен в прошлой попытке задачи финализации."""
+    return steps is not None and steps.is_done(name)
+
+
+def _mark_step(steps, name: str, result=None) -> None:
+    if steps is not None:
+        steps.mark(name, result)
+
+
+def _fail_step(steps, name: str, error: Exception) -> None:
+    if steps is not None:
+        steps.fail(name, error)
+
+
+def _retry_without_anketa(steps) -> None:
+    """
+    Финальная анкета не получена: в задаче очереди (не последняя попытка)
+    прервать попытку до fan-out, чтобы уведомления и файлы не ушли без анкеты
+    и не были отмечены выполненными. На последней попытке выходы пишутся из
+    того, что есть, как при финализации без очереди.
+    """
+    if steps is not None and not steps.last_attempt:
+        steps.raise_if_failed()
+
+
+def _final_session_snapshot(session, final: Optional[Dict[str, Any]], status: SessionStatus):
+    """
+    Сессия в том виде, какой она станет после записи финальной анкеты.
+
+    Уведомления и PostgreSQL получают её сразу, не дожидаясь записи в БД
+    через API и повторного чтения (анкета сливается так же, как в
+    SessionManager.update_anketa).
+    """
+    import copy
+    snapshot = copy.copy(session)
+    snapshot.status = status.value
+    if final and not final.get("is_fallback"):
+        merged = SessionManager._deep_merge(
+            copy.deepcopy(session.anketa_data or {}), copy.deepcopy(final["anketa_data"])
+        )
+        snapshot.anketa_data = merged
+        snapshot.anketa_md = final["anketa_md"]
+        snapshot.company_name = session.company_name or merged.get("company_name")
+        snapshot.contact_name = session.contact_name or merged.get("contact_name")
+    return snapshot
+
+
+async def _finalize_output_files(consultation: VoiceConsultationSession, final: Dict[str, Any]) -> str:
+    await finalize_consultation(consultation, final)
+    if consultation.runtime_status == RuntimeStatus.ERROR:
+        raise RuntimeError("finalize_consultation failed")
+    return consultation.runtime_status.value
+
+
+async def _finalize_output_dialogue(
+    consultation: VoiceConsultationSession, session_id: str, status: SessionStatus
+) -> None:
+    # Save dialogue + duration + status via HTTP API (not direct DB write)
+    # Voice agent = separate process → SQLite WAL isolates writes
+    saved = await _update_dialogue_via_api(
+        session_id,
+        dialogue_history=consultation.dialogue_history,
+        duration_seconds=consultation.get_duration_seconds(),
+        status=status.value,  # ✅ Preserve paused/confirmed/declined
+    )
+    if not saved:
+        raise RuntimeError("dialogue API update failed")
+
+
+async def _finalize_output_anketa(session_id: str, final: Dict[str, Any]) -> None:
+    # CRITICAL: Use API instead of direct DB write (voice agent = separate process)
+    if not await _update_anketa_via_api(session_id, final["anketa_data"], final["anketa_md"]):
+        raise RuntimeError("anketa API update failed")
+
+
+# Сколько шаг notify ждёт доставки (повторы с backoff); остальное доставит очередь процесса
+_NOTIFY_WAIT_SECONDS = 60.0
+
+
+async def _finalize_output_notify(session, status: SessionStatus) -> None:
+    try:
+        from src.notifications.manager import NotificationManager
+        notifier = NotificationManager()
+        # Шаг считается выполненным, когда доставка завершена или письмо ушло в dead-letter
+        delivered = await notifier.on_session_confirmed(session, wait=True, timeout=_NOTIFY_WAIT_SECONDS)
+        anketa_log.info("notification_sent", session_id=session.session_id, status=status.value,
+                        delivered=delivered)
+    except Exception as e:
+        anketa_log.warning("notification_failed", error=str(e))
+        raise
+
+
+async def _finalize_output_learning(consultation: VoiceConsultationSession, session) -> None:
+    """Record learning for industry KB."""
+    try:
+        manager = _get_kb_manager()
+        builder = EnrichedContextBuilder(manager)
+        industry_id = builder.get_industry_id(consultation.dialogue_history)
+        if not (industry_id and session.anketa_data):
+            return
+        session_id = session.session_id
+        company = session.company_name or "N/A"
+        # FIX: Handle Mock objects and prevent StopIteration in async context
+        try:
+            anketa_values = list(session.anketa_data.values()) if hasattr(session.anketa_data, 'values') else []
+            filled = sum(1 for v in anketa_values if v and v != [] and v != "")
+        except (StopIteration, RuntimeError):
+            filled = 0  # Fallback if iteration fails
+
+        # R18-03: Use consultation duration (accurate) instead of stale DB session.duration_seconds
+        _duration_secs = consultation.get_duration_seconds()
+        insight = (
+            f"Голосовая сессия {session_id}: {company}, "
+            f"заполнено полей: {filled}, "
+            f"длительность: {round(_duration_secs / 60, 1)} мин"
+        )
+        await asyncio.to_thread(manager.record_learning, industry_id, insight, f"voice_{session_id}")
+
+        # Dual-write to PostgreSQL (fire-and-forget)
+        pg_learning = _try_get_postgres()
+        if pg_learning:
+            try:
+                await pg_learning.save_learning(industry_id, insight, f"voice_{session_id}")
+            except Exception:
+                pass  # Non-fatal: YAML is primary
+
+        anketa_log.info("learning_recorded", industry_id=industry_id)
+    except Exception as e:
+        anketa_log.warning("record_learning_failed", error=str(e))
+        raise
+
+
+async def _finalize_output_postgres(
+    consultation: VoiceConsultationSession, session, pg_mgr, status: SessionStatus
+) -> None:
+    """Save to PostgreSQL (long-term storage)."""
+    session_id = session.session_id
+    try:
+        from src.anketa.schema import FinalAnketa as _FinalAnketa
+
+        anketa_dict = dict(session.anketa_data)
+        if not anketa_dict.get("interview_id"):
+            anketa_dict["interview_id"] = session_id
+        anketa_obj = _FinalAnketa(**anketa_dict)
+
+        await pg_mgr.save_anketa(anketa_obj)
+        await pg_mgr.update_interview_session(
+            session_id=session_id,
+            completed_at=datetime.now(timezone.utc),
+            duration=consultation.get_duration_seconds(),  # R19-01: Use computed, not stale DB
+            completeness_score=anketa_obj.completion_rate() if hasattr(anketa_obj, 'completion_rate') else None,
+            status=status.value,  # R18-02: Use computed status, not stale DB read
+        )
+        anketa_log.info("postgres_saved", session_id=session_id)
+    except Exception as e:
+        anketa_log.warning("postgres_save_failed", error=str(e))
+        raise
 
 
 async def _finalize_and_save(
     consultation: VoiceConsultationSession,
     session_id: Optional[str],
+    steps=None,
 ):
-    """Final anketa extraction, filesystem save, and DB update."""
+    """Final anketa extraction, filesystem save, and DB update.
+
+    Один проход: анкета извлекается один раз (с document_context и экспертным
+    контентом), затем результат параллельно расходится по выходам — файлы
+    (OutputManager), диалог и анкета через web API, уведомления,
+    record_learning и PostgreSQL.
+
+    Args:
+        consultation: Завершённая консультация
+        session_id: ID сессии в БД (None — standalone, только файлы)
+        steps: JobSteps при выполнении из очереди — шаги, сделанные в прошлых
+               попытках, пропускаются, а ошибки шагов собираются для повтора
+    """
+    db_session = _session_mgr.get_session(session_id) if session_id else None
+
     # R25-01: Server-side deduplication — if session already finalized by another agent,
     # skip to prevent duplicate notifications/writes.
     # F7.3: Allow finalization for 'confirmed' — user may confirm mid-conversation,
     # and we still need to run final extraction to capture last dialogue data.
-    if session_id:
-        pre_check = _session_mgr.get_session(session_id)
-        if pre_check and pre_check.status in (
-            SessionStatus.DECLINED.value, SessionStatus.CONFIRMED.value
-        ):
+    # Повтор задачи после частичного выполнения — не дубль, продолжаем с незавершённых шагов
+    if db_session and not (steps is not None and steps.started):
+        if db_session.status in (SessionStatus.DECLINED.value, SessionStatus.CONFIRMED.value):
             session_log.info(
                 "finalize_already_done",
                 session_id=session_id,
-                status=pre_check.status,
+                status=db_session.status,
             )
             return
 
-    await finalize_consultation(consultation)
-
-    if not session_id:
+    if not db_session:
+        if session_id:
+            # R9-20: Session was deleted — only local files
+            session_log.warning("finalize_session_not_found", session_id=session_id)
+        if _step_done(steps, "save_files"):
+            return
+        await finalize_consultation(consultation)
+        if consultation.runtime_status == RuntimeStatus.ERROR:
+            _fail_step(steps, "save_files", RuntimeError("finalize_consultation failed"))
+        else:
+            _mark_step(steps, "save_files", consultation.runtime_status.value)
         return
 
-    # ✅ FIX БАГ #2: Re-read session to get current status (may have been paused)
+    # --- 1. Single final extraction ---
+    final = steps.result("extract_anketa") if _step_done(steps, "extract_anketa") else None
+    if final is None and len(consultation.dialogue_history) >= 2:
+        try:
+            final = await _extract_final_anketa(consultation, db_session)
+        except Exception as e:
+            consultation.runtime_status = RuntimeStatus.ERROR
+            anketa_log.error(
+                "final_anketa_extraction_failed",
+                session_id=session_id,
+                error=str(e),
+                error_type=type(e).__name__,
+            )
+            _fail_step(steps, "extract_anketa", e)
+            _retry_without_anketa(steps)
+        else:
+            if final["is_fallback"]:
+                anketa_log.warning("finalize_extraction_fallback", session_id=session_id,
+                                   retry=steps is not None and not steps.last_attempt)
+                _fail_step(steps, "extract_anketa", RuntimeError("extraction returned fallback"))
+                _retry_without_anketa(steps)
+            else:
+                _mark_step(steps, "extract_anketa", final)
+    elif final is None:
+        consultation.runtime_status = RuntimeStatus.COMPLETED
+
+    # ✅ FIX БАГ #2: Re-read session to get current status (may have been paused during extraction)
     fresh_session = _session_mgr.get_session(session_id)
     if not fresh_session:
         # R9-20: Session was deleted — don't finalize
@@ -1751,163 +2299,109 @@ async def _finalize_and_save(
     else:
         final_status = current_status
 
-    # Save dialogue + duration + status via HTTP API (not direct DB write)
-    # Voice agent = separate process → SQLite WAL isolates writes
-    await _update_dialogue_via_api(
-        session_id,
-        dialogue_history=consultation.dialogue_history,
-        duration_seconds=consultation.get_duration_seconds(),
-        status=final_status.value,  # ✅ Preserve paused/confirmed/declined
-    )
-
-    # R24-09: Also attempt final extraction on error (DB-targeted extraction is independent)
-    if consultation.runtime_status in (RuntimeStatus.COMPLETED, RuntimeStatus.ERROR):
-        # R19-02: Skip redundant final extraction if last real-time extraction
-        # was within 10 seconds — data is already fresh enough
-        import time as _t
-        _since_last = _t.time() - consultation._last_extraction_time
-        if _since_last < 10.0:
-            anketa_log.info(
-                "finalize_extraction_skipped_recent",
-                session_id=session_id,
-                seconds_since_last=round(_since_last, 1),
-            )
-        else:
-            try:
-                # Fetch document_context if client uploaded files
-                doc_context = None
-                session = _session_mgr.get_session(session_id)
-                # v5.0: Determine consultation type for extraction routing
-                _fin_ct = "consultation"
-                if session and session.voice_config:
-                    _fin_ct = session.voice_config.get("consultation_type", "consultation")
-                if session and session.document_context:
-                    try:
-                        from src.documents import DocumentContext
-                        doc_context = DocumentContext(**session.document_context)
-                    except Exception:
-                        pass
-
-                # R10-11: Reuse cached extractor if available
-                # B13-03: Always use DeepSeek for extraction, NOT voice_config's Azure
-                if consultation._cached_extractor:
-                    extractor = consultation._cached_extractor
-                else:
-                    llm = create_llm_client("deepseek")
-                    extractor = AnketaExtractor(llm)
-
-                anketa = await extractor.extract(
-                    dialogue_history=consultation.dialogue_history,
-                    duration_seconds=consultation.get_duration_seconds(),
-                    document_context=doc_context,
-                    consultation_type=_fin_ct,
-                )
+    # --- 2. Fan-out: each output is independent, they run concurrently ---
+    snapshot = _final_session_snapshot(fresh_session, final, final_status)
+    outputs = {}
+    if final and not _step_done(steps, "save_files"):
+        outputs["save_files"] = _finalize_output_files(consultation, final)
+    if not _step_done(steps, "save_dialogue"):
+        outputs["save_dialogue"] = _finalize_output_dialogue(consultation, session_id, final_status)
+    if final and not final["is_fallback"] and not _step_done(steps, "save_anketa"):
+        outputs["save_anketa"] = _finalize_output_anketa(session_id, final)
+
+    # Send notifications only for confirmed/reviewing sessions (R19-07)
+    if _step_done(steps, "notify"):
+        anketa_log.debug("notification_already_sent", session_id=session_id)
+    elif final_status in (SessionStatus.CONFIRMED, SessionStatus.REVIEWING):
+        outputs["notify"] = _finalize_output_notify(snapshot, final_status)
+    else:
+        anketa_log.debug("notification_skipped", session_id=session_id, status=final_status.value)
 
-                # R22-07: Skip DB update if extraction returned a fallback
-                if getattr(anketa, '_is_fallback', None) is True:
-                    anketa_log.warning(
-                        "finalize_extraction_fallback_skipped",
-                        session_id=session_id,
-                    )
-                else:
-                    anketa_data = anketa.model_dump(mode="json")
-                    anketa_md = AnketaGenerator.render_markdown(anketa)
+    if not _step_done(steps, "learning"):
+        outputs["learning"] = _finalize_output_learning(consultation, snapshot)
 
-                    # CRITICAL: Use API instead of direct DB write (voice agent = separate process)
-                    await _update_anketa_via_api(session_id, anketa_data, anketa_md)
+    pg_mgr = None if _step_done(steps, "postgres") else _try_get_postgres()
+    if pg_mgr and snapshot.anketa_data:
+        outputs["postgres"] = _finalize_output_postgres(consultation, snapshot, pg_mgr, final_status)
 
-            except Exception as e:
-                anketa_log.warning("final_anketa_extraction_failed", error=str(e))
+    results = await asyncio.gather(*outputs.values(), return_exceptions=True)
+    for step, result in zip(outputs, results):
+        if isinstance(result, BaseException):
+            _fail_step(steps, step, result)
+        else:
+            _mark_step(steps, step, result)
 
     session_log.info(
         "session_finalized_in_db",
         session_id=session_id,
         status=final_status.value,  # R12-13: Use actual status, not hardcoded
+        outputs=sorted(outputs),
+        failed=sorted(step for step, result in zip(outputs, results) if isinstance(result, BaseException)),
     )
 
-    # Load fresh session for downstream pipelines (notifications, learning, PostgreSQL)
-    session = _session_mgr.get_session(session_id)
-    if not session:
-        session_log.warning("finalize_session_lost_after_update", session_id=session_id)
-        return
-
-    # --- Send notifications only for confirmed/reviewing sessions (R19-07) ---
-    if final_status in (SessionStatus.CONFIRMED, SessionStatus.REVIEWING):
+    # --- Remove from Redis hot cache ---
+    redis_mgr = _try_get_redis()
+    if redis_mgr:
         try:
-            from src.notifications.manager import NotificationManager
-            notifier = NotificationManager()
-            await notifier.on_session_confirmed(session)
-            anketa_log.info("notification_sent", session_id=session_id, status=final_status.value)
+            redis_mgr.client.delete(f"voice:session:{session_id}")
         except Exception as e:
-            anketa_log.warning("notification_failed", error=str(e))
-    else:
-        anketa_log.debug("notification_skipped", session_id=session_id, status=final_status.value)
+            anketa_log.debug("redis_cache_cleanup_failed", error=str(e))
 
-    # --- Record learning for industry KB ---
-    try:
-        manager = _get_kb_manager()
-        builder = EnrichedContextBuilder(manager)
-        industry_id = builder.get_industry_id(consultation.dialogue_history)
-        if industry_id and session.anketa_data:
-            company = session.company_name or "N/A"
-            # FIX: Handle Mock objects and prevent StopIteration in async context
-            try:
-                anketa_values = list(session.anketa_data.values()) if hasattr(session.anketa_data, 'values') else []
-                filled = sum(1 for v in anketa_values if v and v != [] and v != "")
-            except (StopIteration, RuntimeError):
-                filled = 0  # Fallback if iteration fails
-
-            # R18-03: Use consultation duration (accurate) instead of stale DB session.duration_seconds
-            _duration_secs = consultation.get_duration_seconds()
-            insight = (
-                f"Голосовая сессия {session_id}: {company}, "
-                f"заполнено полей: {filled}, "
-                f"длительность: {round(_duration_secs / 60, 1)} мин"
-            )
-            manager.record_learning(industry_id, insight, f"voice_{session_id}")
 
-            # Dual-write to PostgreSQL (fire-and-forget)
-            pg_learning = _try_get_postgres()
-            if pg_learning:
-                try:
-                    await pg_learning.save_learning(industry_id, insight, f"voice_{session_id}")
-                except Exception:
-                    pass  # Non-fatal: YAML is primary
+# ---------------------------------------------------------------------------
+# Durable finalization queue
+# ---------------------------------------------------------------------------
+# Агент только ставит задачу в очередь (data/jobs.db) и освобождается;
+# выполняет её воркер scripts/run_jobs.py. Задача переживает перезапуск
+# агента и воркера, повторяется с backoff, завершённые шаги не повторяются.
+# ---------------------------------------------------------------------------
 
-            anketa_log.info("learning_recorded", industry_id=industry_id)
-    except Exception as e:
-        anketa_log.warning("record_learning_failed", error=str(e))
+FINALIZE_JOB = "finalize_session"
 
-    # --- Save to PostgreSQL (long-term storage) ---
-    pg_mgr = _try_get_postgres()
-    if pg_mgr and session.anketa_data:
-        try:
-            from src.anketa.schema import FinalAnketa as _FinalAnketa
+_job_queue = None
+_job_queue_lock = threading.Lock()
 
-            anketa_dict = dict(session.anketa_data)
-            if not anketa_dict.get("interview_id"):
-                anketa_dict["interview_id"] = session_id
-            anketa_obj = _FinalAnketa(**anketa_dict)
 
-            await pg_mgr.save_anketa(anketa_obj)
-            await pg_mgr.update_interview_session(
-                session_id=session_id,
-                completed_at=datetime.now(timezone.utc),
-                duration=consultation.get_duration_seconds(),  # R19-01: Use computed, not stale DB
-                completeness_score=anketa_obj.completion_rate() if hasattr(anketa_obj, 'completion_rate') else None,
-                status=final_status.value,  # R18-02: Use computed status, not stale DB read
-            )
-            anketa_log.info("postgres_saved", session_id=session_id)
-        except Exception as e:
-            anketa_log.warning("postgres_save_failed", error=str(e))
+def _get_job_queue():
+    """Get or create the shared JobQueue (data/jobs.db)."""
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                from src.jobs import JobQueue
+                _job_queue = JobQueue()
+    return _job_queue
 
-    # --- Remove from Redis hot cache ---
-    redis_mgr = _try_get_redis()
-    if redis_mgr:
-        try:
-            redis_mgr.client.delete(f"voice:session:{session_id}")
-        except Exception as e:
-            anketa_log.debug("redis_cache_cleanup_failed", error=str(e))
+
+def _enqueue_finalization(consultation: VoiceConsultationSession, session_id: Optional[str]) -> bool:
+    """
+    Поставить финализацию консультации в очередь.
+
+    Ключ идемпотентности — сессия + длина диалога: повторный disconnect того же
+    звонка не создаёт вторую задачу, а продолжение сессии после reconnect — создаёт.
+
+    Returns:
+        True, если задача поставлена (или уже была в очереди)
+    """
+    if consultation.ended_at is None:
+        consultation.ended_at = datetime.now(timezone.utc)
+    payload = consultation.to_job_payload()
+    payload["db_session_id"] = session_id
+    owner = session_id or f"standalone-{consultation.session_id}"
+    key = f"finalize:{owner}:{len(consultation.dialogue_history)}"
+    try:
+        job = _get_job_queue().enqueue(FINALIZE_JOB, payload, idempotency_key=key, session_id=session_id)
+    except Exception as e:
+        session_log.error("finalize_enqueue_failed", session_id=session_id, error=str(e))
+        return False
+    session_log.info("finalize_enqueued", session_id=session_id, job_id=job.job_id, key=key)
+    return True
+
+
+async def run_finalize_job(job, steps) -> None:
+    """Обработчик задачи FINALIZE_JOB (выполняется воркером очереди)."""
+    consultation = VoiceConsultationSession.from_job_payload(job.payload)
+    await _finalize_and_save(consultation, job.payload.get("db_session_id"), steps=steps)
 
 
 def _lookup_db_session(room_name: str):
@@ -2075,6 +2569,18 @@ def _register_event_handlers(
         # P1: Track speaking state for instruction buffering
         consultation._agent_speaking = (new_state == 'speaking')
 
+        # Time-to-first-agent-speech: от входа в entrypoint до начала приветствия
+        if new_state == 'speaking':
+            ttfs_ms = consultation.mark_agent_speech()
+            if ttfs_ms is not None:
+                logger.info(
+                    "time_to_first_speech",
+                    room=consultation.room_name,
+                    session_id=session_id,
+                    ttfs_ms=ttfs_ms,
+                    prewarmed=_worker_prewarmed,
+                )
+
         # P1: Apply buffered instructions when agent stops speaking
         if old_state == 'speaking' and new_state != 'speaking':
             if consultation._pending_instructions:
@@ -2164,12 +2670,20 @@ def _register_event_handlers(
         consultation._finalization_started = True
 
         if db_backed and session_id:
-            # B13-01: Python 3.14 — asyncio.shield() returns Future, not coroutine.
-            # asyncio.create_task() requires a coroutine, so use ensure_future instead.
-            _track_agent_task(asyncio.ensure_future(asyncio.shield(_finalize_and_save(consultation, session_id))))
+            finalize_session_id = session_id
         elif len(consultation.dialogue_history) >= 2:
             # Standalone mode: still run finalization for local output
-            _track_agent_task(asyncio.ensure_future(asyncio.shield(_finalize_and_save(consultation, None))))
+            finalize_session_id = None
+        else:
+            return
+
+        # Финализация — задача durable очереди; агент сразу свободен для следующей комнаты
+        if _enqueue_finalization(consultation, finalize_session_id):
+            return
+        # Очередь недоступна — выполняем inline, как раньше, чтобы не потерять результат
+        # B13-01: Python 3.14 — asyncio.shield() returns Future, not coroutine.
+        # asyncio.create_task() requires a coroutine, so use ensure_future instead.
+        _track_agent_task(asyncio.ensure_future(asyncio.shield(_finalize_and_save(consultation, finalize_session_id))))
 
     event_log.info("All event handlers registered successfully")
 
@@ -2250,8 +2764,8 @@ def _get_voice_id(voice_config: dict = None) -> str:
     return voice_map.get(gender, "alloy")
 
 
-# Verbosity prompt prefixes — prepended to system prompt to adjust agent's response length.
-# Must match exactly between _apply_verbosity_update (strip) and entrypoint (add).
+# Verbosity prompt prefixes — the "verbosity" instruction section, composed before the system prompt
+# to adjust agent's response length (entrypoint and _apply_verbosity_update).
 _VERBOSITY_PREFIXES = {
     "concise": "ВАЖНО: Отвечай МАКСИМАЛЬНО кратко — 1-2 предложения + 1 вопрос. Без длинных вступлений.\n\n",
     "verbose": "ВАЖНО: Давай развёрнутые ответы с примерами и пояснениями. Объясняй подробно.\n\n",
@@ -2266,12 +2780,10 @@ def _get_verbosity_prompt_prefix(verbosity: str) -> str:
 async def _apply_verbosity_update(consultation, agent_session, new_verbosity: str, log):
     """Update agent instructions mid-session to reflect new verbosity setting.
 
-    R17-05/R17-06: Uses _update_instructions_safe() for buffering during speech,
-    and reads from consultation._latest_instructions for consistency.
+    R17-05: Buffered during speech via _update_instructions_safe().
 
-    Strips the old verbosity prefix (if any) from current instructions,
-    then prepends the new one. Preserves all other prompt content
-    (KB context, resume context, review phase, etc.).
+    Replaces the "verbosity" section of consultation.instructions; all other
+    sections (KB context, resume context, review phase, etc.) are preserved.
     """
     try:
         activity = getattr(agent_session, '_activity', None)
@@ -2279,22 +2791,9 @@ async def _apply_verbosity_update(consultation, agent_session, new_verbosity: st
             log.warning("verbosity update: no activity or update_instructions available")
             return
 
-        # R17-06: Read from _latest_instructions (not stale activity.instructions)
-        current = getattr(consultation, '_latest_instructions', None) \
-            or getattr(activity, 'instructions', '') or ''
-
-        # Strip old verbosity prefix if present
-        for prefix in _VERBOSITY_PREFIXES.values():
-            if current.startswith(prefix):
-                current = current[len(prefix):]
-                break
-
-        # Prepend new verbosity prefix (empty for "normal")
-        new_prefix = _get_verbosity_prompt_prefix(new_verbosity)
-        new_instructions = new_prefix + current
-
-        # R17-05: Use _update_instructions_safe for buffering during speech
-        await _update_instructions_safe(consultation, agent_session, new_instructions)
+        # Пустой префикс для "normal" снимает секцию
+        consultation.instructions.set("verbosity", _get_verbosity_prompt_prefix(new_verbosity))
+        await _push_instructions(consultation, agent_session)
         log.info(f"verbosity updated mid-session: {new_verbosity}")
     except Exception as e:
         log.warning(f"verbosity mid-session update failed (non-fatal): {e}")
@@ -2485,6 +2984,8 @@ async def entrypoint(ctx: JobContext):
 
     Вызывается когда клиент подключается к комнате.
     """
+    job_started_at = time.perf_counter()
+
     # Debug logging to file (subprocess logs don't forward to parent, add handler once)
     # R14-05: Use RotatingFileHandler (same as agent.events) to avoid conflicts
     import logging
@@ -2499,10 +3000,8 @@ async def entrypoint(ctx: JobContext):
 
     debug_log.info(f"=== ENTRYPOINT START === Room: {ctx.room.name}")
 
-    # Force reinitialize logging in subprocess
-    from src.logging_config import setup_logging
-    setup_logging("agent")
-
+    # Логирование настроено при импорте модуля в процессе задания (setup_logging
+    # идемпотентен по pid), ресурсы процесса — в prewarm()
     logger.info("=" * 60)
     logger.info(
         "=== AGENT ENTRYPOINT CALLED ===",
@@ -2536,32 +3035,33 @@ async def entrypoint(ctx: JobContext):
         debug_log.info("STEP 3/5: Creating VoiceAgent...")
         # v5.0: Route prompt based on consultation_type
         consultation_type = voice_config.get("consultation_type", "consultation") if voice_config else "consultation"
+        instructions = InstructionComposer()
         if consultation_type == "interview":
-            prompt = get_prompt("voice/interviewer", "system_prompt")
+            instructions.set("base", get_prompt("voice/interviewer", "system_prompt"))
         else:
-            prompt = get_system_prompt()
+            instructions.set("base", get_system_prompt())
 
-        # v5.0: Verbosity injection — prepend instruction based on voice_config.
-        # Uses _VERBOSITY_PREFIXES dict so mid-session _apply_verbosity_update() can
-        # strip/replace the exact same prefix strings.
+        # v5.0: Verbosity injection — section composed before the system prompt.
+        # Mid-session _apply_verbosity_update() replaces the same section.
         if voice_config:
             verbosity = voice_config.get("verbosity", "normal")
-            verbosity_prefix = _get_verbosity_prompt_prefix(verbosity)
-            if verbosity_prefix:
-                prompt = verbosity_prefix + prompt
+            instructions.set("verbosity", _get_verbosity_prompt_prefix(verbosity))
 
         # Инъекция контекста предыдущего разговора для возобновлённых сессий
         if db_session and db_session.dialogue_history:
             resume_ctx = _build_resume_context(db_session)
-            if resume_ctx:
-                prompt = prompt + resume_ctx
+            if instructions.set("resume", resume_ctx):
                 debug_log.info(
                     f"STEP 3/5: Resume context injected, "
                     f"history_messages={len(db_session.dialogue_history)}, "
                     f"context_length={len(resume_ctx)}"
                 )
 
-        agent = VoiceAgent(instructions=prompt)
+        prompt = instructions.compose()
+        instructions.mark_pushed()  # начальные инструкции уходят вместе с агентом
+        # Поиск по документам клиента — вместо полного текста в инструкциях
+        tools = [_build_document_search_tool(session_id)] if session_id else []
+        agent = VoiceAgent(instructions=prompt, tools=tools)
         debug_log.info(f"STEP 3/5: VoiceAgent created, prompt_length={len(prompt)}")
     except Exception as e:
         debug_log.error(f"STEP 3/5 FAILED: {e}")
@@ -2631,22 +3131,32 @@ async def entrypoint(ctx: JobContext):
 
         # session_id and db_session already obtained in Step 1
         consultation = _init_consultation(ctx.room.name, db_session)
+        consultation.instructions = instructions
+        consultation.job_started_at = job_started_at
 
         _register_event_handlers(
             session, consultation, session_id, db_backed=db_session is not None,
         )
         debug_log.info("STEP 5/5: Event handlers registered")
 
+        # Отчёты комнаты в реестр воркеров сервера; последний (closed) освобождает слот
+        load_reporter = RoomLoadReporter(
+            ctx.room.name, _send_room_load,
+            inflight=lambda: get_extraction_pipeline().queue_depth("llm"),
+            pipeline_stats=lambda: get_extraction_pipeline().stats(),
+        )
+        load_reporter.start()
+        ctx.add_shutdown_callback(load_reporter.stop)
+
         # Register session in Redis (optional hot cache)
         redis_mgr = _try_get_redis()
         if redis_mgr and session_id:
             try:
-                import json as _json
                 redis_key = f"voice:session:{session_id}"
                 redis_mgr.client.setex(
                     redis_key,
                     7200,  # 2h TTL
-                    _json.dumps({
+                    dumps({
                         "session_id": session_id,
                         "room_name": ctx.room.name,
                         "status": "active",
@@ -2714,8 +3224,7 @@ async def entrypoint(ctx: JobContext):
 
         # Handle document upload notification
         try:
-            import json as _json
-            metadata = _json.loads(new_metadata) if new_metadata else {}
+            metadata = loads(new_metadata) if new_metadata else {}
             if metadata.get("document_context_updated"):
                 # Re-load session to get fresh document_context
                 if session_id:
@@ -2769,6 +3278,17 @@ async def entrypoint(ctx: JobContext):
                                     f"Рекомендации по агентам из документов:\n{rec_str}"
                                 )
 
+                            # Документы проиндексированы при загрузке: агент ищет фрагменты
+                            # инструментом search_documents, полный текст в инструкции не нужен
+                            from src.documents.retrieval import get_document_index_store
+                            if get_document_index_store().load(session_id) is not None:
+                                doc_block_parts.append(
+                                    "Полный текст документов доступен через инструмент search_documents. "
+                                    "Перед тем как называть цены, числа, сроки или условия из документов, "
+                                    "вызови search_documents с вопросом клиента и опирайся на найденные фрагменты."
+                                )
+                                docs = []
+
                             # B14: Include full document text — agent needs actual content
                             # to answer specific questions (e.g. "how many agents are recommended")
                             # Budget: 20K chars per doc (Azure Realtime 128K context can handle it)
@@ -2785,9 +3305,6 @@ async def entrypoint(ctx: JobContext):
                             doc_block_parts.append(doc_ctx.summary)
 
                         if doc_block_parts and session:
-                            current_instr = getattr(consultation, '_latest_instructions', None) \
-                                or getattr(getattr(session, '_activity', None), 'instructions', None) \
-                                or ''
                             doc_content = "\n\n".join(doc_block_parts)
                             # B14: 50K limit — Azure Realtime 128K context window handles this
                             # Typical: 2-5 docs × 15-20K chars = 30-100K chars, we cap at 50K
@@ -2800,10 +3317,10 @@ async def entrypoint(ctx: JobContext):
                                 "числа, имена, рекомендации.\n\n"
                                 f"{doc_content[:50000]}"
                             )
-                            if "### Документы клиента:" not in current_instr:
-                                updated_instr = current_instr + doc_block
+                            # Повторная загрузка обновляет секцию; без изменений — ничего не отправляется
+                            if consultation.instructions.set("documents", doc_block):
                                 _track_agent_task(asyncio.create_task(
-                                    _update_instructions_safe(consultation, session, updated_instr)
+                                    _push_instructions(consultation, session)
                                 ))
                                 debug_log.info(
                                     f"document_context_injected_into_instructions "
@@ -2918,15 +3435,29 @@ def run_voice_agent():
     if len(sys.argv) == 1:
         sys.argv.append("dev")
 
+    # Идентификатор воркера наследуют процессы заданий (отчёты комнат в реестр сервера)
+    worker_id()
+    # Несколько воркеров на хосте (supervisor) — у каждого свой HTTP-порт LiveKit
+    port_options = {"port": int(os.environ["AGENT_HTTP_PORT"])} if os.getenv("AGENT_HTTP_PORT") else {}
+    # Порог по комнатам — только при ограниченной ёмкости, иначе порог LiveKit по умолчанию
+    load_options = {"load_threshold": LOAD_THRESHOLD} if worker_capacity() else {}
+
     # agent_name отключает автоматический dispatch - агент будет запускаться
     # только при явном вызове через CreateAgentDispatchRequest
     cli.run_app(
         WorkerOptions(
             entrypoint_fnc=entrypoint,
+            prewarm_fnc=prewarm,
+            # Ёмкость воркера: AGENT_MAX_ROOMS комнат, дальше LiveKit шлёт задания другим воркерам
+            load_fnc=_worker_load,
+            # KB (~1000 YAML) грузится в prewarm — запас к 10 с по умолчанию
+            initialize_process_timeout=float(os.getenv("AGENT_PREWARM_TIMEOUT", "30")),
             agent_name="hanc-consultant",  # Explicit dispatch only
             api_key=api_key,
             api_secret=api_secret,
             ws_url=livekit_url,
+            **port_options,
+            **load_options,
         ),
     )
 
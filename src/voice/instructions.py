@@ -0,0 +1,130 @@
+"""
+Instruction composer — инструкции realtime-модели из именованных секций.
+
+Раньше каждая стадия агента (KB, напоминание о полях, review, документы)
+резала и склеивала строку инструкций по маркерам и отправляла её целиком,
+даже если текст не изменился. Каждый update_instructions — это
+session.update в Realtime API: лишний трафик и щелчки в аудио.
+
+Теперь у консультации один InstructionComposer:
+- секции в фиксированном порядке (SECTIONS), каждая хранит текст и хэш;
+- compose() склеивает секции и кэширует результат до следующего изменения;
+- changed — хэш композиции отличается от последнего отправленного
+  (mark_pushed); одинаковые инструкции повторно не отправляются.
+
+Цикл экстракции меняет секции и отправляет не больше одного обновления
+в конце цикла (см. _update_agent_after_extraction в consultant.py).
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+SECTIONS = (
+    "verbosity",   # префикс длины ответов (voice_config.verbosity)
+    "base",        # системный промпт консультанта / интервьюера
+    "resume",      # контекст предыдущего разговора
+    "research",    # данные исследования сайта клиента
+    "kb",          # контекст отрасли для текущей фазы
+    "documents",   # документы клиента
+    "reminder",    # незаполненные поля анкеты
+    "review",      # режим проверки анкеты
+)
+
+SEPARATOR = "\n\n"
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass(frozen=True)
+class Section:
+    """Rendered section text and its content hash."""
+
+    text: str
+    digest: str
+
+
+def _composition_hash(sections: Dict[str, Section]) -> str:
+    return _digest("|".join(
+        f"{name}:{sections[name].digest}" for name in SECTIONS if name in sections
+    ))
+
+
+class InstructionComposer:
+    """Named instruction sections with change detection."""
+
+    def __init__(self):
+        self._sections: Dict[str, Section] = {}
+        self._composed: Optional[str] = None
+        self._composed_hash: Optional[str] = None
+        self._pushed_hash: Optional[str] = None
+
+    def set(self, name: str, text: Optional[str]) -> bool:
+        """Set section text (empty text clears it). Returns True if the section changed."""
+        if name not in SECTIONS:
+            raise KeyError(f"Unknown instruction section: {name}")
+        text = (text or "").strip()
+        if not text:
+            return self.clear(name)
+        digest = _digest(text)
+        current = self._sections.get(name)
+        if current is not None and current.digest == digest:
+            return False
+        self._sections[name] = Section(text=text, digest=digest)
+        self._invalidate()
+        return True
+
+    def clear(self, name: str) -> bool:
+        """Remove a section. Returns True if it was present."""
+        if self._sections.pop(name, None) is None:
+            return False
+        self._invalidate()
+        return True
+
+    def get(self, name: str) -> str:
+        section = self._sections.get(name)
+        return section.text if section is not None else ""
+
+    def has(self, name: str) -> bool:
+        return name in self._sections
+
+    def compose(self) -> str:
+        """Full instructions: non-empty sections in SECTIONS order."""
+        if self._composed is None:
+            self._composed = SEPARATOR.join(
+                self._sections[name].text for name in SECTIONS if name in self._sections
+            )
+        return self._composed
+
+    def ensure_base(self, text: str) -> None:
+        """Set the base section if absent, as the instructions the agent was created with.
+
+        With nothing pushed yet, the base-only composition counts as sent.
+        """
+        if self.has("base"):
+            return
+        self.set("base", text)
+        if self._pushed_hash is None and self.has("base"):
+            self._pushed_hash = _composition_hash({"base": self._sections["base"]})
+
+    @property
+    def composed_hash(self) -> str:
+        """Hash of the composition, derived from the section hashes."""
+        if self._composed_hash is None:
+            self._composed_hash = _composition_hash(self._sections)
+        return self._composed_hash
+
+    @property
+    def changed(self) -> bool:
+        """True if the composition differs from the last pushed one."""
+        return self.composed_hash != self._pushed_hash
+
+    def mark_pushed(self, digest: Optional[str] = None) -> None:
+        """Record a composition as sent (default: the current one, e.g. initial Agent instructions)."""
+        self._pushed_hash = digest if digest is not None else self.composed_hash
+
+    def _invalidate(self) -> None:
+        self._composed = None
+        self._composed_hash = None
@@ -0,0 +1,130 @@
+"""
+Extraction pipeline — стадии цикла экстракции анкеты в голосовом агенте.
+
+Цикл разбит на стадии:
+- snapshot: чтение сессии из БД, окно диалога, подготовка экстрактора
+- llm:      вызов LLM — единственная стадия, занимающая разрешение (permit)
+- persist:  merge с БД, PUT анкеты и диалога на веб-сервер
+- agent:    исследование сайта, KB-контекст, напоминания, review-фаза
+
+Разрешения ограничивают число одновременных LLM-вызовов на воркер
+(MAX_CONCURRENT_EXTRACTIONS). Пока одна сессия пишет в БД и обновляет
+инструкции агента, её разрешение уже отдано следующей сессии.
+
+stats() — глубина очереди и счётчики по стадиям для мониторинга.
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+STAGES = ("snapshot", "llm", "persist", "agent")
+
+DEFAULT_MAX_CONCURRENT_LLM = 10
+
+
+@dataclass
+class StageStats:
+    """Counters of one pipeline stage."""
+
+    waiting: int = 0        # ждут разрешения (только llm)
+    active: int = 0         # выполняются сейчас
+    completed: int = 0
+    failed: int = 0
+    max_waiting: int = 0
+    wait_seconds: float = 0.0
+    busy_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        data = asdict(self)
+        data["wait_seconds"] = round(self.wait_seconds, 3)
+        data["busy_seconds"] = round(self.busy_seconds, 3)
+        return data
+
+
+class ExtractionPipeline:
+    """Stage accounting and the LLM concurrency permit of the extraction cycle."""
+
+    def __init__(self, max_concurrent_llm: int = DEFAULT_MAX_CONCURRENT_LLM):
+        self.max_concurrent_llm = max(1, max_concurrent_llm)
+        self._semaphore = asyncio.Semaphore(self.max_concurrent_llm)
+        self._stats: Dict[str, StageStats] = {stage: StageStats() for stage in STAGES}
+
+    @classmethod
+    def from_env(cls) -> "ExtractionPipeline":
+        try:
+            limit = int(os.getenv("MAX_CONCURRENT_EXTRACTIONS", str(DEFAULT_MAX_CONCURRENT_LLM)))
+        except ValueError:
+            limit = DEFAULT_MAX_CONCURRENT_LLM
+        return cls(limit)
+
+    @asynccontextmanager
+    async def stage(self, name: str) -> AsyncIterator[None]:
+        """Account a stage run (active/completed/failed, busy time)."""
+        stats = self._stats[name]
+        stats.active += 1
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            stats.failed += 1
+            raise
+        else:
+            stats.completed += 1
+        finally:
+            stats.active -= 1
+            stats.busy_seconds += time.perf_counter() - start
+
+    @asynccontextmanager
+    async def llm_permit(self) -> AsyncIterator[None]:
+        """Hold an LLM permit for the duration of the block (the "llm" stage)."""
+        stats = self._stats["llm"]
+        stats.waiting += 1
+        stats.max_waiting = max(stats.max_waiting, stats.waiting)
+        start = time.perf_counter()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            stats.waiting -= 1
+            stats.wait_seconds += time.perf_counter() - start
+        try:
+            async with self.stage("llm"):
+                yield
+        finally:
+            self._semaphore.release()
+
+    async def run(self, name: str, coro: Awaitable[T]) -> T:
+        """Await coro as a run of the given stage."""
+        async with self.stage(name):
+            return await coro
+
+    async def run_concurrently(self, *runs: Tuple[str, Awaitable[Any]]) -> List[Any]:
+        """Run independent stages concurrently: run_concurrently(("persist", coro), ("agent", coro))."""
+        return await asyncio.gather(*(self.run(name, coro) for name, coro in runs))
+
+    def queue_depth(self, name: str) -> int:
+        """Runs of a stage waiting or in progress."""
+        stats = self._stats[name]
+        return stats.waiting + stats.active
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage counters plus the permit limit."""
+        data = {name: stats.to_dict() for name, stats in self._stats.items()}
+        data["llm"]["limit"] = self.max_concurrent_llm
+        return data
+
+
+_pipeline: Optional[ExtractionPipeline] = None
+
+
+def get_extraction_pipeline() -> ExtractionPipeline:
+    """Worker-wide pipeline (limit from MAX_CONCURRENT_EXTRACTIONS)."""
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = ExtractionPipeline.from_env()
+    return _pipeline
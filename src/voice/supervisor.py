@@ -0,0 +1,152 @@
+"""
+Agent Supervisor — несколько процессов-воркеров голосового агента на хосте.
+
+Каждый воркер — отдельный `run_voice_agent.py start` со своим AGENT_WORKER_ID
+и HTTP-портом LiveKit (AGENT_HTTP_PORT: base_port + i), иначе воркеры
+конфликтуют за порт 8081. Упавший воркер перезапускается с экспоненциальной
+задержкой (backoff_delay очереди задач); воркер, проработавший дольше
+stable_seconds, начинает счёт попыток заново.
+
+LiveKit сам распределяет комнаты между зарегистрированными воркерами по их
+загрузке (load_fnc, см. src/voice/workers.py).
+
+Usage:
+    supervisor = AgentSupervisor(workers=3, command=[sys.executable, "scripts/run_voice_agent.py", "start"])
+    supervisor.run()   # до SIGTERM / supervisor.stop()
+"""
+
+import os
+import signal
+import socket
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import structlog
+
+from src.jobs.worker import backoff_delay
+
+logger = structlog.get_logger("agent")
+
+DEFAULT_BASE_PORT = 8081
+
+
+@dataclass
+class WorkerProcess:
+    """One supervised worker slot."""
+
+    index: int
+    worker_id: str
+    port: int
+    process: Optional[subprocess.Popen] = None
+    started_at: float = 0.0
+    restarts: int = 0
+    failures: int = 0  # подряд, для backoff
+    restart_at: Optional[float] = None
+
+
+class AgentSupervisor:
+    """Запускает N воркеров и перезапускает упавшие."""
+
+    def __init__(
+        self,
+        workers: int,
+        command: List[str],
+        base_port: int = DEFAULT_BASE_PORT,
+        env: Optional[Dict[str, str]] = None,
+        backoff_base: float = 1.0,
+        backoff_cap: float = 60.0,
+        stable_seconds: float = 60.0,
+        poll_interval: float = 1.0,
+        drain_timeout: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.command = list(command)
+        self.env = dict(os.environ if env is None else env)
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.stable_seconds = stable_seconds
+        self.poll_interval = poll_interval
+        self.drain_timeout = drain_timeout
+        self._clock = clock
+        self._stopping = threading.Event()
+        host = socket.gethostname()
+        self.workers = [
+            WorkerProcess(index=i, worker_id=f"{host}-w{i}", port=base_port + i)
+            for i in range(max(1, workers))
+        ]
+
+    def _spawn(self, slot: WorkerProcess) -> None:
+        env = dict(
+            self.env,
+            AGENT_WORKER_ID=slot.worker_id,
+            AGENT_HTTP_PORT=str(slot.port),
+            AGENT_SUPERVISED="1",
+        )
+        slot.process = subprocess.Popen(self.command, env=env)
+        slot.started_at = self._clock()
+        slot.restart_at = None
+        logger.info("agent_worker_started", worker_id=slot.worker_id, pid=slot.process.pid, port=slot.port)
+
+    def start(self) -> None:
+        for slot in self.workers:
+            self._spawn(slot)
+
+    def poll(self) -> None:
+        """Detect exited workers and restart the ones whose backoff elapsed."""
+        now = self._clock()
+        for slot in self.workers:
+            if slot.restart_at is not None:
+                if now >= slot.restart_at and not self._stopping.is_set():
+                    slot.restarts += 1
+                    self._spawn(slot)
+                continue
+            if slot.process is None or slot.process.poll() is None:
+                continue
+            if now - slot.started_at >= self.stable_seconds:
+                slot.failures = 0
+            slot.failures += 1
+            delay = backoff_delay(slot.failures, base=self.backoff_base, cap=self.backoff_cap)
+            slot.restart_at = now + delay
+            logger.warning(
+                "agent_worker_exited",
+                worker_id=slot.worker_id,
+                returncode=slot.process.returncode,
+                restart_in=delay,
+            )
+
+    def alive(self) -> int:
+        return sum(1 for slot in self.workers if slot.process is not None and slot.process.poll() is None)
+
+    def run(self) -> None:
+        """Start workers and supervise until stop() (SIGTERM/SIGINT in the main thread)."""
+        if threading.current_thread() is threading.main_thread():
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(sig, lambda *_: self._stopping.set())
+        self.start()
+        try:
+            while not self._stopping.wait(self.poll_interval):
+                self.poll()
+        finally:
+            self.shutdown()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """SIGTERM to all workers (LiveKit lets active rooms finish), SIGKILL after drain_timeout."""
+        self._stopping.set()
+        timeout = self.drain_timeout if timeout is None else timeout
+        running = [slot.process for slot in self.workers if slot.process is not None and slot.process.poll() is None]
+        for process in running:
+            process.terminate()
+        deadline = self._clock() + timeout
+        for process in running:
+            try:
+                process.wait(timeout=max(0.0, deadline - self._clock()))
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        logger.info("agent_supervisor_stopped", workers=len(self.workers))
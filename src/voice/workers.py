@@ -0,0 +1,243 @@
+"""
+Agent workers — нагрузка процесса-воркера LiveKit и отчёты на веб-сервер.
+
+На хосте может работать несколько воркеров (scripts/run_voice_agent.py
+--workers N, см. src/voice/supervisor.py). Каждый воркер:
+- сообщает LiveKit загрузку rooms/capacity (load_fnc) — при AGENT_MAX_ROOMS
+  комнатах LiveKit помечает воркер полным и перестаёт слать ему задания.
+  Ёмкость ограничена, только если AGENT_MAX_ROOMS задан явно или воркер
+  запущен супервизором (по умолчанию DEFAULT_ROOMS_PER_WORKER); одиночный
+  воркер без AGENT_MAX_ROOMS не ограничен и отдаёт LiveKit загрузку CPU, как
+  без этого модуля;
+- раз в AGENT_REPORT_INTERVAL секунд шлёт heartbeat на веб-сервер
+  (POST /api/agent/heartbeat): комнаты, ёмкость, задержку своего event loop.
+
+Процесс задания (одна комната) отчитывается отдельно через RoomLoadReporter:
+извлечения в работе (стадия llm пайплайна), счётчики стадий пайплайна
+(ExtractionPipeline.stats — видны в /api/agent/health) и задержка loop комнаты.
+
+Глобальные объекты consultant.py (_session_mgr, _shared_http_client, пайплайн
+извлечения) живут в процессе задания и на другие воркеры не влияют.
+"""
+
+import asyncio
+import os
+import socket
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import structlog
+
+from src.serialization import dumps_bytes
+
+logger = structlog.get_logger("agent")
+
+DEFAULT_ROOMS_PER_WORKER = 4
+DEFAULT_REPORT_INTERVAL = 5.0
+# LiveKit в prod требует load_threshold < 1: при load = rooms/capacity воркер
+# полон ровно на capacity комнатах для любой ёмкости до 100
+LOAD_THRESHOLD = 0.99
+# Интервал, с которым LiveKit вызывает load_fnc (livekit.agents.worker.UPDATE_LOAD_INTERVAL)
+_LIVEKIT_LOAD_INTERVAL = 0.5
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _env_number(name: str, default, cast):
+    try:
+        return cast(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def worker_capacity() -> int:
+    """
+    Rooms per worker process: AGENT_MAX_ROOMS, DEFAULT_ROOMS_PER_WORKER under
+    the supervisor, else 0 — no limit.
+    """
+    if os.getenv("AGENT_MAX_ROOMS"):
+        return max(1, _env_number("AGENT_MAX_ROOMS", DEFAULT_ROOMS_PER_WORKER, int))
+    if os.getenv("AGENT_SUPERVISED") == "1":
+        return DEFAULT_ROOMS_PER_WORKER
+    return 0
+
+
+def report_interval() -> float:
+    return max(0.5, _env_number("AGENT_REPORT_INTERVAL", DEFAULT_REPORT_INTERVAL, float))
+
+
+def worker_id() -> str:
+    """AGENT_WORKER_ID from the supervisor, else host-pid; job processes inherit it."""
+    value = os.getenv("AGENT_WORKER_ID")
+    if not value:
+        value = os.environ["AGENT_WORKER_ID"] = f"{socket.gethostname()}-{os.getpid()}"
+    return value
+
+
+def heartbeat_url() -> str:
+    server_url = os.getenv("WEB_SERVER_URL", "http://localhost:8000")
+    return f"{server_url}/api/agent/heartbeat"
+
+
+def room_load(active_rooms: int, capacity: int) -> float:
+    """Worker load for LiveKit: share of occupied room slots (1.0 — full, 0 capacity — no limit)."""
+    if capacity <= 0:
+        return 0.0
+    return min(1.0, active_rooms / capacity)
+
+
+class WorkerLoadProbe:
+    """
+    load_fnc воркера и источник его heartbeat.
+
+    LiveKit вызывает load_fnc из event loop воркера каждые 0.5 с; превышение
+    интервала между вызовами — задержка loop воркера. Heartbeat уходит из
+    фонового потока: loop воркера принадлежит LiveKit.
+
+    Без ограничения ёмкости (capacity 0) загрузку для LiveKit считает
+    base_load (например, WorkerOptions.load_fnc — CPU), комнаты только
+    отчитываются.
+    """
+
+    def __init__(
+        self,
+        capacity: Optional[int] = None,
+        interval: Optional[float] = None,
+        url: Optional[str] = None,
+        clock: Callable[[], float] = time.monotonic,
+        base_load: Optional[Callable[[Any], float]] = None,
+    ):
+        self.capacity = worker_capacity() if capacity is None else capacity
+        self._base_load = base_load
+        self.interval = interval or report_interval()
+        self.url = url or heartbeat_url()
+        self._clock = clock
+        self._rooms: List[str] = []
+        self._loop_lag_ms = 0.0
+        self._last_call: Optional[float] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def __call__(self, worker) -> float:
+        """WorkerOptions.load_fnc."""
+        rooms = [info.job.room.name for info in worker.active_jobs]
+        load = self.observe(rooms)
+        if not self.capacity and self._base_load is not None:
+            load = self._base_load(worker)
+        self.start()
+        return load
+
+    def observe(self, rooms: List[str]) -> float:
+        now = self._clock()
+        with self._lock:
+            if self._last_call is not None:
+                lag = max(0.0, now - self._last_call - _LIVEKIT_LOAD_INTERVAL)
+                # Пиковая задержка за период отчёта (сбрасывается в snapshot)
+                self._loop_lag_ms = max(self._loop_lag_ms, lag * 1000)
+            self._last_call = now
+            self._rooms = list(rooms)
+        return room_load(len(rooms), self.capacity)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Heartbeat payload; resets the peak loop lag."""
+        with self._lock:
+            lag, self._loop_lag_ms = self._loop_lag_ms, 0.0
+            rooms = list(self._rooms)
+        return {
+            "worker_id": worker_id(),
+            "pid": os.getpid(),
+            "host": socket.gethostname(),
+            "capacity": self.capacity,
+            "rooms": rooms,
+            "loop_lag_ms": round(lag, 1),
+        }
+
+    def send(self, client: httpx.Client) -> bool:
+        try:
+            response = client.post(self.url, content=dumps_bytes(self.snapshot()), headers=_JSON_HEADERS)
+            return response.status_code == 200
+        except httpx.HTTPError as e:
+            # Веб-сервер может быть ещё не поднят — не шумим
+            logger.debug("worker_heartbeat_failed", error=str(e))
+            return False
+
+    def _run(self) -> None:
+        with httpx.Client(timeout=2.0) as client:
+            while not self._stop.is_set():
+                self.send(client)
+                self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        """Start the heartbeat thread once per process."""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="agent-heartbeat", daemon=True)
+                    self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+class RoomLoadReporter:
+    """
+    Отчёты процесса задания (одна комната): извлечения в работе и задержка loop.
+
+    Задержка меряется по опозданию sleep(interval) в loop комнаты; последний
+    отчёт (closed=True) сразу освобождает слот в реестре сервера.
+    """
+
+    def __init__(
+        self,
+        room: str,
+        send: Callable[[Dict[str, Any]], Awaitable[bool]],
+        inflight: Callable[[], int],
+        interval: Optional[float] = None,
+        pipeline_stats: Optional[Callable[[], Dict[str, Dict[str, float]]]] = None,
+    ):
+        self.room = room
+        self._send = send
+        self._inflight = inflight
+        self._pipeline_stats = pipeline_stats
+        self.interval = interval or report_interval()
+        self._task: Optional[asyncio.Task] = None
+
+    def _payload(self, loop_lag_ms: float = 0.0, closed: bool = False) -> Dict[str, Any]:
+        payload = {
+            "worker_id": worker_id(),
+            "pid": os.getpid(),
+            "room": self.room,
+            "inflight_extractions": self._inflight(),
+            "loop_lag_ms": round(loop_lag_ms, 1),
+            "closed": closed,
+        }
+        if self._pipeline_stats is not None:
+            payload["pipeline"] = self._pipeline_stats()
+        return payload
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        await self._send(self._payload())
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+            await self._send(self._payload(lag * 1000))
+
+    def start(self) -> asyncio.Task:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._send(self._payload(closed=True))
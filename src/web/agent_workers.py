@@ -0,0 +1,213 @@
+"""
+Agent workers — registry of voice agent worker processes on the web server side.
+
+A host may run several LiveKit worker processes (scripts/run_voice_agent.py
+--workers N). Every worker sends a heartbeat to POST /api/agent/heartbeat with
+its capacity, the rooms it serves and its event-loop lag; every job process
+(one per room) reports in-flight extractions, the per-stage counters of its
+extraction pipeline (queue depth, wait and busy time) and the lag of its own loop.
+WorkerRegistry merges these reports: /api/agent/health shows all workers, and
+room dispatch asks assign() for a free slot first.
+
+LiveKit chooses the worker for a dispatched job itself; the registry only
+keeps the sum of slots honest. A reservation holds a slot for a room until a
+heartbeat lists the room on some worker (or the reservation expires), so a
+burst of new sessions between heartbeats cannot overbook the pool. A room that
+is already served or reserved keeps its worker and does not take a second slot.
+A worker reporting capacity 0 has no room limit (a single worker started
+without AGENT_MAX_ROOMS): it always accepts, and the pool capacity is None.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import structlog
+
+logger = structlog.get_logger("server")
+
+# Воркер без heartbeat дольше этого считается мёртвым (интервал отчёта — 5 с)
+WORKER_STALE_SECONDS = 15.0
+# Сколько держать слот под отправленный dispatch до подтверждения heartbeat'ом
+RESERVATION_SECONDS = 30.0
+
+
+@dataclass
+class RoomLoad:
+    """Last report of a job process."""
+
+    inflight_extractions: int = 0
+    loop_lag_ms: float = 0.0
+    pipeline: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+
+@dataclass
+class WorkerState:
+    """Last known state of one worker process."""
+
+    worker_id: str
+    pid: Optional[int] = None
+    host: Optional[str] = None
+    capacity: int = 0
+    loop_lag_ms: float = 0.0
+    updated_at: float = 0.0
+    rooms: Dict[str, RoomLoad] = field(default_factory=dict)
+    reserved: Dict[str, float] = field(default_factory=dict)  # room -> expires at
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def occupied(self) -> int:
+        return len(self.rooms) + len([room for room in self.reserved if room not in self.rooms])
+
+    def free_slots(self) -> Optional[int]:
+        """Free room slots; None — no limit."""
+        if self.unlimited:
+            return None
+        return max(0, self.capacity - self.occupied())
+
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "pid": self.pid,
+            "host": self.host,
+            "capacity": None if self.unlimited else self.capacity,
+            "active_rooms": sorted(self.rooms),
+            "reserved_rooms": sorted(room for room in self.reserved if room not in self.rooms),
+            "free_slots": self.free_slots(),
+            "inflight_extractions": sum(room.inflight_extractions for room in self.rooms.values()),
+            "loop_lag_ms": round(max([self.loop_lag_ms] + [room.loop_lag_ms for room in self.rooms.values()]), 1),
+            "pipeline": {name: room.pipeline for name, room in sorted(self.rooms.items()) if room.pipeline},
+            "last_seen_seconds": round(now - self.updated_at, 1),
+        }
+
+
+class WorkerRegistry:
+    """Heartbeats of agent workers and slot accounting for room dispatch."""
+
+    def __init__(
+        self,
+        stale_seconds: float = WORKER_STALE_SECONDS,
+        reservation_seconds: float = RESERVATION_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.stale_seconds = stale_seconds
+        self.reservation_seconds = reservation_seconds
+        self._clock = clock
+        self._workers: Dict[str, WorkerState] = {}
+        self._lock = threading.Lock()
+
+    def _worker(self, worker_id: str) -> WorkerState:
+        state = self._workers.get(worker_id)
+        if state is None:
+            state = self._workers[worker_id] = WorkerState(worker_id)
+        return state
+
+    def report_worker(
+        self,
+        worker_id: str,
+        capacity: int,
+        rooms: List[str],
+        pid: Optional[int] = None,
+        host: Optional[str] = None,
+        loop_lag_ms: float = 0.0,
+    ) -> None:
+        """Heartbeat of a worker process: the authoritative list of its rooms."""
+        now = self._clock()
+        with self._lock:
+            state = self._worker(worker_id)
+            state.pid, state.host, state.capacity = pid, host, capacity
+            state.loop_lag_ms = loop_lag_ms
+            state.updated_at = now
+            state.rooms = {room: state.rooms.get(room) or RoomLoad() for room in rooms}
+            # Комната пришла на воркер — резерв под её dispatch больше не нужен, где бы он ни был
+            for other in self._workers.values():
+                for room in rooms:
+                    other.reserved.pop(room, None)
+
+    def report_room(
+        self,
+        worker_id: str,
+        room: str,
+        inflight_extractions: int = 0,
+        loop_lag_ms: float = 0.0,
+        closed: bool = False,
+        pipeline: Optional[Dict[str, Dict[str, float]]] = None,
+    ) -> None:
+        """Report of a job process; closed=True drops the room right away."""
+        with self._lock:
+            state = self._worker(worker_id)
+            if closed:
+                state.rooms.pop(room, None)
+                state.reserved.pop(room, None)
+                return
+            state.rooms[room] = RoomLoad(inflight_extractions, loop_lag_ms, pipeline or {})
+            for other in self._workers.values():
+                other.reserved.pop(room, None)
+
+    def _alive(self, now: float) -> List[WorkerState]:
+        alive = []
+        for state in self._workers.values():
+            if now - state.updated_at > self.stale_seconds:
+                continue
+            state.reserved = {room: until for room, until in state.reserved.items() if until > now}
+            alive.append(state)
+        return alive
+
+    @property
+    def reporting(self) -> bool:
+        """True if at least one worker sent a heartbeat recently."""
+        with self._lock:
+            return bool(self._alive(self._clock()))
+
+    def assign(self, room: str) -> Optional[str]:
+        """
+        Take a slot for a room dispatch.
+
+        Returns the worker already serving or holding the room (no new slot),
+        else reserves a slot on the worker with the most free slots. None if
+        every live worker is full.
+        """
+        now = self._clock()
+        with self._lock:
+            alive = self._alive(now)
+            for state in alive:
+                if room in state.rooms or room in state.reserved:
+                    return state.worker_id
+            candidates = [state for state in alive if state.unlimited or state.free_slots() > 0]
+            if not candidates:
+                return None
+            best = max(
+                candidates,
+                key=lambda state: (state.unlimited, state.free_slots() or 0, -state.occupied()),
+            )
+            best.reserved[room] = now + self.reservation_seconds
+            return best.worker_id
+
+    def release(self, room: str) -> None:
+        """Drop a reservation (dispatch failed)."""
+        with self._lock:
+            for state in self._workers.values():
+                state.reserved.pop(room, None)
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate over live workers for /api/agent/health."""
+        now = self._clock()
+        with self._lock:
+            alive = sorted(self._alive(now), key=lambda state: state.worker_id)
+            # Давно молчащие воркеры забываем совсем
+            for worker_id in [w for w, s in self._workers.items() if now - s.updated_at > self.stale_seconds * 20]:
+                del self._workers[worker_id]
+            workers = [state.to_dict(now) for state in alive]
+        # Хотя бы один воркер без ограничения — ёмкость пула не ограничена
+        limited = all(w["capacity"] is not None for w in workers)
+        return {
+            "workers": workers,
+            "capacity": sum(w["capacity"] for w in workers) if limited else None,
+            "active_rooms": sum(len(w["active_rooms"]) for w in workers),
+            "free_slots": sum(w["free_slots"] for w in workers) if limited else None,
+            "inflight_extractions": sum(w["inflight_extractions"] for w in workers),
+            "max_loop_lag_ms": max((w["loop_lag_ms"] for w in workers), default=0.0),
+        }
@@ -0,0 +1,174 @@
+"""
+Session events — server push of anketa/status changes (Server-Sent Events).
+
+SessionManager calls SessionEventBroker.publish() after each committed change
+(update_anketa, update_dialogue, update_status, update_metadata); the web server
+publishes runtime-status changes itself. The broker fans events out to the
+SSE streams open for that session.
+
+Work per change is done once, not per tab: the anketa delta and completion
+rate are computed once and the same message is queued to every subscriber.
+Sessions with no open streams cost a single dict lookup.
+"""
+
+import asyncio
+import copy
+import itertools
+import threading
+from typing import Any, Callable, Dict, Optional, Set
+
+import structlog
+
+from src.serialization import dumps
+
+logger = structlog.get_logger("server")
+
+# Сколько сообщений может накопиться у медленного клиента до resync
+_QUEUE_SIZE = 100
+
+
+def anketa_delta(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Top-level field delta between two anketa_data dicts."""
+    changed = {key: value for key, value in new.items() if old.get(key) != value or key not in old}
+    removed = [key for key in old if key not in new]
+    return {"changed": changed, "removed": removed}
+
+
+def format_sse(event: str, data: Dict[str, Any], event_id: Optional[int] = None) -> str:
+    """Serialize one SSE frame."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+class SessionEventBroker:
+    """
+    In-process pub/sub of session changes for SSE streams.
+
+    publish() is thread-safe and may be called from any thread; delivery
+    happens on the event loop that owns the subscriptions.
+    """
+
+    def __init__(self, completion_fn: Optional[Callable[[Dict[str, Any]], float]] = None):
+        """
+        Args:
+            completion_fn: Computes completion_rate from anketa_data when the
+                           change doesn't carry a stored one
+        """
+        self._completion_fn = completion_fn
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        # Последний отправленный anketa_data — база для дельт (только для сессий с подписчиками)
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+        self._runtime: Dict[str, str] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+
+    def subscribe(
+        self,
+        session_id: str,
+        anketa_data: Optional[Dict[str, Any]] = None,
+        runtime_status: Optional[str] = None,
+    ) -> asyncio.Queue:
+        """
+        Open a stream for a session (must be called on the event loop).
+
+        Args:
+            session_id: Session to follow
+            anketa_data: Anketa already sent to this client in the snapshot
+            runtime_status: Runtime status already sent in the snapshot
+        """
+        self._loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(session_id, set()).add(queue)
+            self._snapshots.setdefault(session_id, copy.deepcopy(anketa_data or {}))
+            if runtime_status is not None:
+                self._runtime.setdefault(session_id, runtime_status)
+        return queue
+
+    def unsubscribe(self, session_id: str, queue: asyncio.Queue) -> None:
+        """Close a stream; per-session state is dropped with the last subscriber."""
+        with self._lock:
+            queues = self._subscribers.get(session_id)
+            if queues is None:
+                return
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[session_id]
+                self._snapshots.pop(session_id, None)
+                self._runtime.pop(session_id, None)
+
+    def subscriber_count(self, session_id: Optional[str] = None) -> int:
+        if session_id is not None:
+            return len(self._subscribers.get(session_id, ()))
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    # ------------------------------------------------------------------
+    # Publishing
+    # ------------------------------------------------------------------
+
+    def publish(self, session_id: str, event: str, data: Dict[str, Any]) -> None:
+        """Publish a change (SessionListener signature)."""
+        if session_id not in self._subscribers or self._loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._dispatch(session_id, event, data)
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._dispatch, session_id, event, data)
+
+    def _dispatch(self, session_id: str, event: str, data: Dict[str, Any]) -> None:
+        with self._lock:
+            if session_id not in self._subscribers:
+                return
+            message = self._build_message(session_id, event, data)
+            if message is None:
+                return
+            queues = list(self._subscribers[session_id])
+
+        for queue in queues:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Клиент не успевает — сбрасываем очередь, он перечитает анкету целиком
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"id": message["id"], "event": "resync", "data": {}})
+                logger.warning("session_events_resync", session_id=session_id)
+
+    def _build_message(self, session_id: str, event: str, data: Dict[str, Any]) -> Optional[dict]:
+        """Turn a raw change into a client message (None if nothing changed)."""
+        if event == "anketa":
+            new = data.get("anketa_data") or {}
+            delta = anketa_delta(self._snapshots.get(session_id, {}), new)
+            if not delta["changed"] and not delta["removed"]:
+                return None
+            self._snapshots[session_id] = copy.deepcopy(new)
+            payload = {**delta, "updated_at": data.get("updated_at")}
+            if "anketa_version" in data:
+                payload["anketa_version"] = data["anketa_version"]
+            # SessionManager передаёт completion_rate, посчитанный при записи
+            if "completion_rate" in data:
+                payload["completion_rate"] = data["completion_rate"]
+            elif self._completion_fn is not None:
+                payload["completion_rate"] = self._completion_fn(new)
+        elif event == "runtime":
+            status = data.get("runtime_status")
+            if self._runtime.get(session_id) == status:
+                return None
+            self._runtime[session_id] = status
+            payload = {"runtime_status": status}
+        else:
+            payload = dict(data)
+        return {"id": next(self._ids), "event": event, "data": payload}
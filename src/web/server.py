@@ -12,12 +12,21 @@ Endpoints:
     API - Sessions:
         POST /api/session/create            - Create new consultation session
         GET  /api/session/by-link/{link}    - Get session by unique link (resumption)
-        GET  /api/session/{session_id}      - Get full session data
-        GET  /api/session/{session_id}/anketa - Get anketa data (for polling)
+        GET  /api/session/{session_id}      - Get full session data (ETag / If-None-Match)
+        GET  /api/session/{session_id}/anketa - Get anketa data (polling fallback, ETag / 304)
+        GET  /api/session/{session_id}/events - Server-Sent Events: anketa deltas, status, runtime status
         PUT  /api/session/{session_id}/anketa - Update anketa (client edits)
         POST /api/session/{session_id}/confirm - Confirm anketa
         POST /api/session/{session_id}/end  - End active session
         POST /api/session/{session_id}/kill - Force-kill session + LiveKit room
+        GET  /api/session/{session_id}/export/{format} - Export anketa: md, html (print), pdf (cached)
+        POST /api/sessions/export           - Batch export of many sessions as a streamed ZIP
+        GET  /api/session/{session_id}/jobs - Background jobs of the session (finalization)
+
+    API - Jobs:
+        GET  /api/jobs                      - List background jobs + counters by status
+        GET  /api/jobs/{job_id}             - Job status, completed steps, last error
+        POST /api/jobs/{job_id}/retry       - Requeue a failed job
 
     API - Rooms:
         GET    /api/rooms                   - List active LiveKit rooms
@@ -28,19 +37,21 @@ Endpoints:
 """
 
 import asyncio
+import hashlib
 import os
 import uuid as _uuid
 from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from fastapi import FastAPI, File, HTTPException, Request, UploadFile
-from fastapi.responses import FileResponse, Response
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field, field_validator
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from src.logging_config import setup_logging
+from src.serialization import ORJSONResponse, dumps
 
 setup_logging("server")
 
@@ -55,9 +66,14 @@ from livekit.api import (
     CreateAgentDispatchRequest,
 )
 from livekit.protocol.room import UpdateRoomMetadataRequest
-from src.session.manager import SessionManager
+from src.anketa.export_service import EXPORT_FORMATS, get_export_service
+from src.jobs import JobQueue
+from src.jobs.queue import JOB_STATUSES
+from src.session.manager import SessionManager, compute_completion_rate
 from src.session.models import SessionStatus
 from src.session.exceptions import InvalidTransitionError
+from src.web.agent_workers import WorkerRegistry
+from src.web.events import SessionEventBroker, format_sse
 
 import re as _re
 
@@ -163,6 +179,15 @@ async def _lifespan(application: FastAPI):
             await _cleanup_task
         except asyncio.CancelledError:
             pass
+    try:
+        from src.notifications import get_dispatcher
+        await get_dispatcher().close()
+    except Exception as e:
+        logger.warning("notification_dispatcher_close_failed", error=str(e))
+    try:
+        export_service.shutdown()
+    except Exception as e:
+        logger.warning("export_pool_shutdown_failed", error=str(e))
     try:
         session_mgr.close()
         logger.info("session_manager_closed")
@@ -177,7 +202,8 @@ async def _lifespan(application: FastAPI):
     logger.info("server_shutdown_complete")
 
 
-app = FastAPI(title="Hanc.AI Voice Consultant", lifespan=_lifespan)
+# Ответы API (в т.ч. большие anketa_data / dialogue_history) кодируются через orjson
+app = FastAPI(title="Hanc.AI Voice Consultant", lifespan=_lifespan, default_response_class=ORJSONResponse)
 
 
 # R4-23: Request ID middleware for distributed tracing
@@ -204,8 +230,7 @@ class SessionIDValidationMiddleware(BaseHTTPMiddleware):
                 sid = parts[3]
                 # Skip fixed routes that are not session IDs
                 if sid and sid not in _SESSION_FIXED_ROUTES and not _SESSION_ID_RE.match(sid):
-                    from starlette.responses import JSONResponse
-                    return JSONResponse(
+                    return ORJSONResponse(
                         status_code=400,
                         content={"detail": "Invalid session_id format"},
                     )
@@ -240,6 +265,67 @@ app.add_middleware(SecurityHeadersMiddleware)
 # Singleton session manager
 session_mgr = SessionManager()
 
+# Durable очередь фоновых задач (финализация сессий); воркер — scripts/run_jobs.py
+job_queue = JobQueue()
+
+# Экспорт анкет: кэш артефактов по версии сессии + рендер PDF в пуле процессов
+export_service = get_export_service()
+
+# Воркеры голосового агента (heartbeat → /api/agent/health, слоты под dispatch комнат)
+agent_registry = WorkerRegistry()
+
+_AGENTS_BUSY_WARNING = "All voice agents are busy — the consultant will not join, try again in a few minutes"
+
+
+def _reserve_agent_slot(room_name: str) -> bool:
+    """
+    Slot for dispatching an agent to the room.
+
+    False only when workers report and all of them are full; without
+    heartbeats (single legacy worker) dispatch goes ahead as before.
+    """
+    if agent_registry.assign(room_name) is not None:
+        return True
+    if agent_registry.reporting:
+        livekit_log.warning("agent_capacity_exhausted", room_name=room_name, **{
+            key: value for key, value in agent_registry.summary().items() if key != "workers"
+        })
+        return False
+    return True
+
+
+def _completion_rate(anketa_data: Optional[dict], session_id: str = None) -> float:
+    """completion_rate of anketa_data (FinalAnketa or InterviewAnketa)."""
+    return compute_completion_rate(anketa_data, session_id)
+
+
+def _etag(*parts) -> str:
+    """Strong ETag from version parts (session version, runtime status, query params)."""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match check (supports lists, weak validators and *)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
+# Push-канал изменений сессий (SSE) вместо частого polling анкеты
+_event_broker = SessionEventBroker(completion_fn=_completion_rate)
+
+# Интервал keepalive-комментариев в SSE потоке (прокси рвут «тихие» соединения)
+_SSE_KEEPALIVE_SECONDS = 15.0
+
+_TERMINAL_STATUSES = {SessionStatus.CONFIRMED.value, SessionStatus.DECLINED.value}
+
 # In-memory runtime status cache (ephemeral, not persisted)
 # Maps session_id -> {"runtime_status": "idle"|"processing"|"completing"|"completed"|"error", "updated_at": float}
 _runtime_statuses: dict = {}
@@ -343,8 +429,8 @@ async def session_review_page(link: str):
 
 
 @app.get("/api/sessions")
-async def list_sessions(status: str = None, limit: int = 50, offset: int = 0):
-    """List all sessions (lightweight summaries for dashboard)."""
+async def list_sessions(request: Request, response: Response, status: str = None, limit: int = 50, offset: int = 0):
+    """List all sessions (lightweight summaries for dashboard). Supports If-None-Match."""
     limit = min(max(limit, 1), 200)  # R4-20: bound limit param
     offset = max(offset, 0)
     # R11-09: Validate status parameter
@@ -352,7 +438,13 @@ async def list_sessions(status: str = None, limit: int = 50, offset: int = 0):
         from src.session.models import VALID_STATUSES
         if status not in VALID_STATUSES:
             raise HTTPException(status_code=400, detail=f"Invalid status. Valid: {sorted(VALID_STATUSES)}")
+    count, last_updated = session_mgr.sessions_list_version(status)
+    etag = _etag("sessions", status, limit, offset, count, last_updated)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
     sessions, total_count = session_mgr.list_sessions_summary(status, limit, offset)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
     return {"sessions": sessions, "total": total_count}
 
 
@@ -406,6 +498,14 @@ async def delete_sessions(req: DeleteSessionsRequest):
                 shutil.rmtree(upload_dir)
             except Exception as e:
                 logger.warning("upload_cleanup_failed", session_id=sid, error=str(e))
+        try:
+            from src.documents.retrieval import get_document_index_store
+            get_document_index_store().delete(sid)
+        except Exception as e:
+            logger.warning("document_index_cleanup_failed", session_id=sid, error=str(e))
+
+    for sid in req.session_ids:
+        export_service.cache.forget(sid)
 
     deleted = session_mgr.delete_sessions(req.session_ids)
     session_log.info("sessions_bulk_deleted", deleted=deleted, rooms_deleted=rooms_deleted)
@@ -494,8 +594,11 @@ async def create_session(req: CreateSessionRequest):
                 pass
             lk_api = None
 
-    # Step 4: Dispatch agent to the room
-    if lk_api:
+    # Step 4: Dispatch agent to the room (if a worker has a free slot)
+    agents_busy = bool(lk_api) and not _reserve_agent_slot(room_name)
+    if agents_busy:
+        await lk_api.aclose()
+    elif lk_api:
         try:
             livekit_log.info(
                 "STEP 4/4: Dispatching agent to room...",
@@ -513,6 +616,7 @@ async def create_session(req: CreateSessionRequest):
                 dispatch_id=getattr(dispatch_result, "dispatch_id", "unknown"),
             )
         except Exception as exc:
+            agent_registry.release(room_name)
             livekit_log.error(
                 "STEP 4/4 FAILED: Agent dispatch error",
                 error=str(exc),
@@ -528,6 +632,8 @@ async def create_session(req: CreateSessionRequest):
         warning = "Voice connection unavailable: failed to generate LiveKit token"
     elif not lk_api:
         warning = "Voice room creation failed — agent may not connect automatically"
+    elif agents_busy:
+        warning = _AGENTS_BUSY_WARNING
 
     logger.info(
         "=== SESSION CREATE DONE ===",
@@ -561,52 +667,130 @@ async def get_session_by_link(link: str):
 
 
 @app.get("/api/session/{session_id}")
-async def get_session(session_id: str):
-    """Get full session data by session_id."""
+async def get_session(session_id: str, request: Request, response: Response):
+    """Get full session data by session_id. Supports If-None-Match."""
+    version = session_mgr.get_session_version(session_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    etag = _session_etag(session_id, version)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
     session = session_mgr.get_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
+    response.headers["ETag"] = _session_etag(session_id, _version_of(session))
+    response.headers["Cache-Control"] = "no-cache"
     return session.model_dump()
 
 
 @app.get("/api/session/{session_id}/anketa")
-async def get_anketa(session_id: str):
-    """Get anketa data for a session (polled by frontend every ~2s)."""
+async def get_anketa(session_id: str, request: Request, response: Response):
+    """Get anketa data for a session (polling fallback). Supports If-None-Match → 304."""
+    # Дешёвая проверка версии: без чтения JSON и без pydantic
+    version = session_mgr.get_session_version(session_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    etag = _anketa_etag(session_id, version)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
     session = session_mgr.get_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
+    response.headers["ETag"] = _anketa_etag(session_id, _version_of(session))
+    response.headers["Cache-Control"] = "no-cache"
+    return _anketa_payload(session)
 
-    # Calculate completion_rate from anketa_data
-    completion_rate = 0.0
-    if session.anketa_data:
-        try:
-            from src.anketa.schema import FinalAnketa, InterviewAnketa
 
-            # Detect anketa type
-            anketa_type = session.anketa_data.get('anketa_type')
-            if anketa_type == 'interview':
-                anketa = InterviewAnketa(**session.anketa_data)
-            else:
-                anketa = FinalAnketa(**session.anketa_data)
+def _version_of(session) -> dict:
+    """Same shape as SessionManager.get_session_version() for an already loaded session."""
+    return {
+        "anketa_version": session.anketa_version,
+        "updated_at": session.updated_at.isoformat(),
+        "status": session.status,
+        "company_name": session.company_name,
+    }
 
-            completion_rate = anketa.completion_rate()
-        except Exception as e:
-            logger.warning("completion_rate_calc_failed", error=str(e), session_id=session_id)
 
+def _session_etag(session_id: str, version: dict) -> str:
+    return _etag("session", session_id, version["anketa_version"], version["updated_at"])
+
+
+def _anketa_etag(session_id: str, version: dict) -> str:
+    # Без updated_at: его меняет каждая запись диалога, а анкета от этого не меняется.
+    # runtime_status живёт в памяти сервера, но входит в ответ — значит и в ETag
+    runtime_status = _runtime_statuses.get(session_id, {}).get("runtime_status", "idle")
+    return _etag(
+        "anketa", session_id, version["anketa_version"], version["status"], version["company_name"], runtime_status
+    )
+
+
+def _anketa_payload(session) -> dict:
+    """Anketa state as returned by GET /anketa and the SSE snapshot."""
     # Include ephemeral runtime_status if available
-    rt = _runtime_statuses.get(session_id, {})
+    rt = _runtime_statuses.get(session.session_id, {})
 
     return {
         "anketa_data": session.anketa_data,
         "anketa_md": session.anketa_md,
+        "anketa_version": session.anketa_version,
         "status": session.status,
         "runtime_status": rt.get("runtime_status", "idle"),
         "company_name": session.company_name,
         "updated_at": session.updated_at.isoformat(),
-        "completion_rate": completion_rate,
+        # Посчитан при записи анкеты (SessionManager), чтение не строит pydantic-модели
+        "completion_rate": session.completion_rate,
     }
 
 
+@app.get("/api/session/{session_id}/events")
+async def session_events(session_id: str, request: Request):
+    """Server-Sent Events stream of session changes (replaces 2-second anketa polling).
+
+    Events:
+        snapshot - full anketa state (same shape as GET /anketa), sent first
+        anketa   - {changed, removed, completion_rate, anketa_version, updated_at}: top-level field delta
+        status   - {status}; the stream ends after a terminal status
+        runtime  - {runtime_status}
+        dialogue - {message_count, duration_seconds}
+        metadata - {company_name?, contact_name?}
+        resync   - client fell behind; refetch GET /anketa
+    """
+    session = session_mgr.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    # Тесты и перезапуски подменяют session_mgr — подписываемся на текущий (идемпотентно)
+    session_mgr.add_listener(_event_broker.publish)
+
+    snapshot = _anketa_payload(session)
+    queue = _event_broker.subscribe(
+        session_id, session.anketa_data, snapshot["runtime_status"]
+    )
+
+    async def _stream():
+        try:
+            yield format_sse("snapshot", snapshot)
+            if session.status in _TERMINAL_STATUSES:
+                return
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=_SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(message["event"], message["data"], message["id"])
+                if message["event"] == "status" and message["data"].get("status") in _TERMINAL_STATUSES:
+                    return
+        finally:
+            _event_broker.unsubscribe(session_id, queue)
+
+    return StreamingResponse(
+        _stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.put("/api/session/{session_id}/runtime-status")
 async def update_runtime_status(session_id: str, req: UpdateRuntimeStatusRequest):
     """Update ephemeral runtime status (called by voice agent process).
@@ -623,6 +807,7 @@ async def update_runtime_status(session_id: str, req: UpdateRuntimeStatusRequest
         if not session_mgr.get_session(session_id):
             raise HTTPException(status_code=404, detail="Session not found")
     _runtime_statuses[session_id] = {"runtime_status": status, "updated_at": time.time()}
+    _event_broker.publish(session_id, "runtime", {"runtime_status": status})
     return {"ok": True}
 
 
@@ -670,7 +855,7 @@ async def update_voice_config(session_id: str, req: dict):
     room_name = (session.room_name if session else None) or f"consultation-{session_id}"
     lk_api = None
     try:
-        import json, time
+        import time
         lk_api = LiveKitAPI(
             url=os.getenv("LIVEKIT_URL"),
             api_key=os.getenv("LIVEKIT_API_KEY"),
@@ -679,7 +864,7 @@ async def update_voice_config(session_id: str, req: dict):
         await lk_api.room.update_room_metadata(
             UpdateRoomMetadataRequest(
                 room=room_name,
-                metadata=json.dumps({"config_version": time.time()}),
+                metadata=dumps({"config_version": time.time()}),
             )
         )
         livekit_log.info("voice_config_signal_sent", room=room_name)
@@ -720,6 +905,7 @@ async def reconnect_session(session_id: str):
 
     # Check if room still exists; if not, recreate + dispatch agent
     room_exists = None  # R4-06: initialize before try block
+    agents_busy = False
     lk_api = None
     try:
         lk_api = LiveKitAPI(
@@ -735,19 +921,25 @@ async def reconnect_session(session_id: str):
             await lk_api.room.create_room(
                 CreateRoomRequest(name=room_name, empty_timeout=300)
             )
-            await lk_api.agent_dispatch.create_dispatch(
-                CreateAgentDispatchRequest(room=room_name, agent_name="hanc-consultant")
-            )
+            agents_busy = not _reserve_agent_slot(room_name)
+            if not agents_busy:
+                try:
+                    await lk_api.agent_dispatch.create_dispatch(
+                        CreateAgentDispatchRequest(room=room_name, agent_name="hanc-consultant")
+                    )
+                except Exception:
+                    agent_registry.release(room_name)
+                    raise
         else:
             # Signal running agent to re-read voice_config from DB.
             # Updates room metadata which triggers "room_metadata_changed" event
             # on the agent, so it picks up changed speech_speed / silence / voice.
-            import json, time
+            import time
             try:
                 await lk_api.room.update_room_metadata(
                     UpdateRoomMetadataRequest(
                         room=room_name,
-                        metadata=json.dumps({"config_version": time.time()}),
+                        metadata=dumps({"config_version": time.time()}),
                     )
                 )
                 livekit_log.info("reconnect_metadata_signal_sent", room=room_name)
@@ -766,11 +958,14 @@ async def reconnect_session(session_id: str):
         room_name=room_name,
         room_existed=room_exists,
     )
-    return {
+    response = {
         "room_name": room_name,
         "livekit_url": livekit_url,
         "user_token": user_token,
     }
+    if agents_busy:
+        response["warning"] = _AGENTS_BUSY_WARNING
+    return response
 
 
 @app.post("/api/session/{session_id}/pause")
@@ -1024,55 +1219,131 @@ async def reconnect_session_post(session_id: str):
     }
 
 
+async def _export_artifact(session_id: str, export_format: str):
+    """Cached export artifact of a session, or None if the session doesn't exist."""
+    version = session_mgr.get_session_version(session_id)
+    if version is None:
+        return None
+
+    async def _load():
+        session = session_mgr.get_session(session_id)
+        if not session:
+            return None
+        voice_config = session.voice_config if session.voice_config else {}
+        session_type = voice_config.get("consultation_type", "consultation")
+        return session.anketa_data, session.anketa_md, session.company_name or "", session_type
+
+    return await export_service.export(
+        session_id, f"{version['anketa_version']}:{version['updated_at']}", _load, export_format
+    )
+
+
 @app.get("/api/session/{session_id}/export/{export_format}")
 async def export_session(session_id: str, export_format: str):
-    """Export session anketa in the requested format (md or pdf/print-html)."""
+    """Export session anketa: md (download), html (print-ready page) or pdf."""
     # R11-20: Whitelist validation first (don't reflect user input in error)
-    if export_format not in ("md", "pdf"):
-        raise HTTPException(status_code=400, detail="Unsupported export format. Supported: md, pdf")
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Unsupported export format. Supported: md, html, pdf")
 
-    session = session_mgr.get_session(session_id)
-    if not session:
+    # Bug #9 fix: markdown is regenerated from anketa_data (cached per anketa version)
+    artifact = await _export_artifact(session_id, export_format)
+    if artifact is None:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    # Bug #9 fix: Generate fresh MD from anketa_data instead of cached anketa_md.
-    # anketa_md in DB may be stale (generated from sliding window before merge).
-    anketa_md = session.anketa_md
-    if session.anketa_data:
-        try:
-            from src.anketa.schema import FinalAnketa
-            from src.anketa import AnketaGenerator
-            anketa_obj = FinalAnketa(**session.anketa_data)
-            anketa_md = AnketaGenerator.render_markdown(anketa_obj)
-        except Exception:
-            pass  # fallback to cached anketa_md
-    company_name = session.company_name
-    voice_config = session.voice_config if session.voice_config else {}
-    session_type = voice_config.get("consultation_type", "consultation")
-
-    if export_format == "md":
-        from src.anketa.exporter import export_markdown
-
-        content, filename = export_markdown(anketa_md or "", company_name or "")
-        session_log.info("session_exported", session_id=session_id, format="md")
-        return Response(
-            content=content,
-            media_type="text/markdown",
-            headers={"Content-Disposition": _safe_content_disposition("attachment", filename)},
-        )
+    session_log.info("session_exported", session_id=session_id, format=export_format, size=artifact.size)
+    return Response(
+        content=artifact.content,
+        media_type=artifact.media_type,
+        headers={"Content-Disposition": _safe_content_disposition(artifact.disposition, artifact.filename)},
+    )
 
-    else:  # pdf
-        from src.anketa.exporter import export_print_html
 
-        content, filename = export_print_html(
-            anketa_md or "", company_name or "", session_type
-        )
-        session_log.info("session_exported", session_id=session_id, format="pdf")
-        return Response(
-            content=content,
-            media_type="text/html",
-            headers={"Content-Disposition": _safe_content_disposition("inline", filename)},
-        )
+class ExportSessionsRequest(BaseModel):
+    session_ids: List[str] = Field(min_length=1, max_length=200)
+    format: str = "pdf"
+
+
+# Сколько анкет пакета рендерится одновременно (остальные ждут, ZIP пишется по порядку)
+_BATCH_EXPORT_CONCURRENCY = 4
+
+
+class _ZipStream:
+    """Write-only file for zipfile: accumulates bytes, drained after each entry."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._offset = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+@app.post("/api/sessions/export")
+async def export_sessions(req: ExportSessionsRequest):
+    """Export many sessions as one ZIP, streamed while the anketas are rendered."""
+    import zipfile
+
+    if req.format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Unsupported export format. Supported: md, html, pdf")
+    for sid in req.session_ids:
+        if not _SESSION_ID_RE.match(sid):
+            raise HTTPException(status_code=400, detail=f"Invalid session_id format: {sid}")
+
+    session_ids = list(dict.fromkeys(req.session_ids))
+    semaphore = asyncio.Semaphore(_BATCH_EXPORT_CONCURRENCY)
+
+    async def _render(sid: str):
+        async with semaphore:
+            return await _export_artifact(sid, req.format)
+
+    async def _stream():
+        tasks = [asyncio.create_task(_render(sid)) for sid in session_ids]
+        buffer = _ZipStream()
+        missing = []
+        try:
+            with zipfile.ZipFile(buffer, "w") as archive:
+                for sid, task in zip(session_ids, tasks):
+                    try:
+                        artifact = await task
+                    except Exception as e:
+                        logger.warning("batch_export_failed", session_id=sid, error=str(e))
+                        artifact = None
+                    if artifact is None:
+                        missing.append(sid)
+                        continue
+                    # PDF уже сжат внутри — повторно не жмём
+                    compression = zipfile.ZIP_STORED if req.format == "pdf" else zipfile.ZIP_DEFLATED
+                    archive.writestr(f"{sid}_{artifact.filename}", artifact.content, compress_type=compression)
+                    yield buffer.drain()
+                if missing:
+                    archive.writestr("missing.txt", "\n".join(missing) + "\n")
+            yield buffer.drain()
+            session_log.info(
+                "sessions_batch_exported", format=req.format,
+                exported=len(session_ids) - len(missing), missing=len(missing),
+            )
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(
+        _stream(),
+        media_type="application/zip",
+        headers={"Content-Disposition": _safe_content_disposition("attachment", f"anketas_{req.format}.zip")},
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -1113,11 +1384,91 @@ async def _check_agent_alive() -> tuple:
     return False, None
 
 
+class AgentHeartbeatRequest(BaseModel):
+    """Worker heartbeat (rooms, capacity) or job-process report (room set)."""
+    worker_id: str = Field(min_length=1, max_length=200)
+    pid: Optional[int] = None
+    host: Optional[str] = Field(default=None, max_length=255)
+    capacity: int = Field(default=0, ge=0, le=1000)  # 0 — без ограничения комнат
+    rooms: List[str] = Field(default_factory=list, max_length=1000)
+    room: Optional[str] = Field(default=None, max_length=200)
+    inflight_extractions: int = Field(default=0, ge=0)
+    loop_lag_ms: float = Field(default=0.0, ge=0)
+    closed: bool = False
+    # ExtractionPipeline.stats() процесса задания: {stage: {waiting, active, wait_seconds, ...}}
+    pipeline: Optional[Dict[str, Dict[str, float]]] = None
+
+
+@app.post("/api/agent/heartbeat")
+async def agent_heartbeat(req: AgentHeartbeatRequest):
+    """Load report of a voice agent worker (src/voice/workers.py)."""
+    if req.room is not None:
+        agent_registry.report_room(
+            req.worker_id, req.room, req.inflight_extractions, req.loop_lag_ms, req.closed, req.pipeline
+        )
+    else:
+        agent_registry.report_worker(req.worker_id, req.capacity, req.rooms, req.pid, req.host, req.loop_lag_ms)
+    return {"ok": True}
+
+
 @app.get("/api/agent/health")
 async def agent_health():
-    """Check if a voice agent worker process is alive."""
+    """Voice agent workers: PID check plus the load reported by every worker."""
     alive, pid = await _check_agent_alive()
-    return {"worker_alive": alive, "worker_pid": pid}
+    summary = agent_registry.summary()
+    return {"worker_alive": alive or bool(summary["workers"]), "worker_pid": pid, **summary}
+
+
+# ---------------------------------------------------------------------------
+# API: Background jobs (status of the durable finalization queue)
+# ---------------------------------------------------------------------------
+
+_JOB_ID_RE = _re.compile(r'^[a-f0-9]{12}$')
+
+
+def _get_job_or_404(job_id: str):
+    if not _JOB_ID_RE.match(job_id):
+        raise HTTPException(status_code=400, detail="Invalid job_id format")
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.get("/api/jobs")
+async def list_jobs(status: str = None, session_id: str = None, kind: str = None, limit: int = 50):
+    """List recent background jobs and queue counters by status."""
+    if status is not None and status not in JOB_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Invalid status. Valid: {list(JOB_STATUSES)}")
+    if session_id is not None:
+        _validate_session_id(session_id)
+    limit = min(max(limit, 1), 200)
+    jobs = await asyncio.to_thread(job_queue.list_jobs, status, session_id, kind, limit)
+    return {"jobs": [job.to_dict() for job in jobs], "stats": job_queue.stats()}
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Job status with completed steps and last error."""
+    return _get_job_or_404(job_id).to_dict()
+
+
+@app.post("/api/jobs/{job_id}/retry")
+async def retry_job(job_id: str):
+    """Requeue a failed job (attempts are reset, completed steps are kept)."""
+    job = _get_job_or_404(job_id)
+    if not job_queue.retry(job_id):
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}, only failed jobs can be retried")
+    session_log.info("job_retry_requested", job_id=job_id, session_id=job.session_id)
+    return job_queue.get(job_id).to_dict()
+
+
+@app.get("/api/session/{session_id}/jobs")
+async def get_session_jobs(session_id: str):
+    """Background jobs of a session (finalization progress)."""
+    _validate_session_id(session_id)
+    jobs = await asyncio.to_thread(job_queue.list_jobs, None, session_id)
+    return {"session_id": session_id, "jobs": [job.to_dict() for job in jobs]}
 
 
 # ---------------------------------------------------------------------------
@@ -1194,6 +1545,8 @@ async def cleanup_all_rooms():
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
 MAX_FILES_PER_SESSION = 5
 SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".xlsx", ".xls", ".txt", ".md"}
+DOCUMENT_PREVIEW_CHARS = 2000  # text_preview в сессии, когда полный текст проиндексирован
+MAX_DOCUMENT_SEARCH_RESULTS = 20
 # R5-08: Allowed MIME types per extension (content_type validation)
 _ALLOWED_MIME_TYPES = {
     ".pdf": {"application/pdf"},
@@ -1240,6 +1593,7 @@ async def upload_documents(
         )
 
     from src.documents import DocumentParser, DocumentAnalyzer
+    from src.documents.retrieval import DocumentIndex, get_document_index_store
 
     parser = DocumentParser()
     parsed_docs = []
@@ -1291,8 +1645,8 @@ async def upload_documents(
         file_path.write_bytes(content)
         saved_files.append(safe_name)
 
-        # Parse
-        doc = parser.parse(file_path)
+        # Parse (в потоке: большие XLSX/PDF не блокируют event loop)
+        doc = await asyncio.to_thread(parser.parse, file_path)
         if doc:
             parsed_docs.append(doc)
             logger.info("document_parsed", filename=file.filename, chunks=len(doc.chunks))
@@ -1310,14 +1664,25 @@ async def upload_documents(
         logger.error("document_analysis_failed", session_id=session_id, error=str(exc))
         raise HTTPException(status_code=500, detail="Document analysis failed")
 
+    # BM25-индекс фрагментов: агент ищет по нему вместо полного текста в инструкциях
+    indexed = False
+    try:
+        doc_index = await asyncio.to_thread(DocumentIndex.build, doc_context.documents)
+        await asyncio.to_thread(get_document_index_store().add, session_id, doc_index)
+        indexed = True
+    except Exception as e:
+        logger.warning("document_index_build_failed", session_id=session_id, error=str(e))
+
     # Store in session
     context_dict = doc_context.model_dump(mode="json")
     # B13-08: Persist word_count before removing chunks (word_count is a @property
     # computed from chunks — once chunks are stripped, it would return 0)
-    # B14: Also persist text_preview — agent needs document text for answering questions
+    # B14: Also persist text_preview — agent needs document text for answering questions.
+    # С индексом полный текст лежит в data/doc_index, в сессии — только превью.
+    preview_chars = DOCUMENT_PREVIEW_CHARS if indexed else 50000  # Full text up to ~12K words
     for doc_obj, doc_data in zip(doc_context.documents, context_dict.get("documents", [])):
         doc_data["word_count"] = doc_obj.word_count
-        doc_data["text_preview"] = doc_obj.full_text[:50000]  # Full text up to ~12K words
+        doc_data["text_preview"] = doc_obj.full_text[:preview_chars]
     # Remove heavy chunks from storage (keep summary + extracted info only)
     for doc_data in context_dict.get("documents", []):
         doc_data.pop("chunks", None)
@@ -1340,8 +1705,7 @@ async def upload_documents(
             api_key=os.getenv("LIVEKIT_API_KEY"),
             api_secret=os.getenv("LIVEKIT_API_SECRET"),
         )
-        import json as _json
-        metadata = _json.dumps({
+        metadata = dumps({
             "document_context_updated": True,
             "document_count": len(parsed_docs),
             "key_facts_count": len(doc_context.key_facts),
@@ -1376,6 +1740,24 @@ async def upload_documents(
     }
 
 
+@app.get("/api/session/{session_id}/documents/search")
+async def search_documents(session_id: str, q: str, top_k: int = 5):
+    """Top-k document fragments relevant to a query (e.g. the latest user utterance).
+
+    BM25 over the per-session index built at upload time; empty when the
+    session has no indexed documents.
+    """
+    _validate_session_id(session_id)
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Query must not be empty")
+    top_k = min(max(top_k, 1), MAX_DOCUMENT_SEARCH_RESULTS)
+
+    from src.documents.retrieval import get_document_index_store
+
+    hits = await asyncio.to_thread(get_document_index_store().search, session_id, q, top_k)
+    return {"session_id": session_id, "query": q, "results": [hit.to_dict() for hit in hits]}
+
+
 async def _extract_anketa_with_documents(session_id: str, doc_context):
     """Background task: extract anketa enriched with document data."""
     try:
@@ -1394,7 +1776,7 @@ async def _extract_anketa_with_documents(session_id: str, doc_context):
             document_context=doc_context,
         )
 
-        anketa_data = anketa.model_dump(mode="json")
+        anketa_data = anketa.to_json_dict()
         anketa_md = AnketaGenerator.render_markdown(anketa)
         session_mgr.update_anketa(session_id, anketa_data, anketa_md)
 
@@ -2,12 +2,24 @@
 """
 Автоматический тест real-time extraction.
 15 сценариев различных разговоров.
+
+Режимы:
+    python tests/test_realtime_extraction.py
+        — через запущенный сервер (BASE_URL)
+    python tests/test_realtime_extraction.py --offline --cassette tests/cassettes/realtime.json
+        — без сервера: AnketaExtractor напрямую, ответы LLM записываются в кассету
+          (режим auto) и при повторных прогонах воспроизводятся без сети
 """
+import argparse
 import asyncio
 import httpx
 import json
+import os
+import sys
 import time
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 BASE_URL = "http://localhost:8000"
 
@@ -342,7 +354,73 @@ async def test_scenario(scenario: Dict, scenario_num: int) -> Dict:
     return results
 
 
-async def main():
+async def run_offline_scenario(scenario: Dict, scenario_num: int, llm) -> Dict:
+    """
+    Тестирует сценарий без сервера: extraction после КАЖДОГО сообщения,
+    как в v5.0, но напрямую через AnketaExtractor с переданным LLM клиентом.
+    """
+    from src.anketa.extractor import AnketaExtractor
+
+    print(f"\n{'='*60}")
+    print(f"СЦЕНАРИЙ {scenario_num}/{len(SCENARIOS)} (offline): {scenario['name']}")
+    print(f"{'='*60}")
+
+    results = {
+        "scenario": scenario["name"],
+        "success": False,
+        "errors": [],
+        "extraction_count": 0,
+        "fields_filled": 0,
+        "messages_sent": 0,
+        "extraction_times": [],
+    }
+
+    extractor = AnketaExtractor(llm)
+    dialogue: List[Dict[str, str]] = []
+    filled_before = 0
+
+    for i, message in enumerate(scenario["messages"], 1):
+        print(f"\n💬 [{i}/{len(scenario['messages'])}] User: {message[:50]}...")
+        dialogue.append({"role": "user", "content": message})
+
+        started = time.perf_counter()
+        try:
+            anketa = await extractor.extract(
+                dialogue_history=list(dialogue), skip_expert_content=True
+            )
+        except Exception as e:
+            results["errors"].append(f"Msg {i}: {e}")
+            print(f"   ❌ ОШИБКА: {e}")
+            continue
+        elapsed = time.perf_counter() - started
+        results["extraction_times"].append(round(elapsed, 3))
+
+        anketa_data = anketa.model_dump(exclude={"created_at"})
+        filled_after = sum(1 for v in anketa_data.values() if v)
+        if filled_after > filled_before:
+            results["extraction_count"] += 1
+            print(f"   ✅ +{filled_after - filled_before} полей ({filled_before} → {filled_after}), {elapsed:.2f} сек")
+        else:
+            print(f"   ⚠️  Нет изменений в анкете (поля: {filled_after})")
+
+        filled_before = filled_after
+        results["messages_sent"] += 1
+        results["fields_filled"] = filled_after
+
+    results["success"] = (
+        results["messages_sent"] > 0
+        and results["extraction_count"] >= results["messages_sent"] * 0.5
+    )
+    print("   ✅ ТЕСТ ПРОЙДЕН" if results["success"] else "   ❌ ТЕСТ ПРОВАЛЕН")
+    return results
+
+
+async def main(
+    offline: bool = False,
+    cassette: Optional[str] = None,
+    cassette_mode: Optional[str] = None,
+    provider: Optional[str] = None,
+):
     """Запускает все 15 сценариев."""
     print("\n" + "="*60)
     print("АВТОМАТИЧЕСКОЕ ТЕСТИРОВАНИЕ REAL-TIME EXTRACTION")
@@ -351,7 +429,16 @@ async def main():
 
     all_results = []
 
+    llm = None
+    if offline:
+        from src.llm.factory import create_llm_client
+        llm = create_llm_client(provider, cassette=cassette, cassette_mode=cassette_mode)
+
     for i, scenario in enumerate(SCENARIOS, 1):
+        if offline:
+            all_results.append(await run_offline_scenario(scenario, i, llm))
+            continue
+
         result = await test_scenario(scenario, i)
         all_results.append(result)
 
@@ -360,6 +447,9 @@ async def main():
             print("\n⏸️  Пауза 5 сек перед следующим сценарием...")
             await asyncio.sleep(5)
 
+    if llm is not None and hasattr(llm, "aclose"):
+        await llm.aclose()
+
     # Итоговая статистика
     print("\n" + "="*60)
     print("ИТОГОВАЯ СТАТИСТИКА ПО ВСЕМ ТЕСТАМ")
@@ -394,5 +484,17 @@ async def main():
 
 
 if __name__ == "__main__":
-    exit_code = asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Real-time extraction scenarios")
+    parser.add_argument("--offline", action="store_true", help="Без сервера: AnketaExtractor напрямую")
+    parser.add_argument("--cassette", help="Кассета LLM (запись/воспроизведение ответов)")
+    parser.add_argument("--cassette-mode", choices=["record", "replay", "auto"], default="auto")
+    parser.add_argument("--provider", help="LLM провайдер (по умолчанию LLM_PROVIDER)")
+    args = parser.parse_args()
+
+    exit_code = asyncio.run(main(
+        offline=args.offline,
+        cassette=args.cassette,
+        cassette_mode=args.cassette_mode,
+        provider=args.provider,
+    ))
     exit(exit_code)
@@ -0,0 +1,451 @@
+"""
+Tests for multi-worker voice agent scaling.
+
+- WorkerRegistry (src/web/agent_workers.py): heartbeats, aggregation, slot
+  reservations, session affinity, stale workers
+- WorkerLoadProbe / RoomLoadReporter (src/voice/workers.py): LiveKit load,
+  loop lag, heartbeat payloads
+- AgentSupervisor (src/voice/supervisor.py): restart with backoff
+- Server: /api/agent/heartbeat, /api/agent/health and room dispatch through a
+  fake LiveKit dispatcher that assigns jobs by worker load like LiveKit does
+"""
+
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.serialization import loads
+from src.voice.supervisor import AgentSupervisor
+from src.voice.workers import (
+    DEFAULT_ROOMS_PER_WORKER,
+    LOAD_THRESHOLD,
+    RoomLoadReporter,
+    WorkerLoadProbe,
+    room_load,
+    worker_capacity,
+)
+from src.web.agent_workers import WorkerRegistry
+
+
+class _Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+
+class TestWorkerRegistry:
+    """Server-side view of all workers."""
+
+    def test_summary_aggregates_workers_and_rooms(self):
+        registry = WorkerRegistry()
+        registry.report_worker("w0", capacity=2, rooms=["r1"], pid=10, loop_lag_ms=3.0)
+        registry.report_worker("w1", capacity=3, rooms=[], pid=11)
+        registry.report_room("w0", "r1", inflight_extractions=2, loop_lag_ms=40.0)
+
+        summary = registry.summary()
+
+        assert [w["worker_id"] for w in summary["workers"]] == ["w0", "w1"]
+        assert summary["capacity"] == 5
+        assert summary["active_rooms"] == 1
+        assert summary["free_slots"] == 4
+        assert summary["inflight_extractions"] == 2
+        assert summary["max_loop_lag_ms"] == 40.0
+
+    def test_stale_worker_excluded(self):
+        clock = _Clock()
+        registry = WorkerRegistry(stale_seconds=15, clock=clock)
+        registry.report_worker("w0", capacity=2, rooms=[])
+        clock.now += 16
+
+        assert registry.summary()["workers"] == []
+        assert registry.reporting is False
+        assert registry.assign("r1") is None
+
+    def test_assign_prefers_most_free_slots(self):
+        registry = WorkerRegistry()
+        registry.report_worker("w0", capacity=2, rooms=["a"])
+        registry.report_worker("w1", capacity=2, rooms=[])
+
+        assert registry.assign("r1") == "w1"
+        assert registry.assign("r2") in ("w0", "w1")
+        assert registry.assign("r3") is not None
+        assert registry.assign("r4") is None  # 4 слота: a + r1..r3
+
+    def test_affinity_does_not_take_second_slot(self):
+        registry = WorkerRegistry()
+        registry.report_worker("w0", capacity=1, rooms=["r1"])
+        registry.report_worker("w1", capacity=1, rooms=[])
+
+        assert registry.assign("r1") == "w0"
+        assert registry.summary()["free_slots"] == 1
+        assert registry.assign("r2") == "w1"
+        assert registry.assign("r2") == "w1"  # повторный dispatch той же комнаты
+
+    def test_heartbeat_elsewhere_confirms_reservation(self):
+        """LiveKit may put the job on another worker: the slot moves there."""
+        registry = WorkerRegistry()
+        registry.report_worker("w0", capacity=1, rooms=[])
+        registry.report_worker("w1", capacity=1, rooms=[])
+        reserved_on = registry.assign("r1")
+        other = "w1" if reserved_on == "w0" else "w0"
+
+        registry.report_worker(other, capacity=1, rooms=["r1"])
+
+        summary = registry.summary()
+        assert summary["active_rooms"] == 1
+        assert summary["free_slots"] == 1
+
+    def test_reservation_expires_and_release(self):
+        clock = _Clock()
+        registry = WorkerRegistry(reservation_seconds=30, clock=clock)
+        registry.report_worker("w0", capacity=1, rooms=[])
+        assert registry.assign("r1") == "w0"
+        assert registry.assign("r2") is None
+
+        registry.release("r1")
+        assert registry.assign("r2") == "w0"
+
+        clock.now += 31
+        registry.report_worker("w0", capacity=1, rooms=[])
+        assert registry.assign("r3") == "w0"
+
+    def test_closed_room_frees_slot(self):
+        registry = WorkerRegistry()
+        registry.report_worker("w0", capacity=1, rooms=["r1"])
+        registry.report_room("w0", "r1", closed=True)
+        assert registry.assign("r2") == "w0"
+
+    def test_unlimited_worker_always_accepts(self):
+        """capacity 0 (single worker without AGENT_MAX_ROOMS) is never full."""
+        registry = WorkerRegistry()
+        registry.report_worker("w0", capacity=0, rooms=[f"r{i}" for i in range(10)])
+
+        assert all(registry.assign(f"new{i}") == "w0" for i in range(10))
+        summary = registry.summary()
+        assert summary["capacity"] is None
+        assert summary["free_slots"] is None
+        assert summary["active_rooms"] == 10
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+
+class TestWorkerLoadProbe:
+    """load_fnc and the worker heartbeat."""
+
+    def test_room_load_reaches_threshold_at_capacity(self):
+        assert room_load(3, 4) < LOAD_THRESHOLD
+        assert room_load(4, 4) >= LOAD_THRESHOLD
+        assert room_load(1, 100) < LOAD_THRESHOLD <= room_load(100, 100)
+
+    def test_capacity_limited_only_when_configured(self, monkeypatch):
+        monkeypatch.delenv("AGENT_MAX_ROOMS", raising=False)
+        monkeypatch.delenv("AGENT_SUPERVISED", raising=False)
+        assert worker_capacity() == 0
+
+        monkeypatch.setenv("AGENT_SUPERVISED", "1")
+        assert worker_capacity() == DEFAULT_ROOMS_PER_WORKER
+
+        monkeypatch.setenv("AGENT_MAX_ROOMS", "2")
+        assert worker_capacity() == 2
+
+    def test_unlimited_probe_reports_base_load(self):
+        """Without a room limit LiveKit gets its default (CPU) load, rooms are only reported."""
+        probe = WorkerLoadProbe(capacity=0, base_load=lambda worker: 0.3)
+        jobs = [SimpleNamespace(job=SimpleNamespace(room=SimpleNamespace(name=f"r{i}"))) for i in range(8)]
+
+        with patch.object(probe, "start"):
+            assert probe(SimpleNamespace(active_jobs=jobs)) == 0.3
+        snapshot = probe.snapshot()
+        assert snapshot["capacity"] == 0
+        assert len(snapshot["rooms"]) == 8
+        assert room_load(8, 0) == 0.0
+
+    def test_load_fnc_reads_livekit_jobs(self):
+        probe = WorkerLoadProbe(capacity=2)
+        worker = SimpleNamespace(active_jobs=[SimpleNamespace(job=SimpleNamespace(room=SimpleNamespace(name="r1")))])
+
+        with patch.object(probe, "start"):
+            assert probe(worker) == 0.5
+        assert probe.snapshot()["rooms"] == ["r1"]
+
+    def test_loop_lag_from_call_spacing(self):
+        clock = _Clock()
+        probe = WorkerLoadProbe(capacity=2, clock=clock)
+        probe.observe([])
+        clock.now += 0.5 + 0.2  # LiveKit вызывает load_fnc каждые 0.5 с
+        probe.observe([])
+
+        assert probe.snapshot()["loop_lag_ms"] == pytest.approx(200.0)
+        assert probe.snapshot()["loop_lag_ms"] == 0.0  # пик сбрасывается отчётом
+
+    def test_send_posts_snapshot(self, monkeypatch):
+        monkeypatch.setenv("AGENT_WORKER_ID", "host-w0")
+        requests = []
+
+        def handler(request):
+            requests.append(loads(request.content))
+            return httpx.Response(200, json={"ok": True})
+
+        probe = WorkerLoadProbe(capacity=3, url="http://server/api/agent/heartbeat")
+        probe.observe(["r1", "r2"])
+        with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+            assert probe.send(client) is True
+
+        assert requests[0]["worker_id"] == "host-w0"
+        assert requests[0]["capacity"] == 3
+        assert requests[0]["rooms"] == ["r1", "r2"]
+
+
+class TestRoomLoadReporter:
+    """Job-process reports."""
+
+    @pytest.mark.asyncio
+    async def test_reports_and_closes(self, monkeypatch):
+        monkeypatch.setenv("AGENT_WORKER_ID", "host-w0")
+        payloads = []
+
+        async def send(payload):
+            payloads.append(payload)
+            return True
+
+        reporter = RoomLoadReporter("r1", send, inflight=lambda: 2, interval=0.01)
+        reporter.start()
+        while len(payloads) < 2:
+            await asyncio.sleep(0.01)
+        await reporter.stop()
+
+        assert payloads[0]["room"] == "r1"
+        assert payloads[0]["worker_id"] == "host-w0"
+        assert payloads[0]["inflight_extractions"] == 2
+        assert payloads[-1]["closed"] is True
+        assert all(p["closed"] is False for p in payloads[:-1])
+        assert "pipeline" not in payloads[0]
+
+    @pytest.mark.asyncio
+    async def test_reports_pipeline_stats(self):
+        from src.voice.pipeline import ExtractionPipeline
+
+        pipeline = ExtractionPipeline(2)
+        payloads = []
+
+        async def send(payload):
+            payloads.append(payload)
+            return True
+
+        reporter = RoomLoadReporter("r1", send, inflight=lambda: 0, interval=0.01, pipeline_stats=pipeline.stats)
+        async with pipeline.llm_permit():
+            reporter.start()
+            while not payloads:
+                await asyncio.sleep(0.01)
+        await reporter.stop()
+
+        assert payloads[0]["pipeline"]["llm"]["active"] == 1
+        assert payloads[0]["pipeline"]["llm"]["limit"] == 2
+        assert payloads[-1]["pipeline"]["llm"]["completed"] == 1
+
+
+class TestAgentSupervisor:
+    """Worker processes restarted with backoff."""
+
+    def test_crashed_worker_restarted_after_backoff(self):
+        clock = _Clock()
+        command = [sys.executable, "-c", "import sys; sys.exit(3)"]
+        supervisor = AgentSupervisor(workers=2, command=command, base_port=9100, backoff_base=5, clock=clock)
+        supervisor.start()
+        try:
+            for slot in supervisor.workers:
+                slot.process.wait(timeout=10)
+            assert [slot.port for slot in supervisor.workers] == [9100, 9101]
+
+            supervisor.poll()
+            assert all(slot.restart_at == clock.now + 5 for slot in supervisor.workers)
+
+            clock.now += 5
+            supervisor.poll()
+            assert all(slot.restarts == 1 for slot in supervisor.workers)
+        finally:
+            supervisor.shutdown(timeout=5)
+
+    def test_worker_env(self):
+        command = [sys.executable, "-c",
+                   "import os; print(os.environ['AGENT_WORKER_ID'], os.environ['AGENT_HTTP_PORT'], "
+                   "os.environ['AGENT_SUPERVISED'])"]
+        supervisor = AgentSupervisor(workers=1, command=command, base_port=9200)
+        with patch("src.voice.supervisor.subprocess.Popen") as mock_popen:
+            supervisor.start()
+        env = mock_popen.call_args.kwargs["env"]
+        assert env["AGENT_WORKER_ID"].endswith("-w0")
+        assert env["AGENT_HTTP_PORT"] == "9200"
+        assert env["AGENT_SUPERVISED"] == "1"
+
+
+# ---------------------------------------------------------------------------
+# Server + fake LiveKit dispatcher
+# ---------------------------------------------------------------------------
+
+
+class _FakeLiveKit:
+    """
+    LiveKit dispatch as seen by the agent workers: a job goes to the least
+    loaded worker whose load_fnc is below load_threshold; a dispatch with no
+    available worker stays unassigned.
+    """
+
+    def __init__(self, client, workers: int, capacity: int, report: bool = True):
+        self.client = client
+        self.probes = {f"host-w{i}": WorkerLoadProbe(capacity=capacity) for i in range(workers)}
+        self.jobs = {worker_id: [] for worker_id in self.probes}
+        self.unassigned = []
+        self.room = SimpleNamespace(create_room=self._create_room)
+        self.agent_dispatch = SimpleNamespace(create_dispatch=self._create_dispatch)
+        if report:
+            self.heartbeat()
+
+    def _load(self, worker_id: str) -> float:
+        return self.probes[worker_id].observe(self.jobs[worker_id])
+
+    def heartbeat(self) -> None:
+        for worker_id, probe in self.probes.items():
+            self._load(worker_id)
+            payload = dict(probe.snapshot(), worker_id=worker_id)
+            assert self.client.post("/api/agent/heartbeat", json=payload).status_code == 200
+
+    async def _create_room(self, request):
+        return SimpleNamespace(sid=f"RM_{request.name}")
+
+    async def _create_dispatch(self, request):
+        available = [w for w in self.probes if self._load(w) < LOAD_THRESHOLD]
+        if not available:
+            self.unassigned.append(request.room)
+        else:
+            self.jobs[min(available, key=self._load)].append(request.room)
+        return SimpleNamespace(dispatch_id=f"AD_{request.room}")
+
+    async def aclose(self):
+        pass
+
+    def __call__(self, **kwargs):
+        return self
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Server with a temporary SessionManager and an empty worker registry."""
+    from fastapi.testclient import TestClient
+
+    from src.session.manager import SessionManager
+    from src.web import server
+
+    monkeypatch.setenv("LIVEKIT_URL", "ws://livekit.test")
+    monkeypatch.setenv("LIVEKIT_API_KEY", "key")
+    monkeypatch.setenv("LIVEKIT_API_SECRET", "secret-secret-secret-secret-secret")
+    temp_mgr = SessionManager(db_path=str(tmp_path / "test.db"))
+    monkeypatch.setattr(server, "session_mgr", temp_mgr)
+    monkeypatch.setattr(server, "agent_registry", WorkerRegistry())
+    yield TestClient(server.app, raise_server_exceptions=False)
+    temp_mgr.close()
+
+
+class TestAgentApi:
+    """Heartbeats, aggregated health and capacity-aware dispatch."""
+
+    def test_health_aggregates_workers(self, client):
+        fake = _FakeLiveKit(client, workers=3, capacity=2)
+        client.post("/api/agent/heartbeat", json={"worker_id": "host-w1", "room": "r9", "inflight_extractions": 1})
+
+        data = client.get("/api/agent/health").json()
+
+        assert data["worker_alive"] is True
+        assert len(data["workers"]) == len(fake.probes)
+        assert data["capacity"] == 6
+        assert data["active_rooms"] == 1
+        assert data["inflight_extractions"] == 1
+
+    def test_health_shows_room_pipeline_stats(self, client):
+        _FakeLiveKit(client, workers=1, capacity=2)
+        stats = {"llm": {"waiting": 3, "active": 2, "wait_seconds": 1.5, "limit": 2}}
+        client.post("/api/agent/heartbeat", json={"worker_id": "host-w0", "room": "r1", "pipeline": stats})
+
+        worker = client.get("/api/agent/health").json()["workers"][0]
+
+        assert worker["pipeline"] == {"r1": stats}
+
+    def test_dispatch_respects_worker_capacity(self, client):
+        from src.web import server
+
+        fake = _FakeLiveKit(client, workers=2, capacity=2)
+        warnings = []
+        with patch.object(server, "LiveKitAPI", fake):
+            for i in range(5):
+                resp = client.post("/api/session/create", json={"pattern": "interaction"})
+                assert resp.status_code == 200
+                warnings.append(resp.json()["warning"])
+                if i % 2:
+                    fake.heartbeat()
+
+        assert warnings[:4] == [None] * 4
+        assert warnings[4] == server._AGENTS_BUSY_WARNING
+        assert sorted(len(rooms) for rooms in fake.jobs.values()) == [2, 2]
+        assert fake.unassigned == []
+
+        fake.heartbeat()
+        health = client.get("/api/agent/health").json()
+        assert health["active_rooms"] == 4
+        assert health["free_slots"] == 0
+
+    def test_room_close_frees_slot_for_next_session(self, client):
+        from src.web import server
+
+        fake = _FakeLiveKit(client, workers=1, capacity=1)
+        with patch.object(server, "LiveKitAPI", fake):
+            first = client.post("/api/session/create", json={"pattern": "interaction"}).json()
+            fake.heartbeat()
+            assert client.post("/api/session/create", json={"pattern": "interaction"}).json()["warning"]
+
+            fake.jobs["host-w0"].remove(first["room_name"])
+            client.post("/api/agent/heartbeat",
+                        json={"worker_id": "host-w0", "room": first["room_name"], "closed": True})
+            assert client.post("/api/session/create", json={"pattern": "interaction"}).json()["warning"] is None
+
+    def test_single_unlimited_worker_has_no_cap(self, client):
+        """Default deployment (one worker, no AGENT_MAX_ROOMS) dispatches every session."""
+        from src.web import server
+
+        fake = _FakeLiveKit(client, workers=1, capacity=0)
+        with patch.object(server, "LiveKitAPI", fake):
+            for _ in range(DEFAULT_ROOMS_PER_WORKER + 2):
+                resp = client.post("/api/session/create", json={"pattern": "interaction"})
+                assert resp.json()["warning"] is None
+                fake.heartbeat()
+
+        assert len(fake.jobs["host-w0"]) == DEFAULT_ROOMS_PER_WORKER + 2
+        health = client.get("/api/agent/health").json()
+        assert health["capacity"] is None
+        assert health["active_rooms"] == DEFAULT_ROOMS_PER_WORKER + 2
+
+    def test_without_heartbeats_dispatch_unchanged(self, client):
+        from src.web import server
+
+        fake = _FakeLiveKit(client, workers=1, capacity=1, report=False)
+        with patch.object(server, "LiveKitAPI", fake):
+            resp = client.post("/api/session/create", json={"pattern": "interaction"})
+
+        assert resp.json()["warning"] is None
+        assert len(fake.jobs["host-w0"]) == 1
@@ -40,8 +40,8 @@ def mock_llm():
 
 @pytest.fixture
 def extractor(mock_llm):
-    """Create extractor with mocked LLM."""
-    return AnketaExtractor(llm=mock_llm)
+    """Create extractor with mocked LLM (single-call expert content)."""
+    return AnketaExtractor(llm=mock_llm, expert_mode="single")
 
 
 @pytest.fixture
@@ -339,48 +339,6 @@ class TestFormatHelpers:
 class TestJsonParsing:
     """Tests for JSON parsing methods."""
 
-    def test_extract_json_from_markdown_json_block(self, extractor):
-        """Test extracting JSON from ```json block."""
-        text = '```json\n{"key": "value"}\n```'
-        result = extractor._extract_json_from_markdown(text)
-        assert '{"key": "value"}' in result
-
-    def test_extract_json_from_markdown_plain_block(self, extractor):
-        """Test extracting JSON from plain ``` block."""
-        text = '```\n{"key": "value"}\n```'
-        result = extractor._extract_json_from_markdown(text)
-        assert '{"key": "value"}' in result
-
-    def test_extract_json_from_markdown_no_block(self, extractor):
-        """Test extracting JSON without markdown blocks."""
-        text = '{"key": "value"}'
-        result = extractor._extract_json_from_markdown(text)
-        assert text == result
-
-    def test_fix_common_json_errors_trailing_comma(self, extractor):
-        """Test fixing trailing commas."""
-        json_with_trailing = '{"key": "value",}'
-        result = extractor._fix_common_json_errors(json_with_trailing)
-        assert result == '{"key": "value"}'
-
-    def test_fix_common_json_errors_trailing_comma_array(self, extractor):
-        """Test fixing trailing commas in arrays."""
-        json_with_trailing = '["a", "b",]'
-        result = extractor._fix_common_json_errors(json_with_trailing)
-        assert result == '["a", "b"]'
-
-    def test_find_balanced_json(self, extractor):
-        """Test finding balanced JSON."""
-        text = '{"key": "value"} extra text'
-        result = extractor._find_balanced_json(text)
-        assert result == '{"key": "value"}'
-
-    def test_find_balanced_json_nested(self, extractor):
-        """Test finding balanced JSON with nesting."""
-        text = '{"outer": {"inner": "value"}} more'
-        result = extractor._find_balanced_json(text)
-        assert result == '{"outer": {"inner": "value"}}'
-
     def test_parse_json_response_direct(self, extractor):
         """Test parsing valid JSON directly."""
         response = '{"company_name": "Test"}'
@@ -834,6 +792,85 @@ class TestExpertContent:
         assert result.anketa_version == "2.0"
 
 
+class TestExpertContentSectioned:
+    """Tests for sectioned (concurrent per-group) expert content generation."""
+
+    @pytest.fixture
+    def sectioned(self, mock_llm):
+        return AnketaExtractor(llm=mock_llm, expert_mode="sectioned", expert_concurrency=2)
+
+    @staticmethod
+    def _section_of(kwargs):
+        prompt = kwargs["messages"][1]["content"]
+        for section, key in (("dialogue", '"faq_items"'), ("business", '"financial_metrics"'),
+                             ("launch", '"escalation_rules"')):
+            if key in prompt:
+                return section
+        raise AssertionError("unknown section prompt")
+
+    @pytest.mark.asyncio
+    async def test_one_call_per_section_merged(self, sectioned, expert_llm_response):
+        """Each group is requested separately and all blocks are merged."""
+        sectioned.llm.chat = AsyncMock(return_value=expert_llm_response)
+
+        result = await sectioned._generate_expert_content(FinalAnketa(company_name="Test", industry="IT"))
+
+        assert sectioned.llm.chat.call_count == 3
+        assert {self._section_of(c.kwargs) for c in sectioned.llm.chat.call_args_list} == {
+            "dialogue", "business", "launch"
+        }
+        assert result.faq_items[0].question == "Какие услуги?"
+        assert result.competitors[0].name == "КонкурентCo"
+        assert result.success_kpis[0].name == "Конверсия"
+        assert result.anketa_version == "2.0"
+
+    @pytest.mark.asyncio
+    async def test_failed_section_gets_its_own_fallback(self, sectioned, expert_llm_response):
+        """A broken group falls back alone; other groups keep LLM content."""
+        async def chat(**kwargs):
+            if self._section_of(kwargs) == "launch":
+                return "not json at all"
+            return expert_llm_response
+
+        sectioned.llm.chat = AsyncMock(side_effect=chat)
+
+        result = await sectioned._generate_expert_content(
+            FinalAnketa(company_name="Test", industry="IT", services=["Услуга"])
+        )
+
+        # LLM content kept for dialogue/business groups
+        assert result.faq_items[0].question == "Какие услуги?"
+        assert result.competitors[0].name == "КонкурентCo"
+        # Fallback only for the launch group
+        assert result.success_kpis[0].name == "Конверсия в целевое действие"
+        assert len(result.launch_checklist) == 4
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, sectioned, expert_llm_response):
+        """No more than expert_concurrency section calls run at once."""
+        import asyncio
+        running = {"now": 0, "max": 0}
+
+        async def chat(**kwargs):
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+            await asyncio.sleep(0.01)
+            running["now"] -= 1
+            return expert_llm_response
+
+        sectioned.llm.chat = AsyncMock(side_effect=chat)
+
+        await sectioned._generate_expert_content(FinalAnketa(company_name="Test", industry="IT"))
+
+        assert running["max"] == 2
+
+    def test_mode_from_env(self, mock_llm, monkeypatch):
+        monkeypatch.setenv("EXPERT_CONTENT_MODE", "sectioned")
+        assert AnketaExtractor(llm=mock_llm).expert_mode == "sectioned"
+        monkeypatch.delenv("EXPERT_CONTENT_MODE")
+        assert AnketaExtractor(llm=mock_llm).expert_mode == "single"
+
+
 # ============================================================================
 # MERGE EXPERT CONTENT TESTS
 # ============================================================================
@@ -9,7 +9,7 @@ import json
 from pathlib import Path
 from datetime import datetime, timezone
 
-from src.anketa.generator import AnketaGenerator, generate_anketa_files
+from src.anketa.generator import AnketaGenerator, AnketaMarkdownRenderer, generate_anketa_files
 from src.anketa.schema import (
     FinalAnketa, AgentFunction, Integration,
     FAQItem, ObjectionHandler, DialogueExample, FinancialMetric,
@@ -681,6 +681,97 @@ class TestAnketaGeneratorStaticRenderMarkdown:
         assert "Tech" in result
 
 
+class TestAnketaMarkdownRenderer:
+    """Tests for section-memoized markdown rendering."""
+
+    @pytest.fixture
+    def anketa(self):
+        return FinalAnketa(
+            company_name="Клиника",
+            industry="Медицина",
+            services=["терапия", "УЗИ"],
+            agent_name="Алина",
+            agent_functions=[AgentFunction(name="Запись", description="Запись на приём")],
+            faq_items=[FAQItem(question="Цена?", answer="От 1000 ₽")],
+            tone_of_voice={"do": "Вежливо"},
+            consultation_duration_seconds=600,
+        )
+
+    def test_output_matches_full_render(self, anketa):
+        """Test cached output is identical to _render_markdown."""
+        renderer = AnketaMarkdownRenderer()
+        expected = AnketaGenerator.__new__(AnketaGenerator)._render_markdown(anketa)
+
+        assert renderer.render(anketa) == expected
+        assert renderer.render(anketa) == expected
+
+    def test_unchanged_anketa_reuses_all_sections(self, anketa):
+        """Test a repeated render renders nothing."""
+        renderer = AnketaMarkdownRenderer()
+        renderer.render(anketa)
+        renderer.rendered = 0
+
+        renderer.render(FinalAnketa(**anketa.model_dump(mode="json")))
+
+        assert renderer.rendered == 0
+
+    def test_only_dirty_sections_rerendered(self, anketa):
+        """Test a FAQ change re-renders only the FAQ section."""
+        renderer = AnketaMarkdownRenderer()
+        renderer.render(anketa)
+        renderer.rendered = 0
+
+        changed = anketa.merge_json({"faq_items": [{"question": "Парковка?", "answer": "Есть"}]})
+        result = renderer.render(changed)
+
+        assert renderer.rendered == 1
+        assert "Парковка?" in result
+        assert "Цена?" not in result
+
+    def test_completion_field_refreshes_rate(self, anketa):
+        """Test a completion field change re-renders header and metadata with the new rate."""
+        renderer = AnketaMarkdownRenderer()
+        renderer.render(anketa)
+        renderer.rendered = 0
+
+        changed = anketa.merge_json({"contact_phone": "+79991234567"})
+        result = renderer.render(changed)
+
+        # header + метаданные; секция компании телефон не показывает
+        assert renderer.rendered == 2
+        assert f"**Заполненность:** {changed.completion_rate():.0%}" in result
+        assert result == AnketaGenerator.__new__(AnketaGenerator)._render_markdown(changed)
+
+    def test_reassigned_field_detected(self, anketa):
+        """Test reassigning a field on the same object invalidates its section."""
+        renderer = AnketaMarkdownRenderer()
+        renderer.render(anketa)
+
+        anketa.services = ["МРТ"]
+
+        assert "- МРТ" in renderer.render(anketa)
+
+    def test_write_streams_same_content(self, anketa, tmp_path):
+        """Test streaming writer output equals render()."""
+        renderer = AnketaMarkdownRenderer()
+        path = tmp_path / "anketa.md"
+
+        with open(path, "w", encoding="utf-8") as f:
+            written = renderer.write(anketa, f)
+
+        content = path.read_text(encoding="utf-8")
+        assert content == renderer.render(anketa)
+        assert written == len(content)
+
+    def test_lru_bounded(self, anketa):
+        """Test the number of cached anketas is bounded."""
+        renderer = AnketaMarkdownRenderer(max_anketas=2)
+        for i in range(3):
+            renderer.render(FinalAnketa(company_name=f"Компания {i}", industry="IT"))
+
+        assert len(renderer._states) == 2
+
+
 class TestGenerateAnketaFiles:
     """Tests for generate_anketa_files function."""
 
@@ -196,6 +196,87 @@ class TestGetAnketa:
         assert resp.status_code == 404
 
 
+# ---------------------------------------------------------------------------
+# Conditional GET (ETag / If-None-Match)
+# ---------------------------------------------------------------------------
+
+
+class TestConditionalGet:
+    """ETag/304 for anketa polling, session detail and the dashboard list."""
+
+    def test_anketa_304_until_changed(self, client, created_session):
+        sid = created_session["session_id"]
+        first = client.get(f"/api/session/{sid}/anketa")
+        etag = first.headers["ETag"]
+        assert first.json()["anketa_version"] == 0
+
+        cached = client.get(f"/api/session/{sid}/anketa", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+
+        client.put(f"/api/session/{sid}/anketa", json={"anketa_data": {"company_name": "Acme"}})
+        fresh = client.get(f"/api/session/{sid}/anketa", headers={"If-None-Match": etag})
+        assert fresh.status_code == 200
+        assert fresh.headers["ETag"] != etag
+        assert fresh.json()["anketa_version"] == 1
+
+    def test_anketa_304_after_dialogue_update(self, client, created_session):
+        sid = created_session["session_id"]
+        etag = client.get(f"/api/session/{sid}/anketa").headers["ETag"]
+
+        client.put(f"/api/session/{sid}/dialogue", json={
+            "dialogue_history": [{"role": "user", "content": "Привет"}],
+            "duration_seconds": 5,
+        })
+        assert client.get(f"/api/session/{sid}/anketa", headers={"If-None-Match": etag}).status_code == 304
+
+        client.post(f"/api/session/{sid}/end")
+        ended = client.get(f"/api/session/{sid}/anketa", headers={"If-None-Match": etag})
+        assert ended.status_code == 200
+        assert ended.json()["status"] != "active"
+
+    def test_anketa_etag_covers_runtime_status(self, client, created_session):
+        sid = created_session["session_id"]
+        etag = client.get(f"/api/session/{sid}/anketa").headers["ETag"]
+
+        client.put(f"/api/session/{sid}/runtime-status", json={"runtime_status": "processing"})
+        resp = client.get(f"/api/session/{sid}/anketa", headers={"If-None-Match": etag})
+
+        assert resp.status_code == 200
+        assert resp.json()["runtime_status"] == "processing"
+
+    def test_anketa_uses_stored_completion_rate(self, client, created_session):
+        from unittest.mock import patch
+
+        sid = created_session["session_id"]
+        client.put(f"/api/session/{sid}/anketa", json={"anketa_data": {"company_name": "Acme"}})
+
+        with patch("src.anketa.schema.FinalAnketa", side_effect=AssertionError("no model on read")):
+            data = client.get(f"/api/session/{sid}/anketa").json()
+        assert data["completion_rate"] >= 0.0
+
+    def test_session_detail_etag(self, client, created_session):
+        sid = created_session["session_id"]
+        etag = client.get(f"/api/session/{sid}").headers["ETag"]
+        assert client.get(f"/api/session/{sid}", headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+
+        client.post(f"/api/session/{sid}/end")
+        assert client.get(f"/api/session/{sid}", headers={"If-None-Match": etag}).status_code == 200
+
+    def test_sessions_list_etag(self, client, created_session):
+        etag = client.get("/api/sessions").headers["ETag"]
+        assert client.get("/api/sessions", headers={"If-None-Match": etag}).status_code == 304
+        # Другие параметры запроса — другой ETag
+        assert client.get("/api/sessions?limit=10", headers={"If-None-Match": etag}).status_code == 200
+
+        client.post("/api/session/create", json={})
+        assert client.get("/api/sessions", headers={"If-None-Match": etag}).status_code == 200
+
+    def test_missing_session_still_404(self, client):
+        resp = client.get("/api/session/deadbeef/anketa", headers={"If-None-Match": "*"})
+        assert resp.status_code == 404
+
+
 # ---------------------------------------------------------------------------
 # PUT /api/session/{session_id}/anketa
 # ---------------------------------------------------------------------------
@@ -651,6 +732,66 @@ class TestFullLifecycleFlow:
         assert confirmed["sessions"][0]["session_id"] == s1["session_id"]
 
 
+# ===================================================================
+# Background jobs
+# ===================================================================
+
+@pytest.fixture
+def jobs(tmp_path):
+    """Replace the global job_queue with a temporary one."""
+    from src.jobs import JobQueue
+    from src.web import server
+
+    temp_queue = JobQueue(db_path=str(tmp_path / "jobs.db"))
+    original = server.job_queue
+    server.job_queue = temp_queue
+    yield temp_queue
+    server.job_queue = original
+    temp_queue.close()
+
+
+class TestJobsEndpoints:
+    """Tests for /api/jobs and /api/session/{id}/jobs."""
+
+    def test_list_jobs_with_stats(self, client, jobs):
+        jobs.enqueue("finalize_session", {}, idempotency_key="k1", session_id="abcdef01")
+        data = client.get("/api/jobs").json()
+        assert len(data["jobs"]) == 1
+        assert data["stats"]["pending"] == 1
+        assert "payload" not in data["jobs"][0]
+
+    def test_list_jobs_invalid_status(self, client, jobs):
+        assert client.get("/api/jobs?status=bogus").status_code == 400
+
+    def test_get_job_and_steps(self, client, jobs):
+        job = jobs.enqueue("finalize_session", {}, idempotency_key="k1")
+        jobs.mark_step(job.job_id, "save_files", {"status": "completed"})
+        data = client.get(f"/api/jobs/{job.job_id}").json()
+        assert data["status"] == "pending"
+        assert data["steps"] == {"save_files": {"status": "completed"}}
+
+    def test_get_job_not_found(self, client, jobs):
+        assert client.get("/api/jobs/0123456789ab").status_code == 404
+        assert client.get("/api/jobs/../etc").status_code in (400, 404)
+
+    def test_retry_only_failed(self, client, jobs):
+        job = jobs.enqueue("finalize_session", {}, idempotency_key="k1", max_attempts=1)
+        assert client.post(f"/api/jobs/{job.job_id}/retry").status_code == 409
+
+        jobs.claim("w1")
+        jobs.fail(job.job_id, "boom", retry_delay=None)
+        resp = client.post(f"/api/jobs/{job.job_id}/retry")
+        assert resp.status_code == 200
+        assert resp.json()["status"] == "pending"
+        assert resp.json()["attempts"] == 0
+
+    def test_session_jobs(self, client, jobs):
+        jobs.enqueue("finalize_session", {}, idempotency_key="k1", session_id="abcdef01")
+        jobs.enqueue("finalize_session", {}, idempotency_key="k2", session_id="abcdef02")
+        data = client.get("/api/session/abcdef01/jobs").json()
+        assert [j["session_id"] for j in data["jobs"]] == ["abcdef01"]
+
+
 # ===================================================================
 # LLM Providers endpoint
 # ===================================================================
@@ -678,3 +819,49 @@ class TestLLMProvidersEndpoint:
             assert "id" in p
             assert "name" in p
             assert "available" in p
+
+
+# ===================================================================
+# Document search endpoint
+# ===================================================================
+
+@pytest.fixture
+def doc_index_store(tmp_path):
+    """Replace the global document index store with a temporary one."""
+    from src.documents import retrieval
+
+    store = retrieval.DocumentIndexStore(root=str(tmp_path / "doc_index"))
+    original = retrieval._store
+    retrieval._store = store
+    yield store
+    retrieval._store = original
+
+
+class TestDocumentSearchEndpoint:
+    """Tests for GET /api/session/{id}/documents/search."""
+
+    def _index(self):
+        from src.documents.models import DocumentChunk, ParsedDocument
+        from src.documents.retrieval import DocumentIndex
+
+        doc = ParsedDocument(
+            filename="price.xlsx", doc_type="xlsx", file_path="price.xlsx",
+            chunks=[
+                DocumentChunk(content="МРТ головного мозга — 6500 руб", doc_type="xlsx", row_range="1-1"),
+                DocumentChunk(content="Парковка для пациентов бесплатная", doc_type="xlsx", row_range="2-2"),
+            ],
+        )
+        return DocumentIndex.build([doc])
+
+    def test_returns_top_chunks(self, client, doc_index_store):
+        doc_index_store.save("abcdef01", self._index())
+        data = client.get("/api/session/abcdef01/documents/search", params={"q": "сколько стоит МРТ?"}).json()
+        assert data["results"][0]["text"] == "МРТ головного мозга — 6500 руб"
+        assert data["results"][0]["source"] == "price.xlsx, строки 1-1"
+
+    def test_no_index_returns_empty(self, client, doc_index_store):
+        data = client.get("/api/session/abcdef01/documents/search", params={"q": "МРТ"}).json()
+        assert data["results"] == []
+
+    def test_empty_query_rejected(self, client, doc_index_store):
+        assert client.get("/api/session/abcdef01/documents/search", params={"q": " "}).status_code == 400
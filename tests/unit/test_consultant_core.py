@@ -14,6 +14,7 @@ Covers:
 - _try_get_redis() / _try_get_postgres()
 - finalize_consultation()
 - _register_event_handlers()
+- prewarm() / time-to-first-agent-speech
 
 The 39 pipeline-wiring tests live in test_voice_pipeline_wiring.py; this file
 tests everything else.
@@ -791,7 +792,7 @@ class TestFinalizeConsultation:
         mock_anketa = MagicMock()
         mock_anketa.company_name = "TestCorp"
         mock_anketa.contact_name = "Ivan"
-        mock_anketa.model_dump.return_value = {"company_name": "TestCorp"}
+        mock_anketa.to_json_dict.return_value = {"company_name": "TestCorp"}
 
         with patch("src.voice.consultant.create_llm_client"), \
              patch("src.voice.consultant.AnketaExtractor") as mock_ext_cls, \
@@ -832,7 +833,7 @@ class TestFinalizeConsultation:
         mock_anketa = MagicMock()
         mock_anketa.company_name = "TestCorp"
         mock_anketa.contact_name = "Ivan"
-        mock_anketa.model_dump.return_value = {"company_name": "TestCorp"}
+        mock_anketa.to_json_dict.return_value = {"company_name": "TestCorp"}
 
         with patch("src.voice.consultant.create_llm_client"), \
              patch("src.voice.consultant.AnketaExtractor") as mock_ext_cls, \
@@ -872,7 +873,7 @@ class TestFinalizeConsultation:
         mock_anketa = MagicMock()
         mock_anketa.company_name = "TestCorp"
         mock_anketa.contact_name = "Ivan"
-        mock_anketa.model_dump.return_value = {"company_name": "TestCorp"}
+        mock_anketa.to_json_dict.return_value = {"company_name": "TestCorp"}
 
         with patch("src.voice.consultant.create_llm_client"), \
              patch("src.voice.consultant.AnketaExtractor") as mock_ext_cls, \
@@ -905,7 +906,7 @@ class TestFinalizeConsultation:
         mock_anketa = MagicMock()
         mock_anketa.company_name = "TestCorp"
         mock_anketa.contact_name = "Ivan"
-        mock_anketa.model_dump.return_value = {"company_name": "TestCorp"}
+        mock_anketa.to_json_dict.return_value = {"company_name": "TestCorp"}
 
         with patch("src.voice.consultant.create_llm_client"), \
              patch("src.voice.consultant.AnketaExtractor") as mock_ext_cls, \
@@ -930,6 +931,234 @@ class TestFinalizeConsultation:
             mock_output.save_dialogue.assert_called_once()
 
 
+# ===========================================================================
+# 11b. TestFinalizeJob (4 tests)
+# ===========================================================================
+
+class TestFinalizeJob:
+    """Tests for the durable finalization job (payload + step checkpoints)."""
+
+    def test_job_payload_round_trip(self):
+        """from_job_payload restores dialogue and timing."""
+        c = _make_consultation(messages=4)
+        c.ended_at = c.start_time
+
+        payload = json.loads(json.dumps(c.to_job_payload()))
+        restored = VoiceConsultationSession.from_job_payload(payload)
+
+        assert restored.session_id == "test-001"
+        assert restored.dialogue_history == c.dialogue_history
+        assert restored.get_duration_seconds() == 0
+
+    @pytest.mark.asyncio
+    async def test_completed_steps_are_skipped(self):
+        """A retried job does not re-extract, redo saves or resend notifications."""
+        from src.jobs import JobQueue, JobSteps
+        from src.voice.consultant import run_finalize_job
+
+        c = _make_consultation(messages=4)
+        c.ended_at = c.start_time
+        queue = JobQueue(db_path=":memory:")
+        job = queue.enqueue("finalize_session", {**c.to_job_payload(), "db_session_id": "test-001"},
+                            idempotency_key="k1")
+        queue.mark_step(job.job_id, "extract_anketa",
+                        {"anketa_data": {"company_name": "TestCorp"}, "anketa_md": "# A", "is_fallback": False})
+        for step in ("save_files", "save_dialogue", "save_anketa", "notify", "learning", "postgres"):
+            queue.mark_step(job.job_id, step)
+
+        with patch("src.voice.consultant._session_mgr") as mock_mgr, \
+             patch("src.voice.consultant.AnketaExtractor") as mock_ext_cls, \
+             patch("src.voice.consultant.finalize_consultation", new_callable=AsyncMock) as mock_fin, \
+             patch("src.voice.consultant._update_dialogue_via_api", new_callable=AsyncMock) as mock_dialogue, \
+             patch("src.voice.consultant._update_anketa_via_api", new_callable=AsyncMock) as mock_anketa, \
+             patch("src.notifications.manager.NotificationManager") as mock_notif, \
+             patch("src.voice.consultant._try_get_postgres") as mock_pg, \
+             patch("src.voice.consultant._try_get_redis", return_value=None):
+            mock_mgr.get_session.return_value = _make_db_session(status="active")
+
+            steps = JobSteps(queue, queue.get(job.job_id))
+            await run_finalize_job(queue.get(job.job_id), steps)
+
+            mock_ext_cls.assert_not_called()
+            mock_fin.assert_not_called()
+            mock_dialogue.assert_not_called()
+            mock_anketa.assert_not_called()
+            mock_notif.assert_not_called()
+            mock_pg.assert_not_called()
+            assert steps.failures == {}
+        queue.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_step_is_recorded_for_retry(self):
+        """A failed dialogue API write is collected instead of silently lost."""
+        from src.jobs import JobQueue, JobSteps
+
+        c = _make_consultation(messages=4)
+        queue = JobQueue(db_path=":memory:")
+        job = queue.enqueue("finalize_session", {}, idempotency_key="k1")
+        steps = JobSteps(queue, job)
+
+        async def set_completed(consultation, final=None):
+            consultation.runtime_status = RuntimeStatus.COMPLETED
+
+        with patch("src.voice.consultant._session_mgr") as mock_mgr, \
+             patch("src.voice.consultant.finalize_consultation", new_callable=AsyncMock,
+                   side_effect=set_completed), \
+             patch("src.voice.consultant._update_dialogue_via_api", new_callable=AsyncMock,
+                   return_value=False), \
+             patch("src.voice.consultant._update_anketa_via_api", new_callable=AsyncMock, return_value=True), \
+             patch("src.voice.consultant.create_llm_client"), \
+             patch("src.voice.consultant.AnketaExtractor") as mock_ext_cls, \
+             patch("src.voice.consultant.AnketaGenerator"), \
+             patch("src.voice.consultant._get_kb_manager"), \
+             patch("src.voice.consultant.EnrichedContextBuilder") as mock_ecb, \
+             patch("src.notifications.manager.NotificationManager") as mock_notif, \
+             patch("src.voice.consultant._try_get_postgres", return_value=None), \
+             patch("src.voice.consultant._try_get_redis", return_value=None):
+            mock_mgr.get_session.return_value = _make_db_session(status="active")
+            anketa = MagicMock(_is_fallback=False)
+            anketa.to_json_dict.return_value = {"company_name": "TestCorp"}
+            mock_ext_cls.return_value.extract = AsyncMock(return_value=anketa)
+            mock_ecb.return_value.get_industry_id.return_value = None
+            mock_notif.return_value.on_session_confirmed = AsyncMock()
+
+            await _finalize_and_save(c, "test-001", steps=steps)
+
+        assert "save_dialogue" in steps.failures
+        assert steps.is_done("save_files")
+        assert steps.is_done("extract_anketa")
+        assert queue.completed_steps(job.job_id).keys() >= {"save_files", "extract_anketa", "save_anketa", "notify"}
+        queue.close()
+
+    @staticmethod
+    def _fallback_patches(stack, finalize_mock):
+        """Patches for a finalization whose extraction returns a fallback anketa."""
+        mocks = {}
+        mock_mgr = stack.enter_context(patch("src.voice.consultant._session_mgr"))
+        mock_mgr.get_session.return_value = _make_db_session(status="active")
+        stack.enter_context(patch("src.voice.consultant.finalize_consultation", finalize_mock))
+        mocks["dialogue"] = stack.enter_context(patch(
+            "src.voice.consultant._update_dialogue_via_api", new_callable=AsyncMock, return_value=True))
+        mocks["anketa"] = stack.enter_context(patch(
+            "src.voice.consultant._update_anketa_via_api", new_callable=AsyncMock, return_value=True))
+        stack.enter_context(patch("src.voice.consultant.create_llm_client"))
+        mock_ext_cls = stack.enter_context(patch("src.voice.consultant.AnketaExtractor"))
+        stack.enter_context(patch("src.voice.consultant.AnketaGenerator"))
+        stack.enter_context(patch("src.voice.consultant._get_kb_manager"))
+        mock_ecb = stack.enter_context(patch("src.voice.consultant.EnrichedContextBuilder"))
+        mock_notif = stack.enter_context(patch("src.notifications.manager.NotificationManager"))
+        stack.enter_context(patch("src.voice.consultant._try_get_postgres", return_value=None))
+        stack.enter_context(patch("src.voice.consultant._try_get_redis", return_value=None))
+        anketa = MagicMock(_is_fallback=True)
+        anketa.to_json_dict.return_value = {}
+        mock_ext_cls.return_value.extract = AsyncMock(return_value=anketa)
+        mock_ecb.return_value.get_industry_id.return_value = None
+        mock_notif.return_value.on_session_confirmed = AsyncMock()
+        mocks["notify"] = mock_notif.return_value.on_session_confirmed
+        return mocks
+
+    @pytest.mark.asyncio
+    async def test_fallback_extraction_retries_before_outputs(self):
+        """A fallback anketa aborts the attempt before notify/files are run and marked done."""
+        from contextlib import ExitStack
+
+        from src.jobs import JobQueue, JobSteps, JobStepsFailed
+
+        c = _make_consultation(messages=4)
+        queue = JobQueue(db_path=":memory:")
+        queue.enqueue("finalize_session", {}, idempotency_key="k1", max_attempts=3)
+        job = queue.claim("w1")
+        steps = JobSteps(queue, job)
+        finalize = AsyncMock()
+
+        with ExitStack() as stack:
+            mocks = self._fallback_patches(stack, finalize)
+            with pytest.raises(JobStepsFailed):
+                await _finalize_and_save(c, "test-001", steps=steps)
+
+        finalize.assert_not_called()
+        mocks["notify"].assert_not_called()
+        mocks["dialogue"].assert_not_called()
+        assert queue.completed_steps(job.job_id) == {}
+        queue.close()
+
+    @pytest.mark.asyncio
+    async def test_fallback_on_last_attempt_writes_outputs(self):
+        """The last attempt writes the fallback files and notifies, as inline finalization does."""
+        from contextlib import ExitStack
+
+        from src.jobs import JobQueue, JobSteps
+
+        c = _make_consultation(messages=4)
+        queue = JobQueue(db_path=":memory:")
+        queue.enqueue("finalize_session", {}, idempotency_key="k1", max_attempts=1)
+        job = queue.claim("w1")
+        steps = JobSteps(queue, job)
+
+        async def set_completed(consultation, final=None):
+            consultation.runtime_status = RuntimeStatus.COMPLETED
+
+        finalize = AsyncMock(side_effect=set_completed)
+        with ExitStack() as stack:
+            mocks = self._fallback_patches(stack, finalize)
+            await _finalize_and_save(c, "test-001", steps=steps)
+
+        assert finalize.call_args[0][1]["is_fallback"] is True
+        mocks["notify"].assert_called_once()
+        mocks["anketa"].assert_not_called()
+        assert "extract_anketa" in steps.failures
+        assert steps.is_done("save_files")
+        queue.close()
+
+    @pytest.mark.asyncio
+    async def test_single_extraction_fans_out_to_all_outputs(self):
+        """One extract() call feeds files, the anketa API and notifications."""
+        c = _make_consultation(messages=4)
+        db_session = _make_db_session(
+            status="active",
+            anketa_data={"company_name": "TestCorp", "industry": "IT"},
+            document_context={"documents": []},
+        )
+        anketa = MagicMock(_is_fallback=False)
+        anketa.to_json_dict.return_value = {"company_name": "TestCorp", "services": ["CRM"]}
+
+        with patch("src.voice.consultant._session_mgr") as mock_mgr, \
+             patch("src.voice.consultant.create_llm_client"), \
+             patch("src.voice.consultant.AnketaExtractor") as mock_ext_cls, \
+             patch("src.voice.consultant.AnketaGenerator") as mock_gen, \
+             patch("src.voice.consultant.OutputManager") as mock_out_cls, \
+             patch("src.voice.consultant._update_dialogue_via_api", new_callable=AsyncMock, return_value=True), \
+             patch("src.voice.consultant._update_anketa_via_api", new_callable=AsyncMock,
+                   return_value=True) as mock_anketa_api, \
+             patch("src.voice.consultant._get_kb_manager"), \
+             patch("src.voice.consultant.EnrichedContextBuilder") as mock_ecb, \
+             patch("src.notifications.manager.NotificationManager") as mock_notif, \
+             patch("src.voice.consultant._try_get_postgres", return_value=None), \
+             patch("src.voice.consultant._try_get_redis", return_value=None):
+            mock_mgr.get_session.return_value = db_session
+            mock_ext_cls.return_value.extract = AsyncMock(return_value=anketa)
+            mock_gen.render_markdown.return_value = "# Anketa"
+            mock_out = mock_out_cls.return_value
+            mock_out.save_anketa.return_value = {"md": "/tmp/a.md", "json": "/tmp/a.json"}
+            mock_ecb.return_value.get_industry_id.return_value = None
+            mock_notif.return_value.on_session_confirmed = AsyncMock()
+
+            await _finalize_and_save(c, "test-001")
+
+            mock_ext_cls.return_value.extract.assert_called_once()
+            assert "document_context" in mock_ext_cls.return_value.extract.call_args[1]
+            mock_out.save_anketa.assert_called_once_with(
+                mock_out.get_company_dir.return_value, "# Anketa", anketa.to_json_dict.return_value
+            )
+            mock_anketa_api.assert_called_once_with("test-001", anketa.to_json_dict.return_value, "# Anketa")
+
+            notified = mock_notif.return_value.on_session_confirmed.call_args[0][0]
+            assert notified.status == "reviewing"
+            assert notified.anketa_data == {"company_name": "TestCorp", "industry": "IT", "services": ["CRM"]}
+            assert db_session.anketa_data == {"company_name": "TestCorp", "industry": "IT"}
+        assert c.runtime_status == RuntimeStatus.COMPLETED
+
+
 # ===========================================================================
 # 12. TestRegisterEventHandlers (5 tests)
 # ===========================================================================
@@ -1025,8 +1254,24 @@ class TestRegisterEventHandlers:
         assert len(c.dialogue_history) == 1
         assert c.dialogue_history[0]["role"] == "assistant"
 
-    def test_session_close_triggers_finalize(self):
-        """close handler creates finalization task (R18-03: single save, no redundant dialogue API call).
+    def test_session_close_enqueues_finalize(self):
+        """close handler only enqueues a durable finalization job (no inline task)."""
+        session, handlers = self._capture_handlers()
+        c = _make_consultation(messages=2)
+
+        _register_event_handlers(session, c, "test-001", db_backed=True)
+
+        with patch("src.voice.consultant.asyncio") as mock_asyncio, \
+             patch("src.voice.consultant._enqueue_finalization", return_value=True) as mock_enqueue:
+            event = MagicMock()
+            event.reason = "disconnect"
+            handlers["close"](event)
+
+            mock_enqueue.assert_called_once_with(c, "test-001")
+            mock_asyncio.ensure_future.assert_not_called()
+
+    def test_session_close_falls_back_to_inline_finalize(self):
+        """If the job queue is unavailable, finalization runs inline as before.
 
         B13-01: Uses ensure_future(shield(...)) instead of create_task(shield(...))
         for Python 3.14 compatibility.
@@ -1036,7 +1281,8 @@ class TestRegisterEventHandlers:
 
         _register_event_handlers(session, c, "test-001", db_backed=True)
 
-        with patch("src.voice.consultant.asyncio") as mock_asyncio:
+        with patch("src.voice.consultant.asyncio") as mock_asyncio, \
+             patch("src.voice.consultant._enqueue_finalization", return_value=False):
             event = MagicMock()
             event.reason = "disconnect"
             handlers["close"](event)
@@ -1641,12 +1887,15 @@ class TestGetVerbosityPromptPrefix:
 class TestApplyVerbosityUpdate:
     """Tests for _apply_verbosity_update() async function."""
 
-    def _make_consultation(self, latest_instructions=None):
-        """Create a consultation mock with required attributes for _apply_verbosity_update."""
-        c = MagicMock()
-        c._latest_instructions = latest_instructions
-        c._agent_speaking = False
-        c._pending_instructions = None
+    def _make_consultation(self, verbosity=None, **sections):
+        """Create a consultation whose instruction composer holds the given sections."""
+        c = VoiceConsultationSession(room_name="consultation-verbosity")
+        c.instructions.set("base", sections.pop("base", "Base prompt"))
+        if verbosity:
+            c.instructions.set("verbosity", _VERBOSITY_PREFIXES[verbosity])
+        for name, text in sections.items():
+            c.instructions.set(name, text)
+        c.instructions.mark_pushed()
         return c
 
     @pytest.mark.asyncio
@@ -1661,20 +1910,15 @@ class TestApplyVerbosityUpdate:
 
     @pytest.mark.asyncio
     async def test_strips_old_concise_prefix_adds_verbose(self):
-        """Strips old concise prefix and adds verbose prefix."""
+        """Replaces concise prefix with verbose prefix."""
         activity = MagicMock()
-        concise_prefix = _VERBOSITY_PREFIXES["concise"]
-        activity.instructions = concise_prefix + "Base system prompt here"
         activity.update_instructions = AsyncMock()
 
         agent_session = MagicMock()
         agent_session._activity = activity
         log = MagicMock()
 
-        # R17-06: _latest_instructions is the source of truth
-        consultation = self._make_consultation(
-            latest_instructions=concise_prefix + "Base system prompt here"
-        )
+        consultation = self._make_consultation(verbosity="concise", base="Base system prompt here")
 
         await _apply_verbosity_update(consultation, agent_session, "verbose", log)
 
@@ -1683,23 +1927,19 @@ class TestApplyVerbosityUpdate:
         verbose_prefix = _VERBOSITY_PREFIXES["verbose"]
         assert new_instructions.startswith(verbose_prefix)
         assert "Base system prompt here" in new_instructions
-        assert concise_prefix not in new_instructions
+        assert _VERBOSITY_PREFIXES["concise"].strip() not in new_instructions
 
     @pytest.mark.asyncio
     async def test_strips_old_verbose_prefix_adds_nothing_for_normal(self):
         """Strips verbose prefix, adds nothing for 'normal'."""
         activity = MagicMock()
-        verbose_prefix = _VERBOSITY_PREFIXES["verbose"]
-        activity.instructions = verbose_prefix + "Base prompt"
         activity.update_instructions = AsyncMock()
 
         agent_session = MagicMock()
         agent_session._activity = activity
         log = MagicMock()
 
-        consultation = self._make_consultation(
-            latest_instructions=verbose_prefix + "Base prompt"
-        )
+        consultation = self._make_consultation(verbosity="verbose")
 
         await _apply_verbosity_update(consultation, agent_session, "normal", log)
 
@@ -1710,16 +1950,13 @@ class TestApplyVerbosityUpdate:
     async def test_no_old_prefix_adds_new(self):
         """If no verbosity prefix exists, just prepends the new one."""
         activity = MagicMock()
-        activity.instructions = "Base prompt without prefix"
         activity.update_instructions = AsyncMock()
 
         agent_session = MagicMock()
         agent_session._activity = activity
         log = MagicMock()
 
-        consultation = self._make_consultation(
-            latest_instructions="Base prompt without prefix"
-        )
+        consultation = self._make_consultation(base="Base prompt without prefix")
 
         await _apply_verbosity_update(consultation, agent_session, "concise", log)
 
@@ -1727,20 +1964,37 @@ class TestApplyVerbosityUpdate:
         concise_prefix = _VERBOSITY_PREFIXES["concise"]
         assert new_instructions == concise_prefix + "Base prompt without prefix"
 
+    @pytest.mark.asyncio
+    async def test_same_verbosity_sends_no_update(self):
+        """Unchanged verbosity does not produce a realtime session update."""
+        activity = MagicMock()
+        activity.update_instructions = AsyncMock()
+
+        agent_session = MagicMock()
+        agent_session._activity = activity
+        log = MagicMock()
+
+        consultation = self._make_consultation(verbosity="concise")
+
+        await _apply_verbosity_update(consultation, agent_session, "concise", log)
+
+        activity.update_instructions.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_preserves_kb_and_resume_context(self):
         """KB context and resume context are preserved when changing verbosity."""
         activity = MagicMock()
-        concise_prefix = _VERBOSITY_PREFIXES["concise"]
-        full_prompt = concise_prefix + "Base prompt\n\n### Контекст отрасли:\nMedical context\n\n### Контекст предыдущего разговора:\nResume data"
-        activity.instructions = full_prompt
         activity.update_instructions = AsyncMock()
 
         agent_session = MagicMock()
         agent_session._activity = activity
         log = MagicMock()
 
-        consultation = self._make_consultation(latest_instructions=full_prompt)
+        consultation = self._make_consultation(
+            verbosity="concise",
+            kb="### Контекст отрасли:\nMedical context",
+            resume="### Контекст предыдущего разговора:\nResume data",
+        )
 
         await _apply_verbosity_update(consultation, agent_session, "verbose", log)
 
@@ -1754,14 +2008,13 @@ class TestApplyVerbosityUpdate:
     async def test_exception_is_non_fatal(self):
         """If update_instructions raises, logs warning but doesn't propagate."""
         activity = MagicMock()
-        activity.instructions = "Base prompt"
         activity.update_instructions = AsyncMock(side_effect=RuntimeError("connection closed"))
 
         agent_session = MagicMock()
         agent_session._activity = activity
         log = MagicMock()
 
-        consultation = self._make_consultation(latest_instructions="Base prompt")
+        consultation = self._make_consultation()
 
         # Should not raise
         await _apply_verbosity_update(consultation, agent_session, "concise", log)
@@ -1771,14 +2024,13 @@ class TestApplyVerbosityUpdate:
     async def test_buffers_when_agent_speaking(self):
         """R17-05: When agent is speaking, instructions should be buffered."""
         activity = MagicMock()
-        activity.instructions = "Base prompt"
         activity.update_instructions = AsyncMock()
 
         agent_session = MagicMock()
         agent_session._activity = activity
         log = MagicMock()
 
-        consultation = self._make_consultation(latest_instructions="Base prompt")
+        consultation = self._make_consultation()
         consultation._agent_speaking = True  # Agent is currently speaking
 
         await _apply_verbosity_update(consultation, agent_session, "concise", log)
@@ -1806,7 +2058,7 @@ class TestFinalizeDeepSeekEnforcement:
         mock_anketa = MagicMock()
         mock_anketa.company_name = "TestCorp"
         mock_anketa.contact_name = "Ivan"
-        mock_anketa.model_dump.return_value = {"company_name": "TestCorp"}
+        mock_anketa.to_json_dict.return_value = {"company_name": "TestCorp"}
 
         with patch("src.voice.consultant.create_llm_client") as mock_create, \
              patch("src.voice.consultant.AnketaExtractor") as mock_ext_cls, \
@@ -1837,7 +2089,7 @@ class TestFinalizeDeepSeekEnforcement:
         mock_anketa = MagicMock()
         mock_anketa.company_name = "TestCorp"
         mock_anketa.contact_name = ""
-        mock_anketa.model_dump.return_value = {"company_name": "TestCorp"}
+        mock_anketa.to_json_dict.return_value = {"company_name": "TestCorp"}
 
         mock_cached = AsyncMock()
         mock_cached.extract = AsyncMock(return_value=mock_anketa)
@@ -1874,7 +2126,7 @@ class TestPeriodicExtractionDeepSeek:
         mock_anketa.company_name = "TestCorp"
         mock_anketa.contact_name = ""
         mock_anketa.completion_rate.return_value = 0.5
-        mock_anketa.model_dump.return_value = {"company_name": "TestCorp"}
+        mock_anketa.to_json_dict.return_value = {"company_name": "TestCorp"}
 
         with patch("src.voice.consultant.create_llm_client") as mock_create, \
              patch("src.voice.consultant.AnketaExtractor") as mock_ext_cls, \
@@ -1939,3 +2191,103 @@ class TestAsyncioShieldFix:
         # Give time for shielded inner to complete
         await asyncio.sleep(0.1)
         assert completed is True
+
+
+class TestWorkerPrewarm:
+    """prewarm(): process-level resources loaded before the job gets a room."""
+
+    @pytest.fixture(autouse=True)
+    def _reset_worker_state(self):
+        import src.voice.consultant as consultant
+
+        saved = (consultant._prewarmed_llm, consultant._shared_http_client, consultant._worker_prewarmed)
+        consultant._prewarmed_llm = None
+        consultant._shared_http_client = None
+        yield consultant
+        consultant._prewarmed_llm, consultant._shared_http_client, consultant._worker_prewarmed = saved
+
+    def _prewarm(self, kb_manager=None):
+        from src.voice.consultant import prewarm
+
+        proc = SimpleNamespace(userdata={})
+        kb_manager = kb_manager or MagicMock()
+        with patch("src.voice.consultant._get_kb_manager", return_value=kb_manager), \
+             patch("src.knowledge.country_detector.get_country_detector") as mock_countries, \
+             patch("src.voice.consultant.create_llm_client") as mock_create, \
+             patch("src.voice.consultant._probe_storage"):
+            prewarm(proc)
+        return proc, kb_manager, mock_countries, mock_create
+
+    def test_loads_resources_once_per_process(self, _reset_worker_state):
+        """Alias index, countries, prompts and clients are ready after prewarm."""
+        from src.config.prompt_loader import get_prompt_loader
+
+        proc, kb_manager, mock_countries, mock_create = self._prewarm()
+
+        kb_manager.matcher.warm.assert_called_once()
+        mock_countries.assert_called_once()
+        mock_create.assert_called_once_with("deepseek")
+        assert "voice/consultant" in get_prompt_loader()._cache
+        assert _reset_worker_state._shared_http_client is not None
+        assert _reset_worker_state._worker_prewarmed is True
+        assert set(proc.userdata["prewarm_ms"]) == {"prompts", "knowledge", "http_clients"}
+
+    def test_prewarmed_llm_handed_to_first_extraction_only(self, _reset_worker_state):
+        """The first consultation takes the prewarmed client, later ones create their own."""
+        from src.voice.consultant import _create_extraction_llm
+
+        _, _, _, mock_create = self._prewarm()
+        prewarmed = mock_create.return_value
+
+        with patch("src.voice.consultant.create_llm_client") as mock_new:
+            assert _create_extraction_llm() is prewarmed
+            assert _create_extraction_llm() is mock_new.return_value
+            mock_new.assert_called_once_with("deepseek")
+
+    def test_failed_step_is_non_fatal(self, _reset_worker_state):
+        """A broken KB does not fail the process: the entrypoint loads lazily."""
+        kb_manager = MagicMock()
+        kb_manager.matcher.warm.side_effect = RuntimeError("broken yaml")
+
+        proc, _, _, mock_create = self._prewarm(kb_manager)
+
+        assert "knowledge" in proc.userdata["prewarm_ms"]
+        mock_create.assert_called_once()  # следующие шаги выполнены
+
+
+class TestTimeToFirstSpeech:
+    """Time-to-first-agent-speech per room."""
+
+    def test_recorded_once(self):
+        c = _make_consultation(messages=0)
+        c.job_started_at = time.perf_counter() - 0.25
+
+        first = c.mark_agent_speech()
+
+        assert first >= 250
+        assert c.first_speech_ms == first
+        assert c.mark_agent_speech() is None
+
+    def test_not_recorded_without_entrypoint_start(self):
+        c = _make_consultation(messages=0)
+        assert c.mark_agent_speech() is None
+        assert c.first_speech_ms is None
+
+    def test_logged_on_first_speaking_state(self):
+        session = MagicMock()
+        handlers = {}
+        session.on = lambda name: (lambda fn: handlers.setdefault(name, fn))
+        c = _make_consultation(messages=0)
+        c.job_started_at = time.perf_counter()
+
+        _register_event_handlers(session, c, "test-001", db_backed=True)
+        with patch("src.voice.consultant.logger") as mock_logger:
+            handlers["agent_state_changed"](SimpleNamespace(old_state="listening", new_state="speaking"))
+            handlers["agent_state_changed"](SimpleNamespace(old_state="speaking", new_state="listening"))
+            handlers["agent_state_changed"](SimpleNamespace(old_state="listening", new_state="speaking"))
+
+        calls = [call for call in mock_logger.info.call_args_list if call.args == ("time_to_first_speech",)]
+        assert len(calls) == 1
+        assert calls[0].kwargs["session_id"] == "test-001"
+        assert calls[0].kwargs["room"] == "consultation-test-001"
+        assert calls[0].kwargs["ttfs_ms"] == c.first_speech_ms
@@ -91,7 +91,7 @@ def _make_anketa_mock(completion_rate=0.3, website=None, contact_phone=None):
     anketa.contact_phone = contact_phone or "+1234567890"
     anketa.completion_rate.return_value = completion_rate
     # Include all required fields for _check_required_fields()
-    anketa.model_dump.return_value = {
+    anketa.to_json_dict.return_value = {
         "company_name": "TestCorp",
         "industry": "IT",
         "business_description": "Test business",
@@ -415,7 +415,7 @@ class TestFinalizeAndSaveConsultationType:
             mock_notif_inst.on_session_confirmed = AsyncMock()
 
             # finalize_consultation sets status to completed
-            async def set_completed(c):
+            async def set_completed(c, final=None):
                 c.runtime_status = RuntimeStatus.COMPLETED
             mock_fin.side_effect = set_completed
 
@@ -476,7 +476,7 @@ class TestFinalizeAndSaveConsultationType:
             mock_notif_inst = mock_notif.return_value
             mock_notif_inst.on_session_confirmed = AsyncMock()
 
-            async def set_completed(c):
+            async def set_completed(c, final=None):
                 c.runtime_status = RuntimeStatus.COMPLETED
             mock_fin.side_effect = set_completed
 
@@ -523,7 +523,7 @@ class TestFinalizeAndSaveConsultationType:
             mock_notif_inst = mock_notif.return_value
             mock_notif_inst.on_session_confirmed = AsyncMock()
 
-            async def set_completed(c):
+            async def set_completed(c, final=None):
                 c.runtime_status = RuntimeStatus.COMPLETED
             mock_fin.side_effect = set_completed
 
@@ -553,34 +553,38 @@ class TestFinalizeAndSaveConsultationType:
             mock_mgr.update_dialogue.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_finalize_not_completed_skips_extraction(self):
-        """When consultation.runtime_status is idle (no finalize ran), final extraction
-        is skipped in _finalize_and_save. R24-09: ERROR status still triggers extraction."""
+    async def test_finalize_extraction_failure_skips_anketa_update(self):
+        """When the single final extraction fails, no anketa is written or saved
+        to files, but the dialogue is still saved via API."""
         consultation = _make_consultation(messages=6)
-        consultation.runtime_status = RuntimeStatus.IDLE
 
         db_session = _make_db_session()
-        db_downstream = _make_db_session(anketa_data={"company_name": "TestCorp"})
 
         with patch("src.voice.consultant._session_mgr") as mock_mgr, \
              patch("src.voice.consultant.finalize_consultation", new_callable=AsyncMock) as mock_fin, \
-             patch("src.voice.consultant.create_llm_client") as mock_ds, \
+             patch("src.voice.consultant.create_llm_client"), \
              patch("src.voice.consultant.AnketaExtractor") as mock_ext_cls, \
+             patch("src.voice.consultant._get_kb_manager"), \
+             patch("src.voice.consultant.EnrichedContextBuilder"), \
+             patch("src.notifications.manager.NotificationManager") as mock_notif, \
+             patch("src.voice.consultant._update_dialogue_via_api", new_callable=AsyncMock,
+                   return_value=True) as mock_dialogue, \
+             patch("src.voice.consultant._update_anketa_via_api", new_callable=AsyncMock) as mock_api_update, \
              patch("src.voice.consultant._try_get_redis", return_value=None), \
              patch("src.voice.consultant._try_get_postgres", return_value=None):
 
-            # finalize_consultation keeps status as idle (no finalize ran)
-            async def keep_idle(c):
-                pass  # status stays idle
-            mock_fin.side_effect = keep_idle
-
-            # R25-01 pre-check + fresh_session + downstream
-            mock_mgr.get_session.side_effect = [db_session, db_session, db_downstream]
+            mock_notif.return_value.on_session_confirmed = AsyncMock()
+            mock_ext_cls.return_value.extract = AsyncMock(side_effect=RuntimeError("LLM down"))
+            # R25-01 pre-check/context + fresh_session after extraction
+            mock_mgr.get_session.side_effect = [db_session, db_session]
 
             await _finalize_and_save(consultation, "test-001")
 
-            # Extractor should not be instantiated since status is idle (not completed/error)
-            mock_ext_cls.assert_not_called()
+            mock_ext_cls.return_value.extract.assert_called_once()
+            mock_fin.assert_not_called()
+            mock_api_update.assert_not_called()
+            mock_dialogue.assert_called_once()
+            assert consultation.runtime_status == RuntimeStatus.ERROR
 
     @pytest.mark.asyncio
     async def test_finalize_interview_type_with_other_voice_config(self):
@@ -623,7 +627,7 @@ class TestFinalizeAndSaveConsultationType:
             mock_notif_inst = mock_notif.return_value
             mock_notif_inst.on_session_confirmed = AsyncMock()
 
-            async def set_completed(c):
+            async def set_completed(c, final=None):
                 c.runtime_status = RuntimeStatus.COMPLETED
             mock_fin.side_effect = set_completed
 
@@ -675,7 +679,7 @@ class TestFinalizeAndSaveConsultationType:
             mock_notif_inst = mock_notif.return_value
             mock_notif_inst.on_session_confirmed = AsyncMock()
 
-            async def set_completed(c):
+            async def set_completed(c, final=None):
                 c.runtime_status = RuntimeStatus.COMPLETED
             mock_fin.side_effect = set_completed
 
@@ -691,7 +695,7 @@ class TestFinalizeAndSaveConsultationType:
             # ✅ v4.4: Changed to use API update instead of direct DB write
             mock_api_update.assert_called_once_with(
                 "test-001",
-                anketa.model_dump.return_value,
+                anketa.to_json_dict.return_value,
                 "# Anketa",
             )
 
@@ -5,10 +5,14 @@ Covers:
 - JSONRepair: JSON parsing with automatic repair
 - DialogueCleaner: Dialogue contamination removal
 - SmartExtractor: Data extraction from dialogue
+- IncrementalSmartExtractor: Stateful extraction over a growing dialogue
 - AnketaPostProcessor: Post-processing pipeline
+- RuleEngine: Compiled contextual list rules
 """
 
 import json
+from pathlib import Path
+
 import pytest
 from unittest.mock import patch, MagicMock
 
@@ -17,7 +21,14 @@ from src.anketa.data_cleaner import (
     DialogueCleaner,
     DialoguePattern,
     SmartExtractor,
+    IncrementalSmartExtractor,
     AnketaPostProcessor,
+    RuleEngine,
+)
+
+# Реальные битые ответы LLM (см. scripts/bench_json_repair.py)
+REPAIR_CORPUS = json.loads(
+    (Path(__file__).parent.parent / "fixtures" / "json_repair" / "corpus.json").read_text(encoding="utf-8")
 )
 
 
@@ -141,6 +152,39 @@ Done.'''
         assert result == {"name": "Test"}
         assert was_repaired is True
 
+    def test_parse_truncated_response_keeps_tail(self):
+        """Обрезанный по max_tokens ответ восстанавливается, включая хвост после последней '}'."""
+        text = '{"a": {"b": 1}, "c": "обрез'
+        result, was_repaired = JSONRepair.parse(text)
+        assert result == {"a": {"b": 1}, "c": "обрез"}
+        assert was_repaired is True
+
+    # -------------------- repair() method --------------------
+
+    def test_repair_removes_trailing_commas(self):
+        assert JSONRepair.repair('{"key": "value",}') == '{"key":"value"}'
+        assert JSONRepair.repair('{"a": ["x", "y",]}') == '{"a":["x","y"]}'
+
+    def test_repair_keeps_first_object_only(self):
+        assert JSONRepair.repair('{"outer": {"inner": "value"}} more {"x": 1}') == '{"outer":{"inner":"value"}}'
+
+    def test_repair_closes_truncated_containers(self):
+        assert json.loads(JSONRepair.repair('{"a": [1, {"b": "x')) == {"a": [1, {"b": "x"}]}
+
+    def test_repair_apostrophe_inside_double_quoted_string(self):
+        """R19-01: апострофы в строках в двойных кавычках не трогаются."""
+        assert json.loads(JSONRepair.repair('{"note": "it\'s fine",}')) == {"note": "it's fine"}
+
+    def test_repair_bare_values(self):
+        result = json.loads(JSONRepair.repair('{status: active user, deleted: None}'))
+        assert result == {"status": "active user", "deleted": None}
+
+    @pytest.mark.parametrize("case", REPAIR_CORPUS, ids=[c["name"] for c in REPAIR_CORPUS])
+    def test_corpus_single_pass(self, case):
+        """Корпус реальных битых ответов LLM чинится одним проходом repair()."""
+        assert json.loads(JSONRepair.repair(case["response"])) == case["expected"]
+        assert JSONRepair.parse(case["response"])[0] == case["expected"]
+
     # -------------------- _extract_json() method --------------------
 
     def test_extract_json_from_json_code_block(self):
@@ -470,6 +514,19 @@ class TestDialogueCleaner:
         cleaned, changes = cleaner.clean(data)
         assert not cleaned["agent_name"].endswith("!")
 
+    def test_combined_patterns_agree_with_individual_patterns(self):
+        """Объединённые префильтры срабатывают ровно тогда, когда срабатывает хотя бы один паттерн."""
+        samples = [
+            "ООО Ромашка", "Консультант: ООО Ромашка", "да, конечно",
+            "Спасибо, всё верно", "Какой у вас сайт?", "мы работаем в сфере IT",
+            "x" * 250, "Итак, клиника", "клиника\nДа, верно",
+        ]
+        for text in samples:
+            expected = any(p.pattern.search(text) for p in DialogueCleaner.DIALOGUE_PATTERNS)
+            assert bool(DialogueCleaner._ANY_DIALOGUE_PATTERN.search(text)) is expected, text
+            expected = any(p.search(text) for p in DialogueCleaner.FULL_DIALOGUE_INDICATORS)
+            assert bool(DialogueCleaner._ANY_FULL_DIALOGUE_INDICATOR.search(text)) is expected, text
+
     # -------------------- clean_anketa_dict() method --------------------
 
     def test_clean_anketa_dict_delegates_to_clean(self):
@@ -628,6 +685,20 @@ class TestSmartExtractor:
         # May or may not extract based on pattern
         assert isinstance(result, dict)
 
+    def test_extract_normalizes_each_message_once(self):
+        """Повторный вызов с дописанным диалогом нормализует только новые реплики."""
+        extractor = SmartExtractor()
+        dialogue = [{"role": "user", "content": "Мой телефон плюс семь девятьсот сорок"}]
+        extractor.extract_from_dialogue(dialogue)
+        dialogue.append({"role": "user", "content": "три двадцать пять"})
+        result = extractor.extract_from_dialogue(dialogue)
+
+        info = extractor._message_tokens.cache_info()
+        assert info.misses == 2
+        assert info.hits == 1
+        # Склейка чисел работает через границу реплик, как на объединённом тексте
+        assert result["contact_phone"] == "+79004325"
+
     # -------------------- _validate_extracted_value() method --------------------
 
     def test_validate_website_valid(self):
@@ -728,6 +799,79 @@ class TestSmartExtractor:
         assert result["company_name"] == "LLM Company"
 
 
+class TestIncrementalSmartExtractor:
+    """Tests for IncrementalSmartExtractor."""
+
+    def test_processes_only_new_messages(self):
+        extractor = IncrementalSmartExtractor()
+        dialogue = [
+            {"role": "assistant", "content": "Как вас зовут?"},
+            {"role": "user", "content": "Меня зовут Анна"},
+        ]
+        assert extractor.update(dialogue) == 1
+
+        dialogue.append({"role": "user", "content": "Почта anna@example.com"})
+        assert extractor.update(dialogue) == 1
+        assert extractor.update(dialogue) == 0
+
+        result = extractor.extract_from_dialogue(dialogue)
+        assert result["contact_name"] == "Анна"
+        assert result["contact_email"] == "anna@example.com"
+
+    def test_keeps_best_hit_with_position(self):
+        """Раннее значение того же паттерна не вытесняется, более приоритетный паттерн — вытесняет."""
+        extractor = IncrementalSmartExtractor()
+        dialogue = [{"role": "user", "content": "Сайт example.ru"}]
+        extractor.update(dialogue)
+        hit = extractor.best["website"]
+        assert (hit.value, hit.rank, hit.message) == ("example.ru", 1, 0)
+
+        dialogue.append({"role": "user", "content": "Ещё сайт other.ru"})
+        extractor.update(dialogue)
+        assert extractor.best["website"].value == "example.ru"
+
+        dialogue.append({"role": "user", "content": "Точнее https://clinic.ru"})
+        extractor.update(dialogue)
+        hit = extractor.best["website"]
+        assert (hit.value, hit.rank, hit.message) == ("https://clinic.ru", 0, 2)
+        assert hit.position == len("Точнее ")
+
+    def test_matches_stateless_extractor_on_single_message(self):
+        dialogue = [{"role": "user", "content": "Мой телефон плюс семь девятьсот сорок три двадцать пять"}]
+        expected = SmartExtractor().extract_from_dialogue(dialogue)
+        assert IncrementalSmartExtractor().extract_from_dialogue(dialogue) == expected
+
+    def test_phone_split_across_messages(self):
+        """STT may cut a number into two segments: the tail of the previous message is rescanned."""
+        dialogue = [{"role": "user", "content": "Мой телефон плюс 7 916"}]
+        extractor = IncrementalSmartExtractor()
+        assert extractor.extract_from_dialogue(dialogue) == {}
+
+        dialogue.append({"role": "user", "content": "123 45 67, звоните"})
+        assert extractor.extract_from_dialogue(dialogue)["contact_phone"] == "+79161234567"
+        assert extractor.best["contact_phone"].message == 0
+        assert extractor.extract_from_dialogue(dialogue) == SmartExtractor().extract_from_dialogue(dialogue)
+
+    def test_email_split_across_messages(self):
+        extractor = IncrementalSmartExtractor()
+        dialogue = [{"role": "user", "content": "Почта anna.petrova"}]
+        extractor.update(dialogue)
+        dialogue.append({"role": "user", "content": "собака example точка ru"})
+
+        assert extractor.extract_from_dialogue(dialogue)["contact_email"] == "anna.petrova@example.ru"
+
+    def test_respects_existing_data_and_survives_trimmed_history(self):
+        extractor = IncrementalSmartExtractor()
+        first = {"role": "user", "content": "Меня зовут Анна", "timestamp": "t1"}
+        extractor.update([first])
+
+        later = [{"role": "user", "content": "Да", "timestamp": "t2"}]
+        assert extractor.extract_from_dialogue(later)["contact_name"] == "Анна"
+        assert "contact_name" not in extractor.extract_from_dialogue(
+            later, existing_data={"contact_name": "Мария"}
+        )
+
+
 # ============================================================================
 # AnketaPostProcessor Tests
 # ============================================================================
@@ -984,6 +1128,76 @@ class TestAnketaPostProcessor:
         assert result["agent_name"] == "Custom Bot"
 
 
+# ============================================================================
+# RuleEngine Tests
+# ============================================================================
+
+class TestRuleEngine:
+    """Tests for RuleEngine (config/anketa_rules.yaml)."""
+
+    @pytest.fixture
+    def engine(self):
+        return RuleEngine()
+
+    def test_fills_agent_functions_on_affirmative_answer(self, engine):
+        dialogue = [
+            {"role": "assistant", "content": "Агент может быть администратором и отправлять напоминания."},
+            {"role": "user", "content": "Да, все интересно"},
+        ]
+        result = engine.fill_contextual_lists({}, dialogue)
+        names = [f["name"] for f in result["agent_functions"]]
+        assert names == ["администратор", "напоминатель"]
+        assert result["agent_functions"][0]["priority"] == "high"
+        assert "integrations" not in result
+
+    def test_and_group_requires_all_terms(self, engine):
+        dialogue = [
+            {"role": "assistant", "content": "Нужна интеграция с календарем? А телефон у вас один?"},
+            {"role": "user", "content": "Конечно"},
+        ]
+        result = engine.fill_contextual_lists({}, dialogue)
+        names = [i["name"] for i in result["integrations"]]
+        assert names == ["Календарь", "Телефония"]
+
+    def test_overlapping_terms_detected(self, engine):
+        """Термин-подстрока другого термина в той же позиции тоже найден."""
+        custom = RuleEngine(rules={
+            "affirmative": ["да"],
+            "integrations": [
+                {"match": [["календарь"]], "value": {"name": "A"}},
+                {"match": [["календар"]], "value": {"name": "B"}},
+            ],
+        })
+        features = custom.scan("Подключим календарь")
+        assert features.terms == frozenset({"календарь", "календар"})
+
+    def test_no_fill_without_affirmative_or_when_list_present(self, engine):
+        dialogue = [
+            {"role": "assistant", "content": "Подключим CRM?"},
+            {"role": "user", "content": "Нет, не нужно"},
+        ]
+        assert "integrations" not in engine.fill_contextual_lists({}, dialogue)
+
+        dialogue[1]["content"] = "Да, однозначно"
+        existing = {"integrations": [{"name": "1С"}]}
+        assert engine.fill_contextual_lists(existing, dialogue)["integrations"] == [{"name": "1С"}]
+
+    def test_scan_is_cached_per_message(self, engine):
+        engine.scan("Подключим CRM?")
+        engine.scan("Подключим CRM?")
+        info = engine.scan.cache_info()
+        assert info.hits == 1
+        assert info.misses == 1
+
+    def test_missing_rules_file_disables_post_processing(self, tmp_path):
+        engine = RuleEngine(rules_path=tmp_path / "missing.yaml")
+        dialogue = [
+            {"role": "assistant", "content": "Подключим CRM?"},
+            {"role": "user", "content": "Конечно"},
+        ]
+        assert engine.fill_contextual_lists({}, dialogue) == {}
+
+
 # ============================================================================
 # Integration Tests
 # ============================================================================
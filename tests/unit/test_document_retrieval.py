@@ -0,0 +1,137 @@
+"""
+Tests for document retrieval (src/documents/retrieval.py).
+
+- Tokenizer: Russian stems, ё, numbers
+- Passages: chunks split by lines with source metadata
+- BM25 search: relevant fragment of a long price list ranks first
+- DocumentIndexStore: persistence, merge on re-upload, cache invalidation
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.documents.models import DocumentChunk, ParsedDocument
+from src.documents.retrieval import (
+    DocumentIndex,
+    DocumentIndexStore,
+    format_hits_for_prompt,
+    split_chunk,
+    tokenize,
+)
+
+
+def _price_list(filename="price.xlsx", rows=300):
+    lines = [f"Анализ крови, профиль {i} | {100 + i} руб" for i in range(rows)]
+    lines[137] = "МРТ коленного сустава | 5400 руб"
+    return ParsedDocument(
+        filename=filename,
+        doc_type="xlsx",
+        file_path=filename,
+        chunks=[DocumentChunk(content="\n".join(lines), doc_type="xlsx", section="Прайс", row_range=f"1-{rows}")],
+    )
+
+
+def _doc(filename, text):
+    return ParsedDocument(
+        filename=filename, doc_type="md", file_path=filename,
+        chunks=[DocumentChunk(content=text, doc_type="md", section="Общее")],
+    )
+
+
+class TestTokenize:
+
+    def test_stems_and_normalizes(self):
+        assert tokenize("Зелёные ёлочки, МРТ и 5 500 руб.") == ["зелен", "елочк", "мрт", "5", "500", "руб"]
+
+    def test_word_forms_share_stem(self):
+        assert tokenize("доставкой") == tokenize("доставка")
+
+
+class TestSplitChunk:
+
+    def test_passages_respect_limit_and_keep_metadata(self):
+        chunk = _price_list().chunks[0]
+        passages = split_chunk(chunk, "price.xlsx", max_chars=500)
+
+        assert len(passages) > 10
+        assert all(len(p.text) <= 500 for p in passages)
+        assert passages[0].source == "price.xlsx, строки 1-300, Прайс"
+        assert "\n".join(p.text for p in passages) == chunk.content
+
+    def test_long_line_split_by_words(self):
+        chunk = DocumentChunk(content="слово " * 300, doc_type="pdf", page=3)
+        passages = split_chunk(chunk, "doc.pdf", max_chars=100)
+        assert all(len(p.text) <= 100 for p in passages)
+        assert passages[0].page == 3
+
+
+class TestDocumentIndex:
+
+    def test_relevant_fragment_ranks_first(self):
+        index = DocumentIndex.build([_price_list(), _doc("about.md", "Клиника работает ежедневно, парковка бесплатная.")])
+
+        hits = index.search("Сколько у вас стоит МРТ?", top_k=3)
+        assert "МРТ коленного сустава | 5400 руб" in hits[0].passage.text
+
+        hits = index.search("есть парковка?", top_k=1)
+        assert hits[0].passage.filename == "about.md"
+
+    def test_no_match_returns_empty(self):
+        index = DocumentIndex.build([_doc("about.md", "Клиника работает ежедневно")])
+        assert index.search("криптовалюта") == []
+        assert DocumentIndex.build([]).search("клиника") == []
+
+    def test_roundtrip(self):
+        index = DocumentIndex.build([_price_list()])
+        restored = DocumentIndex.from_dict(index.to_dict())
+        query = "МРТ сустава"
+        assert [h.passage for h in restored.search(query)] == [h.passage for h in index.search(query)]
+
+    def test_merge_replaces_same_filename(self):
+        index = DocumentIndex.build([_doc("a.md", "старый прайс"), _doc("b.md", "договор оферты")])
+        merged = index.merged_with(DocumentIndex.build([_doc("a.md", "новый прайс")]))
+
+        assert merged.filenames == ["b.md", "a.md"]
+        assert merged.search("прайс")[0].passage.text == "новый прайс"
+        assert merged.search("старый") == []
+
+    def test_format_hits_for_prompt(self):
+        index = DocumentIndex.build([_doc("about.md", "Парковка бесплатная")])
+        assert format_hits_for_prompt(index.search("парковка")) == "[about.md, Общее]\nПарковка бесплатная"
+
+
+class TestDocumentIndexStore:
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        return DocumentIndexStore(root=str(tmp_path / "doc_index"))
+
+    def test_save_load_search(self, store):
+        store.save("abcdef01", DocumentIndex.build([_price_list()]))
+        assert store.load("abcdef01") is store.load("abcdef01")  # из кэша
+        assert "5400" in store.search("abcdef01", "МРТ", top_k=1)[0].passage.text
+        assert store.search("missing1", "МРТ") == []
+
+    def test_add_merges_uploads_and_invalidates_cache(self, store):
+        store.add("abcdef01", DocumentIndex.build([_doc("a.md", "прайс на доставку")]))
+        first = store.load("abcdef01")
+        store.add("abcdef01", DocumentIndex.build([_doc("b.md", "договор поставки")]))
+
+        loaded = store.load("abcdef01")
+        assert loaded is not first
+        assert loaded.filenames == ["a.md", "b.md"]
+
+    def test_corrupt_file_ignored(self, store):
+        store.path("abcdef01").parent.mkdir(parents=True)
+        store.path("abcdef01").write_text("{not json")
+        assert store.load("abcdef01") is None
+
+    def test_delete(self, store):
+        store.save("abcdef01", DocumentIndex.build([_doc("a.md", "прайс")]))
+        store.delete("abcdef01")
+        assert store.load("abcdef01") is None
+        store.delete("abcdef01")  # повторно — без ошибки
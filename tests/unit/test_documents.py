@@ -6,6 +6,7 @@ import pytest
 from unittest.mock import MagicMock, AsyncMock, patch
 from pathlib import Path
 import json
+import re
 
 import sys
 import os
@@ -148,6 +149,26 @@ class TestParsedDocument:
         assert len(doc.extracted_prices) == 1
         assert "email" in doc.extracted_contacts
 
+    def test_full_text_cached(self, sample_document):
+        """Test full_text is computed once and reused."""
+        assert sample_document.full_text is sample_document.full_text
+
+    def test_full_text_cache_invalidated_on_append(self, sample_document):
+        """Test appending a chunk in place refreshes full_text and word_count."""
+        words_before = sample_document.word_count
+        sample_document.chunks.append(DocumentChunk(content="Fourth chunk", doc_type="pdf", page=4))
+
+        assert sample_document.full_text.endswith("Fourth chunk")
+        assert sample_document.word_count == words_before + 2
+
+    def test_full_text_cache_invalidated_on_reassign(self, sample_document):
+        """Test reassigning chunks refreshes full_text."""
+        sample_document.full_text
+        sample_document.chunks = [DocumentChunk(content="Only chunk", doc_type="pdf")]
+
+        assert sample_document.full_text == "Only chunk"
+        assert sample_document.word_count == 2
+
 
 class TestDocumentContext:
     """Test DocumentContext model."""
@@ -383,6 +404,89 @@ Subsection content.
         assert result is None
 
 
+class TestDocumentParserStreaming:
+    """Test row-range XLSX chunking and page-range PDF extraction."""
+
+    @pytest.fixture
+    def xlsx_file(self, tmp_path):
+        openpyxl = pytest.importorskip("openpyxl")
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = "Прайс"
+        ws.append(["Услуга", "Цена", None])
+        ws.append([None, None, None])  # пустая строка пропускается
+        for i in range(1, 6):
+            ws.append([f"Услуга {i}", 1000 * i])
+        path = tmp_path / "price.xlsx"
+        wb.save(path)
+        return path
+
+    @pytest.fixture
+    def pdf_file(self, tmp_path):
+        fitz = pytest.importorskip("fitz")
+        doc = fitz.open()
+        for i in range(1, 6):
+            doc.new_page().insert_text((72, 72), f"Page {i} text")
+        doc.new_page()  # пустая страница без чанка
+        path = tmp_path / "price.pdf"
+        doc.save(path)
+        doc.close()
+        return path
+
+    def test_xlsx_chunks_by_row_range(self, xlsx_file):
+        """Test XLSX rows are split into chunks with sheet row numbers."""
+        result = DocumentParser(xlsx_rows_per_chunk=4).parse(xlsx_file)
+
+        assert [c.row_range for c in result.chunks] == ["1-5", "6-7"]
+        assert all(c.section == "Прайс" for c in result.chunks)
+        assert result.chunks[0].content.splitlines()[0] == "Услуга | Цена"
+        assert "truncated_sheets" not in result.metadata
+
+    def test_xlsx_max_rows_cap(self, xlsx_file):
+        """Test rows beyond the cap are dropped and reported."""
+        result = DocumentParser(xlsx_max_rows=3).parse(xlsx_file)
+
+        assert len(result.chunks) == 1
+        assert result.chunks[0].row_range == "1-4"
+        assert result.metadata["truncated_sheets"] == ["Прайс"]
+
+    def test_pdf_pages_serial(self, pdf_file):
+        """Test PDF pages become chunks; empty pages are skipped."""
+        result = DocumentParser().parse(pdf_file)
+
+        assert result.metadata["pages"] == 6
+        assert [c.page for c in result.chunks] == [1, 2, 3, 4, 5]
+        assert result.chunks[2].content == "Page 3 text"
+
+    def test_pdf_parallel_fallback_keeps_page_order(self, pdf_file):
+        """Test a failing process pool falls back to serial extraction."""
+        pool = MagicMock()
+        pool.submit.side_effect = RuntimeError("pool broken")
+
+        with patch("src.documents.parser._pdf_workers", return_value=4), \
+             patch("src.documents.parser._get_pdf_pool", return_value=pool), \
+             patch("src.documents.parser._reset_pdf_pool") as reset:
+            result = DocumentParser(pdf_parallel_min_pages=2).parse(pdf_file)
+
+        pool.submit.assert_called_once()
+        reset.assert_called_once()
+        assert [c.page for c in result.chunks] == [1, 2, 3, 4, 5]
+
+    def test_pdf_parallel_uses_page_ranges(self, pdf_file):
+        """Test large PDFs are extracted as page ranges through the pool."""
+        from concurrent.futures import ThreadPoolExecutor
+        from src.documents import parser as parser_module
+
+        with ThreadPoolExecutor(max_workers=2) as pool, \
+             patch.object(parser_module, "PDF_PAGES_PER_TASK", 2), \
+             patch.object(parser_module, "_pdf_workers", return_value=2), \
+             patch.object(parser_module, "_get_pdf_pool", return_value=pool):
+            result = DocumentParser(pdf_parallel_min_pages=2).parse(pdf_file)
+
+        assert [c.page for c in result.chunks] == [1, 2, 3, 4, 5]
+        assert result.chunks[4].content == "Page 5 text"
+
+
 class TestDocumentLoader:
     """Test DocumentLoader class."""
 
@@ -1067,3 +1171,149 @@ class TestDocumentAnalyzerV2:
         service_names_lower = [s.lower() for s in context.services_mentioned]
         assert service_names_lower.count("delivery") == 1
         assert "packing" in service_names_lower
+
+
+# ============ ANALYZER MAP-REDUCE TESTS ============
+
+class TestDocumentAnalyzerMapReduce:
+    """Tests for chunk-level map-reduce analysis of large uploads."""
+
+    @staticmethod
+    def _price_doc(filename="price.pdf", pages=6, chars_per_page=3000):
+        return ParsedDocument(
+            filename=filename, doc_type="pdf", file_path="/p",
+            chunks=[
+                DocumentChunk(content=f"Прайс страница {i} " + "x" * chars_per_page, doc_type="pdf", page=i)
+                for i in range(1, pages + 1)
+            ],
+        )
+
+    @staticmethod
+    def _map_response(prompt):
+        page = re.search(r"Прайс страница (\d+)", prompt).group(1)
+        return json.dumps({
+            "summary": f"Страница {page}",
+            "key_facts": [f"Факт {page}", "Клиника работает с 2010 года"],
+            "services": [f"Услуга {page}", "Консультация"],
+            "contacts": {"телефон": "+79991234567" if page == "1" else ""},
+            "prices": [{"service": f"Услуга {page}", "price": "1000"}, {"service": "консультация", "price": "500"}],
+            "faq": [{"question": "Есть парковка?", "answer": "Да"}],
+            "questions": ["Сколько врачей?"],
+        }, ensure_ascii=False)
+
+    def _client(self, summary="Общая сводка"):
+        client = MagicMock()
+
+        async def chat(messages, **kwargs):
+            prompt = messages[0]["content"]
+            if prompt.startswith("Ниже сводки фрагментов"):
+                return summary
+            return self._map_response(prompt)
+
+        client.chat = AsyncMock(side_effect=chat)
+        return client
+
+    def test_batches_bounded_by_tokens_and_documents(self):
+        """Test batches respect the token budget and never mix documents."""
+        analyzer = DocumentAnalyzer(llm_client=MagicMock(), map_batch_tokens=2100)
+        docs = [self._price_doc("a.pdf", pages=4), self._price_doc("b.pdf", pages=1)]
+
+        batches = analyzer._build_batches(docs)
+
+        assert [doc_index for doc_index, _ in batches] == [0, 0, 1]
+        assert all(len(text) <= 2100 * 3 for _, text in batches)
+        assert batches[0][1].startswith("[стр. 1]")
+        assert "Прайс страница 4" in batches[1][1]
+
+    def test_oversized_chunk_split(self):
+        """Test a chunk larger than the budget is split across batches."""
+        analyzer = DocumentAnalyzer(llm_client=MagicMock(), map_batch_tokens=1000)
+        batches = analyzer._build_batches([self._price_doc(pages=1, chars_per_page=7000)])
+
+        assert len(batches) == 3
+        assert "x" * 900 in batches[2][1]
+
+    @pytest.mark.asyncio
+    async def test_large_upload_switches_to_map_reduce(self):
+        """Test the size switch: every chunk is analyzed, results merged and deduplicated."""
+        client = self._client()
+        analyzer = DocumentAnalyzer(llm_client=client, map_batch_tokens=1100)
+        doc = self._price_doc(pages=12)  # ~36K символов > порога
+
+        context = await analyzer.analyze([doc])
+
+        # 12 map-запросов (по странице) + 1 reduce сводки
+        assert client.chat.call_count == 13
+        assert context.summary == "Общая сводка"
+        assert "Услуга 12" in context.services_mentioned
+        assert [s.lower() for s in context.services_mentioned].count("консультация") == 1
+        assert context.key_facts.count("Клиника работает с 2010 года") == 1
+        assert len(context.all_prices) == 13
+        assert context.all_contacts["телефон"] == "+79991234567"
+        assert context.questions_to_clarify == ["Сколько врачей?"]
+        assert doc.extracted_faq == [{"question": "Есть парковка?", "answer": "Да"}]
+
+    @pytest.mark.asyncio
+    async def test_small_upload_keeps_single_call(self):
+        """Test small uploads still use one combined analysis call."""
+        client = self._client()
+        client.chat = AsyncMock(return_value='{"summary": "S", "key_facts": [], "services": [], "contacts": {}, "prices": [], "questions": []}')
+        analyzer = DocumentAnalyzer(llm_client=client)
+
+        context = await analyzer.analyze([self._price_doc(pages=2)])
+
+        assert context.summary == "S"
+        assert client.chat.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_does_not_break_analysis(self):
+        """Test a failing map call loses only its own batch."""
+        client = self._client()
+        map_chat = client.chat.side_effect
+
+        async def chat(messages, **kwargs):
+            if "Прайс страница 2 " in messages[0]["content"]:
+                raise RuntimeError("timeout")
+            return await map_chat(messages, **kwargs)
+
+        client.chat = AsyncMock(side_effect=chat)
+        analyzer = DocumentAnalyzer(llm_client=client, map_batch_tokens=1100)
+
+        context = await analyzer.analyze([self._price_doc(pages=3)], map_reduce=True)
+
+        assert "Услуга 1" in context.services_mentioned
+        assert "Услуга 2" not in context.services_mentioned
+        assert "Услуга 3" in context.services_mentioned
+
+    @pytest.mark.asyncio
+    async def test_map_concurrency_bounded(self):
+        """Test at most map_concurrency map calls run at once."""
+        import asyncio
+
+        active = 0
+        peak = 0
+
+        async def chat(messages, **kwargs):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return '{"summary": "", "key_facts": ["F"]}'
+
+        client = MagicMock()
+        client.chat = AsyncMock(side_effect=chat)
+        analyzer = DocumentAnalyzer(llm_client=client, map_batch_tokens=1100, map_concurrency=2)
+
+        await analyzer.analyze([self._price_doc(pages=6)], map_reduce=True)
+
+        assert client.chat.call_count == 6
+        assert peak == 2
+
+    def test_map_concurrency_from_env(self, monkeypatch):
+        """Test DOCUMENT_ANALYSIS_CONCURRENCY is read, malformed values fall back to 4."""
+        monkeypatch.setenv("DOCUMENT_ANALYSIS_CONCURRENCY", "6")
+        assert DocumentAnalyzer(llm_client=MagicMock()).map_concurrency == 6
+
+        monkeypatch.setenv("DOCUMENT_ANALYSIS_CONCURRENCY", "many")
+        assert DocumentAnalyzer(llm_client=MagicMock()).map_concurrency == 4
@@ -2,8 +2,10 @@
 Unit tests for the v5.0 export endpoint: GET /api/session/{id}/export/{format}.
 
 Tests markdown export (Content-Disposition: attachment, text/markdown),
-PDF/print-HTML export (Content-Disposition: inline, text/html), and
-error cases (404 for missing sessions, 400 for unsupported formats).
+print-HTML export (Content-Disposition: inline, text/html), PDF export
+(application/pdf), the export artifact cache, batch ZIP export
+(POST /api/sessions/export), and error cases (404 for missing sessions,
+400 for unsupported formats).
 
 Uses a temporary SQLite-backed SessionManager swapped into the server
 module, following the same pattern as test_api_server.py.
@@ -33,9 +35,14 @@ def client(tmp_path):
     from src.session.manager import SessionManager
     from src.web import server
 
+    from src.anketa.export_service import ExportService
+
     temp_mgr = SessionManager(db_path=str(tmp_path / "test.db"))
     original_mgr = server.session_mgr
+    original_export = server.export_service
     server.session_mgr = temp_mgr
+    # Рендер в потоке: без пула процессов в тестах
+    server.export_service = ExportService(workers=0)
 
     from fastapi.testclient import TestClient
 
@@ -43,6 +50,7 @@ def client(tmp_path):
     yield c
 
     server.session_mgr = original_mgr
+    server.export_service = original_export
     temp_mgr.close()
 
 
@@ -150,41 +158,41 @@ class TestExportMarkdown:
 
 
 # ---------------------------------------------------------------------------
-# GET /api/session/{id}/export/pdf
+# GET /api/session/{id}/export/html
 # ---------------------------------------------------------------------------
 
 
-class TestExportPdf:
-    """Tests for PDF/print-HTML export: GET /api/session/{id}/export/pdf."""
+class TestExportHtml:
+    """Tests for print-HTML export: GET /api/session/{id}/export/html."""
 
-    def test_pdf_export_returns_200(self, client, session_with_anketa):
-        resp = client.get(f"/api/session/{session_with_anketa}/export/pdf")
+    def test_html_export_returns_200(self, client, session_with_anketa):
+        resp = client.get(f"/api/session/{session_with_anketa}/export/html")
         assert resp.status_code == 200
 
-    def test_pdf_export_content_type_is_html(self, client, session_with_anketa):
-        resp = client.get(f"/api/session/{session_with_anketa}/export/pdf")
+    def test_html_export_content_type_is_html(self, client, session_with_anketa):
+        resp = client.get(f"/api/session/{session_with_anketa}/export/html")
         assert "text/html" in resp.headers["content-type"]
 
-    def test_pdf_export_content_disposition_is_inline(self, client, session_with_anketa):
-        resp = client.get(f"/api/session/{session_with_anketa}/export/pdf")
+    def test_html_export_content_disposition_is_inline(self, client, session_with_anketa):
+        resp = client.get(f"/api/session/{session_with_anketa}/export/html")
         cd = resp.headers["content-disposition"]
         assert cd.startswith("inline")
         assert "filename=" in cd
 
-    def test_pdf_export_filename_contains_company_name(self, client, session_with_anketa):
-        resp = client.get(f"/api/session/{session_with_anketa}/export/pdf")
+    def test_html_export_filename_contains_company_name(self, client, session_with_anketa):
+        resp = client.get(f"/api/session/{session_with_anketa}/export/html")
         cd = resp.headers["content-disposition"]
         assert "TestCorp" in cd
         assert "TestCorp.html" in cd
 
-    def test_pdf_export_html_contains_company_name(self, client, session_with_anketa):
-        resp = client.get(f"/api/session/{session_with_anketa}/export/pdf")
+    def test_html_export_html_contains_company_name(self, client, session_with_anketa):
+        resp = client.get(f"/api/session/{session_with_anketa}/export/html")
         body = resp.content.decode("utf-8")
         assert "TestCorp" in body
 
-    def test_pdf_export_html_is_valid_document(self, client, session_with_anketa):
+    def test_html_export_html_is_valid_document(self, client, session_with_anketa):
         """Returned HTML should be a complete document with DOCTYPE and closing tags."""
-        resp = client.get(f"/api/session/{session_with_anketa}/export/pdf")
+        resp = client.get(f"/api/session/{session_with_anketa}/export/html")
         body = resp.content.decode("utf-8")
         assert "<!DOCTYPE html>" in body
         assert "<html" in body
@@ -194,54 +202,96 @@ class TestExportPdf:
         assert "<body>" in body
         assert "</body>" in body
 
-    def test_pdf_export_default_type_is_consultation(self, client, session_with_anketa):
+    def test_html_export_default_type_is_consultation(self, client, session_with_anketa):
         """Default session (no voice_config) should show 'Konsultatsiya' label."""
-        resp = client.get(f"/api/session/{session_with_anketa}/export/pdf")
+        resp = client.get(f"/api/session/{session_with_anketa}/export/html")
         body = resp.content.decode("utf-8")
         assert "\u041a\u043e\u043d\u0441\u0443\u043b\u044c\u0442\u0430\u0446\u0438\u044f" in body  # Консультация
 
-    def test_pdf_export_interview_type(self, client, session_with_voice_config):
+    def test_html_export_interview_type(self, client, session_with_voice_config):
         """Session with consultation_type='interview' should show 'Intervyu' label."""
-        resp = client.get(f"/api/session/{session_with_voice_config}/export/pdf")
+        resp = client.get(f"/api/session/{session_with_voice_config}/export/html")
         body = resp.content.decode("utf-8")
         assert "\u0418\u043d\u0442\u0435\u0440\u0432\u044c\u044e" in body  # Интервью
 
-    def test_pdf_export_interview_does_not_show_consultation(self, client, session_with_voice_config):
+    def test_html_export_interview_does_not_show_consultation(self, client, session_with_voice_config):
         """Interview-type sessions should NOT show 'Konsultatsiya'."""
-        resp = client.get(f"/api/session/{session_with_voice_config}/export/pdf")
+        resp = client.get(f"/api/session/{session_with_voice_config}/export/html")
         body = resp.content.decode("utf-8")
         # The meta div should contain Интервью, not Консультация
         assert "\u041a\u043e\u043d\u0441\u0443\u043b\u044c\u0442\u0430\u0446\u0438\u044f" not in body
 
-    def test_pdf_export_contains_print_button(self, client, session_with_anketa):
+    def test_html_export_contains_print_button(self, client, session_with_anketa):
         """Print-ready HTML should include a print button for PDF generation."""
-        resp = client.get(f"/api/session/{session_with_anketa}/export/pdf")
+        resp = client.get(f"/api/session/{session_with_anketa}/export/html")
         body = resp.content.decode("utf-8")
         assert "window.print()" in body
 
-    def test_pdf_export_empty_anketa_shows_placeholder(self, client, created_session):
+    def test_html_export_empty_anketa_shows_placeholder(self, client, created_session):
         """Session with no anketa_md should still return valid HTML."""
         sid = created_session["session_id"]
-        resp = client.get(f"/api/session/{sid}/export/pdf")
+        resp = client.get(f"/api/session/{sid}/export/html")
         assert resp.status_code == 200
         body = resp.content.decode("utf-8")
         assert "<!DOCTYPE html>" in body
 
-    def test_pdf_export_contains_anketa_content(self, client, session_with_anketa):
+    def test_html_export_contains_anketa_content(self, client, session_with_anketa):
         """HTML body should contain the rendered anketa content."""
-        resp = client.get(f"/api/session/{session_with_anketa}/export/pdf")
+        resp = client.get(f"/api/session/{session_with_anketa}/export/html")
         body = resp.content.decode("utf-8")
         # The markdown heading "# TestCorp" becomes <h1>TestCorp</h1>
         assert "TestCorp" in body
         assert "IT" in body
 
-    def test_pdf_export_has_hanc_branding(self, client, session_with_anketa):
+    def test_html_export_has_hanc_branding(self, client, session_with_anketa):
         """HTML title should include Hanc.AI branding."""
-        resp = client.get(f"/api/session/{session_with_anketa}/export/pdf")
+        resp = client.get(f"/api/session/{session_with_anketa}/export/html")
         body = resp.content.decode("utf-8")
         assert "Hanc.AI" in body
 
 
+# ---------------------------------------------------------------------------
+# GET /api/session/{id}/export/pdf
+# ---------------------------------------------------------------------------
+
+
+class TestExportPdf:
+    """Tests for real PDF export: GET /api/session/{id}/export/pdf."""
+
+    @pytest.fixture(autouse=True)
+    def fitz(self):
+        return pytest.importorskip("fitz")
+
+    def test_pdf_export_returns_pdf(self, client, session_with_anketa):
+        resp = client.get(f"/api/session/{session_with_anketa}/export/pdf")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/pdf"
+        assert resp.content.startswith(b"%PDF")
+
+    def test_pdf_export_content_disposition_is_inline(self, client, session_with_anketa):
+        resp = client.get(f"/api/session/{session_with_anketa}/export/pdf")
+        cd = resp.headers["content-disposition"]
+        assert cd.startswith("inline")
+        assert "TestCorp.pdf" in cd
+
+    def test_pdf_export_text_matches_anketa(self, client, fitz):
+        """PDF text is rendered from anketa_data (Bug #9), Cyrillic preserved."""
+        from src.web import server
+
+        resp = client.post("/api/session/create", json={})
+        sid = resp.json()["session_id"]
+        server.session_mgr.update_anketa(
+            sid, {"company_name": "Alfa", "industry": "\u041c\u0435\u0434\u0438\u0446\u0438\u043d\u0430"}, ""
+        )
+        server.session_mgr.update_metadata(sid, company_name="Alfa")
+
+        resp = client.get(f"/api/session/{sid}/export/pdf")
+        with fitz.open("pdf", resp.content) as doc:
+            text = "".join(page.get_text() for page in doc)
+        assert "Alfa" in text
+        assert "\u041c\u0435\u0434\u0438\u0446\u0438\u043d\u0430" in text  # Медицина
+
+
 # ---------------------------------------------------------------------------
 # Error cases
 # ---------------------------------------------------------------------------
@@ -346,8 +396,8 @@ class TestExportWithData:
         assert "ExportCo" in body
         assert "E-commerce" in body
 
-    def test_export_pdf_after_anketa_update(self, client):
-        """Full flow: create session -> populate anketa -> export pdf -> verify HTML.
+    def test_export_html_after_anketa_update(self, client):
+        """Full flow: create session -> populate anketa -> export html -> verify HTML.
 
         Bug #9: Export regenerates MD from anketa_data, so we verify the data
         values (not hand-crafted markdown strings like 'SaaS Platform').
@@ -365,15 +415,15 @@ class TestExportWithData:
         server.session_mgr.update_anketa(sid, anketa_data, anketa_md)
         server.session_mgr.update_metadata(sid, company_name="HtmlCorp")
 
-        # Export PDF (print-HTML)
-        resp = client.get(f"/api/session/{sid}/export/pdf")
+        # Export print-HTML
+        resp = client.get(f"/api/session/{sid}/export/html")
         assert resp.status_code == 200
         body = resp.content.decode("utf-8")
         assert "HtmlCorp" in body
         assert "SaaS" in body
         assert "<!DOCTYPE html>" in body
 
-    def test_export_pdf_with_cyrillic_content(self, client):
+    def test_export_html_with_cyrillic_content(self, client):
         """Anketa body with Cyrillic text should appear correctly in HTML.
 
         Note: company_name is set to ASCII to avoid Cyrillic-in-filename
@@ -389,7 +439,7 @@ class TestExportWithData:
         server.session_mgr.update_anketa(sid, {"company_name": "Alfa"}, anketa_md)
         server.session_mgr.update_metadata(sid, company_name="Alfa")
 
-        resp = client.get(f"/api/session/{sid}/export/pdf")
+        resp = client.get(f"/api/session/{sid}/export/html")
         assert resp.status_code == 200
         body = resp.content.decode("utf-8")
         assert "\u041e\u0442\u0440\u0430\u0441\u043b\u044c" in body  # Отрасль
@@ -427,9 +477,9 @@ class TestExportWithData:
         assert "<html>" not in body
         assert "<body>" not in body
 
-    def test_export_pdf_content_is_html_not_markdown(self, client, session_with_anketa):
-        """PDF export should return rendered HTML, not raw markdown."""
-        resp = client.get(f"/api/session/{session_with_anketa}/export/pdf")
+    def test_export_html_content_is_html_not_markdown(self, client, session_with_anketa):
+        """Print-HTML export should return rendered HTML, not raw markdown."""
+        resp = client.get(f"/api/session/{session_with_anketa}/export/html")
         body = resp.content.decode("utf-8")
         assert "<html" in body
         assert "<body>" in body
@@ -444,7 +494,7 @@ class TestExportWithData:
 
         # Different content types
         assert "text/markdown" in md_resp.headers["content-type"]
-        assert "text/html" in pdf_resp.headers["content-type"]
+        assert pdf_resp.headers["content-type"] == "application/pdf"
 
         # Different dispositions
         assert md_resp.headers["content-disposition"].startswith("attachment")
@@ -469,3 +519,131 @@ class TestExportWithData:
 
         assert md_resp.status_code == 200
         assert pdf_resp.status_code == 200
+
+
+# ---------------------------------------------------------------------------
+# Export artifact cache
+# ---------------------------------------------------------------------------
+
+
+class TestExportCache:
+    """Artifacts are cached per session version; any session write invalidates them."""
+
+    def test_repeated_export_served_from_cache(self, client, session_with_anketa):
+        from src.web import server
+
+        cache = server.export_service.cache
+        first = client.get(f"/api/session/{session_with_anketa}/export/html")
+        second = client.get(f"/api/session/{session_with_anketa}/export/html")
+
+        assert first.content == second.content
+        assert cache.misses == 1
+        assert cache.hits == 1
+
+    def test_anketa_update_invalidates_cache(self, client, session_with_anketa):
+        from src.web import server
+
+        client.get(f"/api/session/{session_with_anketa}/export/md")
+        server.session_mgr.update_anketa(session_with_anketa, {"company_name": "TestCorp", "industry": "Retail"}, "")
+
+        body = client.get(f"/api/session/{session_with_anketa}/export/md").content.decode("utf-8")
+        assert "Retail" in body
+        assert server.export_service.cache.hits == 0
+        assert len(server.export_service.cache) == 1  # old version replaced
+
+    def test_formats_cached_separately(self, client, session_with_anketa):
+        from src.web import server
+
+        client.get(f"/api/session/{session_with_anketa}/export/md")
+        client.get(f"/api/session/{session_with_anketa}/export/html")
+        assert len(server.export_service.cache) == 2
+
+    def test_deleted_session_dropped_from_cache(self, client, session_with_anketa):
+        from src.web import server
+
+        client.get(f"/api/session/{session_with_anketa}/export/md")
+        client.post("/api/sessions/delete", json={"session_ids": [session_with_anketa]})
+
+        assert len(server.export_service.cache) == 0
+        assert client.get(f"/api/session/{session_with_anketa}/export/md").status_code == 404
+
+
+# ---------------------------------------------------------------------------
+# POST /api/sessions/export
+# ---------------------------------------------------------------------------
+
+
+def _zip_entries(resp):
+    import io
+    import zipfile
+
+    with zipfile.ZipFile(io.BytesIO(resp.content)) as archive:
+        return {info.filename: (info.compress_type, archive.read(info.filename)) for info in archive.infolist()}
+
+
+class TestBatchExport:
+    """Batch export of many sessions into one streamed ZIP."""
+
+    def _sessions(self, client, count):
+        from src.web import server
+
+        sids = []
+        for i in range(count):
+            sid = client.post("/api/session/create", json={}).json()["session_id"]
+            server.session_mgr.update_anketa(sid, {"company_name": f"Corp{i}", "industry": "IT"}, "")
+            server.session_mgr.update_metadata(sid, company_name=f"Corp{i}")
+            sids.append(sid)
+        return sids
+
+    def test_zip_contains_every_session_in_order(self, client):
+        sids = self._sessions(client, 5)
+        resp = client.post("/api/sessions/export", json={"session_ids": sids, "format": "md"})
+
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/zip"
+        assert resp.headers["content-disposition"].startswith("attachment")
+        entries = _zip_entries(resp)
+        assert list(entries) == [f"{sid}_Corp{i}.md" for i, sid in enumerate(sids)]
+        assert b"Corp3" in entries[f"{sids[3]}_Corp3.md"][1]
+
+    def test_pdf_entries_stored_uncompressed(self, client):
+        import zipfile
+
+        pytest.importorskip("fitz")
+        sids = self._sessions(client, 2)
+        entries = _zip_entries(client.post("/api/sessions/export", json={"session_ids": sids}))
+
+        assert len(entries) == 2
+        for compress_type, content in entries.values():
+            assert compress_type == zipfile.ZIP_STORED
+            assert content.startswith(b"%PDF")
+
+    def test_missing_sessions_listed(self, client):
+        sids = self._sessions(client, 1)
+        resp = client.post("/api/sessions/export", json={"session_ids": sids + ["deadbeef"], "format": "html"})
+
+        entries = _zip_entries(resp)
+        assert f"{sids[0]}_Corp0.html" in entries
+        assert entries["missing.txt"][1] == b"deadbeef\n"
+
+    def test_batch_uses_cache(self, client):
+        from src.web import server
+
+        sids = self._sessions(client, 2)
+        client.get(f"/api/session/{sids[0]}/export/md")
+        client.post("/api/sessions/export", json={"session_ids": sids, "format": "md"})
+
+        assert server.export_service.cache.hits == 1
+
+    def test_invalid_session_id_rejected(self, client):
+        resp = client.post("/api/sessions/export", json={"session_ids": ["../etc"], "format": "md"})
+        assert resp.status_code == 400
+
+    def test_unsupported_format_rejected(self, client):
+        resp = client.post("/api/sessions/export", json={"session_ids": ["deadbeef"], "format": "docx"})
+        assert resp.status_code == 400
+        assert "docx" not in resp.json()["detail"]
+
+    def test_empty_batch_rejected(self, client):
+        resp = client.post("/api/sessions/export", json={"session_ids": []})
+        assert resp.status_code == 422
@@ -0,0 +1,199 @@
+"""
+Tests for the export service (src/anketa/export_service.py).
+
+- build_export: formats, markdown regenerated from anketa_data
+- ExportCache: version keys, one version per session/format, byte budget
+- ExportService: coalescing of concurrent exports, process pool and fallback
+"""
+
+import asyncio
+import os
+import sys
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.anketa.export_service import ExportArtifact, ExportCache, ExportService, build_export
+
+
+def _artifact(size: int = 10) -> ExportArtifact:
+    return ExportArtifact(b"x" * size, "a.md", "text/markdown", "attachment")
+
+
+class TestBuildExport:
+    """One artifact per format."""
+
+    def test_markdown_regenerated_from_data(self):
+        artifact = build_export({"company_name": "Альфа", "industry": "Медицина"}, "# stale", "Альфа", "consultation", "md")
+        assert artifact.media_type == "text/markdown"
+        assert artifact.disposition == "attachment"
+        assert "Медицина" in artifact.content.decode("utf-8")
+        assert "stale" not in artifact.content.decode("utf-8")
+
+    def test_invalid_data_falls_back_to_markdown(self):
+        artifact = build_export({"company_name": ["not", "a", "string"]}, "# Cached", "Corp", "consultation", "md")
+        assert artifact.content == b"# Cached"
+
+    def test_html(self):
+        artifact = build_export(None, "# Title", "Corp", "interview", "html")
+        assert artifact.media_type == "text/html"
+        assert artifact.filename == "Corp.html"
+        assert "Интервью" in artifact.content.decode("utf-8")
+
+    def test_pdf(self):
+        pytest.importorskip("fitz")
+        artifact = build_export(None, "# Title", "Corp", "consultation", "pdf")
+        assert artifact.media_type == "application/pdf"
+        assert artifact.disposition == "inline"
+        assert artifact.content.startswith(b"%PDF")
+
+    def test_pdf_without_pymupdf_returns_print_html(self):
+        with patch("src.anketa.exporter.export_pdf", side_effect=ImportError("fitz")):
+            artifact = build_export(None, "# Title", "Corp", "consultation", "pdf")
+        assert artifact.media_type == "text/html"
+        assert b"window.print()" in artifact.content
+
+
+class TestExportCache:
+    """Version-keyed LRU bounded by bytes."""
+
+    def test_hit_only_for_same_version(self):
+        cache = ExportCache()
+        cache.put("s1", "md", "1:a", _artifact())
+        assert cache.get("s1", "md", "1:a") is not None
+        assert cache.get("s1", "md", "2:b") is None
+        assert cache.get("s1", "pdf", "1:a") is None
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_new_version_replaces_old(self):
+        cache = ExportCache()
+        cache.put("s1", "md", "1:a", _artifact(10))
+        cache.put("s1", "md", "2:b", _artifact(20))
+        assert len(cache) == 1
+        assert cache.total_bytes == 20
+
+    def test_evicts_least_recent_over_budget(self):
+        cache = ExportCache(max_bytes=25)
+        cache.put("s1", "md", "v", _artifact(10))
+        cache.put("s2", "md", "v", _artifact(10))
+        cache.get("s1", "md", "v")
+        cache.put("s3", "md", "v", _artifact(10))
+
+        assert cache.get("s2", "md", "v") is None
+        assert cache.get("s1", "md", "v") is not None
+        assert cache.total_bytes == 20
+
+    def test_oversized_artifact_not_cached(self):
+        cache = ExportCache(max_bytes=5)
+        cache.put("s1", "md", "v", _artifact(10))
+        assert len(cache) == 0
+
+    def test_forget(self):
+        cache = ExportCache()
+        cache.put("s1", "md", "v", _artifact())
+        cache.put("s1", "pdf", "v", _artifact())
+        cache.put("s2", "md", "v", _artifact())
+        cache.forget("s1")
+        assert len(cache) == 1
+        assert cache.total_bytes == 10
+
+
+class TestExportService:
+    """Caching, coalescing and the worker pool."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_exports_render_once(self):
+        service = ExportService(workers=0)
+        loads = []
+
+        async def load():
+            loads.append(1)
+            await asyncio.sleep(0.01)
+            return None, "# Title", "Corp", "consultation"
+
+        results = await asyncio.gather(*(service.export("s1", "1:a", load, "md") for _ in range(3)))
+
+        assert len(loads) == 1
+        assert results[0] is results[1] is results[2]
+        assert await service.export("s1", "1:a", load, "md") is results[0]
+        assert len(loads) == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_other_waiters(self):
+        service = ExportService(workers=0)
+        release = asyncio.Event()
+
+        async def load():
+            await release.wait()
+            return None, "# Title", "Corp", "consultation"
+
+        first = asyncio.create_task(service.export("s1", "1:a", load, "md"))
+        second = asyncio.create_task(service.export("s1", "1:a", load, "md"))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        artifact = await second
+        assert first.cancelled()
+        assert artifact.content == b"# Title"
+        assert service.cache.get("s1", "md", "1:a") is artifact
+        assert service._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_missing_session_not_cached(self):
+        service = ExportService(workers=0)
+
+        async def load():
+            return None
+
+        assert await service.export("s1", "1:a", load, "md") is None
+        assert len(service.cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_broken_pool_falls_back_to_thread(self):
+        service = ExportService(workers=1)
+
+        class _BrokenPool:
+            def submit(self, *args, **kwargs):
+                raise BrokenProcessPool("worker died")
+
+            def shutdown(self, wait=True, cancel_futures=False):
+                pass
+
+        service._pool = _BrokenPool()
+        artifact = await service.render(None, "# Title", "Corp", "consultation", "md")
+
+        assert artifact.content == b"# Title"
+        assert service._pool is None
+
+    @pytest.mark.asyncio
+    async def test_render_error_keeps_pool(self):
+        service = ExportService(workers=1)
+
+        class _FailingPool:
+            def submit(self, *args, **kwargs):
+                raise RuntimeError("render failed")
+
+            def shutdown(self, wait=True, cancel_futures=False):
+                raise AssertionError("pool must not be shut down")
+
+        pool = service._pool = _FailingPool()
+        with patch("src.anketa.export_service.asyncio.to_thread") as to_thread:
+            with pytest.raises(RuntimeError, match="render failed"):
+                await service.render(None, "# Title", "Corp", "consultation", "md")
+
+        to_thread.assert_not_called()
+        assert service._pool is pool
+
+    @pytest.mark.asyncio
+    async def test_renders_in_process_pool(self):
+        service = ExportService(workers=1)
+        try:
+            artifact = await service.render({"company_name": "Альфа", "industry": "IT"}, None, "Альфа", "consultation", "md")
+        finally:
+            service.shutdown(wait=True)
+        assert "Альфа" in artifact.content.decode("utf-8")
@@ -5,7 +5,8 @@ Comprehensive tests for the Anketa Exporter module:
 - export_markdown: MD bytes + filename generation
 - export_print_html: styled HTML for print-to-PDF
 - _escape: HTML entity escaping
-- _md_to_html: simple markdown-to-HTML converter
+- export_pdf: PDF bytes via PyMuPDF Story
+- _md_to_html: simple markdown-to-HTML converter (incl. pipe tables)
 - _inline: inline bold/italic processing
 
 All functions are pure (string in -> bytes/string out), NO mocks needed.
@@ -18,7 +19,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 
 import pytest
 
-from src.anketa.exporter import export_markdown, export_print_html, _md_to_html, _escape, _inline
+from src.anketa.exporter import export_markdown, export_pdf, export_print_html, _md_to_html, _escape, _inline
 
 
 # =========================================================================
@@ -468,6 +469,57 @@ class TestMdToHtml:
         assert "</blockquote>" in result
         assert "<p>Regular paragraph.</p>" in result
 
+    def test_pipe_table(self):
+        """Pipe table: first row is the header, separator row is skipped."""
+        md = "| Поле | Значение |\n|------|----------|\n| Компания | **Альфа** |"
+        result = _md_to_html(md)
+        assert "<table>" in result
+        assert "<th>Поле</th><th>Значение</th>" in result
+        assert "<td>Компания</td><td><strong>Альфа</strong></td>" in result
+        assert "---" not in result
+
+    def test_table_closes_before_heading(self):
+        md = "| A | B |\n|---|---|\n| 1 | 2 |\n## Next"
+        result = _md_to_html(md)
+        assert result.index("</table>") < result.index("<h2>Next</h2>")
+
+
+# =========================================================================
+# TestExportPdf
+# =========================================================================
+
+class TestExportPdf:
+    """Tests for export_pdf (PyMuPDF)."""
+
+    @pytest.fixture(autouse=True)
+    def fitz(self):
+        return pytest.importorskip("fitz")
+
+    def test_returns_pdf_bytes_and_filename(self):
+        content, filename = export_pdf("# Анкета\n\nТекст", "Test Corp")
+        assert content.startswith(b"%PDF")
+        assert filename == "Test Corp.pdf"
+
+    def test_cyrillic_text_extractable(self, fitz):
+        md = "## Отрасль\n\nМедицина\n\n| Поле | Значение |\n|---|---|\n| Телефон | +7 999 |"
+        content, _ = export_pdf(md, "Альфа", "interview")
+        with fitz.open("pdf", content) as doc:
+            text = "".join(page.get_text() for page in doc)
+        assert "Альфа" in text
+        assert "Интервью" in text
+        assert "Медицина" in text
+        assert "+7 999" in text
+
+    def test_long_anketa_spans_pages(self, fitz):
+        md = "\n".join(f"- Пункт {i}" for i in range(400))
+        content, _ = export_pdf(md, "Test")
+        with fitz.open("pdf", content) as doc:
+            assert len(doc) > 1
+
+    def test_empty_company_fallback_filename(self):
+        _, filename = export_pdf("", "")
+        assert filename == "anketa.pdf"
+
 
 # =========================================================================
 # TestInline
@@ -0,0 +1,191 @@
+"""
+Unit tests for the extraction benchmark harness.
+
+Tests cover:
+- percentile() interpolation
+- Case loaders: fixtures, sessions.db, TestResult JSON
+- run_benchmark: per-stage timings, LLM usage, validation and field accuracy
+- compare_reports deltas
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from src.agent_client_simulator.extraction_bench import (
+    STAGES,
+    BenchCase,
+    compare_reports,
+    git_commit,
+    load_fixture_cases,
+    load_result_cases,
+    load_session_cases,
+    percentile,
+    run_benchmark,
+)
+
+FIXTURES_DIR = Path(__file__).parent.parent / "fixtures" / "bench"
+
+DIALOGUE = [
+    {"role": "assistant", "content": "Расскажите о компании"},
+    {"role": "user", "content": "Компания ГрузЭкспресс, грузоперевозки. Интеграция с 1С."},
+]
+
+RESPONSE = json.dumps({
+    "company_name": "ГрузЭкспресс",
+    "industry": "Логистика",
+    "agent_name": "Ассистент",
+    "agent_purpose": "Приём заявок",
+    "integrations": [{"name": "1С", "purpose": "Учёт"}],
+    "main_function": {"name": "Приём заявок", "description": "Заявки"},
+}, ensure_ascii=False)
+
+
+def _case(**overrides):
+    data = {
+        "name": "cargo",
+        "dialogue_history": DIALOGUE,
+        "scenario": {"persona": {"company": "ГрузЭкспресс", "industry": "Логистика",
+                                 "integrations": ["1С"]}},
+        "llm_response": RESPONSE,
+    }
+    data.update(overrides)
+    return BenchCase(**data)
+
+
+class TestPercentile:
+
+    @pytest.mark.unit
+    def test_interpolates(self):
+        assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.5
+        assert percentile([5.0], 95) == 5.0
+        assert percentile([], 50) == 0.0
+
+    @pytest.mark.unit
+    def test_p95_close_to_max(self):
+        values = [float(i) for i in range(1, 101)]
+        assert percentile(values, 95) == pytest.approx(95.05)
+
+
+class TestGitCommit:
+
+    @pytest.mark.unit
+    def test_resolved_from_repo_root(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        commit = git_commit()
+        if (Path(__file__).resolve().parents[2] / ".git").exists():
+            assert commit != "unknown"
+
+
+class TestLoaders:
+
+    @pytest.mark.unit
+    def test_repo_fixtures_load(self):
+        cases = load_fixture_cases(FIXTURES_DIR)
+        assert {c.name for c in cases} >= {"vitalbox", "medical_center"}
+        assert all(c.dialogue_history for c in cases)
+        assert all(isinstance(c.llm_response, str) for c in cases)
+
+    @pytest.mark.unit
+    def test_sessions_db(self, tmp_path):
+        db = tmp_path / "sessions.db"
+        conn = sqlite3.connect(db)
+        conn.execute(
+            "CREATE TABLE sessions (session_id TEXT, dialogue_history TEXT, anketa_data TEXT, "
+            "company_name TEXT, duration_seconds REAL, updated_at TEXT)"
+        )
+        conn.execute("INSERT INTO sessions VALUES ('a', ?, ?, 'ГрузЭкспресс', 60, '2')",
+                     (json.dumps(DIALOGUE), RESPONSE))
+        conn.execute("INSERT INTO sessions VALUES ('b', '[]', NULL, NULL, 0, '1')")
+        conn.commit()
+        conn.close()
+
+        cases = load_session_cases(str(db))
+
+        assert [c.name for c in cases] == ["session_a"]
+        assert cases[0].llm_response == RESPONSE
+        assert cases[0].scenario == {"persona": {"company": "ГрузЭкспресс"}}
+
+    @pytest.mark.unit
+    def test_test_result_json(self, tmp_path):
+        scenarios = tmp_path / "scenarios"
+        scenarios.mkdir()
+        (scenarios / "cargo.yaml").write_text("persona:\n  company: ГрузЭкспресс\n", encoding="utf-8")
+        report = tmp_path / "cargo_result.json"
+        report.write_text(json.dumps({
+            "scenario_name": "cargo",
+            "dialogue_history": DIALOGUE,
+            "final_anketa": {"company_name": "ГрузЭкспресс"},
+        }), encoding="utf-8")
+
+        cases = load_result_cases([report], scenarios_dir=scenarios)
+
+        assert cases[0].scenario["persona"]["company"] == "ГрузЭкспресс"
+        assert json.loads(cases[0].llm_response) == {"company_name": "ГрузЭкспресс"}
+
+
+class TestRunBenchmark:
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_report_stages_and_quality(self):
+        report = await run_benchmark([_case()], iterations=3)
+
+        assert set(report["stages"]) == set(STAGES)
+        assert report["stages"]["json_repair"]["n"] == 3
+        assert report["stages"]["render_markdown"]["n"] == 3
+        assert report["llm"]["calls"] == 3
+        assert report["llm"]["approx_tokens"] > 0
+
+        case = report["cases"][0]
+        assert case["fields"]["company_name"] is True
+        assert case["fields"]["integrations"] == {"matched": 1, "total": 1}
+        assert case["checks"]["completeness"] in ("ok", "warning")
+        assert json.loads(json.dumps(report)) == report
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_scenario_not_mutated_by_validator(self):
+        case = _case()
+        await run_benchmark([case])
+        assert case.scenario["persona"]["integrations"] == ["1С"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_custom_llm_used(self):
+        calls = []
+
+        class FakeLLM:
+            async def chat(self, messages, **kwargs):
+                calls.append(messages)
+                return RESPONSE
+
+        report = await run_benchmark([_case(llm_response=None)], llm_for_case=lambda c: FakeLLM(),
+                                     llm_mode="replay")
+
+        assert len(calls) == 1
+        assert report["llm_mode"] == "replay"
+
+    @pytest.mark.unit
+    def test_compare_reports(self):
+        baseline = {
+            "commit": "aaa",
+            "stages": {"json_repair": {"p50_ms": 1.0, "p95_ms": 3.0}},
+            "quality": {"average_score": 80.0},
+            "cases": [{"name": "x", "validation_score": 80.0}],
+        }
+        current = {
+            "commit": "bbb",
+            "stages": {"json_repair": {"p50_ms": 0.5, "p95_ms": 1.0},
+                       "llm": {"p50_ms": 0.1, "p95_ms": 0.1}},
+            "quality": {"average_score": 90.0},
+            "cases": [{"name": "x", "validation_score": 90.0}],
+        }
+
+        diff = compare_reports(baseline, current)
+
+        assert diff["stages"] == {"json_repair": {"p50_ms": -0.5, "p95_ms": -2.0}}
+        assert diff["average_score"] == 10.0
+        assert diff["cases"] == {"x": 10.0}
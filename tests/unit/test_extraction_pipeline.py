@@ -0,0 +1,175 @@
+"""
+Tests for the voice agent extraction pipeline (src/voice/pipeline.py).
+
+- LLM permit: concurrency limit, waiting queue depth, release on error/cancel
+- Stage accounting: completed/failed counters, concurrent stages
+- _extract_and_update_anketa: the permit is held only during the LLM call
+"""
+
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.voice import pipeline as pipeline_module
+from src.voice.pipeline import ExtractionPipeline, STAGES, get_extraction_pipeline
+from src.voice.consultant import VoiceConsultationSession, _extract_and_update_anketa
+
+
+class TestLLMPermit:
+    """Permit limits concurrent LLM calls and reports the waiting queue."""
+
+    @pytest.mark.asyncio
+    async def test_limits_concurrency(self):
+        pipeline = ExtractionPipeline(max_concurrent_llm=2)
+        running = []
+        peak = []
+
+        async def call():
+            async with pipeline.llm_permit():
+                running.append(1)
+                peak.append(len(running))
+                await asyncio.sleep(0.01)
+                running.pop()
+
+        await asyncio.gather(*(call() for _ in range(5)))
+
+        stats = pipeline.stats()["llm"]
+        assert max(peak) == 2
+        assert stats["completed"] == 5
+        assert stats["max_waiting"] == 3
+        assert stats["waiting"] == 0 and stats["active"] == 0
+        assert stats["limit"] == 2
+
+    @pytest.mark.asyncio
+    async def test_queue_depth_while_waiting(self):
+        pipeline = ExtractionPipeline(max_concurrent_llm=1)
+        release = asyncio.Event()
+
+        async def holder():
+            async with pipeline.llm_permit():
+                await release.wait()
+
+        tasks = [asyncio.create_task(holder()) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert pipeline.queue_depth("llm") == 3
+        assert pipeline.stats()["llm"]["waiting"] == 2
+
+        release.set()
+        await asyncio.gather(*tasks)
+        assert pipeline.queue_depth("llm") == 0
+
+    @pytest.mark.asyncio
+    async def test_released_on_error(self):
+        pipeline = ExtractionPipeline(max_concurrent_llm=1)
+
+        with pytest.raises(RuntimeError):
+            async with pipeline.llm_permit():
+                raise RuntimeError("LLM failed")
+
+        assert pipeline.stats()["llm"]["failed"] == 1
+        async with pipeline.llm_permit():
+            pass  # разрешение не утекло
+
+    @pytest.mark.asyncio
+    async def test_cancel_while_waiting_does_not_leak(self):
+        pipeline = ExtractionPipeline(max_concurrent_llm=1)
+        release = asyncio.Event()
+
+        async def holder():
+            async with pipeline.llm_permit():
+                await release.wait()
+
+        first = asyncio.create_task(holder())
+        second = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        second.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await second
+
+        assert pipeline.stats()["llm"]["waiting"] == 0
+        release.set()
+        await first
+        await asyncio.wait_for(holder(), timeout=1)
+
+
+class TestStages:
+    """Stage accounting outside the permit."""
+
+    @pytest.mark.asyncio
+    async def test_run_concurrently(self):
+        pipeline = ExtractionPipeline()
+        both_active = []
+
+        async def work():
+            await asyncio.sleep(0)
+            both_active.append(pipeline.queue_depth("persist") + pipeline.queue_depth("agent"))
+            return "ok"
+
+        result = await pipeline.run_concurrently(("persist", work()), ("agent", work()))
+
+        assert result == ["ok", "ok"]
+        assert max(both_active) == 2
+        assert pipeline.stats()["persist"]["completed"] == 1
+        assert pipeline.stats()["agent"]["completed"] == 1
+
+    def test_stats_cover_all_stages(self):
+        assert set(ExtractionPipeline().stats()) == set(STAGES)
+
+    def test_limit_from_env(self):
+        with patch.dict(os.environ, {"MAX_CONCURRENT_EXTRACTIONS": "3"}), \
+             patch.object(pipeline_module, "_pipeline", None):
+            assert get_extraction_pipeline().max_concurrent_llm == 3
+
+        with patch.dict(os.environ, {"MAX_CONCURRENT_EXTRACTIONS": "many"}):
+            assert ExtractionPipeline.from_env().max_concurrent_llm == 10
+
+
+class TestExtractionCycle:
+    """_extract_and_update_anketa holds the permit only for the LLM call."""
+
+    @pytest.mark.asyncio
+    async def test_permit_released_before_persist_and_agent_stages(self):
+        consultation = VoiceConsultationSession(room_name="consultation-pipeline")
+        for i in range(6):
+            consultation.add_message("user" if i % 2 == 0 else "assistant", f"Сообщение {i}")
+
+        anketa = MagicMock()
+        anketa.website = ""
+        anketa.completion_rate.return_value = 0.5
+        anketa.to_json_dict.return_value = {"company_name": "TestCorp", "industry": "IT"}
+        consultation._cached_extractor = MagicMock()
+        consultation._cached_extractor.extract = AsyncMock(return_value=anketa)
+
+        pipeline = ExtractionPipeline(max_concurrent_llm=1)
+        seen = {}
+
+        async def persist(*args, **kwargs):
+            seen["persist"] = pipeline.stats()["llm"]["active"]
+
+        async def update_instructions(*args, **kwargs):
+            seen["agent"] = pipeline.stats()["llm"]["active"]
+
+        agent_session = MagicMock()
+        agent_session._activity.update_instructions = AsyncMock(side_effect=update_instructions)
+        db_session = SimpleNamespace(anketa_data={}, voice_config=None, document_context=None)
+
+        with patch("src.voice.consultant._session_mgr") as mock_mgr, \
+             patch("src.voice.consultant._update_anketa_via_api", new=AsyncMock(side_effect=persist)), \
+             patch("src.voice.consultant._update_dialogue_via_api", new_callable=AsyncMock), \
+             patch("src.voice.consultant._try_get_redis", return_value=None), \
+             patch.object(pipeline_module, "_pipeline", pipeline):
+            mock_mgr.get_session.return_value = db_session
+            await _extract_and_update_anketa(consultation, "pipeline-test", agent_session)
+
+        assert seen == {"persist": 0, "agent": 0}
+        stats = pipeline.stats()
+        assert stats["llm"]["completed"] == 1
+        assert stats["snapshot"]["completed"] == 1
+        assert stats["persist"]["completed"] == 2  # анкета + диалог
+        assert stats["agent"]["completed"] == 1
@@ -0,0 +1,205 @@
+"""
+Tests for the instruction composer (src/voice/instructions.py).
+
+- Sections: fixed order, per-section change detection, clear
+- Composition hash: changed / mark_pushed, ensure_base baseline
+- _update_agent_after_extraction: at most one update per cycle, none when unchanged
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.voice.instructions import InstructionComposer
+from src.voice.consultant import (
+    VoiceConsultationSession,
+    _ExtractionSnapshot,
+    _push_instructions,
+    _update_agent_after_extraction,
+)
+
+
+class TestInstructionComposer:
+    """Sections and change detection."""
+
+    def test_composes_sections_in_fixed_order(self):
+        composer = InstructionComposer()
+        composer.set("reminder", "\n\n### Незаполненные поля\n")
+        composer.set("base", "Base prompt")
+        composer.set("verbosity", "ВАЖНО: кратко.\n\n")
+
+        assert composer.compose() == "ВАЖНО: кратко.\n\nBase prompt\n\n### Незаполненные поля"
+
+    def test_set_reports_changes(self):
+        composer = InstructionComposer()
+        assert composer.set("base", "Base prompt") is True
+        assert composer.set("base", "Base prompt\n") is False
+        assert composer.set("base", "Other prompt") is True
+        assert composer.set("kb", "") is False
+        assert composer.clear("base") is True
+        assert composer.clear("base") is False
+
+    def test_unknown_section_rejected(self):
+        with pytest.raises(KeyError):
+            InstructionComposer().set("misc", "text")
+
+    def test_changed_until_pushed(self):
+        composer = InstructionComposer()
+        composer.set("base", "Base prompt")
+        composer.mark_pushed()
+        assert composer.changed is False
+
+        composer.set("kb", "KB v1")
+        assert composer.changed is True
+        composer.clear("kb")
+        assert composer.changed is False  # вернулись к отправленной композиции
+
+    def test_compose_cached_until_change(self):
+        composer = InstructionComposer()
+        composer.set("base", "Base prompt")
+        first = composer.compose()
+        assert composer.compose() is first
+        composer.set("kb", "KB")
+        assert composer.compose() is not first
+
+    def test_ensure_base_counts_as_sent(self):
+        composer = InstructionComposer()
+        composer.ensure_base("Base prompt")
+        assert composer.changed is False
+
+        composer.ensure_base("Other prompt")
+        assert composer.get("base") == "Base prompt"
+
+
+def _make_consultation():
+    consultation = VoiceConsultationSession(room_name="consultation-composer")
+    for i in range(10):
+        consultation.add_message("user" if i % 2 == 0 else "assistant", f"Сообщение {i}")
+    consultation.research_done = True
+    consultation.instructions.set("base", "Base prompt")
+    consultation.instructions.mark_pushed()
+    return consultation
+
+
+def _make_agent_session():
+    session = AsyncMock()
+    session._activity = MagicMock()
+    session._activity.update_instructions = AsyncMock()
+    session.generate_reply = AsyncMock()
+    return session
+
+
+def _snapshot(consultation):
+    return _ExtractionSnapshot(
+        dialogue_history=consultation.dialogue_history,
+        dialogue_filtered=consultation.dialogue_history,
+        dialogue_for_extraction=consultation.dialogue_history,
+        is_windowed=False,
+        db_session=SimpleNamespace(document_context=None),
+        doc_context=None,
+        consultation_type="consultation",
+        extractor=MagicMock(),
+    )
+
+
+def _anketa(rate=0.3):
+    anketa = MagicMock()
+    anketa.website = ""
+    anketa.contact_phone = "+79991234567"
+    anketa.completion_rate.return_value = rate
+    return anketa
+
+
+class TestExtractionCycleInstructions:
+    """One realtime session update per extraction cycle at most."""
+
+    async def _run_cycle(self, consultation, agent_session, missing, rate=0.3, review_ready=False):
+        builder = MagicMock()
+        builder.build_for_voice_full.return_value = "KB CONTEXT"
+        with patch("src.voice.consultant._get_kb_manager"), \
+             patch("src.voice.consultant.EnrichedContextBuilder", return_value=builder), \
+             patch("src.voice.consultant._get_missing_fields", return_value=missing), \
+             patch("src.voice.consultant._check_required_fields", return_value=review_ready), \
+             patch("src.voice.consultant.get_review_system_prompt", return_value="REVIEW PROMPT"):
+            await _update_agent_after_extraction(
+                consultation, "composer-test", agent_session,
+                _snapshot(consultation), _anketa(rate), {},
+            )
+
+    def _prepare_kb(self, consultation):
+        consultation.detected_profile = MagicMock()
+        consultation._detected_phone = "+79991234567"
+
+    @pytest.mark.asyncio
+    async def test_kb_and_reminder_sent_as_one_update(self):
+        consultation = _make_consultation()
+        self._prepare_kb(consultation)
+        agent_session = _make_agent_session()
+
+        await self._run_cycle(consultation, agent_session, missing=["Телефон"])
+
+        agent_session._activity.update_instructions.assert_called_once()
+        sent = agent_session._activity.update_instructions.call_args[0][0]
+        assert sent.startswith("Base prompt")
+        assert "KB CONTEXT" in sent
+        assert "Телефон" in sent
+
+    @pytest.mark.asyncio
+    async def test_unchanged_cycle_sends_nothing(self):
+        consultation = _make_consultation()
+        self._prepare_kb(consultation)
+        agent_session = _make_agent_session()
+
+        await self._run_cycle(consultation, agent_session, missing=["Телефон"])
+        await self._run_cycle(consultation, agent_session, missing=["Телефон"])
+
+        agent_session._activity.update_instructions.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_reminder_removed_when_fields_filled(self):
+        consultation = _make_consultation()
+        agent_session = _make_agent_session()
+
+        await self._run_cycle(consultation, agent_session, missing=["Телефон"])
+        await self._run_cycle(consultation, agent_session, missing=[])
+
+        assert agent_session._activity.update_instructions.call_count == 2
+        sent = agent_session._activity.update_instructions.call_args[0][0]
+        assert sent.startswith("Base prompt")
+        assert "Телефон" not in sent
+
+    @pytest.mark.asyncio
+    async def test_review_replaces_reminder_before_reply(self):
+        consultation = _make_consultation()
+        for i in range(8):
+            consultation.add_message("user", f"Ещё {i}")
+        agent_session = _make_agent_session()
+        order = []
+        agent_session._activity.update_instructions.side_effect = lambda *_: order.append("update")
+        agent_session.generate_reply.side_effect = lambda **_: order.append("reply")
+
+        await self._run_cycle(consultation, agent_session, missing=["Телефон"])
+        await self._run_cycle(consultation, agent_session, missing=[], rate=0.95, review_ready=True)
+
+        sent = agent_session._activity.update_instructions.call_args[0][0]
+        assert sent.endswith("\n\nREVIEW PROMPT")
+        assert "Телефон" not in sent
+        assert order == ["update", "update", "reply"]
+
+    @pytest.mark.asyncio
+    async def test_push_buffered_while_speaking(self):
+        consultation = _make_consultation()
+        consultation._agent_speaking = True
+        consultation.instructions.set("documents", "### Документы клиента:\nПрайс")
+        agent_session = _make_agent_session()
+
+        assert await _push_instructions(consultation, agent_session) is True
+        assert await _push_instructions(consultation, agent_session) is False
+
+        agent_session._activity.update_instructions.assert_not_called()
+        assert consultation._pending_instructions.endswith("Прайс")
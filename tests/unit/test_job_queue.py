@@ -0,0 +1,302 @@
+"""
+Unit tests for the durable job queue (src/jobs).
+
+Tests idempotent enqueue, lease-based claiming, retries with backoff,
+per-step checkpoints and the worker loop.
+"""
+
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pytest
+
+from src.jobs import (
+    DONE,
+    FAILED,
+    PENDING,
+    RUNNING,
+    JobLeaseLost,
+    JobQueue,
+    JobSteps,
+    JobStepsFailed,
+    JobWorker,
+    backoff_delay,
+)
+
+
+@pytest.fixture
+def queue(tmp_path):
+    """JobQueue backed by a temporary SQLite database."""
+    q = JobQueue(db_path=str(tmp_path / "jobs.db"))
+    yield q
+    q.close()
+
+
+class TestEnqueue:
+    """Test job creation and idempotency."""
+
+    def test_enqueue_creates_pending_job(self, queue):
+        job = queue.enqueue("finalize_session", {"a": 1}, idempotency_key="k1", session_id="s1")
+
+        assert job.status == PENDING
+        assert job.payload == {"a": 1}
+        assert job.session_id == "s1"
+        assert job.attempts == 0
+        assert queue.stats()[PENDING] == 1
+
+    def test_duplicate_key_returns_existing_job(self, queue):
+        first = queue.enqueue("finalize_session", {"a": 1}, idempotency_key="k1")
+        second = queue.enqueue("finalize_session", {"a": 2}, idempotency_key="k1")
+
+        assert second.job_id == first.job_id
+        assert second.payload == {"a": 1}
+        assert len(queue.list_jobs()) == 1
+
+    def test_jobs_survive_reopen(self, tmp_path):
+        path = str(tmp_path / "jobs.db")
+        q1 = JobQueue(db_path=path)
+        job = q1.enqueue("finalize_session", {"x": "тест"}, idempotency_key="k1")
+        q1.close()
+
+        q2 = JobQueue(db_path=path)
+        try:
+            restored = q2.get(job.job_id)
+            assert restored.payload == {"x": "тест"}
+            assert restored.status == PENDING
+        finally:
+            q2.close()
+
+
+class TestClaim:
+    """Test claiming and lease expiry."""
+
+    def test_claim_marks_running_and_counts_attempt(self, queue):
+        queue.enqueue("finalize_session", {}, idempotency_key="k1")
+
+        job = queue.claim("w1")
+
+        assert job.status == RUNNING
+        assert job.attempts == 1
+        assert job.locked_by == "w1"
+        assert queue.claim("w2") is None
+
+    def test_claim_respects_run_after(self, queue):
+        queue.enqueue("finalize_session", {}, idempotency_key="k1", delay=60)
+        assert queue.claim("w1") is None
+
+    def test_claim_filters_by_kind(self, queue):
+        queue.enqueue("other", {}, idempotency_key="k1")
+        assert queue.claim("w1", kinds=["finalize_session"]) is None
+        assert queue.claim("w1", kinds=["other"]) is not None
+
+    def test_expired_lease_is_reclaimed(self, queue):
+        queue.enqueue("finalize_session", {}, idempotency_key="k1")
+        first = queue.claim("w1", lease_seconds=0)
+        time.sleep(0.01)
+
+        second = queue.claim("w2")
+
+        assert second.job_id == first.job_id
+        assert second.attempts == 2
+        assert second.locked_by == "w2"
+
+    def test_stale_worker_cannot_overwrite_reclaimed_job(self, queue):
+        queue.enqueue("finalize_session", {}, idempotency_key="k1")
+        first = queue.claim("w1", lease_seconds=0)
+        time.sleep(0.01)
+        second = queue.claim("w2")
+
+        assert queue.complete(first.job_id, worker_id="w1") is False
+        assert queue.fail(first.job_id, "late", retry_delay=1, worker_id="w1") is None
+        stored = queue.get(first.job_id)
+        assert stored.status == RUNNING
+        assert stored.locked_by == "w2"
+
+        assert queue.complete(second.job_id, worker_id="w2") is True
+        assert queue.get(first.job_id).status == DONE
+
+    def test_renew_extends_lease_only_for_owner(self, queue):
+        queue.enqueue("finalize_session", {}, idempotency_key="k1")
+        job = queue.claim("w1", lease_seconds=0)
+
+        assert queue.renew(job.job_id, "w1", lease_seconds=60) is True
+        time.sleep(0.01)
+        assert queue.claim("w2") is None
+        assert queue.renew(job.job_id, "w2", lease_seconds=60) is False
+
+    def test_expired_lease_without_attempts_left_fails(self, queue):
+        queue.enqueue("finalize_session", {}, idempotency_key="k1", max_attempts=1)
+        job = queue.claim("w1", lease_seconds=0)
+        time.sleep(0.01)
+
+        assert queue.claim("w2") is None
+        assert queue.get(job.job_id).status == FAILED
+
+
+class TestFailAndRetry:
+    """Test failure handling."""
+
+    def test_fail_schedules_retry(self, queue):
+        queue.enqueue("finalize_session", {}, idempotency_key="k1")
+        job = queue.claim("w1")
+
+        status = queue.fail(job.job_id, "boom", retry_delay=60)
+
+        assert status == PENDING
+        stored = queue.get(job.job_id)
+        assert stored.last_error == "boom"
+        assert stored.run_after > time.time()
+        assert queue.claim("w1") is None
+
+    def test_fail_after_max_attempts(self, queue):
+        queue.enqueue("finalize_session", {}, idempotency_key="k1", max_attempts=1)
+        job = queue.claim("w1")
+
+        assert queue.fail(job.job_id, "boom", retry_delay=1) == FAILED
+
+    def test_manual_retry_resets_attempts(self, queue):
+        queue.enqueue("finalize_session", {}, idempotency_key="k1", max_attempts=1)
+        job = queue.claim("w1")
+        queue.fail(job.job_id, "boom", retry_delay=None)
+
+        assert queue.retry(job.job_id) is True
+        assert queue.retry(job.job_id) is False
+        reclaimed = queue.claim("w1")
+        assert reclaimed.job_id == job.job_id
+        assert reclaimed.attempts == 1
+
+
+class TestSteps:
+    """Test per-step checkpoints."""
+
+    def test_mark_step_is_persisted_and_idempotent(self, queue):
+        job = queue.enqueue("finalize_session", {}, idempotency_key="k1")
+        queue.mark_step(job.job_id, "save_files", {"status": "completed"})
+        queue.mark_step(job.job_id, "save_files", {"status": "other"})
+        queue.mark_step(job.job_id, "notify")
+
+        assert queue.completed_steps(job.job_id) == {
+            "save_files": {"status": "completed"},
+            "notify": None,
+        }
+        assert queue.get(job.job_id).steps["save_files"] == {"status": "completed"}
+
+
+    def test_stale_worker_cannot_mark_step(self, queue):
+        queue.enqueue("finalize_session", {}, idempotency_key="k1")
+        first = queue.claim("w1", lease_seconds=0)
+        time.sleep(0.01)
+        queue.claim("w2")
+
+        assert queue.mark_step(first.job_id, "notify", worker_id="w1") is False
+        with pytest.raises(JobLeaseLost):
+            JobSteps(queue, first).mark("notify")
+        assert queue.completed_steps(first.job_id) == {}
+
+        assert queue.mark_step(first.job_id, "notify", worker_id="w2") is True
+        assert "notify" in queue.completed_steps(first.job_id)
+
+
+class TestBackoff:
+    """Test exponential backoff."""
+
+    def test_backoff_doubles_and_caps(self):
+        assert backoff_delay(1, base=5, cap=600) == 5
+        assert backoff_delay(2, base=5, cap=600) == 10
+        assert backoff_delay(4, base=5, cap=600) == 40
+        assert backoff_delay(20, base=5, cap=600) == 600
+
+
+class TestWorker:
+    """Test JobWorker.run_once."""
+
+    @pytest.mark.asyncio
+    async def test_run_once_completes_job(self, queue):
+        calls = []
+
+        async def handler(job, steps):
+            calls.append(job.payload["n"])
+            steps.mark("only")
+
+        job = queue.enqueue("finalize_session", {"n": 7}, idempotency_key="k1")
+        worker = JobWorker(queue, {"finalize_session": handler})
+
+        assert await worker.run_once() is True
+        assert await worker.run_once() is False
+        assert calls == [7]
+        stored = queue.get(job.job_id)
+        assert stored.status == DONE
+        assert "only" in stored.steps
+
+    @pytest.mark.asyncio
+    async def test_retry_skips_completed_steps(self, queue):
+        """Уведомление не отправляется повторно, если упал только последующий шаг."""
+        notified = []
+        attempts = {"n": 0}
+
+        async def handler(job, steps):
+            if not steps.is_done("notify"):
+                notified.append(job.job_id)
+                steps.mark("notify")
+            attempts["n"] += 1
+            if attempts["n"] == 1:
+                steps.fail("postgres", ConnectionError("db down"))
+            else:
+                steps.mark("postgres")
+
+        job = queue.enqueue("finalize_session", {}, idempotency_key="k1")
+        worker = JobWorker(queue, {"finalize_session": handler}, backoff_base=0)
+
+        await worker.run_once()
+        after_first = queue.get(job.job_id)
+        assert after_first.status == PENDING
+        assert "postgres" in after_first.last_error
+
+        await worker.run_once()
+        assert queue.get(job.job_id).status == DONE
+        assert notified == [job.job_id]
+
+    @pytest.mark.asyncio
+    async def test_handler_exception_fails_after_max_attempts(self, queue):
+        async def handler(job, steps):
+            raise RuntimeError("always")
+
+        job = queue.enqueue("finalize_session", {}, idempotency_key="k1", max_attempts=2)
+        worker = JobWorker(queue, {"finalize_session": handler}, backoff_base=0)
+
+        await worker.run_once()
+        await worker.run_once()
+
+        stored = queue.get(job.job_id)
+        assert stored.status == FAILED
+        assert stored.attempts == 2
+        assert "RuntimeError: always" in stored.last_error
+
+    @pytest.mark.asyncio
+    async def test_lease_renewed_while_handler_runs(self, queue):
+        import asyncio
+
+        stolen = []
+
+        async def handler(job, steps):
+            await asyncio.sleep(0.3)
+            stolen.append(queue.claim("other"))
+            steps.mark("notify")
+
+        job = queue.enqueue("finalize_session", {}, idempotency_key="k1")
+        worker = JobWorker(queue, {"finalize_session": handler}, lease_seconds=0.15)
+
+        await worker.run_once()
+
+        assert stolen == [None]
+        stored = queue.get(job.job_id)
+        assert stored.status == DONE
+        assert stored.attempts == 1
+
+    def test_steps_failed_message(self):
+        err = JobStepsFailed({"notify": "TimeoutError: t", "postgres": "OSError: x"})
+        assert "notify: TimeoutError: t" in str(err)
+        assert err.failures["postgres"] == "OSError: x"
@@ -617,6 +617,15 @@ class TestIndustryMatcher:
 
         assert len(mentions) > 0
 
+    def test_warm_compiles_patterns(self, mock_loader):
+        """warm() builds the alias map and one compiled pattern per alias."""
+        matcher = IndustryMatcher(mock_loader)
+
+        assert matcher.warm() == len(matcher._alias_map)
+        assert len(matcher._patterns) == len(matcher._alias_map)
+        assert matcher.detect("Наша клиника ищет врачей") == "medical"
+        mock_loader.load_index.assert_called_once()
+
     def test_reload(self, mock_loader):
         """Test reloading matcher data."""
         matcher = IndustryMatcher(mock_loader)
@@ -628,6 +637,7 @@ class TestIndustryMatcher:
 
         assert matcher._loaded is False
         assert matcher._alias_map == {}
+        assert matcher._patterns == []
 
     def test_russian_stem_extraction(self, mock_loader):
         """Test Russian word stemming."""
@@ -0,0 +1,305 @@
+"""
+Unit tests for src/llm/cassette.py
+
+Tests cover:
+- Request keys (stable for JSON key order, independent of headers/host)
+- Record → replay round trip through real LLM clients (OpenAI-compatible, Anthropic)
+- Sequential replay of repeated identical requests
+- Replay miss, missing cassette file, simulated latency
+- Buffered writes (file written on close) and the client's pool limits
+- create_llm_client cassette wiring (args and env, placeholder keys in replay)
+"""
+
+import json
+import os
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from src.llm.anthropic_client import AnthropicClient
+from src.llm.cassette import CassetteMissError, CassetteTransport, request_key
+from src.llm.deepseek import DeepSeekClient
+from src.llm.factory import create_llm_client
+from src.llm.openai_client import OpenAICompatibleClient
+
+
+MESSAGES = [{"role": "user", "content": "Привет"}]
+
+
+def _openai_backend(answers):
+    """MockTransport answering with successive OpenAI-style completions."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        content = answers[min(len(calls) - 1, len(answers) - 1)]
+        return httpx.Response(200, json={
+            "choices": [{"message": {"content": content}, "finish_reason": "stop"}],
+        })
+
+    return httpx.MockTransport(handler), calls
+
+
+def _client(transport, api_key="k", endpoint="https://api.deepseek.com/v1"):
+    return OpenAICompatibleClient(
+        api_key=api_key, endpoint=endpoint, model="deepseek-chat", transport=transport,
+    )
+
+
+# ===========================================================================
+# Request keys
+# ===========================================================================
+
+class TestRequestKey:
+
+    @pytest.mark.unit
+    def test_key_ignores_json_order_headers_and_host(self):
+        a = httpx.Request(
+            "POST", "https://a.example/v1/chat/completions",
+            headers={"Authorization": "Bearer one"}, content=b'{"x": 1, "y": [1, 2]}',
+        )
+        b = httpx.Request(
+            "POST", "https://b.example/v1/chat/completions",
+            headers={"Authorization": "Bearer two"}, content=b'{"y":[1,2],"x":1}',
+        )
+        assert request_key(a) == request_key(b)
+
+    @pytest.mark.unit
+    def test_key_depends_on_body_and_path(self):
+        base = httpx.Request("POST", "https://a/v1/chat", content=b'{"x": 1}')
+        other_body = httpx.Request("POST", "https://a/v1/chat", content=b'{"x": 2}')
+        other_path = httpx.Request("POST", "https://a/v1/messages", content=b'{"x": 1}')
+        assert len({request_key(base), request_key(other_body), request_key(other_path)}) == 3
+
+
+# ===========================================================================
+# Record / replay
+# ===========================================================================
+
+class TestCassetteTransport:
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_record_then_replay_without_network(self, tmp_path):
+        path = tmp_path / "c.json"
+        backend, calls = _openai_backend(["Ответ"])
+
+        recorder = _client(CassetteTransport(str(path), mode="record", inner=backend))
+        assert await recorder.chat(MESSAGES) == "Ответ"
+        await recorder.aclose()
+
+        saved = json.loads(path.read_text(encoding="utf-8"))
+        interaction = next(iter(saved["interactions"].values()))[0]
+        assert interaction["status"] == 200
+        assert "latency_ms" in interaction
+        assert "Bearer" not in path.read_text(encoding="utf-8")
+
+        # Другой ключ и endpoint, без сети
+        player = _client(
+            CassetteTransport(str(path), mode="replay"),
+            api_key="other", endpoint="https://proxy.local/v1",
+        )
+        assert await player.chat(MESSAGES) == "Ответ"
+        assert len(calls) == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_repeated_requests_replay_in_order(self, tmp_path):
+        path = tmp_path / "c.json"
+        backend, _ = _openai_backend(["первый", "второй"])
+
+        recorder = _client(CassetteTransport(str(path), mode="record", inner=backend))
+        assert [await recorder.chat(MESSAGES) for _ in range(2)] == ["первый", "второй"]
+        await recorder.aclose()
+
+        player = _client(CassetteTransport(str(path), mode="replay"))
+        replayed = [await player.chat(MESSAGES) for _ in range(3)]
+        assert replayed == ["первый", "второй", "второй"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_auto_records_only_misses(self, tmp_path):
+        path = tmp_path / "c.json"
+        backend, calls = _openai_backend(["A", "B"])
+
+        first = _client(CassetteTransport(str(path), mode="auto", inner=backend))
+        await first.chat(MESSAGES)
+        await first.aclose()
+
+        second = _client(CassetteTransport(str(path), mode="auto", inner=backend))
+        assert await second.chat(MESSAGES) == "A"
+        assert await second.chat([{"role": "user", "content": "Другое"}]) == "B"
+        await second.aclose()
+        assert len(calls) == 2
+        assert len(CassetteTransport(str(path), mode="replay")) == 2
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_replay_miss_raises(self, tmp_path):
+        path = tmp_path / "c.json"
+        path.write_text(json.dumps({"version": 1, "interactions": {}}), encoding="utf-8")
+
+        player = _client(CassetteTransport(str(path), mode="replay"))
+        with pytest.raises(CassetteMissError):
+            await player.chat(MESSAGES)
+
+    @pytest.mark.unit
+    def test_replay_requires_file(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            CassetteTransport(str(tmp_path / "missing.json"), mode="replay")
+
+    @pytest.mark.unit
+    def test_unknown_mode_rejected(self, tmp_path):
+        with pytest.raises(ValueError):
+            CassetteTransport(str(tmp_path / "c.json"), mode="stream")
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_simulated_latency(self, tmp_path):
+        path = tmp_path / "c.json"
+        backend, _ = _openai_backend(["x"])
+        recorder = _client(CassetteTransport(str(path), mode="record", inner=backend))
+        await recorder.chat(MESSAGES)
+        await recorder.aclose()
+
+        data = json.loads(path.read_text(encoding="utf-8"))
+        for items in data["interactions"].values():
+            items[0]["latency_ms"] = 200
+        path.write_text(json.dumps(data), encoding="utf-8")
+
+        player = _client(CassetteTransport(str(path), mode="replay", latency_scale=0.25))
+        started = time.monotonic()
+        await player.chat(MESSAGES)
+        assert time.monotonic() - started >= 0.045
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_anthropic_client_round_trip(self, tmp_path):
+        path = tmp_path / "c.json"
+        backend = httpx.MockTransport(lambda request: httpx.Response(200, json={
+            "content": [{"type": "text", "text": "Claude"}], "stop_reason": "end_turn",
+        }))
+
+        recorder = AnthropicClient(
+            api_key="k", model="m",
+            transport=CassetteTransport(str(path), mode="record", inner=backend),
+        )
+        await recorder.chat(MESSAGES)
+        await recorder.aclose()
+
+        player = AnthropicClient(
+            api_key="k2", model="m", transport=CassetteTransport(str(path), mode="replay"),
+        )
+        assert await player.chat(MESSAGES) == "Claude"
+
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_recording_written_on_close_not_per_response(self, tmp_path):
+        path = tmp_path / "c.json"
+        backend, _ = _openai_backend(["a", "b"])
+        transport = CassetteTransport(str(path), mode="record", inner=backend)
+        recorder = _client(transport)
+
+        with patch.object(CassetteTransport, "_save", autospec=True, side_effect=CassetteTransport._save) as save:
+            await recorder.chat(MESSAGES)
+            await recorder.chat([{"role": "user", "content": "ещё"}])
+            assert not path.exists()
+            await recorder.aclose()
+
+        assert save.call_count == 1
+        assert len(CassetteTransport(str(path), mode="replay")) == 2
+
+    @pytest.mark.unit
+    def test_unclosed_recorders_flushed_at_exit_without_pinning(self, tmp_path):
+        import gc
+
+        from src.llm import cassette
+
+        path = tmp_path / "c.json"
+        transport = CassetteTransport(str(path), mode="record")
+        transport._interactions["k"] = [{"status": 200}]
+        transport._dirty = True
+        assert transport in cassette._recorders
+
+        cassette._flush_recorders()
+        assert path.exists()
+
+        del transport
+        gc.collect()
+        assert not any(t.path == path for t in cassette._recorders)
+
+    @pytest.mark.unit
+    def test_recording_uses_client_pool_limits(self, tmp_path):
+        transport = CassetteTransport(str(tmp_path / "c.json"), mode="record")
+        client = _client(transport)
+
+        client._get_http_client()
+
+        assert isinstance(transport._inner, httpx.AsyncHTTPTransport)
+        assert transport._limits.max_connections == 5
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_replay_queues_beyond_pool_size(self, tmp_path):
+        import asyncio
+
+        path = tmp_path / "c.json"
+        backend, _ = _openai_backend(["x"])
+        recorder = _client(CassetteTransport(str(path), mode="record", inner=backend))
+        await recorder.chat(MESSAGES)
+        await recorder.aclose()
+        data = json.loads(path.read_text(encoding="utf-8"))
+        for items in data["interactions"].values():
+            items[0]["latency_ms"] = 100
+        path.write_text(json.dumps(data), encoding="utf-8")
+
+        player = _client(CassetteTransport(str(path), mode="replay", latency_scale=1.0))
+        started = time.monotonic()
+        await asyncio.gather(*(player.chat(MESSAGES) for _ in range(6)))
+        # 6 запросов на пуле из 5 соединений — две «волны» по 100 мс
+        assert time.monotonic() - started >= 0.19
+        await player.aclose()
+
+
+# ===========================================================================
+# Factory wiring
+# ===========================================================================
+
+class TestFactoryCassette:
+
+    @pytest.mark.unit
+    def test_replay_without_keys_uses_placeholders(self, tmp_path):
+        path = tmp_path / "c.json"
+        path.write_text(json.dumps({"version": 1, "interactions": {}}), encoding="utf-8")
+
+        env = {k: v for k, v in os.environ.items() if "API_KEY" not in k}
+        with patch.dict(os.environ, env, clear=True):
+            for provider in ("deepseek", "azure", "openai", "anthropic", "xai"):
+                client = create_llm_client(provider, cassette=str(path), cassette_mode="replay")
+                assert isinstance(client._transport, CassetteTransport)
+
+    @pytest.mark.unit
+    def test_env_vars_enable_cassette(self, tmp_path):
+        env = {
+            "DEEPSEEK_API_KEY": "k",
+            "LLM_CASSETTE": str(tmp_path / "c.json"),
+            "LLM_CASSETTE_MODE": "record",
+            "LLM_CASSETTE_LATENCY": "0.5",
+        }
+        with patch.dict(os.environ, env):
+            client = create_llm_client("deepseek")
+
+        assert isinstance(client, DeepSeekClient)
+        assert client._transport.mode == "record"
+        assert client._transport.latency_scale == 0.5
+
+    @pytest.mark.unit
+    def test_no_cassette_by_default(self):
+        env = {"DEEPSEEK_API_KEY": "k"}
+        with patch.dict(os.environ, env):
+            os.environ.pop("LLM_CASSETTE", None)
+            client = create_llm_client("deepseek")
+        assert client._transport is None
@@ -15,7 +15,7 @@ from src.models import (
     AnswerAnalysis, Clarification, QuestionResponse, InterviewContext,
     InterviewStatistics
 )
-from src.anketa.schema import FinalAnketa
+from src.anketa.schema import FinalAnketa, InterviewAnketa, AgentFunction, FAQItem, QAPair
 
 
 class TestEnums:
@@ -331,6 +331,72 @@ class TestFinalAnketa:
         assert "company_name" in json_str
 
 
+
+class TestTrustedAnketa:
+    """Test trusted construction and cached JSON dump of anketa models."""
+
+    @pytest.fixture
+    def anketa(self, sample_final_anketa):
+        sample_final_anketa.agent_functions = [AgentFunction(name="Запись", description="Запись на приём")]
+        sample_final_anketa.faq_items = [FAQItem(question="Цена?", answer="От 1000 ₽")]
+        sample_final_anketa.services = ["терапия", "УЗИ"]
+        return sample_final_anketa
+
+    def test_merge_json_matches_validation(self, anketa):
+        data = {**anketa.to_json_dict(), "company_name": "Клиника", "services": ["МРТ"]}
+        merged = anketa.merge_json(data)
+        assert merged.model_dump(mode="json") == FinalAnketa(**data).model_dump(mode="json")
+        assert anketa.company_name == "TechSolutions Inc."
+
+    def test_merge_json_reuses_unchanged_fields(self, anketa):
+        merged = anketa.merge_json({**anketa.to_json_dict(), "company_name": "Клиника"})
+        assert merged.faq_items[0] is anketa.faq_items[0]
+        assert merged.created_at == anketa.created_at
+
+    def test_merge_json_validates_changed_fields(self, anketa):
+        data = {**anketa.to_json_dict(), "agent_functions": [{"name": "Звонки", "description": "Входящие"}]}
+        merged = anketa.merge_json(data)
+        assert merged.agent_functions == [AgentFunction(name="Звонки", description="Входящие")]
+
+        data["agent_functions"] = ["без описания"]
+        with pytest.raises(ValidationError):
+            anketa.merge_json(data)
+
+    def test_merge_json_carries_json_cache(self, anketa):
+        data = {**anketa.to_json_dict(), "faq_items": [{"question": "Парковка?", "answer": "Есть"}]}
+        merged = anketa.merge_json(data)
+        assert merged._json_cache is not None
+        assert merged.to_json_dict() == merged.model_dump(mode="json")
+
+    def test_merge_json_ignores_unknown_keys(self, anketa):
+        merged = anketa.merge_json({"phone": "+79991234567", "created_at": "2026-01-01T10:00:00Z"})
+        assert "phone" not in merged.model_dump()
+        assert merged.created_at == datetime(2026, 1, 1, 10, 0, tzinfo=timezone.utc)
+
+    def test_interview_anketa_merge_json(self):
+        anketa = InterviewAnketa(qa_pairs=[QAPair(question="Роль?")])
+        merged = anketa.merge_json({"qa_pairs": [{"question": "Роль?", "answer": "Директор"}]})
+        assert merged.qa_pairs[0].answer == "Директор"
+        assert merged.completion_rate() > anketa.completion_rate()
+
+    def test_json_dict_is_cached(self, anketa):
+        first = anketa.to_json_dict()
+        first["company_name"] = "Изменено копией"
+        assert anketa.to_json_dict()["company_name"] == "TechSolutions Inc."
+        assert anketa.to_json_dict() == anketa.model_dump(mode="json")
+
+    def test_json_dict_invalidated_on_assignment(self, anketa):
+        anketa.to_json_dict()
+        anketa.company_name = "Новое имя"
+        assert anketa.to_json_dict()["company_name"] == "Новое имя"
+
+    def test_model_copy_drops_cache(self, anketa):
+        anketa.to_json_dict()
+        copy = anketa.model_copy(update={"industry": "Медицина"})
+        assert copy.to_json_dict()["industry"] == "Медицина"
+        assert anketa.to_json_dict()["industry"] == "IT / Technology"
+
+
 class TestInterviewStatistics:
     """Test InterviewStatistics model."""
 
@@ -0,0 +1,363 @@
+"""
+Tests for notification delivery (src/notifications/delivery.py) against
+local SMTP and HTTP stubs.
+
+- SMTPPool: persistent connection reused, reconnect after server drop,
+  refused recipient is permanent
+- Webhooks: shared HTTP session, body/headers as queued, retry on 5xx,
+  dead-letter on 4xx and after max_attempts
+- Queue: overflow and shutdown go to dead-letter, replay requeues
+"""
+
+import asyncio
+import os
+import socketserver
+import sys
+import threading
+
+import pytest
+import pytest_asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.notifications.delivery import NotificationDispatcher, OutboundMessage, SMTPPool
+from src.notifications.models import EmailConfig
+
+
+# ---------------------------------------------------------------------------
+# Stubs
+# ---------------------------------------------------------------------------
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP dialogue: EHLO, MAIL, RCPT, DATA, RSET, NOOP, QUIT."""
+
+    def _reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode("ascii"))
+
+    def handle(self):
+        stub = self.server.stub
+        stub.connections += 1
+        self._reply("220 stub ESMTP")
+        while True:
+            line = self.rfile.readline().decode("utf-8", "replace").strip()
+            if not line:
+                return
+            command = line.split(" ", 1)[0].upper()
+            if command in ("EHLO", "HELO"):
+                self._reply("250 stub")
+            elif command == "RCPT":
+                self._reply("550 no such user" if "rejected@" in line else "250 ok")
+            elif command == "DATA":
+                self._reply("354 go ahead")
+                data = []
+                while True:
+                    chunk = self.rfile.readline().decode("utf-8", "replace")
+                    if chunk in (".\r\n", ""):
+                        break
+                    data.append(chunk)
+                stub.messages.append("".join(data))
+                self._reply("250 queued")
+                if stub.drop_after_message:
+                    stub.drop_after_message = False
+                    return  # обрыв соединения сервером
+            elif command == "QUIT":
+                self._reply("221 bye")
+                return
+            else:  # MAIL, RSET, NOOP
+                self._reply("250 ok")
+
+
+class _SMTPStub:
+    def __init__(self):
+        self.connections = 0
+        self.messages = []
+        self.drop_after_message = False
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SMTPHandler)
+        self.server.daemon_threads = True
+        self.server.stub = self
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def config(self) -> EmailConfig:
+        return EmailConfig(enabled=True, smtp_server="127.0.0.1", smtp_port=self.port, use_tls=False,
+                           from_address="noreply@test.local")
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def smtp_stub():
+    stub = _SMTPStub()
+    yield stub
+    stub.close()
+
+
+@pytest.fixture
+def smtp_config(tmp_path, smtp_stub):
+    """notifications.yaml pointing at the SMTP stub."""
+    import yaml
+
+    path = tmp_path / "notifications.yaml"
+    path.write_text(yaml.dump({"email": smtp_stub.config().model_dump()}), encoding="utf-8")
+    return str(path)
+
+
+@pytest_asyncio.fixture
+async def http_stub():
+    """aiohttp server answering with queued status codes (200 when the queue is empty)."""
+    from aiohttp import web
+
+    state = {"statuses": [], "requests": []}
+
+    async def hook(request):
+        state["requests"].append((await request.read(), dict(request.headers)))
+        return web.Response(status=state["statuses"].pop(0) if state["statuses"] else 200)
+
+    app = web.Application()
+    app.router.add_post("/hook", hook)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    state["url"] = f"http://127.0.0.1:{port}/hook"
+    yield state
+    await runner.cleanup()
+
+
+def _dispatcher(tmp_path, **kwargs) -> NotificationDispatcher:
+    kwargs.setdefault("backoff_base", 0.01)
+    kwargs.setdefault("backoff_cap", 0.02)
+    return NotificationDispatcher(dead_letter_path=str(tmp_path / "dead.jsonl"), **kwargs)
+
+
+def _webhook(url: str, body: bytes = b'{"event":"on_confirm"}') -> OutboundMessage:
+    return OutboundMessage.webhook(url, body, {"Content-Type": "application/json", "X-Webhook-Signature": "sig"},
+                                   event="on_confirm", session_id="s1")
+
+
+# ---------------------------------------------------------------------------
+# SMTP
+# ---------------------------------------------------------------------------
+
+
+class TestSMTPPool:
+    """Persistent SMTP connections."""
+
+    def test_connection_reused(self, smtp_stub):
+        pool = SMTPPool()
+        cfg = smtp_stub.config()
+        pool.send(cfg, "a@test.local", "Subject: 1\r\n\r\none")
+        pool.send(cfg, "b@test.local", "Subject: 2\r\n\r\ntwo")
+        pool.close()
+
+        assert smtp_stub.connections == 1
+        assert len(smtp_stub.messages) == 2
+
+    def test_reconnects_after_server_drop(self, smtp_stub):
+        pool = SMTPPool()
+        cfg = smtp_stub.config()
+        smtp_stub.drop_after_message = True
+        pool.send(cfg, "a@test.local", "Subject: 1\r\n\r\none")
+        pool.send(cfg, "b@test.local", "Subject: 2\r\n\r\ntwo")
+        pool.close()
+
+        assert smtp_stub.connections == 2
+        assert len(smtp_stub.messages) == 2
+
+    def test_idle_connection_replaced(self, smtp_stub):
+        pool = SMTPPool(idle_seconds=0)
+        cfg = smtp_stub.config()
+        pool.send(cfg, "a@test.local", "Subject: 1\r\n\r\none")
+        pool.send(cfg, "b@test.local", "Subject: 2\r\n\r\ntwo")
+        pool.close()
+        assert smtp_stub.connections == 2
+
+
+class TestEmailDelivery:
+    """Queued emails over the SMTP stub."""
+
+    @pytest.mark.asyncio
+    async def test_emails_delivered_over_pooled_connections(self, tmp_path, smtp_stub, smtp_config):
+        dispatcher = _dispatcher(tmp_path)
+        ids = []
+        for i in range(3):
+            message = OutboundMessage.email(f"user{i}@test.local", "Анкета", f"<p>Привет {i}</p>",
+                                            config_path=smtp_config)
+            assert dispatcher.submit(message)
+            ids.append(message.message_id)
+
+        assert await dispatcher.wait(ids, timeout=10) is True
+        await dispatcher.close()
+
+        assert len(smtp_stub.messages) == 3
+        assert smtp_stub.connections <= 2  # SMTP_POOL_SIZE
+        assert dispatcher.delivered == 3
+
+    @pytest.mark.asyncio
+    async def test_rejected_recipient_dead_lettered_without_retry(self, tmp_path, smtp_stub, smtp_config):
+        dispatcher = _dispatcher(tmp_path)
+        message = OutboundMessage.email("rejected@test.local", "S", "<p>x</p>", config_path=smtp_config)
+        dispatcher.submit(message)
+
+        assert await dispatcher.wait([message.message_id], timeout=10) is False
+        await dispatcher.close()
+
+        [entry] = dispatcher.read_dead_letters()
+        assert entry["reason"] == "rejected"
+        assert entry["attempts"] == 1
+        assert entry["target"] == "rejected@test.local"
+
+
+# ---------------------------------------------------------------------------
+# Webhooks
+# ---------------------------------------------------------------------------
+
+
+class TestWebhookDelivery:
+    """Queued webhooks over the HTTP stub."""
+
+    @pytest.mark.asyncio
+    async def test_body_and_headers_sent_as_queued(self, tmp_path, http_stub):
+        dispatcher = _dispatcher(tmp_path)
+        message = _webhook(http_stub["url"], '{"company":"Альфа"}'.encode("utf-8"))
+        dispatcher.submit(message)
+
+        assert await dispatcher.wait([message.message_id], timeout=10) is True
+        session = dispatcher._http
+        second = _webhook(http_stub["url"])
+        dispatcher.submit(second)
+        await dispatcher.wait([second.message_id], timeout=10)
+        assert dispatcher._http is session  # одна HTTP-сессия на все webhooks
+        await dispatcher.close()
+
+        body, headers = http_stub["requests"][0]
+        assert body == '{"company":"Альфа"}'.encode("utf-8")
+        assert headers["X-Webhook-Signature"] == "sig"
+
+    @pytest.mark.asyncio
+    async def test_server_error_retried(self, tmp_path, http_stub):
+        http_stub["statuses"] = [503, 500]
+        dispatcher = _dispatcher(tmp_path)
+        message = _webhook(http_stub["url"])
+        dispatcher.submit(message)
+
+        assert await dispatcher.wait([message.message_id], timeout=10) is True
+        await dispatcher.close()
+
+        assert message.attempts == 3
+        assert len(http_stub["requests"]) == 3
+        assert {body for body, _ in http_stub["requests"]} == {message.body.encode("utf-8")}
+        assert dispatcher.read_dead_letters() == []
+
+    @pytest.mark.asyncio
+    async def test_client_error_dead_lettered(self, tmp_path, http_stub):
+        http_stub["statuses"] = [400]
+        dispatcher = _dispatcher(tmp_path)
+        message = _webhook(http_stub["url"])
+        dispatcher.submit(message)
+
+        assert await dispatcher.wait([message.message_id], timeout=10) is False
+        await dispatcher.close()
+
+        assert len(http_stub["requests"]) == 1
+        [entry] = dispatcher.read_dead_letters()
+        assert entry["reason"] == "rejected"
+        assert "400" in entry["last_error"]
+
+    @pytest.mark.asyncio
+    async def test_max_attempts_dead_lettered(self, tmp_path, http_stub):
+        http_stub["statuses"] = [500] * 10
+        dispatcher = _dispatcher(tmp_path, max_attempts=3)
+        message = _webhook(http_stub["url"])
+        dispatcher.submit(message)
+
+        assert await dispatcher.wait([message.message_id], timeout=10) is False
+        await dispatcher.close()
+
+        assert len(http_stub["requests"]) == 3
+        [entry] = dispatcher.read_dead_letters()
+        assert entry["reason"] == "max_attempts"
+        assert entry["attempts"] == 3
+
+
+# ---------------------------------------------------------------------------
+# Queue
+# ---------------------------------------------------------------------------
+
+
+class TestDispatcherQueue:
+    """Bounded queue, shutdown, replay."""
+
+    @pytest.mark.asyncio
+    async def test_overflow_goes_to_dead_letter(self, tmp_path):
+        dispatcher = _dispatcher(tmp_path, queue_size=1, workers=1)
+        assert dispatcher.submit(_webhook("http://127.0.0.1:9/hook")) is True
+        assert dispatcher.submit(_webhook("http://127.0.0.1:9/hook")) is False
+
+        assert [e["reason"] for e in dispatcher.read_dead_letters()] == ["queue_full"]
+        await dispatcher.close(timeout=0)
+
+    @pytest.mark.asyncio
+    async def test_close_dead_letters_pending_retries(self, tmp_path, http_stub):
+        http_stub["statuses"] = [500]
+        dispatcher = _dispatcher(tmp_path, backoff_base=60, backoff_cap=60)
+        message = _webhook(http_stub["url"])
+        dispatcher.submit(message)
+        while not dispatcher._retries:
+            await asyncio.sleep(0.01)
+
+        await dispatcher.close(timeout=0.05)
+
+        [entry] = dispatcher.read_dead_letters()
+        assert entry["reason"] == "shutdown"
+        assert entry["message_id"] == message.message_id
+
+    @pytest.mark.asyncio
+    async def test_replay_dead_letters(self, tmp_path, http_stub):
+        http_stub["statuses"] = [400]
+        dispatcher = _dispatcher(tmp_path)
+        message = _webhook(http_stub["url"])
+        dispatcher.submit(message)
+        await dispatcher.wait([message.message_id], timeout=10)
+
+        assert dispatcher.replay_dead_letters() == 1
+        while dispatcher.pending:
+            await asyncio.sleep(0.01)
+        await dispatcher.close()
+
+        assert dispatcher.read_dead_letters() == []
+        assert len(http_stub["requests"]) == 2
+        assert http_stub["requests"][1][1]["X-Webhook-Signature"] == "sig"
+
+    @pytest.mark.asyncio
+    async def test_replay_dead_letters_command(self, tmp_path, http_stub):
+        """scripts/run_jobs.py --replay-dead-letters delivers inside its own loop and closes."""
+        import importlib.util
+        from unittest.mock import patch
+
+        http_stub["statuses"] = [400, 400, 200]
+        seed = _dispatcher(tmp_path)
+        failing = [_webhook(http_stub["url"]) for _ in range(2)]
+        for message in failing:
+            seed.submit(message)
+        await seed.wait([m.message_id for m in failing], timeout=10)
+        await seed.close()
+        assert len(seed.read_dead_letters()) == 2
+
+        script = os.path.join(os.path.dirname(__file__), "..", "..", "scripts", "run_jobs.py")
+        spec = importlib.util.spec_from_file_location("run_jobs_script", script)
+        run_jobs = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(run_jobs)
+
+        operator = _dispatcher(tmp_path)
+        with patch("src.notifications.get_dispatcher", return_value=operator):
+            undelivered = await run_jobs._replay_dead_letters(timeout=10)
+
+        assert undelivered == 0
+        assert operator.read_dead_letters() == []
+        assert len(http_stub["requests"]) == 4
+        assert operator.pending == 0
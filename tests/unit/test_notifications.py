@@ -4,7 +4,6 @@ Unit tests for notification models and NotificationManager.
 
 import hashlib
 import hmac
-import json
 import sys
 import os
 from datetime import datetime
@@ -18,6 +17,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 
 from src.notifications.models import EmailConfig, WebhookConfig, NotificationConfig
 from src.notifications.manager import NotificationManager
+from src.serialization import dumps_bytes
 
 
 # ---------------------------------------------------------------------------
@@ -41,6 +41,13 @@ def _make_session(**overrides):
     return SimpleNamespace(**defaults)
 
 
+def _make_dispatcher():
+    """Dispatcher stub: records queued messages instead of delivering them."""
+    dispatcher = MagicMock()
+    dispatcher.submit.return_value = True
+    return dispatcher
+
+
 def _write_yaml_config(path, email_overrides=None, webhook_overrides=None):
     """Write a notifications YAML config to *path*."""
     email = {
@@ -193,6 +200,22 @@ class TestNotificationManagerConfigLoading:
         assert mgr.config.email.enabled is False
         assert mgr.config.webhooks.enabled is False
 
+    def test_config_cached_until_file_changes(self, tmp_path):
+        """Managers share the parsed config; an edited file is picked up."""
+        cfg_file = tmp_path / "notifications.yaml"
+        _write_yaml_config(cfg_file, email_overrides={"manager_email": "a@test.com"})
+
+        with patch("src.notifications.delivery.yaml.safe_load", wraps=yaml.safe_load) as mock_load:
+            NotificationManager(config_path=str(cfg_file))
+            mgr = NotificationManager(config_path=str(cfg_file))
+            assert mgr.config.email.manager_email == "a@test.com"
+            assert mock_load.call_count == 1
+
+            _write_yaml_config(cfg_file, email_overrides={"manager_email": "b@test.com"})
+            os.utime(cfg_file, ns=(0, os.stat(cfg_file).st_mtime_ns + 1_000_000))
+            assert mgr.config.email.manager_email == "b@test.com"
+            assert mock_load.call_count == 2
+
 
 # ===================================================================
 # send_manager_notification
@@ -206,27 +229,29 @@ class TestSendManagerNotification:
         """No email should be sent when email is disabled."""
         cfg_file = tmp_path / "notifications.yaml"
         _write_yaml_config(cfg_file, email_overrides={"enabled": False})
-        mgr = NotificationManager(config_path=str(cfg_file))
+        mgr = NotificationManager(config_path=str(cfg_file), dispatcher=_make_dispatcher())
 
-        with patch.object(mgr, "_send_email") as mock_send:
-            await mgr.send_manager_notification(_make_session())
-            mock_send.assert_not_called()
+        assert await mgr.send_manager_notification(_make_session()) is None
+        mgr.dispatcher.submit.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_calls_send_email_when_enabled(self, tmp_path):
-        """_send_email should be called with the correct arguments when enabled."""
+    async def test_queues_email_when_enabled(self, tmp_path):
+        """An email to manager_email should be queued for delivery when enabled."""
         cfg_file = tmp_path / "notifications.yaml"
         _write_yaml_config(cfg_file, email_overrides={"enabled": True})
-        mgr = NotificationManager(config_path=str(cfg_file))
+        mgr = NotificationManager(config_path=str(cfg_file), dispatcher=_make_dispatcher())
 
-        with patch.object(mgr, "_send_email") as mock_send:
-            session = _make_session(company_name="Acme")
-            await mgr.send_manager_notification(session)
+        session = _make_session(company_name="Acme")
+        message_id = await mgr.send_manager_notification(session)
 
-            mock_send.assert_called_once()
-            call_kwargs = mock_send.call_args
-            # to_address should be the manager_email from config
-            assert call_kwargs[1]["to_address"] == "mgr@example.com" or call_kwargs[0][0] == "mgr@example.com"
+        mgr.dispatcher.submit.assert_called_once()
+        message = mgr.dispatcher.submit.call_args[0][0]
+        assert message.message_id == message_id
+        assert message.kind == "email"
+        # to_address should be the manager_email from config
+        assert message.target == "mgr@example.com"
+        assert message.subject == "New anketa from Acme"
+        assert message.config_path == str(cfg_file)
 
 
 # ===================================================================
@@ -238,15 +263,16 @@ class TestTriggerWebhook:
 
     @pytest.mark.asyncio
     async def test_skips_when_webhooks_disabled(self, tmp_path):
-        """No HTTP call should happen when webhooks are disabled."""
+        """No message should be queued when webhooks are disabled."""
         cfg_file = tmp_path / "notifications.yaml"
         _write_yaml_config(cfg_file, webhook_overrides={"enabled": False})
-        mgr = NotificationManager(config_path=str(cfg_file))
+        mgr = NotificationManager(config_path=str(cfg_file), dispatcher=_make_dispatcher())
 
-        with patch("src.notifications.manager.json") as mock_json:
+        with patch("src.notifications.manager.dumps_bytes") as mock_dumps:
             await mgr.trigger_webhook("on_confirm", _make_session())
-            # json.dumps should never be called because we bail out early
-            mock_json.dumps.assert_not_called()
+            # the payload should never be serialized because we bail out early
+            mock_dumps.assert_not_called()
+        mgr.dispatcher.submit.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_hmac_signature_is_correct(self, tmp_path):
@@ -262,7 +288,7 @@ class TestTriggerWebhook:
                 "timeout_seconds": 5,
             },
         )
-        mgr = NotificationManager(config_path=str(cfg_file))
+        mgr = NotificationManager(config_path=str(cfg_file), dispatcher=_make_dispatcher())
         session = _make_session()
 
         # Freeze datetime.now(timezone.utc) so the timestamp in the payload is deterministic
@@ -276,45 +302,53 @@ class TestTriggerWebhook:
 
             payload = mgr._build_webhook_payload("on_confirm", session)
 
-        body_bytes = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        body_bytes = dumps_bytes(payload, default=str)
         expected_sig = hmac.new(
             secret.encode("utf-8"), body_bytes, hashlib.sha256
         ).hexdigest()
 
-        # Capture what aiohttp receives
-        captured_headers = {}
-
-        mock_response = AsyncMock()
-        mock_response.status = 200
-        mock_response.__aenter__ = AsyncMock(return_value=mock_response)
-        mock_response.__aexit__ = AsyncMock(return_value=False)
-
-        mock_session_ctx = MagicMock()
-
-        def capture_post(url, data=None, headers=None):
-            captured_headers.update(headers or {})
-            return mock_response
-
-        mock_session_ctx.post = capture_post
+        with patch("src.notifications.manager.datetime") as mock_dt2:
+            mock_dt2.now.return_value = frozen_now
+            mock_dt2.side_effect = lambda *a, **kw: datetime(*a, **kw)
+            await mgr.trigger_webhook("on_confirm", session)
 
-        mock_client_session = MagicMock()
-        mock_client_session.__aenter__ = AsyncMock(return_value=mock_session_ctx)
-        mock_client_session.__aexit__ = AsyncMock(return_value=False)
+        # Body and headers are fixed when the message is queued
+        message = mgr.dispatcher.submit.call_args[0][0]
+        assert message.target == "https://hook.example.com/confirm"
+        assert message.body.encode("utf-8") == body_bytes
+        assert "X-Webhook-Signature" in message.headers
+        assert message.headers["X-Webhook-Signature"] == expected_sig
+        assert message.headers["X-Webhook-Id"] == message.message_id
 
-        # aiohttp is imported locally inside trigger_webhook, so we patch
-        # it in sys.modules rather than as a module-level attribute.
-        mock_aiohttp = MagicMock()
-        mock_aiohttp.ClientTimeout = MagicMock()
-        mock_aiohttp.ClientSession = MagicMock(return_value=mock_client_session)
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("backend", ["orjson", "stdlib"])
+    async def test_datetime_fields_serialized_as_str(self, tmp_path, monkeypatch, backend):
+        """model_dump() keeps datetimes: both JSON backends queue them as str(dt)."""
+        from src import serialization
+
+        if backend == "stdlib":
+            monkeypatch.setattr(serialization, "orjson", None)
+        elif serialization.orjson is None:
+            pytest.skip("orjson not installed")
+        cfg_file = tmp_path / "notifications.yaml"
+        _write_yaml_config(
+            cfg_file,
+            webhook_overrides={"enabled": True, "on_confirm": "https://hook.example.com/confirm"},
+        )
+        mgr = NotificationManager(config_path=str(cfg_file), dispatcher=_make_dispatcher())
+        created_at = datetime(2026, 1, 15, 10, 30, 0)
+        session = SimpleNamespace(
+            session_id="sess-001",
+            model_dump=lambda: {"session_id": "sess-001", "created_at": created_at, "dialogue_history": []},
+        )
 
-        with patch.dict("sys.modules", {"aiohttp": mock_aiohttp}):
-            with patch("src.notifications.manager.datetime") as mock_dt2:
-                mock_dt2.now.return_value = frozen_now
-                mock_dt2.side_effect = lambda *a, **kw: datetime(*a, **kw)
-                await mgr.trigger_webhook("on_confirm", session)
+        await mgr.trigger_webhook("on_confirm", session)
 
-        assert "X-Webhook-Signature" in captured_headers
-        assert captured_headers["X-Webhook-Signature"] == expected_sig
+        message = mgr.dispatcher.submit.call_args[0][0]
+        assert serialization.loads(message.body)["session"] == {
+            "session_id": "sess-001",
+            "created_at": "2026-01-15 10:30:00",
+        }
 
 
 # ===================================================================
@@ -458,3 +492,19 @@ class TestOnSessionConfirmed:
 
             mock_email.assert_awaited_once_with(session)
             mock_webhook.assert_awaited_once_with("on_confirm", session)
+
+    @pytest.mark.asyncio
+    async def test_wait_for_delivery(self, tmp_path):
+        """wait=True waits on the queued message IDs."""
+        cfg_file = tmp_path / "notifications.yaml"
+        _write_yaml_config(cfg_file)
+        dispatcher = _make_dispatcher()
+        dispatcher.wait = AsyncMock(return_value=False)
+        mgr = NotificationManager(config_path=str(cfg_file), dispatcher=dispatcher)
+
+        with patch.object(mgr, "send_manager_notification", new_callable=AsyncMock, return_value="m1"), \
+             patch.object(mgr, "trigger_webhook", new_callable=AsyncMock, return_value=None):
+            delivered = await mgr.on_session_confirmed(_make_session(), wait=True, timeout=5)
+
+        assert delivered is False
+        dispatcher.wait.assert_awaited_once_with(["m1"], timeout=5)
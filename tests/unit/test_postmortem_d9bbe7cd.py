@@ -169,7 +169,7 @@ class TestPeriodicDialogueSave:
         mock_anketa.company_name = "TestCorp"
         mock_anketa.website = ""
         mock_anketa.completion_rate.return_value = 0.5
-        mock_anketa.model_dump.return_value = {"company_name": "TestCorp"}
+        mock_anketa.to_json_dict.return_value = {"company_name": "TestCorp"}
 
         consultation._cached_extractor.extract = AsyncMock(return_value=mock_anketa)
         consultation._cached_extractor_provider = "deepseek"
@@ -180,7 +180,7 @@ class TestPeriodicDialogueSave:
              patch('src.voice.consultant._update_anketa_via_api', new_callable=AsyncMock) as mock_anketa_api, \
              patch('src.voice.consultant._update_dialogue_via_api', new_callable=AsyncMock) as mock_dialogue_api, \
              patch('src.voice.consultant._try_get_redis', return_value=None), \
-             patch('src.voice.consultant._extraction_semaphore', new=None):
+             patch('src.voice.pipeline._pipeline', new=None):
 
             mock_mgr.get_session.return_value = db_session
 
@@ -205,7 +205,7 @@ class TestPeriodicDialogueSave:
         mock_anketa.company_name = "TestCorp"
         mock_anketa.website = ""
         mock_anketa.completion_rate.return_value = 0.5
-        mock_anketa.model_dump.return_value = {"company_name": "TestCorp"}
+        mock_anketa.to_json_dict.return_value = {"company_name": "TestCorp"}
 
         consultation._cached_extractor.extract = AsyncMock(return_value=mock_anketa)
         consultation._cached_extractor_provider = "deepseek"
@@ -216,7 +216,7 @@ class TestPeriodicDialogueSave:
              patch('src.voice.consultant._update_anketa_via_api', new_callable=AsyncMock), \
              patch('src.voice.consultant._update_dialogue_via_api', new_callable=AsyncMock, side_effect=Exception("network error")), \
              patch('src.voice.consultant._try_get_redis', return_value=None), \
-             patch('src.voice.consultant._extraction_semaphore', new=None):
+             patch('src.voice.pipeline._pipeline', new=None):
 
             mock_mgr.get_session.return_value = db_session
 
@@ -245,7 +245,7 @@ class TestCountryDetectorDocumentPhone:
         mock_anketa.contact_phone = ""  # No phone from dialogue
         mock_anketa.website = ""
         mock_anketa.completion_rate.return_value = 0.6
-        mock_anketa.model_dump.return_value = {"company_name": "Bestattung Hanser"}
+        mock_anketa.to_json_dict.return_value = {"company_name": "Bestattung Hanser"}
 
         consultation._cached_extractor.extract = AsyncMock(return_value=mock_anketa)
         consultation._cached_extractor_provider = "deepseek"
@@ -272,7 +272,7 @@ class TestCountryDetectorDocumentPhone:
              patch('src.voice.consultant._update_anketa_via_api', new_callable=AsyncMock), \
              patch('src.voice.consultant._update_dialogue_via_api', new_callable=AsyncMock), \
              patch('src.voice.consultant._try_get_redis', return_value=None), \
-             patch('src.voice.consultant._extraction_semaphore', new=None), \
+             patch('src.voice.pipeline._pipeline', new=None), \
              patch('src.voice.consultant._get_kb_manager') as mock_kb, \
              patch('src.knowledge.country_detector.get_country_detector', return_value=mock_detector):
 
@@ -305,7 +305,7 @@ class TestCountryDetectorDocumentPhone:
         mock_anketa.contact_phone = "+49 171 1234567"  # Phone from dialogue
         mock_anketa.website = ""
         mock_anketa.completion_rate.return_value = 0.6
-        mock_anketa.model_dump.return_value = {"company_name": "TestCorp"}
+        mock_anketa.to_json_dict.return_value = {"company_name": "TestCorp"}
 
         consultation._cached_extractor.extract = AsyncMock(return_value=mock_anketa)
         consultation._cached_extractor_provider = "deepseek"
@@ -329,7 +329,7 @@ class TestCountryDetectorDocumentPhone:
              patch('src.voice.consultant._update_anketa_via_api', new_callable=AsyncMock), \
              patch('src.voice.consultant._update_dialogue_via_api', new_callable=AsyncMock), \
              patch('src.voice.consultant._try_get_redis', return_value=None), \
-             patch('src.voice.consultant._extraction_semaphore', new=None), \
+             patch('src.voice.pipeline._pipeline', new=None), \
              patch('src.voice.consultant._get_kb_manager') as mock_kb, \
              patch('src.knowledge.country_detector.get_country_detector', return_value=mock_detector):
 
@@ -360,7 +360,7 @@ class TestCountryDetectorDocumentPhone:
         mock_anketa.contact_phone = ""
         mock_anketa.website = ""
         mock_anketa.completion_rate.return_value = 0.6
-        mock_anketa.model_dump.return_value = {"company_name": "TestCorp"}
+        mock_anketa.to_json_dict.return_value = {"company_name": "TestCorp"}
 
         consultation._cached_extractor.extract = AsyncMock(return_value=mock_anketa)
         consultation._cached_extractor_provider = "deepseek"
@@ -387,7 +387,7 @@ class TestCountryDetectorDocumentPhone:
              patch('src.voice.consultant._update_anketa_via_api', new_callable=AsyncMock), \
              patch('src.voice.consultant._update_dialogue_via_api', new_callable=AsyncMock), \
              patch('src.voice.consultant._try_get_redis', return_value=None), \
-             patch('src.voice.consultant._extraction_semaphore', new=None), \
+             patch('src.voice.pipeline._pipeline', new=None), \
              patch('src.voice.consultant._get_kb_manager') as mock_kb, \
              patch('src.knowledge.country_detector.get_country_detector', return_value=mock_detector):
 
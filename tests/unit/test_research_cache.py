@@ -0,0 +1,241 @@
+"""
+Unit tests for ResearchCache and its integration with ResearchEngine.
+
+Tests cover:
+- Key normalization (domain, industry, composite keys)
+- TTL freshness, persistence across instances, touch() and purge_expired()
+- get_research_cache() purges expired rows on first open
+- ResearchEngine cache hits for website, web search and synthesis
+- ETag/Last-Modified revalidation (304 → cached data, TTL extended)
+"""
+
+import json
+import os
+import sys
+from unittest.mock import AsyncMock
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.research import cache as cache_module
+from src.research.cache import (
+    INSIGHTS,
+    SEARCH,
+    WEBSITE,
+    ResearchCache,
+    make_key,
+    normalize_domain,
+    normalize_industry,
+)
+from src.research.engine import ResearchEngine
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def cache(tmp_path):
+    """ResearchCache backed by a temporary SQLite file."""
+    c = ResearchCache(db_path=str(tmp_path / "research_cache.db"))
+    yield c
+    c.close()
+
+
+@pytest.fixture
+def engine(cache):
+    """ResearchEngine with mocked clients and a real temporary cache."""
+    deepseek = AsyncMock()
+    deepseek.chat = AsyncMock(return_value=json.dumps({
+        "industry_insights": ["insight1"],
+        "best_practices": ["bp1"],
+        "compliance_notes": [],
+    }))
+    web_search = AsyncMock()
+    web_search.search = AsyncMock(return_value=[
+        {"title": "Result", "url": "https://example.com/1", "snippet": "s"},
+    ])
+    eng = ResearchEngine(deepseek_client=deepseek, web_search_client=web_search, cache=cache)
+    eng.website_parser = AsyncMock()
+    eng.website_parser.parse_multiple_pages = AsyncMock(return_value={
+        "url": "https://example.com",
+        "title": "Test Company",
+        "description": "We do great things",
+        "validators": {"etag": '"v1"'},
+    })
+    return eng
+
+
+# ===========================================================================
+# Keys
+# ===========================================================================
+
+class TestKeys:
+
+    @pytest.mark.unit
+    def test_normalize_domain(self):
+        assert normalize_domain("https://WWW.Example.com/path?q=1") == "example.com"
+        assert normalize_domain("example.com") == "example.com"
+        assert normalize_domain("http://example.com:8080/") == "example.com"
+
+    @pytest.mark.unit
+    def test_normalize_industry(self):
+        assert normalize_industry("  Логистика   и склады ") == "логистика и склады"
+
+    @pytest.mark.unit
+    def test_make_key_stable_for_dict_order(self):
+        assert make_key("a", {"x": 1, "y": 2}) == make_key("a", {"y": 2, "x": 1})
+        assert make_key("a", {"x": 1}) != make_key("b", {"x": 1})
+
+
+# ===========================================================================
+# Store
+# ===========================================================================
+
+class TestResearchCacheStore:
+
+    @pytest.mark.unit
+    def test_missing_key_returns_none(self, cache):
+        assert cache.get(SEARCH, "nope") is None
+        assert cache.get_fresh(SEARCH, "nope") is None
+
+    @pytest.mark.unit
+    def test_set_and_get(self, cache):
+        cache.set(SEARCH, "logistics", [{"title": "t"}])
+        assert cache.get_fresh(SEARCH, "logistics") == [{"title": "t"}]
+
+    @pytest.mark.unit
+    def test_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / "c.db")
+        first = ResearchCache(db_path=path)
+        first.set(WEBSITE, "example.com", {"title": "T"}, validators={"etag": '"1"'})
+        first.close()
+
+        second = ResearchCache(db_path=path)
+        entry = second.get(WEBSITE, "example.com")
+        second.close()
+
+        assert entry.value == {"title": "T"}
+        assert entry.validators == {"etag": '"1"'}
+        assert entry.is_fresh
+
+    @pytest.mark.unit
+    def test_expired_entry_is_stale_but_available(self, cache):
+        cache.set(WEBSITE, "example.com", {"title": "T"}, ttl=-1)
+        entry = cache.get(WEBSITE, "example.com")
+
+        assert entry is not None
+        assert entry.is_fresh is False
+        assert cache.get_fresh(WEBSITE, "example.com") is None
+
+    @pytest.mark.unit
+    def test_touch_extends_ttl(self, cache):
+        cache.set(WEBSITE, "example.com", {"title": "T"}, ttl=-1)
+        cache.touch(WEBSITE, "example.com", ttl=60)
+        assert cache.get_fresh(WEBSITE, "example.com") == {"title": "T"}
+
+    @pytest.mark.unit
+    def test_purge_expired(self, cache):
+        cache.set(SEARCH, "old", [1], ttl=-100)
+        cache.set(SEARCH, "new", [2])
+
+        removed = cache.purge_expired(retention=10)
+
+        assert removed == 1
+        assert cache.get(SEARCH, "old") is None
+        assert cache.get_fresh(SEARCH, "new") == [2]
+
+    @pytest.mark.unit
+    def test_shared_cache_purges_expired_on_first_open(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(cache_module, "_default_cache", None)
+        seed = ResearchCache(db_path="data/research_cache.db")
+        seed.set(SEARCH, "ancient", [1], ttl=-(cache_module._STALE_RETENTION + 60))
+        seed.set(SEARCH, "stale", [2], ttl=-60)  # ещё нужна для ревалидации
+        seed.close()
+
+        shared = cache_module.get_research_cache()
+        try:
+            assert shared.get(SEARCH, "ancient") is None
+            assert shared.get(SEARCH, "stale").value == [2]
+        finally:
+            shared.close()
+
+
+# ===========================================================================
+# Engine integration
+# ===========================================================================
+
+class TestEngineCaching:
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_second_research_served_from_cache(self, engine):
+        """Repeat research for the same domain+industry hits no network and no LLM."""
+        first = await engine.research(website="https://example.com", industry="Логистика")
+        second = await engine.research(website="https://www.example.com/", industry="логистика")
+
+        assert engine.website_parser.parse_multiple_pages.await_count == 1
+        assert engine.web_search.search.await_count == 2  # two queries, first run only
+        assert engine.deepseek.chat.await_count == 1
+        assert second.industry_insights == first.industry_insights == ["insight1"]
+        assert second.website_data["title"] == "Test Company"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_validators_not_leaked_into_website_data(self, engine, cache):
+        result = await engine._parse_website("https://example.com")
+
+        assert "validators" not in result["data"]
+        assert cache.get(WEBSITE, "example.com").validators == {"etag": '"v1"'}
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_stale_website_revalidated_with_304(self, engine, cache):
+        """Stale entry → conditional request; 304 returns cached data and refreshes TTL."""
+        cache.set(WEBSITE, "example.com", {"title": "Cached"}, validators={"etag": '"v1"'}, ttl=-1)
+        engine.website_parser.parse_multiple_pages.return_value = {
+            "url": "https://example.com", "not_modified": True,
+        }
+
+        result = await engine._parse_website("https://example.com")
+
+        engine.website_parser.parse_multiple_pages.assert_awaited_once_with(
+            "https://example.com", validators={"etag": '"v1"'}
+        )
+        assert result["data"] == {"title": "Cached"}
+        assert cache.get(WEBSITE, "example.com").is_fresh
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_website_error_not_cached(self, engine, cache):
+        engine.website_parser.parse_multiple_pages.return_value = {
+            "url": "https://example.com", "error": "boom",
+        }
+        await engine._parse_website("https://example.com")
+        assert cache.get(WEBSITE, "example.com") is None
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_empty_search_not_cached(self, engine, cache):
+        engine.web_search.search.return_value = []
+        await engine._search_industry("logistics")
+        assert cache.get(SEARCH, "logistics") is None
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_insights_cache_keyed_by_website_data(self, engine):
+        """Different website data for the same industry triggers a new synthesis."""
+        await engine.research(website="https://a.com", industry="logistics")
+        engine.website_parser.parse_multiple_pages.return_value = {"title": "Other"}
+        await engine.research(website="https://b.com", industry="logistics")
+
+        assert engine.deepseek.chat.await_count == 2
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_engine_without_cache_unchanged(self):
+        """cache=None (default) keeps the uncached behaviour."""
+        eng = ResearchEngine(deepseek_client=AsyncMock(), web_search_client=AsyncMock())
+        assert eng.cache is None
@@ -56,7 +56,7 @@ def mock_web_search():
 def mock_website_parser():
     """WebsiteParser mock returning parsed website data."""
     parser = AsyncMock()
-    parser.parse = AsyncMock(return_value={
+    parser.parse_multiple_pages = AsyncMock(return_value={
         "title": "Test Company",
         "description": "We do great things",
         "services": ["service1", "service2"],
@@ -190,7 +190,7 @@ class TestResearch:
         """Only website provided -> parses website, no industry search."""
         result = await engine.research(website="https://example.com")
 
-        mock_website_parser.parse.assert_awaited_once_with("https://example.com")
+        mock_website_parser.parse_multiple_pages.assert_awaited_once_with("https://example.com")
         engine.web_search.search.assert_not_awaited()
         assert result.website_data is not None
         assert isinstance(result, ResearchResult)
@@ -201,7 +201,7 @@ class TestResearch:
         """Only industry provided -> web search, no website parsing."""
         result = await engine.research(industry="logistics")
 
-        mock_website_parser.parse.assert_not_awaited()
+        mock_website_parser.parse_multiple_pages.assert_not_awaited()
         engine.web_search.search.assert_awaited()
         assert isinstance(result, ResearchResult)
 
@@ -214,7 +214,7 @@ class TestResearch:
             industry="logistics",
         )
 
-        mock_website_parser.parse.assert_awaited_once()
+        mock_website_parser.parse_multiple_pages.assert_awaited_once()
         engine.web_search.search.assert_awaited()
         assert isinstance(result, ResearchResult)
 
@@ -224,7 +224,7 @@ class TestResearch:
         """No website, no industry -> empty result, no tasks run."""
         result = await engine.research()
 
-        mock_website_parser.parse.assert_not_awaited()
+        mock_website_parser.parse_multiple_pages.assert_not_awaited()
         engine.web_search.search.assert_not_awaited()
         assert result.has_data() is False
         assert result.confidence_score == 0.0
@@ -243,7 +243,7 @@ class TestResearch:
 
         result = await eng.research(website="https://example.com")
 
-        mock_parser.parse.assert_not_awaited()
+        mock_parser.parse_multiple_pages.assert_not_awaited()
 
     @pytest.mark.unit
     @pytest.mark.asyncio
@@ -265,7 +265,7 @@ class TestResearch:
     @pytest.mark.asyncio
     async def test_research_exception_handling(self, engine, mock_website_parser):
         """One task raising exception does not prevent others from succeeding."""
-        mock_website_parser.parse.side_effect = RuntimeError("Parse failed")
+        mock_website_parser.parse_multiple_pages.side_effect = RuntimeError("Parse failed")
 
         result = await engine.research(
             website="https://example.com",
@@ -303,13 +303,13 @@ class TestParseWebsite:
         assert result["type"] == "website"
         assert "data" in result
         assert result["data"]["title"] == "Test Company"
-        mock_website_parser.parse.assert_awaited_once_with("https://example.com")
+        mock_website_parser.parse_multiple_pages.assert_awaited_once_with("https://example.com")
 
     @pytest.mark.unit
     @pytest.mark.asyncio
     async def test_parse_website_error(self, engine, mock_website_parser):
         """Parser exception returns dict with type=website and error string."""
-        mock_website_parser.parse.side_effect = ConnectionError("Timeout")
+        mock_website_parser.parse_multiple_pages.side_effect = ConnectionError("Timeout")
 
         result = await engine._parse_website("https://bad-site.com")
 
@@ -322,7 +322,7 @@ class TestParseWebsite:
     @pytest.mark.asyncio
     async def test_parse_website_returns_full_data(self, engine, mock_website_parser):
         """Parsed data is passed through without modification."""
-        mock_website_parser.parse.return_value = {
+        mock_website_parser.parse_multiple_pages.return_value = {
             "title": "Acme Corp",
             "description": "Leading provider",
             "services": ["consulting"],
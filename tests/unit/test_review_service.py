@@ -390,6 +390,36 @@ class TestReviewWithRetry:
         mock_hc.assert_called_once_with(anketa)
         assert result is anketa
 
+    def test_injected_prompt_and_console_cover_editor_path(self):
+        """Non-interactive runs: confirmations go to prompt_fn, output to output_console."""
+        with patch("src.anketa.review_service.AnketaGenerator"), \
+             patch("src.anketa.review_service.AnketaMarkdownParser"), \
+             patch("src.anketa.review_service.DocumentParser"):
+            from src.anketa.review_service import AnketaReviewService
+
+            prompts = []
+            output = MagicMock()
+            service = AnketaReviewService(
+                prompt_fn=lambda text, **kwargs: prompts.append((text, kwargs)) or "y",
+                output_console=output,
+            )
+        anketa = _make_anketa()
+        updated = _make_anketa(company_name="NewCorp")
+        failed = _make_review_result(status=ReviewStatus.VALIDATION_FAILED, content="# bad", errors=["e1"])
+        ok_result = _make_review_result(status=ReviewStatus.COMPLETED, changed=True, content="# edited")
+
+        with patch("src.anketa.review_service.DocumentReviewer") as MockRev, \
+             patch("src.anketa.review_service.Confirm.ask", side_effect=AssertionError("stdin")), \
+             patch.object(service.parser, "parse", return_value=updated), \
+             patch("src.anketa.review_service.console") as module_console:
+            MockRev.return_value.review.side_effect = [failed, ok_result]
+            result = service._review_with_retry(anketa, "# md")
+
+        assert result is updated
+        assert [kwargs["choices"] for _, kwargs in prompts] == [["y", "n"], ["y", "n"]]
+        assert output.print.called
+        assert not module_console.print.called
+
     def test_review_success_no_changes_returns_original(self):
         """No changes -> returns original anketa immediately."""
         service = _build_service()
@@ -0,0 +1,81 @@
+"""
+Unit tests for src/serialization.py (orjson with stdlib fallback).
+"""
+
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import pytest
+
+from src import serialization
+from src.serialization import ORJSONResponse, dumps, dumps_bytes, loads
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    """Run each test with orjson and with the stdlib fallback."""
+    if request.param == "stdlib":
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+class TestDumps:
+    """Test encoding."""
+
+    def test_unicode_not_escaped_and_compact(self, backend):
+        assert dumps({"name": "Клиника", "n": [1, 2]}) == '{"name":"Клиника","n":[1,2]}'
+
+    def test_bytes_are_utf8(self, backend):
+        assert dumps_bytes({"a": "я"}) == '{"a":"я"}'.encode("utf-8")
+
+    def test_indent(self, backend):
+        assert dumps({"a": 1}, indent=True) == '{\n  "a": 1\n}'
+
+    def test_non_str_keys(self, backend):
+        assert loads(dumps({1: "x"})) == {"1": "x"}
+
+    def test_default_receives_datetime(self, backend):
+        """С default= datetime сериализуется так же, как в json.dumps(default=str)."""
+        ts = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        assert loads(dumps({"ts": ts}, default=str)) == {"ts": str(ts)}
+
+    def test_default_receives_dataclass(self, backend):
+        @dataclass
+        class Point:
+            x: int
+
+        assert loads(dumps({"p": Point(1)}, default=lambda o: "point")) == {"p": "point"}
+
+    def test_unsupported_type_raises_type_error(self, backend):
+        with pytest.raises(TypeError):
+            dumps({"x": object()})
+
+    def test_big_int_falls_back_to_stdlib(self, backend):
+        assert loads(dumps({"n": 2 ** 70})) == {"n": 2 ** 70}
+
+
+class TestLoads:
+    """Test decoding."""
+
+    def test_str_and_bytes(self, backend):
+        assert loads('{"a": "я"}') == {"a": "я"}
+        assert loads('{"a": "я"}'.encode("utf-8")) == {"a": "я"}
+
+    def test_invalid_raises_json_decode_error(self, backend):
+        with pytest.raises(json.JSONDecodeError):
+            loads("{broken")
+
+    def test_nan_accepted_like_stdlib(self, backend):
+        assert loads('{"x": NaN}')["x"] != loads('{"x": NaN}')["x"]
+
+
+class TestORJSONResponse:
+    """Test the FastAPI response class."""
+
+    def test_render_returns_bytes(self, backend):
+        response = ORJSONResponse({"status": "ок"})
+        assert response.body == '{"status":"ок"}'.encode("utf-8")
+        assert response.media_type == "application/json"
@@ -0,0 +1,148 @@
+"""
+Unit tests for session push events (src/web/events.py and the SSE endpoint).
+
+Tests cover:
+- anketa_delta / format_sse helpers
+- SessionEventBroker: deltas computed once per change, dedup, runtime status,
+  thread-safe publish, slow-consumer resync, cleanup on unsubscribe
+- GET /api/session/{id}/events snapshot and terminal-status stream end
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pytest
+
+from src.web.events import SessionEventBroker, anketa_delta, format_sse
+
+
+def _drain(queue):
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+class TestHelpers:
+
+    @pytest.mark.unit
+    def test_anketa_delta(self):
+        old = {"a": 1, "b": [1], "c": "x"}
+        new = {"a": 1, "b": [1, 2], "d": None}
+        assert anketa_delta(old, new) == {"changed": {"b": [1, 2], "d": None}, "removed": ["c"]}
+
+    @pytest.mark.unit
+    def test_format_sse(self):
+        frame = format_sse("anketa", {"x": "я"}, event_id=7)
+        assert frame == 'id: 7\nevent: anketa\ndata: {"x":"я"}\n\n'
+
+
+class TestSessionEventBroker:
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_anketa_delta_fanned_out_once(self):
+        calls = []
+        broker = SessionEventBroker(completion_fn=lambda data: calls.append(data) or 0.5)
+        q1 = broker.subscribe("s1", {"company_name": "Acme"})
+        q2 = broker.subscribe("s1")
+
+        broker.publish("s1", "anketa", {"anketa_data": {"company_name": "Acme", "industry": "IT"}})
+
+        m1, m2 = _drain(q1), _drain(q2)
+        assert m1 == m2
+        assert m1[0]["event"] == "anketa"
+        assert m1[0]["data"]["changed"] == {"industry": "IT"}
+        assert m1[0]["data"]["completion_rate"] == 0.5
+        assert len(calls) == 1
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_unchanged_anketa_and_runtime_skipped(self):
+        broker = SessionEventBroker()
+        queue = broker.subscribe("s1", {"a": 1}, runtime_status="idle")
+
+        broker.publish("s1", "anketa", {"anketa_data": {"a": 1}})
+        broker.publish("s1", "runtime", {"runtime_status": "idle"})
+        broker.publish("s1", "runtime", {"runtime_status": "processing"})
+
+        assert [m["event"] for m in _drain(queue)] == ["runtime"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_unsubscribed_session_ignored(self):
+        broker = SessionEventBroker(completion_fn=lambda data: pytest.fail("computed for nobody"))
+        queue = broker.subscribe("s1")
+        broker.publish("other", "anketa", {"anketa_data": {"a": 1}})
+        assert queue.empty()
+
+        broker.unsubscribe("s1", queue)
+        assert broker.subscriber_count() == 0
+        assert broker._snapshots == {}
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_publish_from_worker_thread(self):
+        broker = SessionEventBroker()
+        queue = broker.subscribe("s1")
+
+        thread = threading.Thread(target=broker.publish, args=("s1", "status", {"status": "paused"}))
+        thread.start()
+        thread.join()
+
+        message = await asyncio.wait_for(queue.get(), timeout=1)
+        assert message["data"] == {"status": "paused"}
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_slow_consumer_gets_resync(self):
+        broker = SessionEventBroker()
+        queue = broker.subscribe("s1")
+
+        for i in range(queue.maxsize + 1):
+            broker.publish("s1", "dialogue", {"message_count": i})
+
+        assert [m["event"] for m in _drain(queue)] == ["resync"]
+
+
+class TestEventsEndpoint:
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        from fastapi.testclient import TestClient
+        from src.session.manager import SessionManager
+        from src.web import server
+
+        temp_mgr = SessionManager(db_path=str(tmp_path / "test.db"))
+        original_mgr = server.session_mgr
+        server.session_mgr = temp_mgr
+        yield TestClient(server.app, raise_server_exceptions=False), temp_mgr
+        server.session_mgr = original_mgr
+        temp_mgr.close()
+
+    @pytest.mark.unit
+    def test_terminal_session_sends_snapshot_and_closes(self, client):
+        http, mgr = client
+        session = mgr.create_session()
+        mgr.update_anketa(session.session_id, {"company_name": "Acme"})
+        mgr.update_status(session.session_id, "declined", force=True)
+
+        resp = http.get(f"/api/session/{session.session_id}/events")
+
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        event, data = resp.text.strip().split("\n")
+        assert event == "event: snapshot"
+        payload = json.loads(data[len("data: "):])
+        assert payload["anketa_data"] == {"company_name": "Acme"}
+        assert payload["status"] == "declined"
+
+    @pytest.mark.unit
+    def test_unknown_session_404(self, client):
+        http, _ = client
+        assert http.get("/api/session/abcdef12/events").status_code == 404
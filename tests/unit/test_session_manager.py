@@ -752,3 +752,133 @@ class TestMergeDocumentContexts:
         result = SessionManager._merge_document_contexts(existing, new)
         assert len(result["key_facts"]) == 2
         assert "New fact" in result["key_facts"]
+
+
+class TestListeners:
+    """Change listeners are notified after each committed update."""
+
+    def _record(self, manager):
+        events = []
+        manager.add_listener(lambda sid, event, data: events.append((sid, event, data)))
+        return events
+
+    def test_update_anketa_notifies_merged_data(self, manager):
+        session = manager.create_session()
+        manager.update_anketa(session.session_id, {"company_name": "Acme"})
+        events = self._record(manager)
+
+        manager.update_anketa(session.session_id, {"industry": "IT"}, "# md")
+
+        sid, event, data = events[-1]
+        assert (sid, event) == (session.session_id, "anketa")
+        assert data["anketa_data"] == {"company_name": "Acme", "industry": "IT"}
+        assert data["anketa_md"] == "# md"
+
+    def test_status_and_dialogue_notify(self, manager):
+        session = manager.create_session()
+        events = self._record(manager)
+
+        manager.update_dialogue(session.session_id, [{"role": "user", "content": "hi"}], 5.0,
+                                status="paused")
+        manager.update_status(session.session_id, "active")
+
+        assert [e[1] for e in events] == ["dialogue", "status", "status"]
+        assert events[0][2] == {"message_count": 1, "duration_seconds": 5.0}
+        assert events[-1][2] == {"status": "active"}
+
+    def test_missing_session_does_not_notify(self, manager):
+        events = self._record(manager)
+        manager.update_anketa("nosuchid", {"company_name": "X"})
+        manager.update_dialogue("nosuchid", [], 0.0)
+        assert events == []
+
+    def test_failing_listener_does_not_break_write(self, manager):
+        session = manager.create_session()
+
+        def boom(sid, event, data):
+            raise RuntimeError("listener down")
+
+        manager.add_listener(boom)
+        manager.add_listener(boom)  # duplicate is ignored
+        assert manager.update_metadata(session.session_id, company_name="Acme") is True
+        assert manager.get_session(session.session_id).company_name == "Acme"
+
+        manager.remove_listener(boom)
+        assert manager._listeners == []
+
+
+class TestAnketaVersion:
+    """anketa_version / completion_rate are maintained at write time."""
+
+    def test_version_bumps_only_on_change(self, manager):
+        session = manager.create_session()
+        assert manager.get_session_version(session.session_id)["anketa_version"] == 0
+
+        manager.update_anketa(session.session_id, {"company_name": "Acme"})
+        manager.update_anketa(session.session_id, {"company_name": "Acme"})  # no-op
+        assert manager.get_session(session.session_id).anketa_version == 1
+
+        manager.update_anketa(session.session_id, {"industry": "IT"}, "# md")
+        assert manager.get_session(session.session_id).anketa_version == 2
+
+    def test_completion_rate_stored(self, manager):
+        session = manager.create_session()
+        manager.update_anketa(session.session_id, {
+            "company_name": "Acme", "industry": "IT", "agent_name": "Ассистент",
+        })
+
+        loaded = manager.get_session(session.session_id)
+        assert 0.0 < loaded.completion_rate <= 1.0
+
+    def test_update_session_keeps_version_without_anketa_change(self, manager):
+        session = manager.create_session()
+        manager.update_anketa(session.session_id, {"company_name": "Acme"})
+        loaded = manager.get_session(session.session_id)
+
+        loaded.contact_name = "Иван"
+        manager.update_session(loaded)
+        assert manager.get_session(session.session_id).anketa_version == 1
+
+        loaded.anketa_data = {"company_name": "Beta"}
+        manager.update_session(loaded)
+        assert manager.get_session(session.session_id).anketa_version == 2
+
+    def test_list_version_changes_on_write(self, manager):
+        before = manager.sessions_list_version()
+        session = manager.create_session()
+        created = manager.sessions_list_version()
+        manager.update_metadata(session.session_id, company_name="Acme")
+
+        assert created[0] == before[0] + 1
+        assert manager.sessions_list_version() != created
+        assert manager.sessions_list_version("confirmed") == (0, None)
+
+    def test_legacy_db_gets_columns_and_backfill(self, tmp_path):
+        import json
+        import sqlite3
+
+        db_path = str(tmp_path / "legacy.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "CREATE TABLE sessions (session_id TEXT PRIMARY KEY, room_name TEXT NOT NULL DEFAULT '', "
+            "unique_link TEXT NOT NULL UNIQUE, status TEXT NOT NULL DEFAULT 'active', "
+            "created_at TEXT NOT NULL, updated_at TEXT NOT NULL, "
+            "dialogue_history TEXT NOT NULL DEFAULT '[]', anketa_data TEXT, anketa_md TEXT, "
+            "company_name TEXT, contact_name TEXT, duration_seconds REAL NOT NULL DEFAULT 0.0, "
+            "output_dir TEXT)"
+        )
+        conn.execute(
+            "INSERT INTO sessions (session_id, unique_link, created_at, updated_at, anketa_data) "
+            "VALUES ('old1', 'link', '2025-01-01T00:00:00+00:00', '2025-01-01T00:00:00+00:00', ?)",
+            (json.dumps({"company_name": "Acme", "industry": "IT"}),),
+        )
+        conn.commit()
+        conn.close()
+
+        mgr = SessionManager(db_path=db_path)
+        try:
+            loaded = mgr.get_session("old1")
+            assert loaded.anketa_version == 0
+            assert loaded.completion_rate > 0.0
+        finally:
+            mgr.close()
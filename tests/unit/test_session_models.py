@@ -169,7 +169,7 @@ class TestModelDump:
             "created_at", "updated_at", "dialogue_history",
             "anketa_data", "anketa_md", "company_name", "contact_name",
             "duration_seconds", "output_dir", "document_context",
-            "voice_config",
+            "voice_config", "anketa_version", "completion_rate",
         }
         assert set(data.keys()) == expected_keys
 
@@ -0,0 +1,208 @@
+"""
+Unit tests for the client simulator runner and batch runner.
+
+Tests cover:
+- ConsultationTester.ask: scripted answers vs async SimulatedClient responses
+- AnketaReviewService prompt_fn injection (review prompt → save)
+- ConsultantInterviewer input_provider injection
+- run_batch: bounded concurrency, failure isolation, aggregated summary
+- TestReporter.batch_report summary file
+"""
+
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.agent_client_simulator.batch import BatchResult, discover_scenarios, run_batch
+from src.agent_client_simulator.runner import ConsultationTester, TestResult
+from src.agent_client_simulator.reporter import TestReporter
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _make_tester():
+    client = MagicMock()
+    client.respond = AsyncMock(return_value="У нас салон красоты, 3 мастера.")
+    client.persona = MagicMock(name="persona")
+    return ConsultationTester(client=client, verbose=False)
+
+
+def _result(name, status="completed", score=80.0, passed=True, duration=10.0):
+    return TestResult(
+        scenario_name=name,
+        status=status,
+        duration_seconds=duration,
+        turn_count=5,
+        validation={"score": score, "passed": passed} if status == "completed" else None,
+    )
+
+
+# ===========================================================================
+# ConsultationTester input provider
+# ===========================================================================
+
+class TestTesterInputProvider:
+
+    @pytest.mark.asyncio
+    async def test_dialogue_prompt_uses_async_client(self):
+        tester = _make_tester()
+        answer = await tester.ask("\n[green]Вы[/green]")
+
+        assert answer == "У нас салон красоты, 3 мастера."
+        tester.client.respond.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_confirmation_prompt_scripted(self):
+        tester = _make_tester()
+        answer = await tester.ask("[cyan]Я правильно понял? (да/нет/уточнить)[/cyan]", default="да")
+
+        assert answer == "да"
+        tester.client.respond.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_refinement_prompt_accepts_suggestion(self):
+        tester = _make_tester()
+        assert await tester.ask("[green]Ваш ответ (или Enter для предложения)[/green]") == ""
+
+    @pytest.mark.asyncio
+    async def test_turn_limit_returns_done(self):
+        tester = _make_tester()
+        tester.turn_count = tester.max_turns_per_phase * 4
+        assert await tester.ask("Вы") == "done"
+
+    @pytest.mark.asyncio
+    async def test_client_error_falls_back(self):
+        tester = _make_tester()
+        tester.client.respond.side_effect = RuntimeError("LLM down")
+        assert await tester.ask("Вы") == "Да, продолжайте, пожалуйста."
+
+    def test_review_prompt_selects_save(self):
+        tester = _make_tester()
+        assert tester._review_prompt("Выберите действие", choices=["o", "s", "c"], default="o") == "s"
+
+    def test_review_service_uses_prompt_fn(self):
+        from src.anketa.review_service import AnketaReviewService
+
+        service = AnketaReviewService(prompt_fn=lambda text, **kw: "c")
+        with patch("src.anketa.review_service.Prompt.ask") as mock_ask:
+            assert service.prompt_action() == "cancel"
+        mock_ask.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_interviewer_uses_input_provider(self):
+        from src.consultant.interviewer import ConsultantInterviewer
+
+        provider = AsyncMock(return_value="нет")
+        interviewer = ConsultantInterviewer(deepseek_client=MagicMock(), input_provider=provider)
+
+        with patch("src.consultant.interviewer.Prompt.ask") as mock_ask:
+            assert await interviewer._confirm_transition("Перейти к анализу?") is False
+        provider.assert_awaited_once_with("", default="да")
+        mock_ask.assert_not_called()
+
+
+# ===========================================================================
+# Batch runner
+# ===========================================================================
+
+class TestRunBatch:
+
+    @pytest.mark.asyncio
+    async def test_runs_with_bounded_concurrency(self):
+        in_flight = 0
+        peak = 0
+
+        async def fake_run(path, verbose=False, input_dir=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return _result(Path(path).stem)
+
+        paths = [Path(f"s{i}.yaml") for i in range(7)]
+        with patch("src.agent_client_simulator.batch.run_test_scenario", side_effect=fake_run):
+            batch = await run_batch(paths, workers=3)
+
+        assert peak == 3
+        assert [r.scenario_name for r in batch.results] == [f"s{i}" for i in range(7)]
+        assert batch.workers == 3
+
+    @pytest.mark.asyncio
+    async def test_failure_is_isolated(self):
+        async def fake_run(path, verbose=False, input_dir=None):
+            if "bad" in str(path):
+                raise ValueError("broken yaml")
+            return _result(Path(path).stem)
+
+        seen = []
+        with patch("src.agent_client_simulator.batch.run_test_scenario", side_effect=fake_run):
+            batch = await run_batch(
+                [Path("good.yaml"), Path("bad.yaml")], workers=2, on_result=seen.append
+            )
+
+        statuses = {r.scenario_name: r.status for r in batch.results}
+        assert statuses == {"good": "completed", "bad": "failed"}
+        assert "broken yaml" in batch.results[1].errors[0]
+        assert len(seen) == 2
+
+    @pytest.mark.asyncio
+    async def test_per_scenario_cassettes(self, tmp_path):
+        seen = {}
+
+        async def fake_run(path, verbose=False, input_dir=None, cassette=None, cassette_mode=None):
+            seen[Path(path).stem] = (cassette, cassette_mode)
+            return _result(Path(path).stem)
+
+        with patch("src.agent_client_simulator.batch.run_test_scenario", side_effect=fake_run):
+            await run_batch(
+                [Path("a.yaml"), Path("b.yaml")], cassette_dir=tmp_path, cassette_mode="replay"
+            )
+
+        assert seen["a"] == (str(tmp_path / "a.json"), "replay")
+        assert seen["b"] == (str(tmp_path / "b.json"), "replay")
+
+    def test_summary_aggregates(self):
+        batch = BatchResult(
+            results=[
+                _result("a", score=90.0),
+                _result("b", score=70.0, passed=False),
+                _result("c", status="failed"),
+            ],
+            workers=2,
+            wall_time_seconds=12.0,
+        )
+        summary = batch.summary()
+
+        assert summary["total"] == 3
+        assert summary["completed"] == 2
+        assert summary["failed"] == 1
+        assert summary["validation_passed"] == 1
+        assert summary["average_score"] == 80.0
+        assert summary["sum_duration_seconds"] == 30.0
+
+    def test_discover_scenarios_skips_templates(self, tmp_path):
+        (tmp_path / "_template.yaml").write_text("x: 1")
+        (tmp_path / "b.yaml").write_text("x: 1")
+        (tmp_path / "a.yaml").write_text("x: 1")
+
+        assert [p.name for p in discover_scenarios(tmp_path)] == ["a.yaml", "b.yaml"]
+
+    def test_batch_report_writes_summary(self, tmp_path):
+        reporter = TestReporter(output_dir=str(tmp_path))
+        batch = BatchResult(results=[_result("a")], workers=1, wall_time_seconds=1.0)
+
+        files = reporter.batch_report(batch, save_files=True)
+
+        summary = json.loads(files["summary"].read_text(encoding="utf-8"))
+        assert summary["total"] == 1
+        assert "a" in files
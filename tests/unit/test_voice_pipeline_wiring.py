@@ -85,7 +85,7 @@ def _make_anketa_mock(completion_rate=0.6, website=None, contact_phone=None):
     anketa.contact_phone = contact_phone or "+1234567890"
     anketa.completion_rate.return_value = completion_rate
     # Include all required fields for _check_required_fields()
-    anketa.model_dump.return_value = {
+    anketa.to_json_dict.return_value = {
         "company_name": "TestLogistics",
         "industry": "logistics",
         "business_description": "Test business",
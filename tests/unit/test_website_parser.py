@@ -485,3 +485,219 @@ class TestParseMultiplePages:
 
         assert "error" in result
         assert "Connection failed" in result["error"]
+
+
+# ============ CRAWLER TESTS ============
+
+HOME_HTML = """
+<html>
+<head><title>Клиника Улыбка</title>
+<meta name="description" content="Стоматология в центре города"></head>
+<body>
+    <a href="/uslugi/">Наши услуги</a>
+    <a href="https://www.example.com/prices">Цены</a>
+    <a href="/kontakty">Контакты</a>
+    <a href="/blog/post-1">Блог</a>
+    <a href="https://other.com/uslugi">Партнёр</a>
+    <a href="/files/price.pdf">Прайс PDF</a>
+    <p>Телефон: +7 (495) 123-45-67</p>
+</body>
+</html>
+"""
+
+PAGES = {
+    "https://example.com": HOME_HTML,
+    "https://example.com/uslugi/": (
+        "<ul><li>Лечение кариеса под микроскопом</li>"
+        "<li>Имплантация зубов под ключ</li>"
+        "<li>Профессиональная гигиена полости рта</li>"
+        "<li>Исправление прикуса брекетами</li>"
+        "<li>Отбеливание зубов системой Zoom</li></ul>"
+    ),
+    "https://www.example.com/prices": "<p>Консультация — 1 500 ₽, чистка от 4500 руб.</p>",
+    "https://example.com/kontakty": "<p>г. Москва, ул. Тверская, 12</p><p>info@example.com</p>",
+}
+
+
+def _make_site_client(pages=PAGES, delay: float = 0.0):
+    """Mock httpx.AsyncClient serving pages from a dict (404 for unknown URLs)."""
+    import asyncio
+
+    requested = []
+
+    async def _get(url, headers=None):
+        requested.append(url)
+        if delay:
+            await asyncio.sleep(delay)
+        response = MagicMock()
+        response.status_code = 200 if url in pages else 404
+        response.headers = {}
+        response.text = pages.get(url, "")
+        if url not in pages:
+            response.raise_for_status = MagicMock(side_effect=Exception("404 Not Found"))
+        else:
+            response.raise_for_status = MagicMock()
+        return response
+
+    client = AsyncMock()
+    client.get = AsyncMock(side_effect=_get)
+    client.__aenter__ = AsyncMock(return_value=client)
+    client.__aexit__ = AsyncMock(return_value=False)
+    client.requested = requested
+    return client
+
+
+class TestCrawler:
+    """Test multi-page crawling: link discovery, merging, budget, early stop."""
+
+    @pytest.mark.unit
+    def test_discover_links_same_origin_and_priority(self):
+        """Only same-site links matching page keywords, prices first."""
+        parser = WebsiteParser()
+        links = parser._discover_links(HOME_HTML, "https://example.com")
+
+        assert links == [
+            "https://www.example.com/prices",
+            "https://example.com/uslugi/",
+            "https://example.com/kontakty",
+        ]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_crawl_merges_subpages(self):
+        """Data from services, prices and contacts pages is merged into one result."""
+        parser = WebsiteParser(politeness_delay=0)
+        client = _make_site_client()
+
+        with patch("src.research.website_parser.httpx.AsyncClient", return_value=client):
+            result = await parser.parse_multiple_pages("example.com")
+
+        assert result["title"] == "Клиника Улыбка"
+        assert result["contacts"]["phone"] == "+7 (495) 123-45-67"
+        assert result["contacts"]["email"] == "info@example.com"
+        assert "Тверская" in result["contacts"]["address"]
+        assert "1 500 ₽" in result["prices"]
+        assert "Имплантация зубов под ключ" in result["services"]
+        assert len(result["pages"]) == 4
+        assert "https://other.com/uslugi" not in client.requested
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_crawl_respects_max_pages(self):
+        """max_pages limits the number of fetched pages including the home page."""
+        parser = WebsiteParser(politeness_delay=0)
+        client = _make_site_client()
+
+        with patch("src.research.website_parser.httpx.AsyncClient", return_value=client):
+            result = await parser.parse_multiple_pages("https://example.com", max_pages=2)
+
+        assert len(client.requested) == 2
+        assert result["pages"] == ["https://example.com", "https://www.example.com/prices"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_crawl_time_budget_returns_partial(self):
+        """Slow subpages are cancelled when the time budget runs out."""
+        parser = WebsiteParser(politeness_delay=0)
+        slow_pages = dict(PAGES)
+        client = _make_site_client(slow_pages)
+
+        async def _slow_get(url, headers=None, _orig=client.get.side_effect):
+            if url != "https://example.com":
+                import asyncio
+                await asyncio.sleep(5)
+            return await _orig(url, headers)
+
+        client.get = AsyncMock(side_effect=_slow_get)
+
+        with patch("src.research.website_parser.httpx.AsyncClient", return_value=client):
+            result = await parser.parse_multiple_pages("https://example.com", time_budget=0.2)
+
+        assert result["pages"] == ["https://example.com"]
+        assert result["title"] == "Клиника Улыбка"
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_crawl_stops_early_when_complete(self):
+        """Home page with all key fields → no subpages fetched."""
+        complete_home = HOME_HTML.replace(
+            "</body>",
+            "<p>info@example.com, г. Москва, ул. Тверская, 12</p><p>от 1000 ₽</p>"
+            + PAGES["https://example.com/uslugi/"] + "</body>",
+        )
+        parser = WebsiteParser(politeness_delay=0)
+        client = _make_site_client({"https://example.com": complete_home})
+
+        with patch("src.research.website_parser.httpx.AsyncClient", return_value=client):
+            result = await parser.parse_multiple_pages("https://example.com")
+
+        assert client.requested == ["https://example.com"]
+        assert result["pages"] == ["https://example.com"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_crawl_blocks_unsafe_redirect_on_subpage(self):
+        """R21-18: SSRF check applies to redirect hops of every crawled page."""
+        parser = WebsiteParser(politeness_delay=0)
+        client = _make_site_client()
+        orig = client.get.side_effect
+
+        async def _get(url, headers=None):
+            if url == "https://example.com/kontakty":
+                response = MagicMock()
+                response.status_code = 302
+                response.headers = {"location": "http://127.0.0.1/admin"}
+                return response
+            return await orig(url, headers)
+
+        client.get = AsyncMock(side_effect=_get)
+
+        with patch("src.research.website_parser.httpx.AsyncClient", return_value=client):
+            result = await parser.parse_multiple_pages("https://example.com")
+
+        assert "https://example.com/kontakty" not in result["pages"]
+        assert all("127.0.0.1" not in call.args[0] for call in client.get.call_args_list)
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_crawl_blocks_unsafe_discovered_link(self):
+        """A same-site link whose host resolves to a private address is not fetched."""
+        parser = WebsiteParser(politeness_delay=0)
+        client = _make_site_client()
+
+        def _safe(url):
+            return not url.startswith("https://www.example.com")
+
+        with patch("src.research.website_parser.httpx.AsyncClient", return_value=client), \
+                patch("src.research.website_parser._is_safe_url", side_effect=_safe):
+            result = await parser.parse_multiple_pages("https://example.com")
+
+        assert "https://www.example.com/prices" not in client.requested
+        assert "https://example.com/kontakty" in result["pages"]
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_crawl_uses_single_pooled_client(self):
+        """All pages of one crawl share one AsyncClient with connection limits."""
+        parser = WebsiteParser(politeness_delay=0)
+        client = _make_site_client()
+
+        with patch("src.research.website_parser.httpx.AsyncClient", return_value=client) as mock_cls:
+            await parser.parse_multiple_pages("https://example.com")
+
+        mock_cls.assert_called_once()
+        assert mock_cls.call_args.kwargs["follow_redirects"] is False
+        assert "limits" in mock_cls.call_args.kwargs
+
+    @pytest.mark.unit
+    @pytest.mark.asyncio
+    async def test_injected_client_is_reused(self):
+        """A client passed to the constructor is used instead of creating one."""
+        client = _make_site_client()
+        parser = WebsiteParser(client=client, politeness_delay=0)
+
+        with patch("src.research.website_parser.httpx.AsyncClient") as mock_cls:
+            result = await parser.parse("https://example.com")
+
+        mock_cls.assert_not_called()
+        assert result["title"] == "Клиника Улыбка"